@@ -1013,8 +1013,13 @@ fi
 stop_assistant_processes() {
     local stopped=false
 
-    # Stop systemd service first (if enabled) - this also stops the daemon process
+    # Stop systemd service first (if enabled) - this also stops the daemon process.
+    # Stop the socket unit too, otherwise a client connecting mid-update would
+    # re-activate the daemon with half-installed code.
     local systemd_stopped=false
+    if command -v systemctl &> /dev/null && systemctl --user is-active llm-assistant.socket &> /dev/null; then
+        systemctl --user stop llm-assistant.socket
+    fi
     if command -v systemctl &> /dev/null && systemctl --user is-active llm-assistant.service &> /dev/null; then
         log "Stopping llm-assistant systemd service..."
         systemctl --user stop llm-assistant.service && systemd_stopped=true && stopped=true
@@ -0,0 +1,98 @@
+"""Benchmark system prompt assembly overhead.
+
+Measures what llm-assistant spends on the system prompt before each model
+call, with and without the caches in llm_assistant.templates:
+
+- cold: compiling system_prompt.j2 in a new process, from source and from
+  the bytecode cache
+- turn: rendering the base template and session sections and laying them
+  out (what _render_system_prompt/_system_prompt_layout do), memoized and
+  not memoized
+
+Usage:
+    python benchmarks/bench_prompt_assembly.py [--turns 2000]
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+
+from jinja2 import FileSystemBytecodeCache, PackageLoader, select_autoescape
+from jinja2.sandbox import SandboxedEnvironment
+
+from llm_assistant import templates
+from llm_tools_core.prompt_layout import SESSION, TURN, PromptSegment, layout_prompt
+
+BASE_VARS = dict(mode="assistant", platform="Linux", exec=True)
+ENVIRONMENT_VARS = dict(date="2026-01-01", platform="Linux", shell="bash 5.2", environment="")
+SKILLS_XML = "<available_skills>\n" + "".join(
+    f"  <skill><name>skill-{i}</name><description>{'Does things. ' * 20}</description></skill>\n"
+    for i in range(20)
+) + "</available_skills>"
+
+
+def _environment(bytecode_cache=None) -> SandboxedEnvironment:
+    return SandboxedEnvironment(
+        loader=PackageLoader('llm_assistant', 'templates'),
+        autoescape=select_autoescape(['html']),
+        trim_blocks=True,
+        lstrip_blocks=True,
+        bytecode_cache=bytecode_cache,
+    )
+
+
+def _time_ms(fn, repeat: int) -> float:
+    """Median wall time of fn() in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def bench_cold(repeat: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = FileSystemBytecodeCache(tmp)
+        _environment(cache).get_template('system_prompt.j2')  # Populate the cache
+        source = _time_ms(lambda: _environment().get_template('system_prompt.j2'), repeat)
+        cached = _time_ms(lambda: _environment(cache).get_template('system_prompt.j2'), repeat)
+    print(f"cold load system_prompt.j2:  source {source:7.3f} ms   bytecode cache {cached:7.3f} ms")
+
+
+def _assemble(render) -> str:
+    segments = [
+        PromptSegment("base", render('system_prompt.j2', **BASE_VARS)),
+        PromptSegment("skills", render('sections/skills.j2', skills_xml=SKILLS_XML), SESSION),
+        PromptSegment("rag", render('sections/rag.j2', gui=False), SESSION),
+        PromptSegment("environment", render('sections/environment.j2', gui=False, **ENVIRONMENT_VARS), TURN),
+        PromptSegment("watch", render('sections/watch.j2', watch_goal="spot failing builds"), TURN),
+    ]
+    return layout_prompt(segments).text
+
+
+def _render_uncached(template_name: str, **kwargs) -> str:
+    return templates._env.get_template(template_name).render(**kwargs)
+
+
+def bench_turn(turns: int) -> None:
+    templates.clear_render_cache()
+    assert _assemble(templates.render) == _assemble(_render_uncached)
+    plain = _time_ms(lambda: _assemble(_render_uncached), turns)
+    memo = _time_ms(lambda: _assemble(templates.render), turns)
+    print(f"per-turn prompt assembly:    render  {plain:7.3f} ms   memoized       {memo:7.3f} ms")
+    print(f"render cache: {templates.render_cache_stats()}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=2000, help="Assemblies timed per variant")
+    parser.add_argument("--cold", type=int, default=50, help="Cold loads timed per variant")
+    args = parser.parse_args()
+    bench_cold(args.cold)
+    bench_turn(args.turns)
+
+
+if __name__ == "__main__":
+    main()
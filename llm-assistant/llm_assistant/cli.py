@@ -11,7 +11,8 @@ Note: session.py is imported lazily to avoid loading audio dependencies
 from typing import List, Optional, Tuple
 
 import click
-import llm
+
+from llm_tools_core import get_plugin_catalog
 
 
 def resolve_model_query(queries: List[str]) -> Optional[str]:
@@ -21,10 +22,9 @@ def resolve_model_query(queries: List[str]) -> Optional[str]:
     """
     if not queries:
         return None
-    for model in llm.get_models():
-        model_id = model.model_id.lower()
-        if all(q.lower() in model_id for q in queries):
-            return model.model_id
+    for model_id in get_plugin_catalog().model_ids():
+        if all(q.lower() in model_id.lower() for q in queries):
+            return model_id
     return None
 
 
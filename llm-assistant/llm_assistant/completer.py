@@ -9,7 +9,7 @@ This module provides the SlashCommandCompleter class for:
 import logging
 from typing import TYPE_CHECKING
 
-import llm
+from llm_tools_core import get_plugin_catalog
 from prompt_toolkit.completion import Completer, Completion
 
 from .config import SLASH_COMMANDS
@@ -159,8 +159,7 @@ class SlashCommandCompleter(Completer):
         """Complete model names dynamically."""
         partial_lower = partial.lower()
         try:
-            for model in llm.get_models():
-                model_id = model.model_id
+            for model_id in get_plugin_catalog().model_ids():
                 if model_id.lower().startswith(partial_lower):
                     yield Completion(
                         model_id,
@@ -278,19 +277,15 @@ class SlashCommandCompleter(Completer):
             return
         partial_upper = partial.upper()
         try:
-            project_dir = self.session.findings_base_dir / self.session.findings_project
-            findings_file = project_dir / "findings.md"
-            if findings_file.exists():
-                _, findings = self.session._parse_findings_file(findings_file)
-                for meta, _ in findings:
-                    fid = meta.get('id', '')
-                    if fid.upper().startswith(partial_upper):
-                        title = meta.get('title', '')[:30]
-                        yield Completion(
-                            fid,
-                            start_position=-len(partial),
-                            display_meta=title
-                        )
+            for meta in self.session._finding_summaries():
+                fid = meta.get('id', '')
+                if fid.upper().startswith(partial_upper):
+                    title = meta.get('title', '')[:30]
+                    yield Completion(
+                        fid,
+                        start_position=-len(partial),
+                        display_meta=title
+                    )
         except Exception as e:
             logger.debug("_complete_findings failed: %s", e, exc_info=True)
 
@@ -1,19 +1,40 @@
 """Context management mixin for llm-assistant.
 
 This module provides context window management:
-- Token estimation (API-based and character-based)
+- Token estimation (API-based, or a running per-response ledger)
+- Per-source token budgets for injected context (memory, KB, workflow,
+  terminal, RAG, squash summary)
 - Context squashing (compression of old messages)
 - Context stripping (removing ephemeral terminal content)
+- System prompt layout: segments ordered most stable first, with provider
+  cache breakpoints and per-response cache-read/cache-write accounting
 - Squash chain tracking for conversation continuity
 """
 
 import json
 import re
-from typing import TYPE_CHECKING, Optional
+import threading
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 
 import llm
 
-from llm_tools_core.tokens import CHARS_PER_TOKEN, estimate_tokens, estimate_tokens_json
+from llm_tools_core.context_budget import (
+    SESSION_BUDGET_FRACTION,
+    TURN_BUDGET_FRACTION,
+    Allocation,
+    allocate_budget,
+)
+from llm_tools_core.prompt_layout import (
+    SESSION,
+    TURN,
+    PromptCacheStats,
+    PromptLayout,
+    PromptSegment,
+    layout_prompt,
+    system_prompt_kwargs,
+)
+from llm_tools_core.tokens import count_tokens, estimate_tokens, get_tokenizer
 
 from .utils import get_config_dir, ConsoleHelper
 from .templates import render
@@ -30,11 +51,67 @@ _CONTEXT_TAG_PATTERNS = tuple(
         'gui_context',
         'conversation_summary',
         'retrieved_documents',
+        'knowledge_sections',
         'watch_prompt',
     )
 )
 _EXCESS_BLANK_LINES = re.compile(r'\n{3,}')
 
+# Tool schema token counts, keyed by the active tool names, the tool schema
+# version and the tokenizer in use; shared by all sessions in the process
+_SCHEMA_TOKEN_CACHE: Dict[Tuple, int] = {}
+_SCHEMA_TOKEN_CACHE_SIZE = 64
+
+
+# Background squash: once the context passes SQUASH_PRECOMPUTE_THRESHOLD of
+# the limit, older turns are summarized with the judge model in chunks of
+# SQUASH_CHUNK_RESPONSES (the last SQUASH_KEEP_RECENT are left alone)
+SQUASH_PRECOMPUTE_THRESHOLD = 0.5
+SQUASH_CHUNK_RESPONSES = 4
+SQUASH_KEEP_RECENT = 3
+
+# Per-message caps on text given to the chunk summarizer, and on the
+# not-yet-summarized turns appended verbatim at swap time
+SQUASH_EXCERPT_CHARS = 4000
+SQUASH_TAIL_CHARS = 1000
+
+
+@dataclass
+class _SquashState:
+    """Precomputed summary of a conversation's older responses.
+
+    Chunk summaries are merged like a binary counter: two summaries of the
+    same level become one of the next level, so the stack holds at most
+    log2(chunks) summaries, oldest first, and each chunk costs one map
+    call plus amortized O(1) merge calls.
+    """
+    conversation: object = None
+    covered: int = 0  # responses[:covered] are summarized
+    last: object = None  # responses[covered - 1], to detect rewinds
+    stack: List[Tuple[int, str]] = field(default_factory=list)  # (level, summary)
+    running: bool = False
+
+    @property
+    def ready(self) -> Optional[str]:
+        """The summary to swap in, or None if nothing is summarized yet."""
+        if not self.stack:
+            return None
+        return "\n\n".join(summary for _level, summary in self.stack)
+
+
+@dataclass
+class _TokenLedger:
+    """Running token count of a conversation's finished responses.
+
+    Each response is counted once, when it is first seen finished; later
+    estimates only look at responses appended since. Rebuilt when the
+    conversation is replaced or responses are removed (squash, rewind).
+    """
+    conversation: object = None
+    counted: int = 0
+    last: object = None
+    tokens: int = 0
+
 
 class ContextMixin:
     """Mixin providing context management functionality.
@@ -54,11 +131,17 @@ class ContextMixin:
     - previous_capture_block_hashes: dict for block hashes
     - rewind_undo_buffer: Optional buffer for undo
     - pending_summary: Optional[str] for squash summary
+    - context_usage: dict of per-source token usage from the last turn
+    - prompt_cache: PromptCacheStats of provider prompt-cache usage
+    - _prompt_segments: system prompt segments from _render_system_prompt
     - _get_active_tools: method to get active tools
-    - _render_system_prompt: method to render system prompt
+    - _tools_version: method returning the version of the tool schemas
+    - _render_system_prompt: method to render system prompt (sets _prompt_segments)
     - _get_memory_content: method to get AGENTS.md content
     - _get_loaded_kb_content: method to get KB content
+    - _get_kb_sections: method to retrieve KB sections for a query
     - _get_workflow_context: method to get workflow context
+    - _get_judge_model: method returning the lighter judge model
     - _debug: method for debug output
     """
 
@@ -77,11 +160,23 @@ class ContextMixin:
     previous_capture_block_hashes: dict
     rewind_undo_buffer: Optional[object]
     pending_summary: Optional[str]
+    context_usage: Dict[str, Dict[str, int]]
+    prompt_cache: PromptCacheStats
 
     def _estimate_tool_schema_tokens(self) -> int:
-        """Estimate token count for all tool schemas as sent to the API."""
+        """Estimate token count for all tool schemas as sent to the API.
+
+        Cached by the active tool names and _tools_version(), so calling
+        this every turn costs a tuple of names; the schemas are serialized
+        and counted again only when the tool set or an MCP schema changes.
+        """
         try:
             active_tools = self._get_active_tools()
+            key = (tuple(tool.name for tool in active_tools), self._tools_version(), get_tokenizer())
+            tokens = _SCHEMA_TOKEN_CACHE.get(key)
+            if tokens is not None:
+                return tokens
+
             tool_schemas = []
             for tool in active_tools:
                 if hasattr(tool, 'input_schema'):
@@ -96,7 +191,10 @@ class ContextMixin:
                     'parameters': params,
                 })
 
-            tokens = estimate_tokens_json(tool_schemas)
+            tokens = count_tokens(json.dumps(tool_schemas, indent=2))
+            if len(_SCHEMA_TOKEN_CACHE) >= _SCHEMA_TOKEN_CACHE_SIZE:
+                _SCHEMA_TOKEN_CACHE.clear()
+            _SCHEMA_TOKEN_CACHE[key] = tokens
             self._debug(f"Estimated tool schemas: {tokens} tokens ({len(active_tools)} tools)")
             return tokens
 
@@ -106,12 +204,51 @@ class ContextMixin:
             self._debug(f"Tool schema measurement exception: {e}, using estimate: {fallback}")
             return fallback
 
+    @staticmethod
+    def _response_tokens(resp) -> int:
+        """Tokens of one finished response (prompt + reply)."""
+        text = resp.text()
+        if hasattr(resp, 'prompt') and resp.prompt and resp.prompt.prompt:
+            text = f"{resp.prompt.prompt}\n{text}"
+        return count_tokens(text)
+
+    def _ledger_tokens(self) -> int:
+        """Tokens of the conversation so far, updated incrementally.
+
+        Finished responses are added to the ledger once; a response still
+        streaming is estimated from its accumulated chunks without being
+        recorded.
+        """
+        responses = self.conversation.responses
+        ledger = getattr(self, '_token_ledger', None)
+        if (
+            ledger is None
+            or ledger.conversation is not self.conversation
+            or ledger.counted > len(responses)
+            or (ledger.counted and responses[ledger.counted - 1] is not ledger.last)
+        ):
+            ledger = self._token_ledger = _TokenLedger(conversation=self.conversation)
+
+        while ledger.counted < len(responses) and getattr(responses[ledger.counted], '_done', False):
+            resp = responses[ledger.counted]
+            ledger.tokens += self._response_tokens(resp)
+            ledger.counted += 1
+            ledger.last = resp
+
+        tokens = ledger.tokens
+        for resp in responses[ledger.counted:]:
+            # In-progress: use accumulated chunks to avoid blocking on resp.text()
+            if hasattr(resp, 'prompt') and resp.prompt and resp.prompt.prompt:
+                tokens += estimate_tokens(resp.prompt.prompt)
+            tokens += estimate_tokens("".join(getattr(resp, '_chunks', [])))
+        return tokens
+
     def estimate_tokens(self, with_source: bool = False):
         """Estimate current context window size in tokens.
 
         Returns the actual tokens that would be sent on the next API call:
         - Uses the last response's input_tokens + output_tokens (accurate from API)
-        - Falls back to char-based estimation if API tokens unavailable
+        - Falls back to the running token ledger if API tokens unavailable
 
         Note: input_tokens from API is cumulative (includes full conversation history),
         so the last response's tokens represent the current context window size.
@@ -124,10 +261,8 @@ class ContextMixin:
         tokens = 0
 
         try:
-            system_prompt_len = len(self.system_prompt)
-
             if not self.conversation.responses:
-                tokens = system_prompt_len // CHARS_PER_TOKEN + self._tool_token_overhead
+                tokens = estimate_tokens(self.system_prompt) + self._tool_token_overhead
                 source = "estimated"
             else:
                 last_response = self.conversation.responses[-1]
@@ -139,19 +274,11 @@ class ContextMixin:
                     tokens = last_response.input_tokens
                 else:
                     source = "estimated"
-                    total_chars = system_prompt_len
-
-                    for resp in self.conversation.responses:
-                        if hasattr(resp, 'prompt') and resp.prompt and resp.prompt.prompt:
-                            total_chars += len(resp.prompt.prompt)
-
-                        if resp is self.conversation.responses[-1] and not getattr(resp, '_done', False):
-                            # In-progress: use accumulated chunks to avoid blocking on resp.text()
-                            total_chars += len("".join(getattr(resp, '_chunks', [])))
-                        else:
-                            total_chars += len(resp.text())
-
-                    tokens = (total_chars // CHARS_PER_TOKEN) + self._tool_token_overhead
+                    tokens = (
+                        estimate_tokens(self.system_prompt)
+                        + self._ledger_tokens()
+                        + self._tool_token_overhead
+                    )
 
         except Exception as e:
             ConsoleHelper.warning(self.console, f"Token estimation failed: {e}")
@@ -162,6 +289,8 @@ class ContextMixin:
 
     def check_and_squash_context(self):
         """Auto-squash when context reaches threshold (like tmuxai)"""
+        # Tools may have changed since the last turn (MCP, skills); cached per tool set
+        self._tool_token_overhead = self._estimate_tool_schema_tokens()
         current_tokens = self.estimate_tokens()
 
         if current_tokens >= self.max_context_size * self.context_squash_threshold:
@@ -199,6 +328,95 @@ class ContextMixin:
                         "  • Use a model with larger context window\n"
                         "  • Reduce terminal content in watch mode"
                     )
+        else:
+            self.schedule_background_squash(current_tokens)
+
+    def _squash_lock(self) -> threading.Lock:
+        return self.__dict__.setdefault('_squash_lock_obj', threading.Lock())
+
+    def _current_squash_state(self) -> _SquashState:
+        """Squash state for the current conversation (reset if it changed). Call under _squash_lock."""
+        responses = self.conversation.responses
+        state = getattr(self, '_squash_state', None)
+        if (
+            state is None
+            or state.conversation is not self.conversation
+            or state.covered > len(responses)
+            or (state.covered and responses[state.covered - 1] is not state.last)
+        ):
+            state = self._squash_state = _SquashState(conversation=self.conversation)
+        return state
+
+    def _format_excerpt(self, responses, start: int, max_chars: int) -> str:
+        """Render responses as numbered User/AI lines, injected context stripped."""
+        parts = []
+        for i, response in enumerate(responses, start + 1):
+            prompt_text = ""
+            if hasattr(response, 'prompt') and response.prompt:
+                prompt_text = self._strip_context(response.prompt.prompt or "")
+            response_text = response.text()
+            if prompt_text:
+                parts.append(f"{i}. User: {prompt_text[:max_chars]}")
+            if response_text:
+                parts.append(f"{i}. AI: {response_text[:max_chars]}")
+        return "\n\n".join(parts)
+
+    def schedule_background_squash(self, current_tokens: Optional[int] = None) -> None:
+        """Summarize older turns in the background once the context is large.
+
+        Called after each turn; returns immediately. Does nothing below
+        SQUASH_PRECOMPUTE_THRESHOLD of the context limit, while a previous
+        run is still going, or until a full chunk of older responses exists.
+        """
+        if self.max_context_size <= 0:
+            return
+        if current_tokens is None:
+            current_tokens = self.estimate_tokens()
+        if current_tokens < self.max_context_size * SQUASH_PRECOMPUTE_THRESHOLD:
+            return
+
+        with self._squash_lock():
+            state = self._current_squash_state()
+            responses = list(self.conversation.responses)
+            end = len(responses) - SQUASH_KEEP_RECENT
+            if state.running or end - state.covered < SQUASH_CHUNK_RESPONSES:
+                return
+            state.running = True
+
+        threading.Thread(
+            target=self._run_background_squash,
+            args=(state, responses, end),
+            name="context-squash",
+            daemon=True,
+        ).start()
+
+    def _run_background_squash(self, state: _SquashState, responses: list, end: int) -> None:
+        """Map each new chunk to a summary and merge equal-level summaries."""
+        try:
+            model = self._get_judge_model()
+            covered, stack = state.covered, list(state.stack)
+            while end - covered >= SQUASH_CHUNK_RESPONSES:
+                chunk = responses[covered:covered + SQUASH_CHUNK_RESPONSES]
+                excerpt = self._format_excerpt(chunk, covered, SQUASH_EXCERPT_CHARS)
+                stack.append((0, model.prompt(render('prompts/squash_chunk.j2', excerpt=excerpt)).text()))
+                while len(stack) >= 2 and stack[-1][0] == stack[-2][0]:
+                    level = stack[-1][0]
+                    summaries = "\n\n".join(
+                        f"### Part {n}\n{summary}" for n, (_level, summary) in enumerate(stack[-2:], 1)
+                    )
+                    merged = model.prompt(render('prompts/squash_merge.j2', summaries=summaries)).text()
+                    stack[-2:] = [(level + 1, merged)]
+                covered += SQUASH_CHUNK_RESPONSES
+
+                with self._squash_lock():
+                    if getattr(self, '_squash_state', None) is not state:
+                        return  # Conversation replaced or rewound meanwhile
+                    state.covered, state.last, state.stack = covered, responses[covered - 1], list(stack)
+                self._debug(f"Background squash: {covered} responses summarized ({len(stack)} part(s))")
+        except Exception as e:
+            self._debug(f"Background squash failed: {e}")
+        finally:
+            state.running = False
 
     def squash_context(self, keep: Optional[str] = None):
         """Compress earlier messages into summary (like Claude Code's /compact).
@@ -211,86 +429,220 @@ class ContextMixin:
             return
 
         try:
-            # Get responses to squash (all but last 3 - we'll re-execute those)
-            responses_to_squash = self.conversation.responses[:-3]
-
-            # Build summary from old responses using public APIs
-            summary_parts = []
-            for i, response in enumerate(responses_to_squash, 1):
-                # Extract prompt text using public API
-                prompt_text = ""
-                if hasattr(response, 'prompt') and response.prompt:
-                    prompt_text = response.prompt.prompt or ""
-
-                # Extract response text using public API
-                response_text = response.text()
-
-                if prompt_text:
-                    summary_parts.append(f"{i}. User: {prompt_text[:200]}...")
-                if response_text:
-                    summary_parts.append(f"{i}. AI: {response_text[:200]}...")
-
-            # Build keep instruction if provided
-            keep_section = ""
-            if keep:
-                keep_section = f"\n\nIMPORTANT: Preserve full details about: {keep}"
-
-            # Generate summary using a standalone prompt (not in conversation)
-            summary_prompt = render('prompts/squash_prompt.j2',
-                keep_section=keep_section,
-                summary_parts=chr(10).join(summary_parts),
-            )
-
-            summary_response = self.model.prompt(summary_prompt)
-            summary = summary_response.text()
-
-            # Create new conversation and update system prompt
-            # Re-render system prompt to preserve current watch mode state
-            # Store summary for next user message (keeps system prompt clean)
-            self.pending_summary = summary
-            self._update_system_prompt()
-
-            # Save old conversation ID and source before creating new one
-            old_conversation_id = self.conversation.id
-            old_source = getattr(self.conversation, 'source', None)
-
-            # Create completely fresh conversation
-            self.conversation = llm.Conversation(model=self.model)
-            # Preserve source for origin tracking (not a constructor parameter)
-            if old_source:
-                self.conversation.source = old_source
-            new_conversation_id = self.conversation.id
-
-            # Record link between old and new conversation for --continue tracking
-            if self.logging_enabled:
-                self._record_squash_link(old_conversation_id, new_conversation_id)
-
-            # Clear per-terminal content hashes (summary replaces full history)
-            self.terminal_content_hashes.clear()
-            self.toolresult_hash_updated.clear()
-            self.previous_capture_block_hashes.clear()
-
-            # Clear rewind undo buffer (new conversation = no undo)
-            self.rewind_undo_buffer = None
-
-            ConsoleHelper.success(self.console, "Context squashed")
-            ConsoleHelper.info(self.console, f"New session: {new_conversation_id}")
-            ConsoleHelper.dim(self.console, f"(Previous: {old_conversation_id})")
-            ConsoleHelper.info(self.console, "Summary will be included with your next message")
+            with self._squash_lock():
+                state = self._current_squash_state()
+                ready, covered = state.ready, state.covered
+
+            if ready and not keep:
+                # Instant swap: older turns were summarized in the background;
+                # the rest go in (truncated) as they are
+                self._debug(f"Squash: using precomputed summary of {covered} responses")
+                tail = self._format_excerpt(self.conversation.responses[covered:], covered, SQUASH_TAIL_CHARS)
+                summary = ready
+                if tail:
+                    summary += f"\n\n## Most Recent Exchanges\n\n{tail}"
+            else:
+                summary = self._summarize_for_squash(keep, ready, covered)
+
+            self._swap_in_summary(summary)
 
         except Exception as e:
             ConsoleHelper.error(self.console, f"Error squashing context: {e}")
 
-    def _build_system_prompt(self) -> str:
-        """Build system prompt with memory, KB, and workflow context appended.
+    def _summarize_for_squash(self, keep: Optional[str], ready: Optional[str], covered: int) -> str:
+        """Summarize the conversation with one model call (blocking).
+
+        Reuses background chunk summaries for responses[:covered] when
+        available; later responses contribute 200-character snippets.
+        """
+        # Get responses to squash (all but last 3 - we'll re-execute those)
+        responses_to_squash = self.conversation.responses[:-3]
+
+        # Build summary from old responses using public APIs
+        summary_parts = []
+        if ready and covered <= len(responses_to_squash):
+            summary_parts.append(f"Summary of messages 1-{covered}:\n{ready}")
+        else:
+            covered = 0
+        for i, response in enumerate(responses_to_squash[covered:], covered + 1):
+            # Extract prompt text using public API
+            prompt_text = ""
+            if hasattr(response, 'prompt') and response.prompt:
+                prompt_text = response.prompt.prompt or ""
+
+            # Extract response text using public API
+            response_text = response.text()
+
+            if prompt_text:
+                summary_parts.append(f"{i}. User: {prompt_text[:200]}...")
+            if response_text:
+                summary_parts.append(f"{i}. AI: {response_text[:200]}...")
+
+        # Build keep instruction if provided
+        keep_section = ""
+        if keep:
+            keep_section = f"\n\nIMPORTANT: Preserve full details about: {keep}"
+
+        # Generate summary using a standalone prompt (not in conversation)
+        summary_prompt = render('prompts/squash_prompt.j2',
+            keep_section=keep_section,
+            summary_parts=chr(10).join(summary_parts),
+        )
+
+        summary_response = self.model.prompt(summary_prompt)
+        return summary_response.text()
+
+    def _swap_in_summary(self, summary: str) -> None:
+        """Start a fresh conversation that continues from summary."""
+        # Create new conversation and update system prompt
+        # Re-render system prompt to preserve current watch mode state
+        # Store summary for next user message (keeps system prompt clean)
+        self.pending_summary = summary
+        self._update_system_prompt()
+
+        # Save old conversation ID and source before creating new one
+        old_conversation_id = self.conversation.id
+        old_source = getattr(self.conversation, 'source', None)
+
+        # Create completely fresh conversation
+        self.conversation = llm.Conversation(model=self.model)
+        # Preserve source for origin tracking (not a constructor parameter)
+        if old_source:
+            self.conversation.source = old_source
+        new_conversation_id = self.conversation.id
+
+        # Record link between old and new conversation for --continue tracking
+        if self.logging_enabled:
+            self._record_squash_link(old_conversation_id, new_conversation_id)
+
+        # Clear per-terminal content hashes (summary replaces full history)
+        self.terminal_content_hashes.clear()
+        self.toolresult_hash_updated.clear()
+        self.previous_capture_block_hashes.clear()
+
+        # Clear rewind undo buffer (new conversation = no undo)
+        self.rewind_undo_buffer = None
+
+        ConsoleHelper.success(self.console, "Context squashed")
+        ConsoleHelper.info(self.console, f"New session: {new_conversation_id}")
+        ConsoleHelper.dim(self.console, f"(Previous: {old_conversation_id})")
+        ConsoleHelper.info(self.console, "Summary will be included with your next message")
+
+    def _budget_context_sources(self, texts: Dict[str, str]) -> Dict[str, Allocation]:
+        """Fit per-turn context sources into TURN_BUDGET_FRACTION of the context window."""
+        budget = int(self.max_context_size * TURN_BUDGET_FRACTION)
+        return allocate_budget({name: text or "" for name, text in texts.items()}, budget, count=count_tokens)
+
+    def _session_context_sources(self) -> Dict[str, Allocation]:
+        """Memory and KB for the system prompt, fit into SESSION_BUDGET_FRACTION.
+
+        They are budgeted apart from the per-turn sources, so their trimmed
+        text changes only when they do and the SESSION tier of the prompt
+        keeps its cached prefix. The allocation is reused until the texts,
+        the budget or the tokenizer change.
+        """
+        texts = {"memory": self._get_memory_content() or "", "kb": self._get_loaded_kb_content() or ""}
+        budget = int(self.max_context_size * SESSION_BUDGET_FRACTION)
+        key = (budget, get_tokenizer(), texts["memory"], texts["kb"])
+        cached = getattr(self, '_session_allocation', None)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        allocations = allocate_budget(texts, budget, count=count_tokens)
+        self._session_allocation = (key, allocations)
+        return allocations
+
+    def _allocate_context(self, include_system: bool = True, **texts: str) -> Dict[str, str]:
+        """Budget this turn's injected context and record per-source usage.
+
+        Args:
+            include_system: Also budget the system prompt sources (memory
+                and KB on the session budget, workflow with this turn's
+                sources); False where the system prompt carries none
+            **texts: Prompt sources (terminal, rag, kb_sections, summary)
+
+        Returns:
+            Source name -> text, with the lowest-priority sources trimmed
+            when the total is over budget
+        """
+        allocations: Dict[str, Allocation] = {}
+        if include_system:
+            allocations.update(self._session_context_sources())
+            texts = {"workflow": self._get_workflow_context() or "", **texts}
+        allocations.update(self._budget_context_sources(texts))
+        self.context_usage = {
+            name: {"tokens": a.tokens, "requested": a.requested}
+            for name, a in allocations.items() if a.requested
+        }
+        trimmed = [f"{name} {a.requested}->{a.tokens}" for name, a in allocations.items() if a.trimmed]
+        if trimmed:
+            self._debug(f"Context budget trimmed: {', '.join(trimmed)}")
+        return {name: a.text for name, a in allocations.items()}
+
+    def _format_context_usage(self) -> str:
+        """One-line per-source summary of the last turn's context usage."""
+        parts = []
+        for name, usage in self.context_usage.items():
+            part = f"{name} ~{usage['tokens']:,}"
+            if usage["tokens"] < usage["requested"]:
+                part += f" (trimmed from ~{usage['requested']:,})"
+            parts.append(part)
+        return ", ".join(parts) if parts else "none"
+
+    def _format_prompt_cache(self) -> str:
+        """One-line summary of provider prompt-cache usage this session."""
+        stats = self.prompt_cache
+        if not (stats.cache_read or stats.cache_write):
+            return "no cache hits reported"
+        return (
+            f"{stats.hit_rate:.0%} hit rate (read ~{stats.cache_read:,}, "
+            f"written ~{stats.cache_write:,} of ~{stats.prompt_tokens:,} prompt tokens)"
+        )
+
+    def _prompt_section_segments(self, gui: bool = False, **environment) -> List[PromptSegment]:
+        """Segments for session state, rendered from templates/sections/.
 
-        The base system prompt is rendered by _render_system_prompt() at init/mode change.
-        This method appends memory, KB, and workflow context for the current request.
+        Args:
+            gui: Render the GUI variants
+            **environment: date, platform, shell, environment for <environment>
         """
-        prompt = self.system_prompt
+        segments = []
+        if getattr(self, 'loaded_skills', None):
+            skills = render('sections/skills.j2', skills_xml=self._get_skills_xml())
+            segments.append(PromptSegment("skills", skills, SESSION))
+        if getattr(self, 'active_rag_collection', None):
+            segments.append(PromptSegment("rag", render('sections/rag.j2', gui=gui), SESSION))
+        # The date changes daily: after memory and KB (SESSION), so a date
+        # rollover does not invalidate their cached prefix
+        segments.append(PromptSegment(
+            "environment", render('sections/environment.j2', gui=gui, **environment), TURN
+        ))
+        if getattr(self, 'watch_mode', False):
+            watch = render('sections/watch.j2', watch_goal=self.watch_goal)
+            segments.append(PromptSegment("watch", watch, TURN))
+        return segments
+
+    def _system_prompt_layout(self, sources: Optional[Dict[str, str]] = None) -> PromptLayout:
+        """Lay out the system prompt with memory, KB, and workflow context.
+
+        The rendered segments come from _render_system_prompt() at init and on
+        state changes; memory, KB, and workflow context are added per request.
+        Segments are ordered most stable first (see llm_tools_core.prompt_layout)
+        so the provider's prompt cache keeps matching as the session evolves.
 
-        # Append memory content (AGENTS.md) - before KB
-        memory_content = self._get_memory_content()
+        Args:
+            sources: Budgeted texts from _allocate_context(); if None, the
+                system prompt sources are budgeted on their own
+        """
+        segments = list(getattr(self, '_prompt_segments', None) or [PromptSegment("base", self.system_prompt)])
+        if sources is None:
+            allocations = {
+                **self._session_context_sources(),
+                **self._budget_context_sources({"workflow": self._get_workflow_context() or ""}),
+            }
+            sources = {name: a.text for name, a in allocations.items()}
+
+        # Memory content (AGENTS.md) - before KB
+        memory_content = sources.get("memory")
         if memory_content:
             memory_instructions = """## Persistent Memory (AGENTS.md)
 
@@ -298,19 +650,39 @@ The `<memory>` section below contains user preferences and project-specific note
 - Apply these preferences to personalize responses and follow user conventions
 - Project Memory takes precedence over Global Memory for project-specific topics
 - Treat memory entries as authoritative user instructions"""
-            prompt = f"{prompt}\n\n{memory_instructions}\n\n<memory>\n{memory_content}\n</memory>"
+            segments.append(PromptSegment(
+                "memory", f"{memory_instructions}\n\n<memory>\n{memory_content}\n</memory>", SESSION
+            ))
 
-        # Append KB content if any loaded
-        kb_content = self._get_loaded_kb_content()
+        # KB content if any loaded
+        kb_content = sources.get("kb")
         if kb_content:
-            prompt = f"{prompt}\n\n<knowledge>\n# Knowledge Base\n\n{kb_content}\n</knowledge>"
+            segments.append(PromptSegment(
+                "kb", f"<knowledge>\n# Knowledge Base\n\n{kb_content}\n</knowledge>", SESSION
+            ))
 
-        # Append workflow context if a workflow is active (from WorkflowMixin)
-        workflow_context = self._get_workflow_context()
+        # Workflow context if a workflow is active (from WorkflowMixin)
+        workflow_context = sources.get("workflow")
         if workflow_context:
-            prompt = f"{prompt}\n\n{workflow_context}"
+            segments.append(PromptSegment("workflow", workflow_context, TURN))
+
+        return layout_prompt(segments)
+
+    def _build_system_prompt(self, sources: Optional[Dict[str, str]] = None) -> str:
+        """System prompt text for the current request (see _system_prompt_layout)."""
+        return self._system_prompt_layout(sources).text
+
+    def _system_prompt_kwargs(self, sources: Optional[Dict[str, str]] = None) -> dict:
+        """prompt() kwargs carrying the system prompt with its cache breakpoints."""
+        return system_prompt_kwargs(self._system_prompt_layout(sources), self.model)
 
-        return prompt
+    def _record_prompt_cache(self, response) -> None:
+        """Add a finished response's cache-read/cache-write tokens to prompt_cache."""
+        usage = self.prompt_cache.record(
+            getattr(response, 'input_tokens', None), getattr(response, 'token_details', None)
+        )
+        if usage.read or usage.write:
+            self._debug(f"Prompt cache: read {usage.read}, write {usage.write}")
 
     def _strip_context(self, prompt_text):
         """Remove injected context sections from prompt for clean display.
@@ -319,6 +691,7 @@ The `<memory>` section below contains user preferences and project-specific note
         - <terminal_context>: Ephemeral terminal captures
         - <conversation_summary>: Squash summaries
         - <retrieved_documents>: RAG search results
+        - <knowledge_sections>: KB sections retrieved for the query
         - <watch_prompt>: Watch mode iteration prompts
         - <gui_context>: GUI assistant context
 
@@ -19,9 +19,13 @@ import json
 import os
 import signal
 import sys
+import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Optional
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
 
 import daemon
 from daemon import pidfile as daemon_pidfile
@@ -36,6 +40,9 @@ from rich.console import Console
 # Import shared utilities from llm_tools_core
 from llm_tools_core import (
     AtHandler,
+    DirectoryIndex,
+    evict_idle_engines,
+    rag_cache_stats,
     CONTEXT_UNCHANGED_MARKER,
     get_socket_path,
     build_simple_system_prompt,
@@ -48,6 +55,14 @@ from llm_tools_core import (
     remove_pid_file,
     cleanup_stale_daemon,
     get_assistant_default_model,
+    get_model_context_limit,
+    get_plugin_catalog,
+    get_tool_result_cache,
+    get_tool_executors,
+    PromptLayout,
+    PromptSegment,
+    layout_prompt,
+    system_prompt_kwargs,
 )
 from llm_tools_core.tool_execution import execute_tool_call
 
@@ -57,6 +72,10 @@ from .headless_session import (
     get_headless_tools,
     get_tool_implementations,
 )
+from .mcp import evict_idle_mcp_servers
+from . import shared_state
+from .systemd_service import get_listen_socket, sd_notify
+from .templates import render_cache_stats
 from .utils import get_config_dir, get_logs_db_path, logs_on, parse_command
 
 # GUI server (aiohttp - always available)
@@ -72,6 +91,16 @@ _RESET_COMMANDS = {"/clear", "/reset", "/new"}
 _STATUS_COMMANDS = {"/info", "/status"}
 _QUIT_COMMANDS = {"/quit", "/exit"}
 
+# An @pdf: reference may use at most 1/N of the model's context window;
+# longer documents keep their most query-relevant pages
+FRAGMENT_BUDGET_DIVISOR = 4
+
+# Pre-initialized sessions kept ready for new terminal ids (see SessionPool)
+SESSION_POOL_SIZE = 2
+
+# Appended to a response whose stream was abandoned by the client
+_CANCELLED_MARKER = "\n\n[Cancelled]"
+
 
 def _get_default_pidfile() -> str:
     """Get default PID file path for daemon mode."""
@@ -202,6 +231,24 @@ def _run_as_daemon(pidfile_path: str | None, logfile_path: str | None):
     # atexit handler is registered automatically by DaemonContext.open()
 
 
+def _mark_response_cancelled(response, partial_text: str) -> None:
+    """Freeze a response whose stream was abandoned before completion.
+
+    llm only marks a Response done (and appends it to its conversation) once
+    the stream is exhausted, so text(), tool_calls() and log_to_db() on an
+    unfinished response would re-run the model. Pin the partial text with a
+    cancellation marker so the turn can be logged and kept in history without
+    another provider call, and drop half-received tool calls.
+    """
+    response._chunks = [partial_text + _CANCELLED_MARKER]
+    response._tool_calls = []
+    response._end = time.monotonic()
+    response._done = True
+    conversation = getattr(response, "conversation", None)
+    if conversation is not None and response not in conversation.responses:
+        conversation.responses.append(response)
+
+
 class SessionState:
     """State wrapper for a HeadlessSession tied to a terminal."""
 
@@ -215,6 +262,69 @@ class SessionState:
         self.last_activity = datetime.now()
 
 
+class SessionPool:
+    """Pre-initialized HeadlessSessions for terminal ids seen for the first time.
+
+    Building a session runs every mixin init (model lookup, MCP server set,
+    memory, KBs, skills, prompt render). Short-lived clients such as espanso
+    (tid "espanso:<pid>") would pay that on every request. The pool keeps a few
+    anonymous sessions ready and refills in the background after each take.
+    The read-only parts they hold come from shared_state, so idle pool
+    entries cost little memory.
+    """
+
+    def __init__(self, factory, size: int = SESSION_POOL_SIZE):
+        self._factory = factory
+        self._size = size
+        self._idle: deque = deque()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._refill_task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start filling the pool (call from the running event loop)."""
+        self._loop = asyncio.get_running_loop()
+        self._schedule_refill()
+
+    async def stop(self) -> None:
+        if self._refill_task is not None:
+            self._refill_task.cancel()
+            try:
+                await self._refill_task
+            except asyncio.CancelledError:
+                pass
+        self._idle.clear()
+
+    def take(self) -> Optional[HeadlessSession]:
+        """Pop a warm session, or None if the pool is empty.
+
+        Safe to call from any thread; the refill always runs on the loop.
+        """
+        try:
+            session = self._idle.popleft()
+        except IndexError:
+            session = None
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._schedule_refill)
+        return session
+
+    def __len__(self) -> int:
+        return len(self._idle)
+
+    def _schedule_refill(self) -> None:
+        if self._refill_task is None or self._refill_task.done():
+            self._refill_task = self._loop.create_task(self._refill())
+
+    async def _refill(self) -> None:
+        while len(self._idle) < self._size:
+            try:
+                session = await asyncio.to_thread(self._factory)
+            except Exception:
+                # Same failure would surface on the synchronous path with a
+                # proper error; don't spin here
+                return
+            self._idle.append(session)
+
+
 class AssistantDaemon:
     """Unix socket server for llm-assistant daemon mode."""
 
@@ -231,6 +341,9 @@ class AssistantDaemon:
         self.foreground = foreground
         self.use_python_daemon = use_python_daemon
         self.sessions: Dict[str, SessionState] = {}
+        self.session_pool = SessionPool(self._create_session)
+        # Directory listings shared by all @ completion requests
+        self.dir_index = DirectoryIndex()
         self.server: Optional[asyncio.AbstractServer] = None
         self.start_time = datetime.now()
         # Set inside run() once we have a running event loop; signal/shutdown
@@ -240,6 +353,14 @@ class AssistantDaemon:
 
         self.request_queues: Dict[str, asyncio.Queue] = {}
         self.workers: Dict[str, asyncio.Task] = {}
+        # In-flight query cancellation flags (tid -> flag). Set by an explicit
+        # 'cancel' command or when the client socket goes away mid-stream.
+        self.cancel_flags: Dict[str, threading.Event] = {}
+
+        # Dedicated executor for model streaming so provider I/O never blocks
+        # the event loop (same approach as WebUIServer._llm_executor)
+        self._llm_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="llm")
+        self._configure_tool_pools()
 
         self.logging_enabled = logs_on()
         self._db_migrated = False
@@ -247,6 +368,23 @@ class AssistantDaemon:
         self.web_port = int(os.environ.get('LLM_GUI_PORT', 8741))
         self.web_server: Optional["WebUIServer"] = None
 
+    def _configure_tool_pools(self):
+        """Apply tool_pools / tool_timeouts from assistant-config.yaml.
+
+        Example:
+            tool_pools: {network: 16, cpu: 4, subprocess: 2}
+            tool_timeouts: {sandboxed_shell: 600, microsoft_docs_fetch: 30}
+        """
+        config = shared_state.load_yaml(get_config_dir() / "assistant-config.yaml")
+        if not isinstance(config, dict):
+            config = {}
+        pools = config.get("tool_pools")
+        timeouts = config.get("tool_timeouts")
+        get_tool_executors().configure(
+            sizes=pools if isinstance(pools, dict) else None,
+            timeouts=timeouts if isinstance(timeouts, dict) else None,
+        )
+
     def _handle_signal(self):
         """Signal handler for SIGTERM/SIGINT — stops the daemon gracefully."""
         if self._stop_event is not None:
@@ -263,6 +401,10 @@ class AssistantDaemon:
         else:
             self.console.print(f"[dim]{timestamp}[/] {tid} {arrow} {info}")
 
+    def _create_session(self, **kwargs) -> HeadlessSession:
+        """Build a HeadlessSession with the daemon's model and debug settings."""
+        return HeadlessSession(model_name=self.model_id, debug=self.debug, **kwargs)
+
     def get_session_state(
         self,
         terminal_id: str,
@@ -277,18 +419,24 @@ class AssistantDaemon:
             source: Origin of the session ("gui", "tui", "cli", "api", or None)
         """
         if terminal_id not in self.sessions:
-            session = HeadlessSession(
-                model_name=self.model_id,
-                debug=self.debug,
-                session_log=session_log,
-                terminal_id=terminal_id,
-                source=source,
-            )
+            session = self.session_pool.take()
+            if session is not None:
+                session.assign(terminal_id, session_log=session_log, source=source)
+            else:
+                session = self._create_session(
+                    session_log=session_log,
+                    terminal_id=terminal_id,
+                    source=source,
+                )
             self.sessions[terminal_id] = SessionState(terminal_id, session)
-        elif source:
-            # A terminal_id can be reused across clients (e.g. TUI then GUI);
-            # refresh source so new responses are tagged correctly.
-            self.sessions[terminal_id].session.source = source
+        else:
+            session = self.sessions[terminal_id].session
+            # Pick up AGENTS.md/KB/skills edits (free while nothing changed)
+            session.refresh_shared_state()
+            if source:
+                # A terminal_id can be reused across clients (e.g. TUI then GUI);
+                # refresh source so new responses are tagged correctly.
+                session.source = source
         return self.sessions[terminal_id]
 
     async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
@@ -346,6 +494,9 @@ class AssistantDaemon:
                 await self._queue_request(tid, request, writer)
             elif cmd == 'rag_activate':
                 await self.handle_rag_activate(tid, request, writer)
+            elif cmd == 'cancel':
+                # Not queued: must reach the flag while the worker is busy
+                await self.handle_cancel(tid, writer)
             else:
                 await self._emit_error(writer, ErrorCode.PARSE_ERROR, f"Unknown command: {cmd}")
 
@@ -417,10 +568,6 @@ class AssistantDaemon:
         start_time = time.time()
 
         query = request.get('q', '').strip()
-        session_log = request.get('log', '')
-        mode = request.get('mode', 'assistant')
-        custom_system_prompt = request.get('sys', '')
-        source = request.get('source')  # Origin: "gui", "tui", "cli", "api"
         image_paths = request.get('images', [])  # List of image file paths
 
         attachments = []
@@ -443,6 +590,36 @@ class AssistantDaemon:
             if handled:
                 return
 
+        # Registered before the pre-model stages, so a cancel sent while
+        # references are fetched or RAG runs stops the query too
+        cancel_flag = threading.Event()
+        self.cancel_flags[tid] = cancel_flag
+        try:
+            await self._answer_query(tid, request, writer, query, attachments, start_time, cancel_flag)
+        finally:
+            if self.cancel_flags.get(tid) is cancel_flag:
+                del self.cancel_flags[tid]
+
+    async def _answer_query(
+        self,
+        tid: str,
+        request: dict,
+        writer: asyncio.StreamWriter,
+        query: str,
+        attachments: List[llm.Attachment],
+        start_time: float,
+        cancel_flag: threading.Event,
+    ):
+        """Run the pre-model stages, then the model and tool loop, for a query.
+
+        cancel_flag is checked between stages; once set, the query ends with
+        a "done" event before the model is called.
+        """
+        session_log = request.get('log', '')
+        mode = request.get('mode', 'assistant')
+        custom_system_prompt = request.get('sys', '')
+        source = request.get('source')  # Origin: "gui", "tui", "cli", "api"
+
         # Get session state (pass source so GUI clients get correct behavior)
         state = self.get_session_state(tid, session_log, source=source)
         state.touch()
@@ -452,49 +629,97 @@ class AssistantDaemon:
         # Prevents stale paths when terminal_id is reused across sessions
         session.session_log = session_log if session_log else None
 
-        # Capture context with deduplication (async to avoid blocking event loop)
-        context = await session.capture_context(session_log)
+        loop = asyncio.get_running_loop()
+
+        # One-shot: pending context from /rag search (cleared once the
+        # pre-model stages succeed, so a failed query does not lose it)
+        pending_rag_context = session.pending_rag_context
 
-        # RAG context retrieval (if RAG collection is active)
-        rag_context = ""
-        if session.pending_rag_context:
-            # One-shot: consume pending context from /rag search
-            rag_context = session.pending_rag_context
-            session.pending_rag_context = None
-        elif session.active_rag_collection and query.strip():
+        async def retrieve_rag() -> str:
+            if pending_rag_context:
+                return pending_rag_context
+            if not (session.active_rag_collection and query.strip()):
+                return ""
             # Persistent mode: search on every prompt. Vector search does disk
             # (and sometimes network) I/O — run off the event loop so other
             # clients aren't blocked while we wait.
-            loop = asyncio.get_running_loop()
-            rag_context = await loop.run_in_executor(
+            return await loop.run_in_executor(
                 None, session._retrieve_rag_context, query
             ) or ""
 
-        # Build prompt with context (order: terminal context → RAG context → user input)
+        def build_tools() -> Tuple[list, PromptLayout, dict]:
+            # Determine tools and system prompt based on mode
+            if mode == 'simple':
+                tools = []  # No tools in simple mode
+                system_layout = layout_prompt([
+                    PromptSegment("system", custom_system_prompt or build_simple_system_prompt())
+                ])
+            else:  # 'assistant' mode (default)
+                tools = session.get_tools()
+                system_layout = session.get_system_prompt_layout()
+            implementations = get_tool_implementations()
+            implementations.update(session._get_active_external_tools())
+            return tools, system_layout, implementations
+
+        timings: Dict[str, float] = {}
+
+        # Resolving @ references does not touch the session and is mostly
+        # I/O-bound: run it alongside the session stages
+        stages_start = time.perf_counter()
+        (
+            (context, rag_context, built),
+            (fragments, ref_attachments, ref_errors),
+        ) = await asyncio.gather(
+            self._session_stages(session, session_log, retrieve_rag, build_tools, timings, cancel_flag),
+            # @ references in the query (@pdf:, @yt:, @file:, URLs, ...)
+            self._timed_stage(timings, "refs", self._resolve_at_references(
+                query, request.get('cwd'), writer,
+                token_budget=get_model_context_limit(session.model_name) // FRAGMENT_BUDGET_DIVISOR,
+                cancel=cancel_flag,
+            )),
+        )
+        if cancel_flag.is_set():
+            # Nothing reached the model; pending /rag context stays for the next query
+            self._log_request(tid, "out", "cancelled", time.time() - start_time)
+            await self._emit(writer, {"type": "done"})
+            return
+        tools, system_layout, implementations = built
+        if pending_rag_context:
+            session.pending_rag_context = None
+        if self.debug:
+            stages = ", ".join(f"{name} {ms:.0f}ms" for name, ms in timings.items())
+            total = (time.perf_counter() - stages_start) * 1000
+            self.console.print(f"[dim]Pre-model stages: {stages} (total {total:.0f}ms)[/]", highlight=False)
+        attachments.extend(ref_attachments)
+
         unchanged_wrapped = f"<terminal_context>{CONTEXT_UNCHANGED_MARKER}</terminal_context>"
-        prompt_parts = []
+        terminal = ""
         if context and context != unchanged_wrapped:
-            prompt_parts.append(context)
+            terminal = context
         elif context and CONTEXT_UNCHANGED_MARKER in context:
-            prompt_parts.append("<terminal_context>[Terminal context unchanged from previous message]</terminal_context>")
+            terminal = "<terminal_context>[Terminal context unchanged from previous message]</terminal_context>"
+
+        # Fit injected context into its token budget (lowest priority trimmed
+        # first); the headless system prompt carries no memory/KB sources
+        sources = session._allocate_context(
+            include_system=False,
+            terminal=terminal,
+            rag=rag_context,
+            summary=f"<conversation_summary>\n{session.pending_summary}\n</conversation_summary>"
+            if session.pending_summary else "",
+        )
+        # Pending summary from /squash is one-time use
+        session.pending_summary = None
+
+        # Build prompt with context (order: summary → terminal context → RAG context → user input)
+        prompt_parts = [sources[name] for name in ("summary", "terminal", "rag") if sources[name]]
 
-        if rag_context:
-            prompt_parts.append(rag_context)
+        if ref_errors:
+            prompt_parts.append("\n".join(ref_errors))
 
         prompt_parts.append(query)
         full_prompt = "\n\n".join(prompt_parts)
 
-        # Determine tools and system prompt based on mode
-        if mode == 'simple':
-            tools = []  # No tools in simple mode
-            system_prompt = custom_system_prompt or build_simple_system_prompt()
-        else:  # 'assistant' mode (default)
-            tools = session.get_tools()
-            system_prompt = session.get_system_prompt()
-
-        implementations = get_tool_implementations()
-        implementations.update(session._get_active_external_tools())
-
         conversation = session.get_or_create_conversation()
 
         # Open a fresh DB handle per query (migration ran once at startup)
@@ -511,16 +736,19 @@ class AssistantDaemon:
             prompt_kwargs = {
                 "tools": tools if tools else None,
                 "attachments": attachments if attachments else None,
+                "fragments": fragments if fragments else None,
             }
             if len(conversation.responses) == 0:
-                prompt_kwargs["system"] = system_prompt
+                prompt_kwargs.update(system_prompt_kwargs(system_layout, conversation.model))
             response = conversation.prompt(full_prompt, **prompt_kwargs)
 
-            for chunk in response:
-                if chunk:
-                    await self._emit(writer, {"type": "text", "content": chunk})
-
-            tool_calls = list(response.tool_calls())
+            text = await self._relay_response(response, writer, cancel_flag)
+            if cancel_flag.is_set():
+                _mark_response_cancelled(response, text)
+                tool_calls = []
+            else:
+                tool_calls = list(response.tool_calls())
+                session._record_prompt_cache(response)
 
             if db:
                 response.log_to_db(db)
@@ -533,38 +761,56 @@ class AssistantDaemon:
             }
 
             async def emit(event: dict) -> None:
-                await self._emit(writer, event)
+                if not await self._emit(writer, event):
+                    cancel_flag.set()
 
             while tool_calls and iteration < MAX_TOOL_ITERATIONS:
                 iteration += 1
 
                 tool_results = []
                 for tool_call in tool_calls:
+                    if cancel_flag.is_set():
+                        break
                     result = await execute_tool_call(
                         tool_call, implementations, emit, arg_overrides
                     )
                     tool_results.append(result)
 
+                if cancel_flag.is_set():
+                    # The requesting response stays in history; without
+                    # results its tool calls would break the next turn.
+                    response._tool_calls = []
+                    break
+
                 # Empty prompt - tool results drive the continuation
-                followup_response = conversation.prompt(
+                response = conversation.prompt(
                     "",
                     tools=tools if tools else None,
                     tool_results=tool_results
                 )
 
-                for chunk in followup_response:
-                    if chunk:
-                        await self._emit(writer, {"type": "text", "content": chunk})
-
-                tool_calls = list(followup_response.tool_calls())
+                text = await self._relay_response(response, writer, cancel_flag)
+                if cancel_flag.is_set():
+                    _mark_response_cancelled(response, text)
+                    tool_calls = []
+                else:
+                    tool_calls = list(response.tool_calls())
+                    session._record_prompt_cache(response)
 
                 if db:
-                    followup_response.log_to_db(db)
+                    response.log_to_db(db)
 
             duration = time.time() - start_time
-            self._log_request(tid, "out", "done", duration)
+            if cancel_flag.is_set():
+                self._log_request(tid, "out", "cancelled", duration)
+            else:
+                self._log_request(tid, "out", "done", duration)
             await self._emit(writer, {"type": "done"})
 
+            # Precompute the /squash summary once the conversation is large
+            if mode != 'simple':
+                session.schedule_background_squash()
+
         except Exception as e:
             duration = time.time() - start_time
             self._log_request(tid, "out", f"error: {str(e)[:50]}", duration)
@@ -573,6 +819,187 @@ class AssistantDaemon:
             if db is not None and db.conn:
                 db.conn.close()
 
+    async def _session_stages(
+        self,
+        session: HeadlessSession,
+        session_log: str,
+        retrieve_rag: Callable[[], Awaitable[str]],
+        build_tools: Callable[[], Tuple[list, PromptLayout, dict]],
+        timings: Dict[str, float],
+        cancel_flag: Optional[threading.Event] = None,
+    ) -> Tuple[str, str, Optional[Tuple[list, PromptLayout, dict]]]:
+        """Run the pre-model stages that use the session.
+
+        Context capture (context and dedup state) and RAG retrieval (a
+        read-only search) touch disjoint session state and run together.
+        Building tools reads the tool and prompt layout state, so it runs
+        once both are done, unless cancel_flag was set meanwhile.
+
+        Returns:
+            (terminal context, RAG context, build_tools() result or None)
+        """
+        loop = asyncio.get_running_loop()
+        context, rag_context = await asyncio.gather(
+            # Terminal context with deduplication (async to avoid blocking event loop)
+            self._timed_stage(timings, "context", session.capture_context(session_log)),
+            self._timed_stage(timings, "rag", retrieve_rag()),
+        )
+        if cancel_flag is not None and cancel_flag.is_set():
+            return context, rag_context, None
+        built = await self._timed_stage(timings, "tools", loop.run_in_executor(None, build_tools))
+        return context, rag_context, built
+
+    @staticmethod
+    async def _timed_stage(timings: Dict[str, float], name: str, awaitable):
+        """Await a pre-model stage, recording its wall time in ms under name."""
+        start = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            timings[name] = (time.perf_counter() - start) * 1000
+
+    async def _resolve_at_references(
+        self,
+        query: str,
+        cwd: Optional[str] = None,
+        writer: Optional[asyncio.StreamWriter] = None,
+        token_budget: Optional[int] = None,
+        cancel: Optional[threading.Event] = None
+    ) -> Tuple[List[str], List[llm.Attachment], List[str]]:
+        """Resolve @ references in a query concurrently.
+
+        Explicit references (@pdf:, @yt:, @arxiv:, @dir:, @file:, @http(s)://)
+        that fail produce a note for the model. Bare @path references are used
+        only if they resolve, so e-mail addresses and @mentions pass through
+        untouched. Long PDFs are cut to token_budget by page relevance, and
+        extraction progress is streamed to writer as "progress" events.
+        Setting cancel stops resolution early (see AtHandler.resolve_many).
+
+        Returns:
+            (fragments, attachments, error_notes)
+        """
+        handler = AtHandler(cwd=cwd or str(Path.home()))
+        references = handler.parse_references(query)
+        if not references:
+            return [], [], []
+
+        loop = asyncio.get_running_loop()
+
+        def progress(original: str, done: int, total: int) -> None:
+            # Called from resolver threads; hand the event to the loop
+            if writer is not None:
+                event = {"type": "progress", "ref": original, "done": done, "total": total}
+                asyncio.run_coroutine_threadsafe(self._emit(writer, event), loop)
+
+        resolved = await loop.run_in_executor(
+            None,
+            lambda: handler.resolve_many(
+                references, query=query, token_budget=token_budget, progress=progress,
+                cancel=cancel,
+            ),
+        )
+
+        fragments: List[str] = []
+        attachments: List[llm.Attachment] = []
+        errors: List[str] = []
+        for reference, ref in zip(references, resolved):
+            explicit = (
+                reference.startswith(AtHandler.URL_PREFIXES)
+                or reference.split(":", 1)[0] in AtHandler.PREFIXES
+            )
+            if ref.error:
+                if explicit:
+                    errors.append(f"[Could not load {ref.original}: {ref.error}]")
+                elif self.debug:
+                    self.console.print(f"[dim]Skipped {ref.original}: {ref.error}[/]", highlight=False)
+            elif ref.type == "attachment":
+                attachments.append(llm.Attachment(path=ref.path))
+            elif ref.content:
+                fragments.append(ref.content)
+        return fragments, attachments, errors
+
+    async def _relay_response(
+        self,
+        response,
+        writer: asyncio.StreamWriter,
+        cancel_flag: threading.Event,
+    ) -> str:
+        """Stream a model response to the client and return the text sent.
+
+        Sets cancel_flag if the client has disconnected; the caller checks the
+        flag afterwards to tell a finished response from an abandoned one.
+        """
+        text = ""
+        stream = self._stream_response(response, cancel_flag)
+        try:
+            async for chunk in stream:
+                if not chunk:
+                    continue
+                text += chunk
+                if not await self._emit(writer, {"type": "text", "content": chunk}):
+                    cancel_flag.set()
+                    break
+        finally:
+            await stream.aclose()
+        return text
+
+    async def _stream_response(
+        self,
+        response,
+        cancel_flag: threading.Event,
+    ) -> AsyncIterator[str]:
+        """Iterate a synchronous model response in the LLM thread pool.
+
+        Mirrors WebUIServer._stream_llm_response: a bounded queue carries
+        chunks back to the event loop, so other clients (and 'cancel'
+        commands) are served while the provider streams. Once cancel_flag is
+        set the producer closes the response iterator, which closes the
+        provider stream instead of draining it.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=50)
+        error: list = [None]
+
+        def sync_producer():
+            iterator = iter(response)
+            try:
+                for chunk in iterator:
+                    if cancel_flag.is_set():
+                        break
+                    future = asyncio.run_coroutine_threadsafe(queue.put(chunk), loop)
+                    future.result(timeout=30)
+            except Exception as e:
+                error[0] = e
+            finally:
+                if cancel_flag.is_set():
+                    close = getattr(iterator, "close", None)
+                    if close is not None:
+                        try:
+                            close()
+                        except Exception:
+                            pass
+                asyncio.run_coroutine_threadsafe(queue.put(None), loop)
+
+        loop.run_in_executor(self._llm_executor, sync_producer)
+
+        finished = False
+        try:
+            while True:
+                chunk = await queue.get()
+                if chunk is None:
+                    finished = True
+                    if error[0] and not cancel_flag.is_set():
+                        raise error[0]
+                    break
+                yield chunk if isinstance(chunk, str) else str(chunk)
+        finally:
+            if not finished:
+                # Consumer left early - stop the producer and make room so a
+                # producer blocked on put() sees the flag promptly
+                cancel_flag.set()
+                while not queue.empty():
+                    queue.get_nowait()
+
     async def _handle_slash_command(
         self,
         tid: str,
@@ -656,9 +1083,9 @@ class AssistantDaemon:
             def get_model_list():
                 lines = ["[bold]Available models:[/]"]
                 current = self.model_id or get_assistant_default_model()
-                for model in llm.get_models():
-                    marker = " [green](current)[/]" if model.model_id == current else ""
-                    lines.append(f"  - {model.model_id}{marker}")
+                for model_id in get_plugin_catalog().model_ids():
+                    marker = " [green](current)[/]" if model_id == current else ""
+                    lines.append(f"  - {model_id}{marker}")
                 return "\n".join(lines)
             content = await loop.run_in_executor(None, get_model_list)
             await self._emit_text_done(writer, content)
@@ -734,7 +1161,10 @@ class AssistantDaemon:
             completions = self._complete_slash_commands(prefix)
         elif prefix.startswith('@'):
             # Fragment completion (@github:, @pdf:, @yt:, @file:, etc.)
-            completions = self._complete_fragments(prefix, cwd=cwd)
+            # Off the event loop: a cold listing may hit a slow filesystem
+            completions = await asyncio.get_running_loop().run_in_executor(
+                None, self._complete_fragments, prefix, cwd
+            )
         elif prefix.startswith('model:'):
             # Model name completion
             completions = await self._complete_models(prefix[6:])
@@ -766,10 +1196,14 @@ class AssistantDaemon:
     def _complete_fragments(self, prefix: str, cwd: Optional[str] = None) -> List[Dict[str, str]]:
         """Complete fragment prefixes and file paths.
 
-        Uses AtHandler from llm-tools-core for unified completion logic.
+        Uses AtHandler from llm-tools-core for unified completion logic,
+        backed by the daemon's DirectoryIndex. The first completion in a
+        directory also starts a background prefetch of the tree below it.
         """
-        handler = AtHandler()
-        completions = handler.get_completions(prefix, cwd=cwd)
+        working_dir = cwd or str(Path.home())
+        self.dir_index.prefetch(working_dir)
+        handler = AtHandler(cwd=working_dir, index=self.dir_index)
+        completions = handler.get_completions(prefix[1:] if prefix.startswith('@') else prefix)
         return [
             {"text": c.text, "description": c.description}
             for c in completions
@@ -826,34 +1260,38 @@ class AssistantDaemon:
         return string_io.getvalue()
 
     async def _complete_models(self, prefix: str) -> List[Dict[str, str]]:
-        """Complete model names. Runs llm.get_models() in an executor since
-        plugin discovery can be slow and would otherwise block the event loop."""
+        """Complete model names from the plugin catalogue. Runs in an executor
+        since a stale catalogue is rebuilt by (slow) plugin discovery."""
         prefix_lower = prefix.lower()
         loop = asyncio.get_running_loop()
 
         try:
-            models = await loop.run_in_executor(None, llm.get_models)
+            model_ids = await loop.run_in_executor(None, get_plugin_catalog().model_ids)
         except Exception as e:
             if self.debug:
                 self.console.print(f"[yellow]Model completion failed: {e}[/]", highlight=False)
             return []
 
         return [
-            {"text": m.model_id, "description": ""}
-            for m in models
-            if m.model_id.lower().startswith(prefix_lower)
+            {"text": model_id, "description": ""}
+            for model_id in model_ids
+            if model_id.lower().startswith(prefix_lower)
         ]
 
-    async def _emit(self, writer: asyncio.StreamWriter, event: dict):
-        """Emit a NDJSON event."""
+    async def _emit(self, writer: asyncio.StreamWriter, event: dict) -> bool:
+        """Emit a NDJSON event.
+
+        Returns True if the event was written, False if the client disconnected.
+        """
         if writer.is_closing():
-            return
+            return False
         try:
             line = json.dumps(event) + '\n'
             writer.write(line.encode('utf-8'))
             await writer.drain()
+            return True
         except (ConnectionResetError, BrokenPipeError, ConnectionAbortedError):
-            pass  # Client disconnected
+            return False  # Client disconnected
 
     async def _emit_error(self, writer: asyncio.StreamWriter, code: str, message: str):
         """Emit an error event and done."""
@@ -899,10 +1337,32 @@ class AssistantDaemon:
             "tools": tool_names,
             "active_workers": len(self.workers),
             "active_sessions": len(self.sessions),
+            "pooled_sessions": len(self.session_pool),
+            "rag_cache": rag_cache_stats(),
+            "tool_cache": get_tool_result_cache().stats(),
+            "tool_pools": get_tool_executors().stats(),
+            "context_sources": state.session.context_usage if state else {},
+            "prompt_cache": state.session.prompt_cache.stats() if state else {},
+            "template_renders": render_cache_stats(),
         }
 
         await self._emit_text_done(writer, json.dumps(status, indent=2))
 
+    async def handle_cancel(self, terminal_id: str, writer: asyncio.StreamWriter):
+        """Cancel the in-flight query for a terminal.
+
+        Request: {"cmd": "cancel", "tid": "..."}
+        Response: {"type": "cancelled", "active": bool}
+
+        Sent by thin clients on Ctrl+C. The worker stops the model stream,
+        skips remaining tool calls and logs the partial response.
+        """
+        flag = self.cancel_flags.get(terminal_id)
+        if flag is not None:
+            flag.set()
+        await self._emit(writer, {"type": "cancelled", "active": flag is not None})
+        await self._emit(writer, {"type": "done"})
+
     async def handle_help(self, writer: asyncio.StreamWriter):
         """Handle help request - show available commands in headless mode."""
         lines = []
@@ -1052,16 +1512,7 @@ class AssistantDaemon:
             await self._emit_error(writer, ErrorCode.PARSE_ERROR, "Collection name required")
             return
 
-        state = self.sessions.get(terminal_id)
-        if not state:
-            session = HeadlessSession(
-                model_name=self.model_id,
-                debug=self.debug,
-                terminal_id=terminal_id,
-            )
-            state = SessionState(terminal_id, session)
-            self.sessions[terminal_id] = state
-
+        state = self.get_session_state(terminal_id)
         session = state.session
 
         # _handle_rag_command writes to session.console; capture it for the client.
@@ -1096,11 +1547,17 @@ class AssistantDaemon:
                     stale_tids.append(tid)
             for tid in stale_tids:
                 self.sessions.pop(tid, None)
+            evict_idle_engines()
+            evict_idle_mcp_servers()
 
     async def run(self):
         """Run the daemon server."""
         # When using python-daemon, PID file management is handled by DaemonContext
         # Only use llm_tools_core PID functions in foreground mode
+        # Socket handed over by systemd (llm-assistant.socket). Clients may
+        # already be queued on it, and its path belongs to systemd.
+        listen_sock = get_listen_socket()
+
         if not self.use_python_daemon:
             # Check if daemon is already running
             is_alive, existing_pid = is_daemon_process_alive()
@@ -1115,8 +1572,10 @@ class AssistantDaemon:
                 )
                 return
 
-            # Clean up stale files from crashed daemon
-            cleanup_stale_daemon()
+            # Clean up stale files from crashed daemon (never the socket
+            # systemd is listening on for us)
+            if listen_sock is None:
+                cleanup_stale_daemon()
 
         # Ensure socket directory exists
         self.socket_path.parent.mkdir(parents=True, exist_ok=True)
@@ -1138,16 +1597,23 @@ class AssistantDaemon:
         # at ~/.config/, but clients check the /tmp path)
         write_pid_file()
 
-        # Start server with secure permissions from the start
-        # Use umask to ensure socket is created with 0o600 permissions (no race condition)
-        old_umask = os.umask(0o177)  # 0o777 - 0o177 = 0o600
-        try:
+        if listen_sock is not None:
+            # Socket activation: systemd created the socket with mode 0600
             self.server = await asyncio.start_unix_server(
                 self.handle_client,
-                path=str(self.socket_path)
+                sock=listen_sock
             )
-        finally:
-            os.umask(old_umask)  # Restore original umask
+        else:
+            # Start server with secure permissions from the start
+            # Use umask to ensure socket is created with 0o600 permissions (no race condition)
+            old_umask = os.umask(0o177)  # 0o777 - 0o177 = 0o600
+            try:
+                self.server = await asyncio.start_unix_server(
+                    self.handle_client,
+                    path=str(self.socket_path)
+                )
+            finally:
+                os.umask(old_umask)  # Restore original umask
 
         # Start web UI server
         try:
@@ -1190,17 +1656,29 @@ class AssistantDaemon:
         for sig in (signal.SIGTERM, signal.SIGINT):
             loop.add_signal_handler(sig, self._handle_signal)
 
+        # Serve memory/KB/skills from memory until inotify reports an edit
+        shared_state.enable_watching()
+
         # Start idle checker
         idle_task = asyncio.create_task(self.idle_checker())
 
+        # Warm sessions in the background for the first clients
+        self.session_pool.start()
+
+        # Type=notify units count as started from here on (no-op outside systemd)
+        sd_notify("READY=1")
+
         try:
             await self._stop_event.wait()
         finally:
+            sd_notify("STOPPING=1")
+
             idle_task.cancel()
             try:
                 await idle_task
             except asyncio.CancelledError:
                 pass
+            await self.session_pool.stop()
 
             # Cancel all workers and await them
             # Snapshot task list before cancelling — workers delete from self.workers
@@ -1216,14 +1694,19 @@ class AssistantDaemon:
             if self.web_server:
                 await self.web_server.stop()
 
+            self._llm_executor.shutdown(wait=False, cancel_futures=True)
+            get_tool_executors().shutdown()
+
             self.server.close()
             await self.server.wait_closed()
 
-            # Clean up socket and PID file
-            try:
-                self.socket_path.unlink()
-            except FileNotFoundError:
-                pass
+            # Clean up socket and PID file. An activated socket stays in place:
+            # systemd keeps listening and restarts the daemon on the next client.
+            if listen_sock is None:
+                try:
+                    self.socket_path.unlink()
+                except FileNotFoundError:
+                    pass
             # Always remove /tmp PID file (python-daemon handles its own ~/.config/ pidfile)
             remove_pid_file()
 
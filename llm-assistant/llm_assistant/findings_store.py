@@ -0,0 +1,276 @@
+"""SQLite store for pentest findings.
+
+This module provides FindingsStore, the source of truth for ReportMixin.
+Each project keeps findings.db next to findings.md:
+
+- One row per finding (metadata as JSON, markdown body) plus its rendered
+  view pieces: the summary table row, the findings.md block and the
+  export block. Changing a finding re-renders only its own pieces;
+  findings.md and the pandoc export are concatenations of stored text
+- Every change is a single transaction (WAL journal), so a crash cannot
+  leave a half-written project
+- New finding IDs are reserved with reserve_id(), which picks the next
+  number and records it in one BEGIN IMMEDIATE transaction, so two
+  sessions adding findings to the same project never get the same ID;
+  add() then inserts the finding with a plain INSERT that fails instead
+  of overwriting
+- A key/value state table records the signature of the findings.md last
+  generated, so ReportMixin can tell when the user edited the file by
+  hand and re-import it; write_view() replaces view files atomically
+
+The store knows nothing about the markdown format; ReportMixin renders
+the view pieces and passes them in.
+"""
+
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Rendered pieces stored per finding
+VIEW_KINDS = ("row", "block", "export")
+
+_ID_RE = re.compile(r"^F(\d+)$", re.IGNORECASE)
+
+# Reservations older than this were abandoned (crashed session) and are
+# forgotten
+RESERVATION_MAX_AGE = 24 * 3600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS project (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS findings (
+    num INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE COLLATE NOCASE,
+    seq INTEGER,
+    meta TEXT NOT NULL,
+    body TEXT NOT NULL,
+    row TEXT NOT NULL,
+    block TEXT NOT NULL,
+    export TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS findings_seq ON findings(seq);
+CREATE TABLE IF NOT EXISTS reserved (
+    id TEXT PRIMARY KEY COLLATE NOCASE,
+    seq INTEGER NOT NULL,
+    created REAL NOT NULL
+);
+"""
+
+# (metadata, body, {view kind: text})
+FindingRecord = Tuple[Dict[str, Any], str, Dict[str, str]]
+
+
+def view_signature(path: Path) -> Optional[str]:
+    """Signature (mtime, size) of a generated view file, or None if missing."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return f"{st.st_mtime_ns}:{st.st_size}"
+
+
+def write_view(path: Path, text: str) -> Optional[str]:
+    """Atomically replace a view file; returns its new signature."""
+    fd, tmp = tempfile.mkstemp(dir=Path(path).parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(text)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    return view_signature(path)
+
+
+def _seq(finding_id: str) -> Optional[int]:
+    match = _ID_RE.match(finding_id or "")
+    return int(match.group(1)) if match else None
+
+
+class FindingsStore:
+    """Findings of one project, in insertion order.
+
+    Usable as a context manager; the connection is closed on exit.
+    With read_only=True an existing database is opened without creating
+    or changing anything.
+    """
+
+    def __init__(self, path: Path, read_only: bool = False):
+        self.path = Path(path)
+        if read_only:
+            self._conn = sqlite3.connect(f"{self.path.resolve().as_uri()}?mode=ro", uri=True)
+            return
+        self._conn = sqlite3.connect(str(self.path))
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "FindingsStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # Project metadata and state
+
+    def project_meta(self) -> Dict[str, Any]:
+        """Project front matter (project, created, language, ...)."""
+        rows = self._conn.execute("SELECT key, value FROM project ORDER BY rowid")
+        return {key: json.loads(value) for key, value in rows}
+
+    def set_project_meta(self, meta: Dict[str, Any]) -> None:
+        with self._conn:
+            self._set_project_meta(meta)
+
+    def _set_project_meta(self, meta: Dict[str, Any]) -> None:
+        self._conn.execute("DELETE FROM project")
+        self._conn.executemany(
+            "INSERT INTO project (key, value) VALUES (?, ?)",
+            [(key, json.dumps(value, default=str)) for key, value in meta.items()],
+        )
+
+    def get_state(self, key: str) -> Optional[str]:
+        row = self._conn.execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_state(self, key: str, value: str) -> None:
+        with self._conn:
+            self._conn.execute(
+                "INSERT INTO state (key, value) VALUES (?, ?)"
+                " ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (key, value),
+            )
+
+    # Findings
+
+    def count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM findings").fetchone()[0]
+
+    @contextmanager
+    def _immediate(self):
+        """Write transaction that takes the database write lock up front."""
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._conn.rollback()
+            raise
+        self._conn.commit()
+
+    def reserve_id(self) -> str:
+        """Reserve the next finding ID (F001, F002, ...).
+
+        The number is above every stored or reserved one, and is taken in
+        the same transaction that records it. Pass the ID to add(), or to
+        release() if the finding is abandoned.
+        """
+        with self._immediate():
+            self._conn.execute(
+                "DELETE FROM reserved WHERE created < ?", (time.time() - RESERVATION_MAX_AGE,)
+            )
+            highest = self._conn.execute(
+                "SELECT MAX(seq) FROM (SELECT seq FROM findings UNION ALL SELECT seq FROM reserved)"
+            ).fetchone()[0]
+            seq = (highest or 0) + 1
+            finding_id = f"F{seq:03d}"
+            self._conn.execute(
+                "INSERT INTO reserved (id, seq, created) VALUES (?, ?, ?)", (finding_id, seq, time.time())
+            )
+        return finding_id
+
+    def release(self, finding_id: str) -> None:
+        """Drop a reservation whose finding will not be added."""
+        with self._conn:
+            self._conn.execute("DELETE FROM reserved WHERE id = ?", (finding_id,))
+
+    def metas(self) -> List[Dict[str, Any]]:
+        """Metadata of all findings."""
+        return [json.loads(meta) for (meta,) in self._conn.execute("SELECT meta FROM findings ORDER BY num")]
+
+    def get(self, finding_id: str) -> Optional[Tuple[Dict[str, Any], str]]:
+        """(metadata, body) of a finding, or None."""
+        row = self._conn.execute(
+            "SELECT meta, body FROM findings WHERE id = ?", (finding_id,)
+        ).fetchone()
+        return (json.loads(row[0]), row[1]) if row else None
+
+    def add(self, meta: Dict[str, Any], body: str, views: Dict[str, str]) -> None:
+        """Add a new finding under its reserved ID.
+
+        Raises:
+            sqlite3.IntegrityError: A finding with this ID already exists
+        """
+        with self._immediate():
+            self._conn.execute(
+                "INSERT INTO findings (id, seq, meta, body, row, block, export)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                self._values(meta, body, views),
+            )
+            self._conn.execute("DELETE FROM reserved WHERE id = ?", (str(meta["id"]),))
+
+    def put(self, meta: Dict[str, Any], body: str, views: Dict[str, str]) -> None:
+        """Add a finding, or replace the one with the same ID in place."""
+        with self._conn:
+            self._put(meta, body, views)
+
+    def _put(self, meta: Dict[str, Any], body: str, views: Dict[str, str]) -> None:
+        self._conn.execute(
+            "INSERT INTO findings (id, seq, meta, body, row, block, export)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)"
+            " ON CONFLICT(id) DO UPDATE SET seq = excluded.seq, meta = excluded.meta,"
+            " body = excluded.body, row = excluded.row, block = excluded.block,"
+            " export = excluded.export",
+            self._values(meta, body, views),
+        )
+
+    @staticmethod
+    def _values(meta: Dict[str, Any], body: str, views: Dict[str, str]) -> tuple:
+        finding_id = str(meta["id"])
+        return (
+            finding_id, _seq(finding_id), json.dumps(meta, default=str), body,
+            *(views[kind] for kind in VIEW_KINDS),
+        )
+
+    def delete(self, finding_id: str) -> Optional[Dict[str, Any]]:
+        """Remove a finding; returns its metadata, or None if not found."""
+        with self._conn:
+            row = self._conn.execute(
+                "SELECT meta FROM findings WHERE id = ?", (finding_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("DELETE FROM findings WHERE id = ?", (finding_id,))
+        return json.loads(row[0])
+
+    def replace_all(self, project_meta: Dict[str, Any], findings: Iterable[FindingRecord]) -> None:
+        """Replace the whole project (import from findings.md) in one transaction."""
+        with self._conn:
+            self._set_project_meta(project_meta)
+            self._conn.execute("DELETE FROM findings")
+            for meta, body, views in findings:
+                self._put(meta, body, views)
+
+    def views(self, kind: str) -> List[str]:
+        """Rendered pieces of one kind ("row", "block", "export"), in order."""
+        if kind not in VIEW_KINDS:
+            raise ValueError(f"Unknown view kind: {kind}")
+        return [text for (text,) in self._conn.execute(f"SELECT {kind} FROM findings ORDER BY num")]
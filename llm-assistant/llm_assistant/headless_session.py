@@ -24,9 +24,13 @@ from rich.console import Console
 
 from llm_tools_core import (
     CONTEXT_UNCHANGED_MARKER,
+    PromptCacheStats,
+    PromptLayout,
+    PromptSegment,
     filter_new_blocks,
     get_assistant_default_model,
     get_sessions_dir,
+    layout_prompt,
     sanitize_terminal_id_for_filename,
 )
 
@@ -39,7 +43,8 @@ from .workflow import WorkflowMixin
 from .report import ReportMixin
 from .web import WebMixin
 from .context import ContextMixin
-from .mcp import MCPMixin
+from .mcp import MCPMixin, _all_tools
+from . import shared_state
 from .templates import render
 from .utils import get_config_dir, get_logs_db_path, logs_on, get_judge_model, ConsoleHelper
 
@@ -201,8 +206,9 @@ Returns:
 )
 
 
-# Base tool list + implementations are memoized because llm.get_tools() triggers
-# plugin discovery and the daemon calls them on every query. HEADLESS_TOOL_NAMES
+# Base tool list + implementations are memoized because the daemon calls them
+# on every query. Tools come from the plugin catalogue stubs shared with mcp.py,
+# so no plugin discovery runs until a tool is invoked. HEADLESS_TOOL_NAMES
 # is frozen at import; dynamic per-session tools (MCP/skills/optional) are layered
 # on top by HeadlessSession.get_tools(), so this cache stays correct.
 _BASE_TOOLS_CACHE: Optional[List[Tool]] = None
@@ -213,9 +219,8 @@ def _build_base_tools_and_impls() -> Tuple[List[Tool], Dict[str, callable]]:
     tools: List[Tool] = [SUGGEST_COMMAND_TOOL]
     impls: Dict[str, callable] = {'suggest_command': _suggest_command_impl}
 
-    all_tools = llm.get_tools()
     for name in HEADLESS_TOOL_NAMES:
-        tool = all_tools.get(name)
+        tool = _all_tools.get(name)
         if not isinstance(tool, Tool):
             continue
         tools.append(tool)
@@ -360,28 +365,16 @@ class HeadlessSession(
 
         # Now render system prompt (after mixins initialized)
         self.system_prompt = self._render_system_prompt()
+        # Shared-state generation this session was built from (see refresh_shared_state)
+        self._shared_generation = shared_state.generation()
 
     def _load_config(self) -> dict:
-        """Load assistant-config.yaml if it exists."""
-        config_file = get_config_dir() / "assistant-config.yaml"
-        if config_file.exists():
-            try:
-                import yaml
-                with open(config_file) as f:
-                    return yaml.safe_load(f) or {}
-            except Exception:
-                return {}
-        return {}
+        """Load assistant-config.yaml if it exists (shared, read-only)."""
+        return shared_state.load_yaml(get_config_dir() / "assistant-config.yaml")
 
     def _init_mixins(self):
         """Initialize mixin-specific state."""
-        # MemoryMixin - load AGENTS.md files
-        if hasattr(self, '_load_memories'):
-            self._load_memories()
-
-        # KnowledgeBaseMixin - load auto-load KBs from config
-        if hasattr(self, '_load_auto_kbs'):
-            self._load_auto_kbs()
+        self._load_shared_state()
 
         # MCPMixin (headless mode = no_exec_mode=True)
         if hasattr(MCPMixin, '_mcp_init'):
@@ -401,6 +394,8 @@ class HeadlessSession(
         self.previous_capture_block_hashes = {}
         self.rewind_undo_buffer = None
         self.pending_summary = None
+        self.context_usage = {}
+        self.prompt_cache = PromptCacheStats()
         self._tool_token_overhead = 0
 
         # ReportMixin stubs (terminal capture not available in headless mode)
@@ -408,6 +403,58 @@ class HeadlessSession(
         self.findings_base_dir = get_config_dir() / 'findings'
         self.findings_project: Optional[str] = None
 
+    def _load_shared_state(self) -> None:
+        """Load memory and auto-load KBs from the process-wide shared_state.
+
+        Texts are shared by reference with every other session; only files
+        that changed since the last load are read again.
+        """
+        # MemoryMixin - load AGENTS.md files
+        if hasattr(self, '_load_memories'):
+            self._load_memories()
+
+        # KnowledgeBaseMixin - load auto-load KBs from config
+        if hasattr(self, '_load_auto_kbs'):
+            self._load_auto_kbs()
+
+    def refresh_shared_state(self) -> bool:
+        """Reload memory, KBs and skills if their files changed.
+
+        Called when a pre-warmed session is handed out and before every
+        daemon request. With the shared_state watcher running this is an
+        integer comparison; otherwise one stat() per shared file. KBs loaded
+        with /kb stay loaded. Returns True if the session was refreshed.
+        """
+        if shared_state.revalidate() == self._shared_generation:
+            return False
+        kb_names = list(self.loaded_kbs)
+        self.loaded_kbs = {}
+        self._load_shared_state()
+        for name in kb_names:
+            if name not in self.loaded_kbs:
+                self._load_kb(name, silent=True)
+        self.loaded_skills = {}
+        if hasattr(self, '_auto_load_all_skills'):
+            self._auto_load_all_skills()
+        self._rebuild_skill_tools()
+        self.system_prompt = self._render_system_prompt()
+        self._shared_generation = shared_state.generation()
+        return True
+
+    def assign(
+        self,
+        terminal_id: str,
+        session_log: Optional[str] = None,
+        source: Optional[str] = None,
+    ) -> None:
+        """Bind a pre-warmed (anonymous) session to a terminal."""
+        self.refresh_shared_state()
+        self.terminal_id = terminal_id
+        self.session_log = session_log
+        self.source = source
+        # GUI sessions render extra prompt sections
+        self.system_prompt = self._render_system_prompt()
+
     def _debug(self, msg: str):
         """Print debug message if debug mode enabled."""
         if self.debug:
@@ -438,37 +485,38 @@ class HeadlessSession(
         """
         return []
 
-    def get_system_prompt(self, gui: bool = False) -> str:
-        """Render the system prompt for headless mode.
+    def get_system_prompt_layout(self, gui: bool = False) -> PromptLayout:
+        """Lay out the system prompt for headless mode.
 
         Args:
             gui: If True, include GUI-specific sections (Mermaid diagrams)
         """
-        skills = bool(getattr(self, 'loaded_skills', None))
-        return render(
+        # Identical across sessions with the same settings; render() memoizes it
+        base = render(
             'system_prompt.j2',
             headless=True,
             mode=self.mode,
             exec=False,
-            watch_mode=False,  # Not available in headless mode
-            watch_goal="",
-            rag=bool(self.active_rag_collection),
             gui=gui,
-            skills=skills,
-            skills_xml=self._get_skills_xml() if skills else "",
+            platform=platform.system(),
+        )
+        return layout_prompt([PromptSegment("base", base)] + self._prompt_section_segments(
+            gui=gui,
             date=datetime.now().strftime("%Y-%m-%d"),
             platform=platform.system(),
             shell=os.environ.get("SHELL", "/bin/bash"),
             environment="",
-        )
+        ))
 
     def _render_system_prompt(self) -> str:
         """Render system prompt for headless mode.
 
         Required by WebMixin._update_system_prompt() and ContextMixin.
-        Delegates to get_system_prompt() which handles GUI mode flag.
+        Uses the GUI variant for sessions of the web GUI.
         """
-        return self.get_system_prompt(gui=(self.source == "gui"))
+        layout = self.get_system_prompt_layout(gui=(self.source == "gui"))
+        self._prompt_segments = layout.segments
+        return layout.text
 
     # _build_system_prompt is inherited from ContextMixin
 
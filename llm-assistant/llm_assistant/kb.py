@@ -3,17 +3,34 @@
 This module provides knowledge base functionality:
 - Loading/unloading markdown KB files
 - Auto-loading from config
+- Section mode for large KBs: only their front matter goes into the system
+  prompt, and the sections relevant to each query are retrieved (BM25)
+  into the prompt
 - /kb command handling
+
+Config (assistant-config.yaml):
+    knowledge_base:
+      auto_load: [pentest]
+      mode: auto        # auto (sections for KBs over KB_SECTION_THRESHOLD chars), sections, full
+      top_k: 5          # Sections retrieved per query
 """
 
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
+
+from llm_tools_core import KBSectionIndex
 
+from . import shared_state
 from .utils import get_config_dir, parse_command, parse_comma_list, ConsoleHelper, render_grouped_list
 
 if TYPE_CHECKING:
     from rich.console import Console
 
+# In auto mode, KBs larger than this are retrieved by section
+KB_SECTION_THRESHOLD = 12_000
+
+KB_TOP_K = 5
+
 
 class KnowledgeBaseMixin:
     """Mixin providing knowledge base functionality.
@@ -45,23 +62,22 @@ class KnowledgeBaseMixin:
         for name in auto_load:
             self._load_kb(name, silent=True)
 
+    def _find_kb_path(self, name: str) -> Optional[Path]:
+        """Path of a KB file by name (with or without .md), or None."""
+        # Try with .md extension first
+        return shared_state.find_file(self._get_kb_dir(), (f"{name}.md", name))
+
     def _load_kb(self, name: str, silent: bool = False) -> bool:
         """Load a KB file by name."""
-        kb_dir = self._get_kb_dir()
-
-        # Try with .md extension first
-        kb_path = kb_dir / f"{name}.md"
-        if not kb_path.exists():
-            # Try without extension
-            kb_path = kb_dir / name
-            if not kb_path.exists():
-                if not silent:
-                    ConsoleHelper.error(self.console, f"KB not found: {name}")
-                    ConsoleHelper.dim(self.console, f"Looking in: {kb_dir}")
-                return False
+        kb_path = self._find_kb_path(name)
+        if kb_path is None:
+            if not silent:
+                ConsoleHelper.error(self.console, f"KB not found: {name}")
+                ConsoleHelper.dim(self.console, f"Looking in: {self._get_kb_dir()}")
+            return False
 
         try:
-            content = kb_path.read_text()
+            content = shared_state.read_text(kb_path)
             self.loaded_kbs[name] = content
             self._debug(f"Loaded KB: {kb_path} ({len(content)} chars)")
             if not silent:
@@ -81,15 +97,65 @@ class KnowledgeBaseMixin:
         ConsoleHelper.warning(self.console, f"KB not loaded: {name}")
         return False
 
+    def _kb_settings(self) -> dict:
+        settings = self._load_config().get("knowledge_base") or {}
+        return settings if isinstance(settings, dict) else {}
+
+    def _kb_section_index(self, name: str, content: str, mode: str) -> Optional[KBSectionIndex]:
+        """Section index of a loaded KB, or None if it is injected in full.
+
+        The index is built once per file version and shared by all sessions.
+        """
+        if mode == "full" or (mode != "sections" and len(content) <= KB_SECTION_THRESHOLD):
+            return None
+        kb_path = self._find_kb_path(name)
+        if kb_path is None:
+            return None
+        index = shared_state.load_file("kb-sections", kb_path, lambda p: KBSectionIndex(p.read_text()))
+        # A KB without headings cannot be retrieved by section
+        return index if index.sections else None
+
     def _get_loaded_kb_content(self) -> str:
-        """Get combined content of all loaded KBs."""
+        """Get combined content of all loaded KBs for the system prompt.
+
+        KBs in section mode contribute only their front matter; their
+        sections come from _get_kb_sections() with each query.
+        """
         if not self.loaded_kbs:
             return ""
+        mode = self._kb_settings().get("mode", "auto")
         parts = []
         for name, content in self.loaded_kbs.items():
+            index = self._kb_section_index(name, content, mode)
+            if index is not None:
+                note = "(Sections relevant to each request are provided in <knowledge_sections>.)"
+                content = f"{index.front}\n\n{note}" if index.front else note
             parts.append(f"## {name}\n\n{content}")
         return "\n\n---\n\n".join(parts)
 
+    def _get_kb_sections(self, query: str) -> str:
+        """Sections of section-mode KBs relevant to query, wrapped for the prompt."""
+        if not self.loaded_kbs or not query.strip():
+            return ""
+        settings = self._kb_settings()
+        mode = settings.get("mode", "auto")
+        try:
+            top_k = max(1, int(settings.get("top_k", KB_TOP_K)))
+        except (TypeError, ValueError):
+            self._debug(f"KB: invalid top_k {settings.get('top_k')!r}, using {KB_TOP_K}")
+            top_k = KB_TOP_K
+        parts = []
+        for name, content in self.loaded_kbs.items():
+            index = self._kb_section_index(name, content, mode)
+            if index is None:
+                continue
+            for section in index.search(query, top_k):
+                parts.append(f"[{name}: {section.heading}]\n{section.text.strip()}")
+        if not parts:
+            return ""
+        self._debug(f"KB: injecting {len(parts)} section(s)")
+        return "<knowledge_sections>\n" + "\n\n".join(parts) + "\n</knowledge_sections>"
+
     def _handle_kb_command(self, args: str) -> bool:
         """Handle /kb commands. Returns True to continue REPL."""
         cmd, rest = parse_command(args)
@@ -1,19 +1,23 @@
 """MCP (Model Context Protocol) tools and server management for llm-assistant.
 
 This module provides:
-- Background MCP tool loading
+- Per-server MCP loading (lazy, parallel, with cached tool schemas)
 - Tool list management (ASSISTANT_TOOLS, EXTERNAL_TOOLS, etc.)
 - MCPMixin for server management commands
 """
 
 import atexit
+import json
+import os
 import threading
-from concurrent.futures import ThreadPoolExecutor
+from importlib.util import find_spec
 from typing import TYPE_CHECKING, Set
 
 import llm
 from llm import Tool
 
+from llm_tools_core import MCPServerPool, get_cache_dir, get_plugin_catalog
+
 from .config import (
     EXTERNAL_TOOL_PLUGINS,
     OPTIONAL_TOOL_PLUGINS,
@@ -28,83 +32,66 @@ if TYPE_CHECKING:
 
 # =============================================================================
 # Always-on external tools (always available and auto-dispatch)
-_all_tools = llm.get_tools()
+# Built from the on-disk plugin catalogue: plugins are only imported when one
+# of these tools is first invoked (or when the catalogue has to be rebuilt)
+try:
+    _all_tools = get_plugin_catalog().tool_stubs()
+except Exception:
+    _all_tools = llm.get_tools()
 
 # =============================================================================
-# Background MCP Loading
+# Per-server MCP Loading
 # =============================================================================
-# Load MCP tools in background to avoid blocking startup
-# User sees prompt immediately, MCP tools become available when loading completes
+# Each server in ~/.llm-tools-mcp/mcp.json gets its own llm-tools-mcp toolbox,
+# connected in parallel with its own timeout and only once a session activates
+# it. Tool schemas are cached on disk, so tools are advertised (as stubs that
+# connect on first call) before their server is up; idle servers are shut down.
 
-_mcp_future = None
-_mcp_toolbox = None
-_mcp_loaded = False
-_mcp_load_error = None  # Stores error message if MCP loading failed
+_MCP_INSTALLED = find_spec("llm_tools_mcp") is not None
 _mcp_lock = threading.Lock()
-_mcp_executor = ThreadPoolExecutor(max_workers=1)
-
-
-def _load_mcp_background():
-    """Load MCP tools in background thread.
-
-    Returns:
-        Tuple of (MCP_toolbox_or_None, error_message_or_None)
-    """
-    try:
-        from llm_tools_mcp.register_tools import MCP
-        return MCP(), None
-    except ImportError:
-        return None, "llm-tools-mcp not installed"
-    except FileNotFoundError as e:
-        return None, f"Config file not found: {e.filename}"
-    except Exception as e:
-        return None, str(e) or "Unknown error during MCP initialization"
-
+_mcp_generation = -1  # MCPServerPool.generation last registered into _all_tools
 
-# Start loading immediately but don't block module import
-_mcp_future = _mcp_executor.submit(_load_mcp_background)
 
+def _connect_mcp_server(name: str, config: dict):
+    """Start one MCP server through llm-tools-mcp (single-server config file).
 
-def _cleanup_mcp():
-    """Clean up MCP resources on exit.
-
-    Properly shuts down the ThreadPoolExecutor and closes any MCP toolbox
-    HTTP connections to prevent 'coroutine was never awaited' warnings.
+    The config may carry tokens (env, headers), so the file is user-only
+    (0600) in a user-only (0700) directory.
     """
-    global _mcp_toolbox, _mcp_executor
-
-    # Close MCP toolbox HTTP connections if it has a close method
-    if _mcp_toolbox is not None:
+    from llm_tools_mcp.register_tools import MCP
+
+    config_dir = get_cache_dir("llm-assistant") / "mcp-servers"
+    config_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+    os.chmod(config_dir, 0o700)  # created by earlier versions with default permissions
+    config_path = config_dir / f"{name}.json"
+    fd = os.open(str(config_path), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w") as f:
+        os.fchmod(f.fileno(), 0o600)
+        f.write(json.dumps({"mcpServers": {name: config}}))
+    return MCP(config_path=str(config_path))
+
+
+def _close_mcp_toolbox(toolbox):
+    """Close a toolbox's HTTP connections (prevents 'coroutine was never awaited' warnings)."""
+    if hasattr(toolbox, 'close'):
+        toolbox.close()
+    elif hasattr(toolbox, 'aclose'):
+        # For async close, we need to run it in an event loop
+        import asyncio
         try:
-            # MCP toolbox may have an async close method
-            if hasattr(_mcp_toolbox, 'close'):
-                _mcp_toolbox.close()
-            elif hasattr(_mcp_toolbox, 'aclose'):
-                # For async close, we need to run it in an event loop
-                import asyncio
-                try:
-                    loop = asyncio.get_event_loop()
-                    if loop.is_running():
-                        # Can't await in running loop from atexit
-                        pass
-                    else:
-                        loop.run_until_complete(_mcp_toolbox.aclose())
-                except RuntimeError:
-                    # No event loop available
-                    pass
-        except Exception:
-            pass  # Ignore cleanup errors
-
-    # Shutdown the executor
-    if _mcp_executor is not None:
-        try:
-            _mcp_executor.shutdown(wait=False)
-        except Exception:
+            loop = asyncio.get_event_loop()
+            if not loop.is_running():
+                # Can't await in a running loop
+                loop.run_until_complete(toolbox.aclose())
+        except RuntimeError:
+            # No event loop available
             pass
 
 
+_mcp_pool = MCPServerPool(connect=_connect_mcp_server, close=_close_mcp_toolbox)
+
 # Register cleanup handler
-atexit.register(_cleanup_mcp)
+atexit.register(_mcp_pool.shutdown)
 
 
 def _rebuild_tool_lists():
@@ -129,41 +116,78 @@ def _rebuild_tool_lists():
     }
 
 
-def _ensure_mcp_loaded():
-    """Wait for background MCP load to complete, then register tools.
+def _mcp_tool_stub(server: str, optional: bool, schema: dict) -> Tool:
+    """Advertised MCP tool whose implementation connects its server on demand."""
+    tool_name = schema["name"]
+
+    def implementation(**kwargs):
+        return _mcp_pool.call(server, tool_name, kwargs)
+
+    implementation.__name__ = tool_name
+    tool = Tool(
+        name=tool_name,
+        description=schema.get("description"),
+        input_schema=schema.get("input_schema") or {},
+        implementation=implementation,
+    )
+    tool.server_name = server
+    tool.mcp_optional = optional
+    return tool
 
-    Call this before accessing ASSISTANT_TOOLS or EXTERNAL_TOOLS to ensure
-    MCP tools are available. The first call waits for background load to
-    complete, subsequent calls return immediately.
+
+def _ensure_mcp_loaded(servers=()):
+    """Register the MCP tools of all configured servers into _all_tools.
+
+    Call this before accessing ASSISTANT_TOOLS or EXTERNAL_TOOLS. Tools are
+    advertised from cached schemas without starting their servers; only
+    the given (active) servers that have no cached schemas yet are
+    connected and waited for, in parallel, each with its own timeout.
+    Also shuts down servers that have been idle for too long.
     """
-    global _mcp_toolbox, _mcp_loaded, _mcp_load_error, ASSISTANT_TOOLS, EXTERNAL_TOOLS
-    if _mcp_loaded:
+    global _mcp_generation
+    if get_mcp_load_error():
         return
 
+    _mcp_pool.evict_idle()
+    unknown = [name for name in servers if not _mcp_pool.tools(name)]
+    if unknown:
+        _mcp_pool.start(unknown)
+        _mcp_pool.wait(unknown)
+
     with _mcp_lock:
-        if _mcp_loaded:
+        if _mcp_pool.generation == _mcp_generation:
             return
-        if _mcp_future:
-            try:
-                result = _mcp_future.result(timeout=30)
-                # Handle both old (single value) and new (tuple) return format
-                if isinstance(result, tuple):
-                    _mcp_toolbox, _mcp_load_error = result
-                else:
-                    _mcp_toolbox = result
-                if _mcp_toolbox:
-                    for tool in _mcp_toolbox.tools():
-                        _all_tools[tool.name] = tool
-                    _rebuild_tool_lists()
-            except Exception as e:
-                _mcp_load_error = str(e) or "Failed to load MCP tools"
-        _mcp_loaded = True
+        _mcp_generation = _mcp_pool.generation
+        for name in [name for name, tool in _all_tools.items() if getattr(tool, 'server_name', None)]:
+            del _all_tools[name]
+        for server, optional in _mcp_pool.servers().items():
+            for schema in _mcp_pool.tools(server):
+                _all_tools[schema["name"]] = _mcp_tool_stub(server, optional, schema)
+        _rebuild_tool_lists()
+
+
+def start_mcp_servers(servers) -> None:
+    """Connect servers a session just activated, in the background."""
+    if not get_mcp_load_error():
+        _mcp_pool.start(servers)
+
+
+def evict_idle_mcp_servers() -> int:
+    """Shut down MCP servers without a tool call for a while."""
+    return _mcp_pool.evict_idle()
+
+
+def mcp_server_states() -> dict:
+    """Per-server load state: {name: {status, error, optional, tool_count, idle_seconds}}."""
+    return _mcp_pool.state()
 
 
 def get_mcp_load_error() -> str | None:
     """Get the MCP loading error message, if any."""
-    _ensure_mcp_loaded()
-    return _mcp_load_error
+    if not _MCP_INSTALLED:
+        return "llm-tools-mcp not installed"
+    _mcp_pool.servers()  # Re-reads the config if it changed
+    return _mcp_pool.config_error
 
 
 # Build ASSISTANT_TOOLS - base tools always offered to model
@@ -227,6 +251,7 @@ class MCPMixin:
         self.active_mcp_servers = self._get_default_mcp_servers()
         self.no_exec_mode = no_exec_mode
         self.loaded_optional_tools = set()
+        start_mcp_servers(self.active_mcp_servers)
 
     def _is_gemini_model(self) -> bool:
         """Check if current model is a Gemini model (vertex/* or gemini-*)."""
@@ -234,38 +259,21 @@ class MCPMixin:
 
     def _get_default_mcp_servers(self) -> set:
         """Get non-optional MCP servers (loaded by default)."""
-        _ensure_mcp_loaded()
-        servers = set()
-        for tool in _all_tools.values():
-            server = getattr(tool, 'server_name', None)
-            is_optional = getattr(tool, 'mcp_optional', False)
-            if server and not is_optional:
-                servers.add(server)
-        return servers
+        return {server for server, optional in self._get_all_mcp_servers().items() if not optional}
 
     def _get_all_mcp_servers(self) -> dict:
-        """Get all MCP servers with their optional status.
+        """Get all configured MCP servers with their optional status.
 
-        Returns dict mapping server_name -> is_optional (bool).
-        Result is cached after first call since MCP tools don't change at runtime.
+        Returns dict mapping server_name -> is_optional (bool). Read from
+        mcp.json (re-read when it changes); servers need not be running.
         """
-        if not hasattr(self, '_all_mcp_servers_cache'):
-            _ensure_mcp_loaded()
-            servers = {}
-            for tool in _all_tools.values():
-                server = getattr(tool, 'server_name', None)
-                if server and server not in servers:
-                    servers[server] = getattr(tool, 'mcp_optional', False)
-            self._all_mcp_servers_cache = servers
-        return self._all_mcp_servers_cache
+        if get_mcp_load_error():
+            return {}
+        return _mcp_pool.servers()
 
     def _count_tools_for_server(self, server_name: str) -> int:
-        """Count tools available from a specific MCP server."""
-        count = 0
-        for tool in _all_tools.values():
-            if getattr(tool, 'server_name', None) == server_name:
-                count += 1
-        return count
+        """Count tools available from a specific MCP server (live or cached)."""
+        return len(_mcp_pool.tools(server_name))
 
     def _add_dynamic_tools(self, tools: list, existing_names: set) -> list:
         """Add dynamic tools (MCP, optional, Gemini-only, skills) to a base tool list.
@@ -280,8 +288,8 @@ class MCPMixin:
         Returns:
             The extended tools list
         """
-        # Ensure MCP tools are loaded
-        _ensure_mcp_loaded()
+        # Ensure MCP tools of active servers are advertised
+        _ensure_mcp_loaded(self.active_mcp_servers)
 
         # Add MCP tools from active servers
         for tool in _all_tools.values():
@@ -331,8 +339,9 @@ class MCPMixin:
         - Gemini-only tools (view_youtube_native) when using Gemini/Vertex model
         - Skill tools when skills are loaded
         """
-        # Ensure MCP tools are loaded (waits for background load on first call)
-        _ensure_mcp_loaded()
+        # Ensure MCP tools of active servers are advertised (waits only for
+        # servers without cached schemas)
+        _ensure_mcp_loaded(self.active_mcp_servers)
 
         # Start with base ASSISTANT_TOOLS, filtering out inactive MCP servers
         tools = [t for t in ASSISTANT_TOOLS if (
@@ -349,6 +358,15 @@ class MCPMixin:
         # Add dynamic tools (MCP, optional, Gemini-only, skills) via shared helper
         return self._add_dynamic_tools(tools, existing_names)
 
+    def _tools_version(self) -> int:
+        """Version of the MCP tool schemas, bumped when they are re-registered.
+
+        Other tools keep their schema for the life of the process, so the
+        names of the active tools plus this version identify the schemas
+        sent to the model.
+        """
+        return _mcp_generation
+
     def _get_active_external_tools(self) -> dict:
         """Get dispatch dict for currently active external tools.
 
@@ -360,8 +378,9 @@ class MCPMixin:
         MCP tools are filtered by active_mcp_servers set - only tools from
         active servers are included.
         """
-        # Ensure MCP tools are loaded (waits for background load on first call)
-        _ensure_mcp_loaded()
+        # Ensure MCP tools of active servers are advertised (waits only for
+        # servers without cached schemas)
+        _ensure_mcp_loaded(self.active_mcp_servers)
 
         tools = dict(EXTERNAL_TOOLS)  # Base dispatch (always available)
 
@@ -407,8 +426,15 @@ class MCPMixin:
             return
 
         self.active_mcp_servers.add(server_name)
+        start_mcp_servers([server_name])
+        # Waits only if the server's tools are not known yet (no cached schemas)
+        _ensure_mcp_loaded({server_name})
         tool_count = self._count_tools_for_server(server_name)
-        ConsoleHelper.success(self.console, f"{server_name} loaded ({tool_count} tools)")
+        status = mcp_server_states().get(server_name, {})
+        if status.get("status") == "failed" and not tool_count:
+            ConsoleHelper.warning(self.console, f"{server_name} loaded, but not reachable: {status.get('error')}")
+        else:
+            ConsoleHelper.success(self.console, f"{server_name} loaded ({tool_count} tools)")
 
     def _handle_mcp_unload(self, server_name: str):
         """Unload any MCP server (default or optional)."""
@@ -445,6 +471,14 @@ class MCPMixin:
         optional_servers = {s for s, opt in all_servers.items() if opt}
 
         ConsoleHelper.bold(self.console, "MCP Servers:")
+        states = mcp_server_states()
+
+        def describe(server: str) -> str:
+            state = states.get(server, {})
+            status = state.get("status", "stopped")
+            if status == "failed":
+                return f"[red]failed: {state.get('error')}[/]"
+            return "not started" if status == "stopped" else status
 
         # Show default servers
         if default_servers:
@@ -452,7 +486,7 @@ class MCPMixin:
             for server in sorted(default_servers):
                 if server in self.active_mcp_servers:
                     tool_count = self._count_tools_for_server(server)
-                    self.console.print(f"    [green]●[/] {server} ({tool_count} tools)")
+                    self.console.print(f"    [green]●[/] {server} ({tool_count} tools, {describe(server)})")
                 else:
                     self.console.print(f"    [dim]○[/] {server} [dim](unloaded)[/]")
 
@@ -462,7 +496,7 @@ class MCPMixin:
             for server in sorted(optional_servers):
                 if server in self.active_mcp_servers:
                     tool_count = self._count_tools_for_server(server)
-                    self.console.print(f"    [green]●[/] {server} ({tool_count} tools)")
+                    self.console.print(f"    [green]●[/] {server} ({tool_count} tools, {describe(server)})")
                 else:
                     self.console.print(f"    [dim]○[/] {server}")
 
@@ -11,6 +11,7 @@ from pathlib import Path
 from datetime import datetime
 from typing import TYPE_CHECKING, Optional
 
+from . import shared_state
 from .utils import get_config_dir, parse_command, ConsoleHelper
 
 if TYPE_CHECKING:
@@ -47,12 +48,8 @@ class MemoryMixin:
 
         Priority: AGENTS.md > Agents.md > agents.md
         """
-        # Check in priority order
-        for variant in ["AGENTS.md", "Agents.md", "agents.md"]:
-            candidate = directory / variant
-            if candidate.exists() and candidate.is_file():
-                return candidate
-        return None
+        # Shared probe, redone only when the directory's entries change
+        return shared_state.find_file(directory, ("AGENTS.md", "Agents.md", "agents.md"))
 
     def _get_local_agents_path(self) -> Optional[Path]:
         """Get local AGENTS.md path from cwd if exists."""
@@ -66,7 +63,7 @@ class MemoryMixin:
         if global_path:
             self._global_memory_path = global_path
             try:
-                self._global_memory = global_path.read_text()
+                self._global_memory = shared_state.read_text(global_path)
                 self._debug(f"Loaded global memory: {global_path} ({len(self._global_memory)} chars)")
             except Exception as e:
                 ConsoleHelper.warning(self.console, f"Failed to load global AGENTS.md: {e}")
@@ -81,7 +78,7 @@ class MemoryMixin:
         if local_path:
             self._local_memory_path = local_path
             try:
-                self._local_memory = local_path.read_text()
+                self._local_memory = shared_state.read_text(local_path)
                 self._debug(f"Loaded local memory: {local_path} ({len(self._local_memory)} chars)")
             except Exception as e:
                 ConsoleHelper.warning(self.console, f"Failed to load local AGENTS.md: {e}")
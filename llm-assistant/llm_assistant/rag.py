@@ -7,6 +7,7 @@ This module provides RAG functionality via llm-tools-rag:
 - /rag command handling
 """
 
+import time
 from typing import TYPE_CHECKING, Optional
 
 from .ui import Spinner
@@ -176,14 +177,15 @@ class RAGMixin:
 
     def _rag_oneshot_search(self, collection: str, query: str):
         """One-shot RAG search without activating persistent mode."""
-        from llm_tools_rag import collection_exists, search_collection
+        from llm_tools_core import cached_search
+        from llm_tools_rag import collection_exists
 
         if not collection_exists(collection):
             ConsoleHelper.error(self.console, f"Collection '{collection}' not found")
             return
 
         with Spinner(f"Searching {collection}...", self.console):
-            results = search_collection(collection, query, self.rag_top_k, self.rag_search_mode)
+            results = cached_search(collection, query, self.rag_top_k, self.rag_search_mode)
 
         if not results:
             ConsoleHelper.warning(self.console, "No results found")
@@ -201,19 +203,37 @@ class RAGMixin:
 
     def _rag_add_documents(self, collection: str, path: str):
         """Add documents to a RAG collection (creates if needed)."""
-        from llm_tools_rag import add_to_collection, collection_exists
+        from llm_tools_core import get_engine, invalidate_collection
+        from llm_tools_core.rag_ingest import ingest_documents
+        from llm_tools_rag import collection_exists
 
         is_new = not collection_exists(collection)
         action = "Creating" if is_new else "Adding to"
 
         ConsoleHelper.info(self.console, f"{action} collection '{collection}'...")
 
+        last_report = [0.0]
+
+        def progress(done: int, total: int, file_path: str, chunks: int):
+            # At most one line per second; llm-tools-rag prints its own
+            # "Embedding X/Y chunks..." progress within each file
+            now = time.monotonic()
+            if done == total or now - last_report[0] >= 1.0:
+                last_report[0] = now
+                ConsoleHelper.dim(self.console, f"[{done}/{total}] {file_path} ({chunks} chunks added)")
+
         try:
-            # No spinner - llm-tools-rag shows its own "Embedding X/Y chunks..." progress
-            result = add_to_collection(collection, path)
+            # No spinner - it would fight with the engine's own progress output
+            try:
+                result = ingest_documents(get_engine(collection), collection, path, progress=progress)
+            finally:
+                invalidate_collection(collection)
 
             if result["status"] == "success":
-                ConsoleHelper.success(self.console, f"Added {result.get('chunks', '?')} chunks")
+                message = f"Added {result.get('chunks', '?')} chunks"
+                if "files" in result:
+                    message += f" ({result['reason']})"
+                ConsoleHelper.success(self.console, message)
                 # Auto-activate the collection
                 self.active_rag_collection = collection
                 # Re-render system prompt and notify web companion
@@ -229,6 +249,7 @@ class RAGMixin:
 
     def _rag_rebuild_collection(self, collection: str):
         """Rebuild a RAG collection's index."""
+        from llm_tools_core import invalidate_collection
         from llm_tools_rag import collection_exists, rebuild_collection_index
 
         if not collection_exists(collection):
@@ -237,13 +258,18 @@ class RAGMixin:
 
         try:
             with Spinner(f"Rebuilding {collection}...", self.console):
-                rebuild_collection_index(collection)
+                try:
+                    rebuild_collection_index(collection)
+                finally:
+                    invalidate_collection(collection)
             ConsoleHelper.success(self.console, f"Rebuilt index for '{collection}'")
         except Exception as e:
             ConsoleHelper.error(self.console, f"Error rebuilding: {e}")
 
     def _rag_delete_collection(self, collection: str):
         """Delete a RAG collection."""
+        from llm_tools_core import invalidate_collection
+        from llm_tools_core.rag_ingest import delete_manifest
         from llm_tools_rag import collection_exists, remove_collection
 
         if not collection_exists(collection):
@@ -258,7 +284,11 @@ class RAGMixin:
             return
 
         try:
-            remove_collection(collection)
+            try:
+                remove_collection(collection)
+                delete_manifest(collection)
+            finally:
+                invalidate_collection(collection)
             ConsoleHelper.success(self.console, f"Deleted collection '{collection}'")
 
             # Deactivate if was active
@@ -272,13 +302,18 @@ class RAGMixin:
             ConsoleHelper.error(self.console, f"Error deleting: {e}")
 
     def _retrieve_rag_context(self, query: str) -> str:
-        """Retrieve and format RAG context for query."""
+        """Retrieve and format RAG context for query.
+
+        Goes through the shared engine registry and result cache, so
+        follow-up questions don't reload the collection and a repeated
+        query doesn't search again.
+        """
         if not self.active_rag_collection:
             return ""
 
         try:
-            from llm_tools_rag import search_collection
-            results = search_collection(
+            from llm_tools_core import cached_search
+            results = cached_search(
                 self.active_rag_collection,
                 query,
                 top_k=self.rag_top_k,
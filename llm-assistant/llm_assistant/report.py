@@ -4,12 +4,16 @@ This module provides pentest finding management:
 - Project creation with language selection
 - LLM-assisted finding analysis
 - Evidence capture
+- Findings kept in a SQLite store (findings_store); findings.md and the
+  Word export are views generated from it, and hand edits to findings.md
+  are imported back
 - Export to Word via pandoc
 - /report command handling
 """
 
 import re
 import shutil
+import sqlite3
 import subprocess
 from datetime import datetime
 from pathlib import Path
@@ -18,6 +22,7 @@ from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 import llm
 import yaml
 
+from .findings_store import FindingsStore, view_signature, write_view
 from .schemas import FindingSchema
 from .templates import render
 from .utils import get_config_dir, validate_language_code, md_table_escape, yaml_escape, parse_command, ConsoleHelper, parse_schema_response
@@ -48,6 +53,9 @@ class ReportMixin:
     pending_summary: Optional[str]
     chat_terminal_uuid: str
 
+    # ((project dir, findings.md signature), finding metadata) for completions
+    _finding_summaries_cache: Optional[Tuple[Tuple[Path, Optional[str]], List[Dict]]] = None
+
     def _handle_report_command(self, args: str) -> bool:
         """Route /report subcommands to appropriate handlers."""
         subcmd, subargs = parse_command(args)
@@ -108,27 +116,19 @@ class ReportMixin:
             ConsoleHelper.warning(self.console, f"Project already exists, switched to: {safe_name}")
             return True
 
-        # Create project directory and initial findings.md
+        # Create project directory, findings store and initial findings.md
         project_dir.mkdir(parents=True, exist_ok=True)
         (project_dir / "evidence").mkdir(exist_ok=True)
 
-        # Create initial findings.md with project YAML frontmatter including language
-        findings_file = project_dir / "findings.md"
-        initial_content = f"""---
-project: {safe_name}
-created: {datetime.now().strftime('%Y-%m-%d')}
-assessor: Pentest Team
-language: {lang_code}
-language_name: {language_name}
----
-
-# Penetration Test Findings: {safe_name}
-
-| ID | Severity | Title |
-|----|----------|-------|
-
-"""
-        findings_file.write_text(initial_content)
+        with FindingsStore(project_dir / "findings.db") as store:
+            store.set_project_meta({
+                "project": safe_name,
+                "created": datetime.now().strftime('%Y-%m-%d'),
+                "assessor": "Pentest Team",
+                "language": lang_code,
+                "language_name": language_name,
+            })
+            self._write_findings_view(store, project_dir)
 
         self.findings_project = safe_name
         ConsoleHelper.success(self.console, f"Created project: {project_dir} ({language_name})")
@@ -147,26 +147,18 @@ language_name: {language_name}
             return True
 
         project_dir = self.findings_base_dir / self.findings_project
-        findings_file = project_dir / "findings.md"
-
-        if not findings_file.exists():
-            ConsoleHelper.error(self.console, f"Project file not found: {findings_file}")
-            return True
-
-        # Parse existing findings
-        project_meta, findings = self._parse_findings_file(findings_file)
-
-        # Safety check: if parsing returned empty project_meta, file may be corrupted
-        if not project_meta:
-            ConsoleHelper.error(self.console, "Could not parse project file (missing or invalid YAML frontmatter)")
-            ConsoleHelper.dim(self.console, f"Check file manually: {findings_file}")
+        try:
+            store = self._open_findings_store(project_dir)
+        except ValueError as e:
+            ConsoleHelper.error(self.console, str(e))
+            ConsoleHelper.dim(self.console, f"Check file manually: {project_dir / 'findings.md'}")
             return True
+        with store:
+            # Get language from project metadata (default to English for legacy projects)
+            language_name = store.project_meta().get('language_name', 'English')
 
-        # Get language from project metadata (default to English for legacy projects)
-        language_name = project_meta.get('language_name', 'English')
-
-        # Generate next finding ID
-        finding_id = self._get_next_finding_id(findings)
+            # Reserve the next finding ID (another session may be adding too)
+            finding_id = store.reserve_id()
 
         # Capture evidence (terminal context)
         evidence = self._capture_report_evidence(finding_id, project_dir)
@@ -233,11 +225,8 @@ language_name: {language_name}
         else:
             finding_body += "(none captured)\n"
 
-        # Append to findings list
-        findings.append((finding_meta, finding_body))
-
-        # Write updated file
-        self._write_findings_file(findings_file, project_meta, findings)
+        # Store the finding and regenerate findings.md
+        self._add_finding(project_dir, finding_meta, finding_body)
 
         # Display confirmation with severity color
         severity = finding_meta['severity']
@@ -293,34 +282,22 @@ language_name: {language_name}
             }
 
         project_dir = self.findings_base_dir / self.findings_project
-        findings_file = project_dir / "findings.md"
-
-        if not findings_file.exists():
-            return {
-                "finding_id": None,
-                "title": None,
-                "severity": None,
-                "success": False,
-                "error": f"Project file not found: {findings_file}",
-            }
-
-        # Parse existing findings
-        project_meta, findings = self._parse_findings_file(findings_file)
-
-        if not project_meta:
+        try:
+            store = self._open_findings_store(project_dir)
+        except ValueError as e:
             return {
                 "finding_id": None,
                 "title": None,
                 "severity": None,
                 "success": False,
-                "error": "Could not parse project file (missing or invalid YAML frontmatter)",
+                "error": str(e),
             }
+        with store:
+            # Get language from project metadata
+            language_name = store.project_meta().get('language_name', 'English')
 
-        # Get language from project metadata
-        language_name = project_meta.get('language_name', 'English')
-
-        # Generate next finding ID
-        finding_id = self._get_next_finding_id(findings)
+            # Reserve the next finding ID (another session may be adding too)
+            finding_id = store.reserve_id()
 
         # Use provided context or capture from terminals
         if context is None:
@@ -388,12 +365,9 @@ language_name: {language_name}
         else:
             finding_body += "(none captured)\n"
 
-        # Append to findings list
-        findings.append((finding_meta, finding_body))
-
-        # Write updated file
+        # Store the finding and regenerate findings.md
         try:
-            self._write_findings_file(findings_file, project_meta, findings)
+            self._add_finding(project_dir, finding_meta, finding_body)
         except Exception as e:
             return {
                 "finding_id": finding_id,
@@ -599,8 +573,12 @@ Respond with a JSON object containing these fields:
                     finding_meta = yaml.safe_load(yaml_block)
                     if isinstance(finding_meta, dict) and 'id' in finding_meta:
                         # This is a finding YAML block
-                        # Next block is the markdown body
+                        # Next block is the markdown body, without the line
+                        # break that ends the closing --- (written back by
+                        # _render_finding_views, so a re-import is stable)
                         body = blocks[i + 1] if i + 1 < len(blocks) else ""
+                        if body.startswith("\n"):
+                            body = body[1:]
                         findings.append((finding_meta, body))
                         i += 2
                         continue
@@ -611,20 +589,6 @@ Respond with a JSON object containing these fields:
 
         return project_meta, findings
 
-    def _get_next_finding_id(self, findings: List[Tuple[Dict, str]]) -> str:
-        """Generate next finding ID (F001, F002, ...)."""
-        if not findings:
-            return "F001"
-
-        max_num = 0
-        for meta, _ in findings:
-            fid = meta.get('id', '')
-            if fid.startswith('F') and fid[1:].isdigit():
-                num = int(fid[1:])
-                max_num = max(max_num, num)
-
-        return f"F{max_num + 1:03d}"
-
     @staticmethod
     def _sanitize_finding_text(text: str) -> str:
         """Sanitize text for safe inclusion in YAML-delimited findings file.
@@ -637,12 +601,84 @@ Respond with a JSON object containing these fields:
             return text
         return re.sub(r'^---$', '- - -', text, flags=re.MULTILINE)
 
-    def _write_findings_file(self, path: Path, project_meta: Dict, findings: List[Tuple[Dict, str]]):
-        """Write findings.md with project YAML frontmatter + per-finding YAML blocks."""
-        lines = []
+    def _render_finding_views(self, meta: Dict, body: str) -> Dict[str, str]:
+        """Render one finding's summary row, findings.md block and export block."""
+        fid = meta.get('id', '?')
+        severity = meta.get('severity', 0)
+        title = meta.get('title', 'Untitled')
+        sev_label = "High" if severity >= 7 else "Med" if severity >= 4 else "Low"
 
-        # Project frontmatter
-        lines.append("---")
+        # Finding metadata as YAML, then the markdown body
+        block = ["---"]
+        for key, value in meta.items():
+            if key == 'evidence':
+                if value:
+                    block.append("evidence:")
+                    for ev in value:
+                        block.append(f"  - type: {yaml_escape(ev.get('type', 'file'))}")
+                        block.append(f"    path: {yaml_escape(ev.get('path', ''))}")
+                else:
+                    block.append("evidence: []")
+            else:
+                block.append(f"{key}: {yaml_escape(value)}")
+        block.append("---")
+        block.append(body.rstrip())
+        block.append("")
+
+        # Export: no per-finding YAML, for clean Word output
+        export = [
+            f"## {fid}: {title}",
+            "",
+            f"**Severity:** {severity} ({sev_label}) - {meta.get('severity_rationale', '')}",
+            body,
+            "",
+        ]
+        return {
+            "row": f"| {fid} | {severity} ({sev_label}) | {md_table_escape(title)} |",
+            "block": "\n".join(block),
+            "export": "\n".join(export),
+        }
+
+    def _open_findings_store(self, project_dir: Path) -> FindingsStore:
+        """Open a project's findings store, importing findings.md if it changed.
+
+        findings.md is generated from the store, but may be edited by hand
+        (/report edit) or predate the store: a file that differs from the
+        last generated one is imported, replacing the stored findings.
+
+        Raises:
+            ValueError: No project here, or findings.md cannot be parsed
+        """
+        findings_file = project_dir / "findings.md"
+        db_path = project_dir / "findings.db"
+        signature = view_signature(findings_file)
+        if signature is None and not db_path.exists():
+            raise ValueError(f"Project file not found: {findings_file}")
+
+        store = FindingsStore(db_path)
+        try:
+            if signature is not None and signature != store.get_state("view_signature"):
+                project_meta, findings = self._parse_findings_file(findings_file)
+                # Refuse to replace stored findings with a corrupted file
+                if not project_meta:
+                    raise ValueError("Could not parse project file (missing or invalid YAML frontmatter)")
+                store.replace_all(
+                    project_meta,
+                    [(meta, body, self._render_finding_views(meta, body)) for meta, body in findings],
+                )
+                store.set_state("view_signature", signature)
+                self._debug(f"report: imported {len(findings)} finding(s) from {findings_file}")
+            elif not store.project_meta():
+                raise ValueError(f"Project file not found: {findings_file}")
+        except BaseException:
+            store.close()
+            raise
+        return store
+
+    def _write_findings_view(self, store: FindingsStore, project_dir: Path) -> None:
+        """Regenerate findings.md from the stored, pre-rendered finding pieces."""
+        project_meta = store.project_meta()
+        lines = ["---"]
         for key, value in project_meta.items():
             lines.append(f"{key}: {yaml_escape(value)}")
         lines.append("---")
@@ -654,36 +690,69 @@ Respond with a JSON object containing these fields:
         lines.append("")
         lines.append("| ID | Severity | Title |")
         lines.append("|----|----------|-------|")
-
-        for meta, _ in findings:
-            fid = meta.get('id', '?')
-            severity = meta.get('severity', 0)
-            title = md_table_escape(meta.get('title', 'Untitled'))
-            sev_label = "High" if severity >= 7 else "Med" if severity >= 4 else "Low"
-            lines.append(f"| {fid} | {severity} ({sev_label}) | {title} |")
-
+        lines.extend(store.views("row"))
         lines.append("")
 
         # Per-finding YAML blocks + bodies
-        for meta, body in findings:
-            lines.append("---")
-            # Write finding metadata as YAML
-            for key, value in meta.items():
-                if key == 'evidence':
-                    if value:
-                        lines.append("evidence:")
-                        for ev in value:
-                            lines.append(f"  - type: {yaml_escape(ev.get('type', 'file'))}")
-                            lines.append(f"    path: {yaml_escape(ev.get('path', ''))}")
-                    else:
-                        lines.append("evidence: []")
-                else:
-                    lines.append(f"{key}: {yaml_escape(value)}")
-            lines.append("---")
-            lines.append(body.rstrip())
-            lines.append("")
+        lines.extend(store.views("block"))
+
+        signature = write_view(project_dir / "findings.md", "\n".join(lines))
+        store.set_state("view_signature", signature)
 
-        path.write_text("\n".join(lines))
+    def _add_finding(self, project_dir: Path, meta: Dict, body: str) -> None:
+        """Add a finding under its reserved ID and regenerate findings.md.
+
+        The reservation is released if the finding cannot be stored.
+        """
+        try:
+            with self._open_findings_store(project_dir) as store:
+                store.add(meta, body, self._render_finding_views(meta, body))
+                self._write_findings_view(store, project_dir)
+        except BaseException:
+            try:
+                with FindingsStore(project_dir / "findings.db") as store:
+                    store.release(meta['id'])
+            except sqlite3.Error:
+                pass
+            raise
+
+    def _read_finding_metas(self, project_dir: Path) -> List[Dict]:
+        """Metadata of a project's findings, without creating or changing files.
+
+        Read from findings.db when it matches findings.md, otherwise parsed
+        from findings.md ([] if neither is usable).
+        """
+        findings_file = project_dir / "findings.md"
+        signature = view_signature(findings_file)
+        db_path = project_dir / "findings.db"
+        if db_path.exists():
+            try:
+                with FindingsStore(db_path, read_only=True) as store:
+                    if signature is None or store.get_state("view_signature") == signature:
+                        return store.metas()
+            except sqlite3.Error:
+                pass
+        if signature is None:
+            return []
+        try:
+            return [meta for meta, _body in self._parse_findings_file(findings_file)[1]]
+        except (OSError, yaml.YAMLError):
+            return []
+
+    def _finding_summaries(self) -> List[Dict]:
+        """Metadata of the current project's findings ([] if unavailable).
+
+        Called by the completer on every keystroke: cached until findings.md
+        changes (it is rewritten on every change), and never writes.
+        """
+        if not self.findings_project:
+            return []
+        project_dir = self.findings_base_dir / self.findings_project
+        key = (project_dir, view_signature(project_dir / "findings.md"))
+        cached = self._finding_summaries_cache
+        if cached is None or cached[0] != key:
+            cached = self._finding_summaries_cache = (key, self._read_finding_metas(project_dir))
+        return cached[1]
 
     def _report_list(self) -> bool:
         """List all findings in current project."""
@@ -692,20 +761,19 @@ Respond with a JSON object containing these fields:
             return True
 
         project_dir = self.findings_base_dir / self.findings_project
-        findings_file = project_dir / "findings.md"
-
-        if not findings_file.exists():
-            ConsoleHelper.error(self.console, f"Project file not found: {findings_file}")
+        try:
+            with self._open_findings_store(project_dir) as store:
+                findings = store.metas()
+        except ValueError as e:
+            ConsoleHelper.error(self.console, str(e))
             return True
 
-        project_meta, findings = self._parse_findings_file(findings_file)
-
         if not findings:
             ConsoleHelper.dim(self.console, f"No findings in project: {self.findings_project}")
             return True
 
         ConsoleHelper.bold(self.console, f"Findings for {self.findings_project}:")
-        for meta, _ in findings:
+        for meta in findings:
             fid = meta.get('id', '?')
             severity = meta.get('severity', 0)
             title = meta.get('title', 'Untitled')
@@ -729,7 +797,7 @@ Respond with a JSON object containing these fields:
         project_dir = self.findings_base_dir / self.findings_project
         findings_file = project_dir / "findings.md"
 
-        ConsoleHelper.dim(self.console, "Edit the findings file directly:")
+        ConsoleHelper.dim(self.console, "Edit the findings file directly (changes are imported on the next /report command):")
         self.console.print(f"  {findings_file}")
         return True
 
@@ -745,27 +813,18 @@ Respond with a JSON object containing these fields:
             return True
 
         project_dir = self.findings_base_dir / self.findings_project
-        findings_file = project_dir / "findings.md"
-
-        if not findings_file.exists():
-            ConsoleHelper.error(self.console, "Project file not found")
-            return True
-
-        project_meta, findings = self._parse_findings_file(findings_file)
-
-        # Safety check: refuse to modify corrupted files
-        if not project_meta:
-            ConsoleHelper.error(self.console, "Could not parse project file (invalid format)")
+        try:
+            store = self._open_findings_store(project_dir)
+        except ValueError as e:
+            # Refuses to modify corrupted files
+            ConsoleHelper.error(self.console, str(e))
             return True
 
-        # Find the finding to delete (to get evidence paths)
-        deleted_finding = None
-        new_findings = []
-        for m, b in findings:
-            if m.get('id', '').upper() == finding_id:
-                deleted_finding = m
-            else:
-                new_findings.append((m, b))
+        with store:
+            # Metadata of the deleted finding has its evidence paths
+            deleted_finding = store.delete(finding_id)
+            if deleted_finding is not None:
+                self._write_findings_view(store, project_dir)
 
         if deleted_finding is None:
             ConsoleHelper.warning(self.console, f"Finding {finding_id} not found")
@@ -782,7 +841,6 @@ Respond with a JSON object containing these fields:
                     except Exception:
                         pass  # Best effort deletion
 
-        self._write_findings_file(findings_file, project_meta, new_findings)
         ConsoleHelper.success(self.console, f"Deleted {finding_id}")
         return True
 
@@ -807,33 +865,27 @@ Respond with a JSON object containing these fields:
             return True
 
         project_dir = self.findings_base_dir / self.findings_project
-        findings_file = project_dir / "findings.md"
-
-        if not findings_file.exists():
-            ConsoleHelper.error(self.console, "Project file not found")
-            return True
-
-        project_meta, findings = self._parse_findings_file(findings_file)
-
-        # Safety check: refuse to modify corrupted files
-        if not project_meta:
-            ConsoleHelper.error(self.console, "Could not parse project file (invalid format)")
+        try:
+            store = self._open_findings_store(project_dir)
+        except ValueError as e:
+            # Refuses to modify corrupted files
+            ConsoleHelper.error(self.console, str(e))
             return True
 
-        # Find and update the finding
-        found = False
-        for meta, body in findings:
-            if meta.get('id', '').upper() == finding_id:
+        with store:
+            finding = store.get(finding_id)
+            if finding is not None:
+                # Update only this finding, then regenerate the view
+                meta, body = finding
                 meta['severity'] = new_severity
                 meta['severity_rationale'] = f"Manually set to {new_severity}"
-                found = True
-                break
+                store.put(meta, body, self._render_finding_views(meta, body))
+                self._write_findings_view(store, project_dir)
 
-        if not found:
+        if finding is None:
             ConsoleHelper.warning(self.console, f"Finding {finding_id} not found")
             return True
 
-        self._write_findings_file(findings_file, project_meta, findings)
         sev_color = "red" if new_severity >= 7 else "yellow" if new_severity >= 4 else "green"
         ConsoleHelper.success(self.console, f"Updated {finding_id} severity to [{sev_color}]{new_severity}[/]")
         return True
@@ -852,11 +904,7 @@ Respond with a JSON object containing these fields:
         ConsoleHelper.bold(self.console, "Finding Projects:")
         for project_dir in sorted(projects):
             name = project_dir.name
-            findings_file = project_dir / "findings.md"
-            count = 0
-            if findings_file.exists():
-                _, findings = self._parse_findings_file(findings_file)
-                count = len(findings)
+            count = len(self._read_finding_metas(project_dir))
 
             active = " [green](active)[/]" if name == self.findings_project else ""
             self.console.print(f"  {name}{active} - {count} findings")
@@ -888,20 +936,21 @@ Respond with a JSON object containing these fields:
             return True
 
         project_dir = self.findings_base_dir / self.findings_project
-        findings_file = project_dir / "findings.md"
-
-        if not findings_file.exists():
-            ConsoleHelper.error(self.console, "Project file not found")
-            return True
 
         if shutil.which("pandoc") is None:
             ConsoleHelper.error(self.console, "pandoc not found. Install with: apt install pandoc")
             return True
 
-        # Create export file (strip per-finding YAML for clean Word output)
-        project_meta, findings = self._parse_findings_file(findings_file)
+        # Export view from the stored, pre-rendered pieces (no per-finding YAML)
+        try:
+            with self._open_findings_store(project_dir) as store:
+                project_meta = store.project_meta()
+                rows = store.views("row")
+                finding_blocks = store.views("export")
+        except ValueError as e:
+            ConsoleHelper.error(self.console, str(e))
+            return True
 
-        # Build clean markdown for export (no per-finding YAML)
         export_lines = []
         export_lines.append(f"# Penetration Test Findings: {project_meta.get('project', 'Unknown')}")
         export_lines.append("")
@@ -914,27 +963,11 @@ Respond with a JSON object containing these fields:
         export_lines.append("")
         export_lines.append("| ID | Severity | Title |")
         export_lines.append("|----|----------|-------|")
-        for meta, _ in findings:
-            fid = meta.get('id', '?')
-            severity = meta.get('severity', 0)
-            title = md_table_escape(meta.get('title', 'Untitled'))
-            sev_label = "High" if severity >= 7 else "Med" if severity >= 4 else "Low"
-            export_lines.append(f"| {fid} | {severity} ({sev_label}) | {title} |")
+        export_lines.extend(rows)
         export_lines.append("")
 
         # Each finding
-        for meta, body in findings:
-            fid = meta.get('id', '?')
-            title = meta.get('title', 'Untitled')
-            severity = meta.get('severity', 0)
-            rationale = meta.get('severity_rationale', '')
-            sev_label = "High" if severity >= 7 else "Med" if severity >= 4 else "Low"
-
-            export_lines.append(f"## {fid}: {title}")
-            export_lines.append("")
-            export_lines.append(f"**Severity:** {severity} ({sev_label}) - {rationale}")
-            export_lines.append(body)
-            export_lines.append("")
+        export_lines.extend(finding_blocks)
 
         # Write temp file and convert
         export_md = project_dir / "findings_export.md"
@@ -56,7 +56,6 @@ from datetime import date
 from collections import deque
 from rich.console import Console
 from rich.live import Live
-from rich.markdown import Markdown
 from rich.panel import Panel
 from rich.prompt import Prompt
 from rich.spinner import Spinner as RichSpinner
@@ -74,6 +73,7 @@ from prompt_toolkit.styles import Style as PTStyle
 # Local module imports
 from llm_tools_core import PromptDetector
 from llm_tools_core import detect_os, detect_shell, detect_environment
+from llm_tools_core import PromptCacheStats, PromptSegment, layout_prompt
 from .voice import VoiceInput, VOICE_AVAILABLE, VOICE_UNAVAILABLE_REASON
 from .ui import Spinner
 from .completer import SlashCommandCompleter
@@ -98,7 +98,7 @@ from .report import ReportMixin
 from .web import WebMixin
 from .terminal import TerminalMixin
 from .context import ContextMixin
-from llm_tools_core import filter_new_blocks, get_assistant_default_model
+from llm_tools_core import filter_new_blocks, get_assistant_default_model, get_plugin_catalog, MarkdownStream
 from llm_tools_core.mcp_citations import is_microsoft_doc_tool, format_microsoft_citations
 from .watch import WatchMixin
 from .workflow import WorkflowMixin
@@ -331,6 +331,8 @@ class TerminatorAssistantSession(KnowledgeBaseMixin, MemoryMixin, RAGMixin, Skil
 
         # Pending summary from context squash (prepended to next user message)
         self.pending_summary: Optional[str] = None
+        self.context_usage: Dict[str, Dict[str, int]] = {}  # Per-source tokens of the last turn
+        self.prompt_cache = PromptCacheStats()  # Provider prompt-cache tokens of this session
 
         # Undo buffer for /rewind command (stores removed responses for single undo)
         self.rewind_undo_buffer: Optional[List] = None
@@ -842,9 +844,11 @@ class TerminatorAssistantSession(KnowledgeBaseMixin, MemoryMixin, RAGMixin, Skil
         if tts_enabled and self.speech_output:
             self.speech_output.stop()
 
-        # Show spinner while waiting for first token, then switch to markdown
+        # Show spinner while waiting for first token, then switch to markdown.
+        # Finished blocks are committed to scrollback once; Live only redraws
+        # the trailing open block, so long answers don't re-render per chunk.
         thinking_spinner = RichSpinner("dots", text=Text("Thinking…", style="cyan"), style="cyan")
-        has_content = False
+        md_stream = MarkdownStream(self.console)
         cancelled = False
 
         # Enter cbreak mode for non-blocking Escape detection during streaming
@@ -857,38 +861,41 @@ class TerminatorAssistantSession(KnowledgeBaseMixin, MemoryMixin, RAGMixin, Skil
 
         try:
             with Live(thinking_spinner, refresh_per_second=10, console=self.console, transient=True) as live:
-                for chunk in response:
-                    # Check for Escape keypress (non-blocking)
-                    if cbreak_active and self._check_escape_pressed():
-                        self._turn_cancelled.set()
-                    if self._turn_cancelled.is_set():
-                        cancelled = True
-                        break
+                try:
+                    for chunk in response:
+                        # Check for Escape keypress (non-blocking)
+                        if cbreak_active and self._check_escape_pressed():
+                            self._turn_cancelled.set()
+                        if self._turn_cancelled.is_set():
+                            cancelled = True
+                            break
 
-                    accumulated_text += chunk
-                    if not has_content and accumulated_text.strip():
-                        has_content = True
-                        live.transient = False
-                    if has_content:
-                        live.update(Markdown(accumulated_text))
-
-                    if self.web_clients:
-                        now = time.monotonic()
-                        text_len = len(accumulated_text)
-                        if (now - web_last_broadcast_ts) >= 0.06 or (text_len - web_last_broadcast_len) >= 80:
-                            self._broadcast_to_web({
-                                "type": "assistant_chunk",
-                                "content": accumulated_text,
-                                "done": False,
-                            })
-                            web_last_broadcast_ts = now
-                            web_last_broadcast_len = text_len
-
-                    # Queue TTS if enabled (non-blocking)
-                    if tts_enabled and sentence_buffer:
-                        sentence = sentence_buffer.add(chunk)
-                        if sentence:
-                            self.speech_output.speak_sentence(sentence)
+                        accumulated_text += chunk
+                        md_stream.feed(chunk)
+                        if md_stream.has_content:
+                            live.update(md_stream.tail)
+
+                        if self.web_clients:
+                            now = time.monotonic()
+                            text_len = len(accumulated_text)
+                            if (now - web_last_broadcast_ts) >= 0.06 or (text_len - web_last_broadcast_len) >= 80:
+                                self._broadcast_to_web({
+                                    "type": "assistant_chunk",
+                                    "content": accumulated_text,
+                                    "done": False,
+                                })
+                                web_last_broadcast_ts = now
+                                web_last_broadcast_len = text_len
+
+                        # Queue TTS if enabled (non-blocking)
+                        if tts_enabled and sentence_buffer:
+                            sentence = sentence_buffer.add(chunk)
+                            if sentence:
+                                self.speech_output.speak_sentence(sentence)
+                finally:
+                    # Commit the open block (also on errors, so partial output stays visible)
+                    live.update(Text(""))
+                    md_stream.finish()
         finally:
             if cbreak_active:
                 self._restore_terminal_mode()
@@ -975,29 +982,30 @@ class TerminatorAssistantSession(KnowledgeBaseMixin, MemoryMixin, RAGMixin, Skil
         return result
 
     def _render_system_prompt(self) -> str:
-        """Render system prompt using Jinja2 template.
+        """Render system prompt using Jinja2 templates.
 
-        Called at init and when mode changes (/assistant or /agent).
-        Jinja2 template handles mode filtering and environment injection.
+        Called at init and when mode or session state changes (/assistant,
+        /agent, /watch, /rag, /skill). The base template handles mode
+        filtering; session state is rendered as separate segments so that
+        changing it leaves the cached prompt prefix intact.
         """
         os_info = detect_os()
         shell_name, shell_version = detect_shell()
         shell_info = f"{shell_name} {shell_version}".strip() if shell_version else shell_name
         env_type = detect_environment()
 
-        return render('system_prompt.j2',
+        base = render('system_prompt.j2',
             mode=self.mode,
+            platform=os_info,
+            exec=not self.no_exec_mode,
+        )
+        self._prompt_segments = [PromptSegment("base", base)] + self._prompt_section_segments(
             date=date.today().isoformat(),
             platform=os_info,
             shell=shell_info,
             environment=env_type,
-            watch_mode=self.watch_mode,
-            watch_goal=self.watch_goal,
-            rag=bool(self.active_rag_collection),
-            skills=bool(self.loaded_skills),
-            skills_xml=self._get_skills_xml() if self.loaded_skills else "",
-            exec=not self.no_exec_mode,
         )
+        return layout_prompt(self._prompt_segments).text
 
     # _build_system_prompt is inherited from ContextMixin
 
@@ -2927,9 +2935,9 @@ Screenshot size: {file_size} bytes"""
             if not args:
                 # List available models
                 ConsoleHelper.bold(self.console, "Available models:")
-                for model in llm.get_models():
-                    current = " [green](current)[/]" if model.model_id == self.model_name else ""
-                    self.console.print(f"  - {model.model_id}{current}")
+                for model_id in get_plugin_catalog().model_ids():
+                    current = " [green](current)[/]" if model_id == self.model_name else ""
+                    self.console.print(f"  - {model_id}{current}")
             elif args == "default" or args.startswith("default "):
                 # /model default — manage persistent default model
                 default_args = args[len("default"):].strip()
@@ -3036,6 +3044,8 @@ Mode: {mode_display}
 {tools_info}
 Memory: {memory_status}
 Context size: ~{tokens:,} tokens / {self.max_context_size:,} ({percentage}%) [{token_source}]
+Context sources: {self._format_context_usage()}
+Prompt cache: {self._format_prompt_cache()}
 Exchanges: {len(self.conversation.responses)}
 Watch mode: {"enabled" if self.watch_mode else "disabled"}{watch_goal_line}
 
@@ -4193,27 +4203,25 @@ Type !fragment <name> [...] to insert fragments""",
                             if rag_context:
                                 self._debug("RAG: injecting context")
 
-                        # Build prompt with context (order: terminal context → RAG context → user input)
-                        prompt_parts = []
-
-                        if context:
-                            prompt_parts.append(f"<terminal_context>\n{context}\n</terminal_context>")
-
-                        if rag_context:
-                            prompt_parts.append(rag_context)
+                        # Fit injected context into its token budget (lowest priority trimmed first)
+                        sources = self._allocate_context(
+                            terminal=f"<terminal_context>\n{context}\n</terminal_context>" if context else "",
+                            rag=rag_context,
+                            kb_sections=self._get_kb_sections(processed_input),
+                            summary=f"<conversation_summary>\n{self.pending_summary}\n</conversation_summary>"
+                            if self.pending_summary else "",
+                        )
 
+                        # Build prompt with context (order: summary → terminal context → KB sections → RAG context → user input)
+                        prompt_parts = [
+                            sources[name] for name in ("summary", "terminal", "kb_sections", "rag") if sources[name]
+                        ]
                         prompt_parts.append(processed_input)
 
                         full_prompt = "\n\n".join(prompt_parts)
 
-                        # Prepend pending summary from squash (one-time use)
-                        if self.pending_summary:
-                            full_prompt = f"""<conversation_summary>
-{self.pending_summary}
-</conversation_summary>
-
-{full_prompt}"""
-                            self.pending_summary = None
+                        # Pending summary from squash is one-time use
+                        self.pending_summary = None
 
                         # Broadcast user message to web companion
                         if self.web_clients:
@@ -4223,12 +4231,13 @@ Type !fragment <name> [...] to insert fragments""",
                             })
 
                         # Always pass system prompt on every call (required for Gemini/Vertex
-                        # which is stateless - systemInstruction must be sent on every request)
+                        # which is stateless - systemInstruction must be sent on every request),
+                        # laid out stable-first with cache breakpoints for prompt caching
                         # Also pass fragments and attachments (TUI screenshots)
                         # Include tools for structured output (schema validation)
                         response = self._prompt(
                             full_prompt,
-                            system=self._build_system_prompt(),
+                            **self._system_prompt_kwargs(sources),
                             fragments=[str(f) for f in fragments] if fragments else None,
                             attachments=all_attachments if all_attachments else None,
                             tools=self._get_active_tools()
@@ -4248,6 +4257,7 @@ Type !fragment <name> [...] to insert fragments""",
 
                         # Extract tool calls from the response (structured output)
                         tool_calls = list(response.tool_calls())
+                        self._record_prompt_cache(response)
 
                         # Log response to database for --continue functionality
                         # INSIDE lock to prevent race with watch mode reading stripped prompt
@@ -4335,6 +4345,7 @@ Type !fragment <name> [...] to insert fragments""",
 
                                     # Check if the model made more tool calls
                                     more_tool_calls = list(followup_response.tool_calls())
+                                    self._record_prompt_cache(followup_response)
 
                                     # Log followup response to database
                                     # INSIDE lock to prevent race with watch mode reading stripped prompt
@@ -0,0 +1,286 @@
+"""Process-wide read-only session state for llm-assistant.
+
+Every session in a process reads the same files at startup: the assistant
+config, auto-loaded KBs, AGENTS.md memory, and the skills directory.
+This module keeps one copy of each, shared by reference between
+sessions. An entry is re-read only when its file signature (mtime, size)
+changes.
+
+After enable_watching() (the daemon), entries are served from memory
+without any stat() until an inotify event for their file or directory
+drops them, so an edit shows up on the next turn at no per-turn cost.
+Entries whose directory cannot be watched keep validating by signature.
+
+Values returned from here are shared: callers must not mutate them.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Optional, Sequence, Set, Tuple, Union
+
+from llm_tools_core.file_watch import FileWatcher, create_file_watcher
+
+PathLike = Union[str, Path]
+
+_lock = threading.Lock()
+# (kind, path) -> (signature, value)
+_entries: Dict[Tuple[str, str], Tuple[Hashable, Any]] = {}
+# Bumped whenever an entry changes or is dropped (not on first load);
+# sessions compare it to know whether their shared state may be stale.
+_generation = 0
+
+_watcher: Optional[FileWatcher] = None
+# Entries kept fresh by the watcher (served without a signature check)
+_watched: Set[Tuple[str, str]] = set()
+# Bumped on every watcher event; a load that overlaps one is not trusted
+_epoch = 0
+
+# Kinds keyed by a directory; any change below it invalidates them
+# (find: entries only care about their probed names, see _affects())
+_DIRECTORY_KINDS = ("dir:", "tree:")
+
+
+def _file_signature(path: PathLike) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _dir_signature(path: PathLike) -> Optional[Tuple]:
+    """Signature of a directory and the entry file of each subdirectory.
+
+    Covers adding, removing or renaming a subdirectory (directory mtime) and
+    edits to any <sub>/SKILL.md (mtime, size).
+    """
+    top = _file_signature(path)
+    if top is None:
+        return None
+    children = []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                if entry.is_dir():
+                    children.append((entry.name, _file_signature(os.path.join(entry.path, "SKILL.md"))))
+    except OSError:
+        return None
+    return (top, tuple(sorted(children)))
+
+
+def _tree_signature(path: PathLike) -> Optional[Tuple]:
+    """Signature of every directory below path (entries added/removed/renamed)."""
+    if _file_signature(path) is None:
+        return None
+    return tuple(
+        (root, _file_signature(root)) for root, _dirs, _files in os.walk(path)
+    )
+
+
+def _signature_function(kind: str) -> Callable[[PathLike], Optional[Hashable]]:
+    if kind.startswith("dir:"):
+        return _dir_signature
+    if kind.startswith("tree:"):
+        return _tree_signature
+    return _file_signature  # Files, and the directory itself for find:
+
+
+def _watch(kind: str, path: str) -> bool:
+    """Ask the watcher to cover an entry; False if it cannot."""
+    if _watcher is None:
+        return False
+    if kind.startswith(("dir:", "tree:")):
+        return _watcher.watch(path, recursive=True)
+    if kind.startswith("find:"):
+        return _watcher.watch(path)
+    return _watcher.watch(os.path.dirname(path))
+
+
+def _affects(kind: str, entry_path: str, path: str) -> bool:
+    """Whether a change to path can change the entry (kind, entry_path)."""
+    if entry_path == path or entry_path.startswith(path + os.sep):
+        return True  # The entry's file or directory, or one above it
+    if not path.startswith(entry_path + os.sep):
+        return False
+    if kind.startswith("find:"):
+        # Only the probed names matter: other files in the directory (such
+        # as logs.db next to AGENTS.md) are written all the time
+        directory, name = os.path.split(path)
+        return directory == entry_path and name in kind[len("find:"):].split("\0")
+    return kind.startswith(_DIRECTORY_KINDS)
+
+
+def _on_change(path: Optional[str]) -> None:
+    """Watcher callback: drop every entry the changed path affects."""
+    global _generation, _epoch
+    with _lock:
+        _epoch += 1  # Also covers loads in flight, not yet in _entries
+        stale = [
+            key for key in _entries
+            if path is None or _affects(key[0], key[1], path)
+        ]
+        if not stale:
+            return
+        for key in stale:
+            del _entries[key]
+            _watched.discard(key)
+        _generation += 1
+
+
+def _get(kind: str, path: PathLike, loader: Callable[[Path], Any]) -> Any:
+    global _generation
+    key = (kind, str(path))
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None and key in _watched:
+            return entry[1]
+        epoch = _epoch
+
+    # Watch before reading, so an edit made during the load is not missed
+    watched = _watch(kind, key[1])
+    signature = _signature_function(kind)(path)
+    if signature is not None and entry is not None and entry[0] == signature:
+        value = entry[1]
+    else:
+        # Load outside the lock; a concurrent duplicate load is harmless
+        value = loader(Path(path))
+        if signature is None:
+            return value
+    with _lock:
+        if entry is None or entry[0] != signature:
+            _entries[key] = (signature, value)
+            # A first load changes nothing other sessions hold
+            if entry is not None:
+                _generation += 1
+        if watched and _epoch == epoch:
+            _watched.add(key)
+    return value
+
+
+def enable_watching() -> bool:
+    """Keep entries fresh with inotify instead of stat() (idempotent).
+
+    Returns False where inotify is unavailable; signatures are used then.
+    """
+    global _watcher
+    with _lock:
+        if _watcher is None:
+            _watcher = create_file_watcher(_on_change)
+        return _watcher is not None
+
+
+def read_text(path: PathLike) -> str:
+    """Return the text of a file, shared between sessions.
+
+    Raises OSError like Path.read_text() if the file cannot be read.
+    """
+    return _get("text", path, lambda p: p.read_text())
+
+
+def load_yaml(path: PathLike) -> dict:
+    """Return a parsed YAML mapping, or {} if missing or invalid."""
+    def loader(p: Path) -> dict:
+        try:
+            import yaml
+            with open(p) as f:
+                return yaml.safe_load(f) or {}
+        except Exception:
+            return {}
+
+    return _get("yaml", path, loader)
+
+
+def load_file(kind: str, path: PathLike, loader: Callable[[Path], Any]) -> Any:
+    """Return loader(path), recomputed only when the file changes.
+
+    Used for values derived from a file, such as the KB section index.
+    """
+    return _get(f"file:{kind}", path, loader)
+
+
+def scan_directory(kind: str, path: PathLike, loader: Callable[[Path], Any]) -> Any:
+    """Return loader(path), recomputed only when the directory changes.
+
+    Used for the skills catalogue: a directory of <name>/SKILL.md entries.
+    """
+    return _get(f"dir:{kind}", path, loader)
+
+
+def scan_directory_variant(
+    kind: str,
+    path: PathLike,
+    variant: Hashable,
+    loader: Callable[[Path], Any],
+    max_variants: int = 8,
+) -> Any:
+    """Like scan_directory(), for values that also depend on variant.
+
+    Used for the skills prompt of one set of loaded skills. At most
+    max_variants values are kept per directory (least recently used
+    dropped first); all are dropped when the directory changes.
+    """
+    variants = _get(f"dir:{kind}", path, lambda _: OrderedDict())
+    with _lock:
+        if variant in variants:
+            variants.move_to_end(variant)
+            return variants[variant]
+    value = loader(Path(path))
+    with _lock:
+        variants[variant] = value
+        while len(variants) > max_variants:
+            variants.popitem(last=False)
+    return value
+
+
+def scan_tree(kind: str, path: PathLike, loader: Callable[[Path], Any]) -> Any:
+    """Return loader(path), recomputed when anything below path is added,
+    removed or renamed.
+
+    Used for the file list of a skill (loadable files at any depth).
+    """
+    return _get(f"tree:{kind}", path, loader)
+
+
+def find_file(directory: PathLike, names: Sequence[str]) -> Optional[Path]:
+    """First of names that is a file in directory, or None.
+
+    Used for AGENTS.md variants and KB names; re-probed only when entries
+    of the directory change, not on every call.
+    """
+    def loader(d: Path) -> Optional[Path]:
+        for name in names:
+            candidate = d / name
+            if candidate.is_file():
+                return candidate
+        return None
+
+    return _get("find:" + "\0".join(names), directory, loader)
+
+
+def revalidate() -> int:
+    """Drop entries whose files changed and return the current generation.
+
+    Entries kept fresh by the watcher are not checked.
+    """
+    global _generation
+    with _lock:
+        items = [(key, entry) for key, entry in _entries.items() if key not in _watched]
+    stale = []
+    for key, (signature, _value) in items:
+        kind, path = key
+        current = _signature_function(kind)(path)
+        if current != signature:
+            stale.append(key)
+    with _lock:
+        for key in stale:
+            _entries.pop(key, None)
+        if stale:
+            _generation += 1
+        return _generation
+
+
+def generation() -> int:
+    """Current generation counter (see revalidate())."""
+    return _generation
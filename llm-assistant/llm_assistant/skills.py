@@ -11,12 +11,48 @@ from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Any
 
 from llm import Tool
 
+from . import shared_state
 from .utils import get_config_dir, check_import, parse_command, parse_comma_list, ConsoleHelper, render_grouped_list
 
 if TYPE_CHECKING:
     from rich.console import Console
 
 
+def _scan_skills(skills_dir: Path) -> Dict[str, Tuple[Path, Any]]:
+    """Read name -> (path, properties) for every valid skill in skills_dir."""
+    from llm_tools_skills import discover_skills, read_properties
+
+    result = {}
+    for name, path in discover_skills(skills_dir).items():
+        try:
+            result[name] = (path, read_properties(path))
+        except ValueError:
+            pass  # Skip invalid skills
+    return result
+
+
+def _collect_skill_files(skill_dir: Path) -> List[str]:
+    """Loadable files below skill_dir (relative paths), SKILL.md excluded."""
+    from llm_tools_skills import TEXT_FILE_EXTENSIONS, TEXT_FILE_NAMES
+
+    files = []
+
+    def collect(directory: Path, prefix: str = ""):
+        try:
+            for item in sorted(directory.iterdir()):
+                rel_path = f"{prefix}{item.name}" if prefix else item.name
+                if item.is_dir():
+                    collect(item, f"{rel_path}/")
+                elif item.is_file() and item.name.lower() != "skill.md":
+                    if item.suffix.lower() in TEXT_FILE_EXTENSIONS or item.name in TEXT_FILE_NAMES:
+                        files.append(rel_path)
+        except PermissionError:
+            pass
+
+    collect(skill_dir)
+    return files
+
+
 class SkillsMixin:
     """Mixin providing skills functionality.
 
@@ -50,51 +86,43 @@ class SkillsMixin:
             return
 
         available = self._discover_available_skills()
-        for name in available:
-            self._load_skill(name, silent=True)
+        if not available:
+            return
+        # One tool rebuild and prompt render for the whole batch
+        # (_load_skill would redo both per skill)
+        self.loaded_skills.update(available)
+        self._rebuild_skill_tools()
+        self._update_system_prompt(broadcast_type="skill")
 
     def _discover_available_skills(self) -> Dict[str, Tuple[Path, Any]]:
-        """Discover all available skills from the skills directory."""
-        from llm_tools_skills import discover_skills, read_properties
+        """Discover all available skills from the skills directory.
 
-        result = {}
+        The catalogue is shared between sessions and rescanned only when the
+        skills directory or a SKILL.md changes.
+        """
         skills_dir = self._get_skills_dir()
-        if skills_dir.exists():
-            discovered = discover_skills(skills_dir)
-            for name, path in discovered.items():
-                try:
-                    props = read_properties(path)
-                    result[name] = (path, props)
-                except ValueError:
-                    pass  # Skip invalid skills
-        return result
+        if not skills_dir.exists():
+            return {}
+        return dict(shared_state.scan_directory("skills", skills_dir, _scan_skills))
 
     def _get_skills_xml(self) -> str:
         """Generate <available_skills> XML for system prompt."""
         from llm_tools_skills import to_prompt
         skill_dirs = [path for path, _ in self.loaded_skills.values()]
-        return to_prompt(skill_dirs)
+        # Keyed by the loaded set; skill dirs live under the skills directory,
+        # so its signature covers every SKILL.md that to_prompt() reads
+        return shared_state.scan_directory_variant(
+            "skills-xml", self._get_skills_dir(), tuple(skill_dirs),
+            lambda _: to_prompt(skill_dirs),
+        )
 
     def _list_skill_files(self, skill_dir: Path) -> List[str]:
-        """List all loadable files in skill directory (recursively)."""
-        from llm_tools_skills import TEXT_FILE_EXTENSIONS, TEXT_FILE_NAMES
-
-        files = []
-
-        def collect(directory: Path, prefix: str = ""):
-            try:
-                for item in sorted(directory.iterdir()):
-                    rel_path = f"{prefix}{item.name}" if prefix else item.name
-                    if item.is_dir():
-                        collect(item, f"{rel_path}/")
-                    elif item.is_file() and item.name.lower() != "skill.md":
-                        if item.suffix.lower() in TEXT_FILE_EXTENSIONS or item.name in TEXT_FILE_NAMES:
-                            files.append(rel_path)
-            except PermissionError:
-                pass
-
-        collect(skill_dir)
-        return files
+        """List all loadable files in skill directory (recursively).
+
+        Shared between sessions; the tree is walked again only when files
+        are added, removed or renamed below skill_dir.
+        """
+        return shared_state.scan_tree("skill-files", skill_dir, _collect_skill_files)
 
     def _load_skill(self, name: str, silent: bool = False) -> bool:
         """Load a skill by name."""
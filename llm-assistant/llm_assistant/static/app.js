@@ -992,6 +992,15 @@ const toolsControl = {
         }
     },
 
+    serverBadge(server) {
+        // Tool count plus load state (servers start on first use)
+        let text = `${server.tool_count} tools`;
+        if (server.status === 'connecting') text += ' · connecting';
+        if (server.status === 'failed') text += ' · failed';
+        const title = server.error ? ` title="${escapeHtml(server.error)}"` : '';
+        return `<span class="tool-item-badge ${escapeHtml(server.status || '')}"${title}>${text}</span>`;
+    },
+
     render() {
         const container = document.getElementById('tools-list');
         if (!container) return;
@@ -1044,7 +1053,7 @@ const toolsControl = {
                                    data-name="${safeName}"
                                    ${server.enabled ? 'checked' : ''}>
                             <span class="tool-item-label">${safeName}</span>
-                            <span class="tool-item-badge">${server.tool_count} tools</span>
+                            ${this.serverBadge(server)}
                         </label>`;
                 }
                 html += '</div>';
@@ -1062,7 +1071,7 @@ const toolsControl = {
                                    data-name="${safeName}"
                                    ${server.enabled ? 'checked' : ''}>
                             <span class="tool-item-label">${safeName}</span>
-                            <span class="tool-item-badge">${server.tool_count} tools</span>
+                            ${this.serverBadge(server)}
                         </label>`;
                 }
                 html += '</div>';
@@ -1339,6 +1348,15 @@ const ragPanel = {
         }
     },
 
+    showProgress(msg) {
+        // Per-file progress while /api/rag/add ingests a directory
+        const addBtn = document.getElementById('rag-add-btn');
+        if (addBtn && addBtn.disabled) {
+            addBtn.textContent = `${msg.done}/${msg.total}`;
+            addBtn.title = `${msg.chunks || 0} chunks added`;
+        }
+    },
+
     async addDocument(path) {
         if (!path.trim()) return;
 
@@ -1364,7 +1382,7 @@ const ragPanel = {
             const response = await fetch('/api/rag/add', {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ collection: this.activeCollection, path: path })
+                body: JSON.stringify({ collection: this.activeCollection, path: path, session: sessionId })
             });
 
             const result = await response.json();
@@ -1803,6 +1821,10 @@ function handleMessage(msg) {
             addToolCall(msg.tool, msg.args, msg.tool_call_id, msg.messageId);
             break;
 
+        case 'tool_progress':
+            appendToolProgress(msg.tool_call_id, msg.output, msg.dropped);
+            break;
+
         case 'tool_done':
             completeToolCall(msg.tool_call_id, msg.result);
             break;
@@ -1836,6 +1858,10 @@ function handleMessage(msg) {
             }
             break;
 
+        case 'ragProgress':
+            ragPanel.showProgress(msg);
+            break;
+
         case 'history':
             // This is the active session's history, not a historical load
             isHistoricalView = false;
@@ -2410,6 +2436,25 @@ function addToolCall(toolName, args, toolCallId, messageId) {
     scrollToBottom();
 }
 
+/**
+ * Append streamed output of a running tool to its output pane.
+ * Only the last 2000 characters are kept; tool_done replaces them with the result.
+ */
+function appendToolProgress(toolCallId, output, dropped) {
+    const container = toolCallId && document.getElementById('tool-' + toolCallId);
+    const outputContent = container && container.querySelector('.tool-call-output pre');
+    if (!outputContent || !output) return;
+
+    let text = outputContent.classList.contains('tool-output-placeholder') ? '' : outputContent.textContent;
+    if (dropped) {
+        text += `\n... (${dropped} characters skipped)\n`;
+    }
+    text += output;
+    outputContent.textContent = text.length > 2000 ? text.substring(text.length - 2000) : text;
+    outputContent.classList.remove('tool-output-placeholder');
+    outputContent.scrollTop = outputContent.scrollHeight;
+}
+
 function completeToolCall(toolCallId, result) {
     if (!toolCallId) {
         console.warn('completeToolCall: missing toolCallId');
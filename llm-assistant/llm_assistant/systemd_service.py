@@ -4,28 +4,38 @@ Provides functions to install, enable, and manage a systemd user service
 that keeps the llm-assistant daemon running. This improves startup latency
 for the @ command by avoiding subprocess-based daemon spawning.
 
-Unlike llm-server which uses socket activation (FD 3), this uses a simple
-service that starts the daemon directly - the daemon creates its own socket.
+The service is paired with a .socket unit: systemd owns the listening
+socket and passes it to the daemon (FD 3), so clients can connect as soon
+as the user session starts - the kernel queues the connection while the
+daemon is still starting. The daemon reports readiness with sd_notify.
+Started without systemd, the daemon creates its own socket as before.
 """
 
 import os
+import socket
 import subprocess
 import sys
 from pathlib import Path
-from typing import Tuple
+from typing import Optional, Tuple
 
+from llm_tools_core import get_socket_path
 
-# Service unit template (simple service, no socket activation)
+
+# First file descriptor passed by systemd socket activation (SD_LISTEN_FDS_START)
+SD_LISTEN_FDS_START = 3
+
+# Service unit template (Type=notify: ready once the daemon sends READY=1)
 # Note: {path} is captured at install time to include user's full PATH
 # (e.g., ~/.cargo/bin for asciinema, ~/.local/bin for tools)
 SERVICE_UNIT_TEMPLATE = """\
 [Unit]
 Description=LLM Assistant Daemon
 Documentation=https://github.com/c0ffee0wl/llm-linux-setup
-After=network.target
+After=network.target llm-assistant.socket
 
 [Service]
-Type=simple
+Type=notify
+NotifyAccess=main
 ExecStart={executable} --foreground
 Restart=on-failure
 RestartSec=5
@@ -41,6 +51,23 @@ PrivateTmp=no
 
 [Install]
 WantedBy=default.target
+Also=llm-assistant.socket
+"""
+
+# Socket unit template. {socket_path} is the same path clients connect to
+# (/tmp/llm-assistant-{{UID}}/daemon.sock), resolved at install time.
+SOCKET_UNIT_TEMPLATE = """\
+[Unit]
+Description=LLM Assistant Daemon Socket
+Documentation=https://github.com/c0ffee0wl/llm-linux-setup
+
+[Socket]
+ListenStream={socket_path}
+SocketMode=0600
+DirectoryMode=0700
+
+[Install]
+WantedBy=sockets.target
 """
 
 
@@ -55,6 +82,11 @@ def get_service_name() -> str:
     return "llm-assistant.service"
 
 
+def get_socket_unit_name() -> str:
+    """Get the socket unit name."""
+    return "llm-assistant.socket"
+
+
 def get_executable() -> str:
     """Get the llm-assistant executable path for the service.
 
@@ -87,6 +119,63 @@ def generate_service_unit() -> str:
     return SERVICE_UNIT_TEMPLATE.format(executable=executable, path=current_path)
 
 
+def generate_socket_unit() -> str:
+    """Generate the .socket unit file content."""
+    return SOCKET_UNIT_TEMPLATE.format(socket_path=get_socket_path())
+
+
+def get_listen_socket() -> Optional[socket.socket]:
+    """Take over the listening socket passed by systemd socket activation.
+
+    Implements the sd_listen_fds() protocol: LISTEN_PID must match this
+    process and LISTEN_FDS gives the number of descriptors starting at FD 3.
+    The variables are removed so child processes don't inherit them.
+
+    Returns:
+        The inherited listening socket, or None if not socket-activated.
+    """
+    listen_pid = os.environ.pop("LISTEN_PID", None)
+    listen_fds = os.environ.pop("LISTEN_FDS", None)
+    os.environ.pop("LISTEN_FDNAMES", None)
+    if listen_pid != str(os.getpid()) or not listen_fds:
+        return None
+    try:
+        if int(listen_fds) < 1:
+            return None
+    except ValueError:
+        return None
+
+    sock = socket.socket(fileno=SD_LISTEN_FDS_START)
+    if sock.family != socket.AF_UNIX or sock.type != socket.SOCK_STREAM:
+        sock.detach()  # Not ours to close
+        return None
+    sock.setblocking(False)
+    return sock
+
+
+def sd_notify(state: str) -> bool:
+    """Send a state notification (e.g. "READY=1") to the service manager.
+
+    No-op outside systemd (NOTIFY_SOCKET unset). Abstract-namespace socket
+    addresses ('@' prefix) are supported.
+
+    Returns:
+        True if the notification was sent.
+    """
+    address = os.environ.get("NOTIFY_SOCKET")
+    if not address:
+        return False
+    if address.startswith("@"):
+        address = "\0" + address[1:]
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM | socket.SOCK_CLOEXEC) as sock:
+            sock.connect(address)
+            sock.sendall(state.encode("utf-8"))
+        return True
+    except OSError:
+        return False
+
+
 def is_service_enabled() -> bool:
     """Check if the systemd service is enabled."""
     ok, _ = _run_systemctl("is-enabled", get_service_name())
@@ -133,75 +222,89 @@ def _run_systemctl(*args, check: bool = False) -> Tuple[bool, str]:
 
 
 def install_service() -> bool:
-    """Install and enable the systemd user service.
+    """Install and enable the systemd user service and its socket.
 
-    Creates the service unit file, reloads systemd, and enables the service.
+    Creates the service and socket unit files, reloads systemd, and enables
+    both units.
 
     Returns:
         True on success, False on failure.
     """
     service_name = get_service_name()
+    socket_name = get_socket_unit_name()
     unit_dir = get_unit_directory()
     service_path = unit_dir / service_name
+    socket_path = unit_dir / socket_name
 
     # Create unit directory if needed
     unit_dir.mkdir(parents=True, exist_ok=True)
 
-    service_content = generate_service_unit()
-    needs_update = (not service_path.exists()
-                    or service_path.read_text() != service_content)
+    needs_update = False
+    for path, content in ((service_path, generate_service_unit()),
+                          (socket_path, generate_socket_unit())):
+        if not path.exists() or path.read_text() != content:
+            print(f"Writing {path}")
+            path.write_text(content)
+            needs_update = True
     if needs_update:
-        print(f"Writing {service_path}")
-        service_path.write_text(service_content)
         print("Reloading systemd daemon...")
         success, output = _run_systemctl("daemon-reload")
         if not success:
             print(f"Warning: daemon-reload failed: {output}")
 
-    print(f"Enabling {service_name}...")
-    success, output = _run_systemctl("enable", service_name)
+    print(f"Enabling {service_name} and {socket_name}...")
+    success, output = _run_systemctl("enable", service_name, socket_name)
     if not success:
         print(f"Warning: enable failed: {output}")
         return False
 
-    # restart only when the unit actually changed, so no-op updates don't
+    # restart only when a unit actually changed, so no-op updates don't
     # churn a healthy daemon (and drop in-flight @ queries).
     is_active, _ = _run_systemctl("is-active", service_name)
-    if needs_update or not is_active:
+    socket_active, _ = _run_systemctl("is-active", socket_name)
+    if needs_update or not is_active or not socket_active:
         print(f"Restarting {service_name}...")
-        success, output = _run_systemctl("restart", service_name)
+        # The socket must be listening before the daemon starts, otherwise the
+        # daemon binds the path itself and the socket unit would replace it.
+        _run_systemctl("stop", service_name)
+        success, output = _run_systemctl("restart", socket_name)
+        if not success:
+            print(f"Warning: socket start failed: {output}")
+        success, output = _run_systemctl("start", service_name)
         if not success:
             print(f"Warning: restart failed: {output}")
 
     print(f"\nService installed: {service_path}")
+    print(f"Socket installed: {socket_path}")
     print("\nTo check status:")
-    print(f"  systemctl --user status {service_name}")
+    print(f"  systemctl --user status {service_name} {socket_name}")
 
     return True
 
 
 def uninstall_service() -> bool:
-    """Stop, disable, and remove the systemd user service.
+    """Stop, disable, and remove the systemd user service and socket.
 
     Returns:
         True on success, False on failure.
     """
     service_name = get_service_name()
+    socket_name = get_socket_unit_name()
     unit_dir = get_unit_directory()
-    service_path = unit_dir / service_name
 
-    # Stop the service
-    print(f"Stopping {service_name}...")
-    _run_systemctl("stop", service_name)  # Ignore errors - may not be running
+    # Stop the socket first so it can't re-activate the service
+    print(f"Stopping {socket_name} and {service_name}...")
+    _run_systemctl("stop", socket_name, service_name)  # Ignore errors - may not be running
 
-    # Disable the service
-    print(f"Disabling {service_name}...")
-    _run_systemctl("disable", service_name)  # Ignore errors - may not be enabled
+    print(f"Disabling {service_name} and {socket_name}...")
+    _run_systemctl("disable", service_name, socket_name)  # Ignore errors - may not be enabled
 
-    # Remove the unit file
-    if service_path.exists():
-        print(f"Removing {service_path}")
-        service_path.unlink()
+    # Remove the unit files
+    for name in (service_name, socket_name):
+        unit_path = unit_dir / name
+        if unit_path.exists():
+            print(f"Removing {unit_path}")
+            unit_path.unlink()
 
     # Reload systemd daemon
     _run_systemctl("daemon-reload")
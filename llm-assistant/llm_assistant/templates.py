@@ -1,11 +1,59 @@
 """Jinja2 template loader and rendering.
 
-Provides a single render() function for all templates.
+Provides a single render() function for all templates:
+- Compiled templates are kept in a bytecode cache under
+  XDG_CACHE_HOME/llm-assistant/jinja/, so a new process loads them
+  instead of parsing and compiling (cold start)
+- Templates are pure functions of their variables, so the system prompt
+  and its sections (MEMO_TEMPLATES), which are re-rendered per session or
+  turn with the same variables, are memoized on the template name and
+  variables: a repeat costs a dict lookup
+- Other templates (watch, squash and safety prompts) embed terminal
+  context or commands that rarely repeat; they are rendered without
+  building a memo key, so large inputs are not walked and hashed for
+  nothing
+- Only renders whose variables are plain data (str, numbers, bool, None,
+  lists, dicts) are memoized, and only outputs up to MEMO_MAX_CHARS
+
+benchmarks/bench_prompt_assembly.py measures the per-turn overhead.
 """
 
-from jinja2 import PackageLoader, select_autoescape
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional
+
+from jinja2 import FileSystemBytecodeCache, PackageLoader, select_autoescape
 from jinja2.sandbox import SandboxedEnvironment
 
+from llm_tools_core.xdg import get_cache_dir
+
+# Memoized renders kept (least recently used dropped first)
+MEMO_MAX_ENTRIES = 128
+
+# Templates rendered repeatedly with the same variables
+MEMO_TEMPLATES = frozenset({
+    'system_prompt.j2',
+    'sections/environment.j2',
+    'sections/rag.j2',
+    'sections/skills.j2',
+    'sections/watch.j2',
+    'help_text.j2',
+    'web_companion.html',
+})
+
+# Larger outputs are not kept
+MEMO_MAX_CHARS = 64 * 1024
+
+
+def _bytecode_cache() -> Optional[FileSystemBytecodeCache]:
+    """Bytecode cache in the user cache directory, or None if not writable."""
+    directory = get_cache_dir("llm-assistant") / "jinja"
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        return None
+    return FileSystemBytecodeCache(str(directory))
+
 
 # Create sandboxed Jinja2 environment with package loader
 # SandboxedEnvironment prevents template code from accessing unsafe attributes
@@ -15,8 +63,39 @@ _env = SandboxedEnvironment(
     autoescape=select_autoescape(['html']),
     trim_blocks=True,
     lstrip_blocks=True,
+    bytecode_cache=_bytecode_cache(),
 )
 
+_lock = threading.Lock()
+_renders: "OrderedDict[Hashable, str]" = OrderedDict()
+_hits = 0
+_misses = 0
+
+
+def _freeze(value):
+    """Hashable form of a plain-data template variable; TypeError otherwise."""
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (bool, int, float)):
+        return (type(value), value)  # True == 1, but they render differently
+    if isinstance(value, (list, tuple)):
+        return (type(value), tuple(_freeze(v) for v in value))
+    if isinstance(value, dict):
+        return (dict, tuple(sorted((k, _freeze(v)) for k, v in value.items())))
+    raise TypeError(type(value).__name__)
+
+
+def _memo_key(template_name: str, kwargs: dict) -> Optional[Hashable]:
+    """Key of a render's inputs, or None if they are not plain data.
+
+    Hashing a tuple of strings is cheap after the first time: Python caches
+    each string's hash, and callers pass the same strings turn after turn.
+    """
+    try:
+        return (template_name, tuple(sorted((k, _freeze(v)) for k, v in kwargs.items())))
+    except TypeError:
+        return None
+
 
 def render(template_name: str, **kwargs) -> str:
     """Render a Jinja2 template with the given variables.
@@ -28,5 +107,37 @@ def render(template_name: str, **kwargs) -> str:
     Returns:
         Rendered template string
     """
+    global _hits, _misses
+    key = _memo_key(template_name, kwargs) if template_name in MEMO_TEMPLATES else None
+    if key is not None:
+        with _lock:
+            text = _renders.get(key)
+            if text is not None:
+                _renders.move_to_end(key)
+                _hits += 1
+                return text
+            _misses += 1
+
     template = _env.get_template(template_name)
-    return template.render(**kwargs)
+    text = template.render(**kwargs)
+
+    if key is not None and len(text) <= MEMO_MAX_CHARS:
+        with _lock:
+            _renders[key] = text
+            if len(_renders) > MEMO_MAX_ENTRIES:
+                _renders.popitem(last=False)
+    return text
+
+
+def render_cache_stats() -> Dict[str, int]:
+    """Memoized render counters, for status output and benchmarks."""
+    with _lock:
+        return {"entries": len(_renders), "hits": _hits, "misses": _misses}
+
+
+def clear_render_cache() -> None:
+    """Drop memoized renders and reset the counters."""
+    global _hits, _misses
+    with _lock:
+        _renders.clear()
+        _hits = _misses = 0
@@ -248,12 +248,22 @@ class WatchMixin:
                     if not should_skip:
                         # Build prompt - content already filtered to only new blocks
                         # Wrap in <watch_prompt> tag for filtering in web companion
-                        prompt = '<watch_prompt>' + render('prompts/watch_prompt.j2',
+                        prompt = render('prompts/watch_prompt.j2',
                             iteration_count=self.previous_watch_iteration_count,
                             goal=self.watch_goal,
                             exec_status=exec_status,
                             context=context,
-                        ) + '</watch_prompt>'
+                        )
+                        # Large KBs are in the system prompt by front matter
+                        # only: add the sections relevant to the goal and the
+                        # new output (budgeted, without touching the main
+                        # turn's context usage)
+                        kb_sections = self._budget_context_sources({
+                            "kb_sections": self._get_kb_sections(f"{self.watch_goal}\n{context}"),
+                        })["kb_sections"].text
+                        if kb_sections:
+                            prompt = f"{kb_sections}\n\n{prompt}"
+                        prompt = '<watch_prompt>' + prompt + '</watch_prompt>'
 
                         try:
                             # Use schema if model supports it for reliable parsing
@@ -261,7 +271,7 @@ class WatchMixin:
                             self._debug(f"watch: calling model (supports_schema={use_schema})")
                             response = self.model.prompt(
                                 prompt,
-                                system=self._build_system_prompt(),
+                                **self._system_prompt_kwargs(),
                                 attachments=tui_attachments if tui_attachments else None,
                                 stream=False,
                                 schema=WatchResponseSchema if use_schema else None
@@ -9,6 +9,8 @@ This module provides web companion functionality:
 import threading
 from typing import TYPE_CHECKING, Optional, Set, Dict
 
+from llm_tools_core import cache_usage
+
 from .templates import render
 from .utils import ConsoleHelper
 
@@ -116,7 +118,9 @@ class WebMixin:
                     "type": "token_update",
                     "current_tokens": current_tokens,
                     "max_tokens": max_tokens,
-                    "percentage": pct
+                    "percentage": pct,
+                    "sources": session.context_usage,
+                    "prompt_cache": session.prompt_cache.stats(),
                 })
 
                 # Send conversation history on connect
@@ -250,7 +254,9 @@ class WebMixin:
             "type": "token_update",
             "current_tokens": current_tokens,
             "max_tokens": max_tokens,
-            "percentage": pct
+            "percentage": pct,
+            "sources": self.context_usage,
+            "prompt_cache": self.prompt_cache.stats(),
         })
 
     def _broadcast_tool_call(self, tool_name: str, arguments: dict, result: str = None, status: str = "pending"):
@@ -338,6 +344,7 @@ class WebMixin:
                             att_info["size"] = len(att.content)
                         attachments_info.append(att_info)
 
+                usage = cache_usage(getattr(r, 'token_details', None))
                 messages.append({
                     "role": "user",
                     "content": full_prompt,
@@ -345,7 +352,9 @@ class WebMixin:
                     "has_context": "<terminal_context>" in full_prompt,
                     "attachments": attachments_info,
                     "input_tokens": r.input_tokens,
-                    "output_tokens": r.output_tokens
+                    "output_tokens": r.output_tokens,
+                    "cache_read": usage.read,
+                    "cache_write": usage.write,
                 })
 
                 # Include tool results if present (tool outputs sent as input)
@@ -30,15 +30,18 @@ import sqlite_utils
 
 from llm_tools_core.markdown import strip_markdown
 from llm_tools_core.tool_execution import execute_tool_call
+from llm_tools_core.prompt_layout import system_prompt_kwargs
 from llm_tools_core import (
     MAX_TOOL_ITERATIONS,
     ConversationHistory,
     AtHandler,
     RAGHandler,
+    get_engine,
     gather_context,
     format_gui_context,
     strip_context_tags,
     get_assistant_default_model,
+    get_plugin_catalog,
 )
 from llm_tools_core.hashing import hash_gui_context
 
@@ -52,6 +55,9 @@ if TYPE_CHECKING:
 _COLLECTION_NAME_RE = re.compile(r'^[\w\-]+$')
 _COLLECTION_NAME_ERROR = "Invalid collection name (alphanumeric, underscore, hyphen only; max 64 chars)"
 
+# Minimum seconds between ragProgress messages during /api/rag/add
+RAG_PROGRESS_INTERVAL = 0.25
+
 
 def _invalid_collection_name(name: str) -> Optional[web.Response]:
     """Return a 400 JSON response if ``name`` fails the RAG-collection rules.
@@ -396,6 +402,11 @@ class WebUIServer:
             # Other unexpected errors
             return False
 
+    async def _send_to_session(self, session_id: str, data: dict) -> None:
+        """Send JSON to every WebSocket connected to a session."""
+        for ws in list(self.ws_clients.get(session_id, ())):
+            await self._safe_send_json(ws, data)
+
     async def handle_websocket(self, request: web.Request) -> web.WebSocketResponse:
         """Handle WebSocket connections for streaming and commands."""
         ws = web.WebSocketResponse()
@@ -526,9 +537,9 @@ class WebUIServer:
                 # Get tools if in assistant mode
                 tools = session.get_tools() if hasattr(session, "get_tools") else []
                 # Get system prompt with GUI-specific sections (Mermaid diagrams)
-                system_prompt = (
-                    session.get_system_prompt(gui=True)
-                    if hasattr(session, "get_system_prompt")
+                system_layout = (
+                    session.get_system_prompt_layout(gui=True)
+                    if hasattr(session, "get_system_prompt_layout")
                     else None
                 )
 
@@ -538,8 +549,8 @@ class WebUIServer:
                 prompt_kwargs = {}
                 if tools:
                     prompt_kwargs["tools"] = tools
-                if len(conversation.responses) == 0 and system_prompt:
-                    prompt_kwargs["system"] = system_prompt
+                if len(conversation.responses) == 0 and system_layout:
+                    prompt_kwargs.update(system_prompt_kwargs(system_layout, conversation.model))
                 if attachments:
                     prompt_kwargs["attachments"] = attachments
                 if tool_results:
@@ -555,6 +566,9 @@ class WebUIServer:
                     future = asyncio.run_coroutine_threadsafe(queue.put(chunk), loop)
                     future.result(timeout=30)
 
+                if not cancel_flag.is_set() and hasattr(session, "_record_prompt_cache"):
+                    session._record_prompt_cache(response)
+
             except Exception as e:
                 import traceback
                 logging.error(f"LLM streaming error: {e}\n{traceback.format_exc()}")
@@ -1596,8 +1610,7 @@ class WebUIServer:
 
             def get_models():
                 models = []
-                for model in llm.get_models():
-                    model_id = model.model_id
+                for model_id in get_plugin_catalog().model_ids():
                     # Determine provider from model_id
                     if "/" in model_id:
                         provider = model_id.split("/")[0]
@@ -1791,7 +1804,8 @@ class WebUIServer:
             if prefix.startswith("@"):
                 prefix = prefix[1:]
 
-            handler = AtHandler(cwd=cwd)
+            self.daemon.dir_index.prefetch(cwd)
+            handler = AtHandler(cwd=cwd, index=self.daemon.dir_index)
             # Run in executor to avoid blocking event loop (filesystem I/O)
             loop = asyncio.get_running_loop()
             completions = await loop.run_in_executor(
@@ -2109,10 +2123,34 @@ class WebUIServer:
                     status=500
                 )
 
-            # Run in executor to avoid blocking event loop (DB/network I/O)
+            # Per-file progress goes to the requesting session's WebSockets
             loop = asyncio.get_running_loop()
+            session_id = data.get("session")
+            last_sent = [0.0]
+
+            def progress(done: int, total: int, file_path: str, chunks: int):
+                now = time.monotonic()
+                if done < total and now - last_sent[0] < RAG_PROGRESS_INTERVAL:
+                    return
+                last_sent[0] = now
+                asyncio.run_coroutine_threadsafe(
+                    self._send_to_session(session_id, {
+                        "type": "ragProgress",
+                        "collection": collection,
+                        "done": done,
+                        "total": total,
+                        "path": file_path,
+                        "chunks": chunks,
+                    }),
+                    loop,
+                )
+
+            # Run in executor to avoid blocking event loop (DB/network I/O)
             result = await loop.run_in_executor(
-                None, lambda: handler.add_documents(collection, path, refresh=refresh)
+                None, lambda: handler.add_documents(
+                    collection, path, refresh=refresh,
+                    progress=progress if session_id else None
+                )
             )
             # Handle result defensively in case of unexpected return
             if result is None:
@@ -2155,11 +2193,9 @@ class WebUIServer:
                 )
 
             # Create empty collection by getting/creating the engine
+            # (kept resident for the searches that follow)
             loop = asyncio.get_running_loop()
-            await loop.run_in_executor(
-                None,
-                lambda: __import__('llm_tools_rag.engine', fromlist=['get_or_create_engine']).get_or_create_engine(name)
-            )
+            await loop.run_in_executor(None, get_engine, name)
 
             return web.json_response({"status": "created", "name": name})
         except Exception as e:
@@ -2214,7 +2250,8 @@ class WebUIServer:
         """Return tool configuration for the UI.
 
         GET /api/tools?session=xxx
-        Returns MCP servers and optional tools with their enabled status.
+        Returns MCP servers (with their load state: stopped, connecting,
+        connected or failed) and optional tools with their enabled status.
         """
         session_id = request.query.get("session", "")
         if not session_id:
@@ -2225,24 +2262,24 @@ class WebUIServer:
         session = state.session
 
         # Import MCP functions and config
-        from .mcp import _all_tools, _ensure_mcp_loaded
+        from .mcp import mcp_server_states
         from .config import OPTIONAL_TOOL_PLUGINS
-        _ensure_mcp_loaded()
 
-        # Get MCP servers
+        # Get MCP servers (read from config; does not start any server)
         mcp_servers = []
         all_servers = session._get_all_mcp_servers()
         active_servers = session.active_mcp_servers
-        default_servers = session._get_default_mcp_servers()
+        states = mcp_server_states()
 
         for server in sorted(all_servers):
-            tool_count = sum(1 for t in _all_tools.values()
-                            if getattr(t, 'server_name', None) == server)
+            state = states.get(server, {})
             mcp_servers.append({
                 'name': server,
                 'enabled': server in active_servers,
-                'optional': server not in default_servers,
-                'tool_count': tool_count
+                'optional': all_servers[server],
+                'tool_count': state.get('tool_count', 0),
+                'status': state.get('status', 'stopped'),
+                'error': state.get('error'),
             })
 
         # Get optional tools (imagemage, etc.)
@@ -2296,7 +2333,9 @@ class WebUIServer:
             async with self._tool_toggle_lock:
                 if tool_type == 'mcp':
                     if enabled:
+                        from .mcp import start_mcp_servers
                         session.active_mcp_servers.add(name)
+                        start_mcp_servers([name])
                     else:
                         session.active_mcp_servers.discard(name)
                 elif tool_type == 'optional':
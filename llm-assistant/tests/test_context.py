@@ -0,0 +1,98 @@
+"""Tests for context budgeting and token estimation in ContextMixin."""
+
+import pytest
+
+pytest.importorskip("llm")
+pytest.importorskip("jinja2")
+
+from llm_assistant import context  # noqa: E402
+from llm_assistant.context import ContextMixin  # noqa: E402
+
+
+class Tool:
+    def __init__(self, name, schema):
+        self.name = name
+        self.description = f"{name} tool"
+        self.input_schema = schema
+
+
+class Session(ContextMixin):
+    def __init__(self, tools=(), memory="", kb=""):
+        self.tools = list(tools)
+        self.version = 0
+        self.memory = memory
+        self.kb = kb
+        self.max_context_size = 10_000
+
+    def _get_memory_content(self):
+        return self.memory
+
+    def _get_loaded_kb_content(self):
+        return self.kb
+
+    def _get_workflow_context(self):
+        return ""
+
+    def _get_active_tools(self):
+        return self.tools
+
+    def _tools_version(self):
+        return self.version
+
+    def _debug(self, message):
+        pass
+
+
+def test_tool_schema_tokens_are_counted_once_per_tool_set(monkeypatch):
+    counted = []
+
+    def count_tokens(text):
+        counted.append(text)
+        return len(text)
+
+    monkeypatch.setattr(context, "count_tokens", count_tokens)
+    monkeypatch.setattr(context, "_SCHEMA_TOKEN_CACHE", {})
+    session = Session([Tool("a", {"type": "object"})])
+
+    first = session._estimate_tool_schema_tokens()
+    assert session._estimate_tool_schema_tokens() == first
+    assert len(counted) == 1
+
+    # An MCP reload with a changed schema bumps the version
+    session.tools = [Tool("a", {"type": "object", "properties": {"x": {"type": "string"}}})]
+    session.version += 1
+    assert session._estimate_tool_schema_tokens() > first
+    assert len(counted) == 2
+
+    session.tools.append(Tool("b", {}))
+    session._estimate_tool_schema_tokens()
+    assert len(counted) == 3
+
+
+def test_system_prompt_sources_do_not_depend_on_turn_context():
+    session = Session(memory="remember " * 200, kb="fact " * 3000)
+    quiet = session._allocate_context(terminal="$ ls", rag="")
+    busy = session._allocate_context(
+        terminal="<terminal_context>" + "output\n" * 20_000 + "</terminal_context>",
+        rag="document " * 20_000,
+    )
+    assert busy["kb"] == quiet["kb"] and busy["memory"] == quiet["memory"]
+    assert busy["kb"]  # trimmed to its own budget, not dropped
+    assert session.context_usage["terminal"]["tokens"] < session.context_usage["terminal"]["requested"]
+
+
+def test_session_allocation_is_reused_until_sources_change(monkeypatch):
+    calls = []
+    real = context.allocate_budget
+
+    def allocate_budget(texts, *args, **kwargs):
+        calls.append(tuple(texts))
+        return real(texts, *args, **kwargs)
+
+    monkeypatch.setattr(context, "allocate_budget", allocate_budget)
+    session = Session(memory="m", kb="k")
+    session._session_context_sources()
+    session._session_context_sources()
+    session.kb = "k2"
+    assert session._session_context_sources()["kb"].text == "k2"
+    assert calls == [("memory", "kb"), ("memory", "kb")]
@@ -0,0 +1,67 @@
+"""Tests for the daemon's pre-model query stages."""
+
+import asyncio
+import threading
+
+import pytest
+
+pytest.importorskip("llm")
+pytest.importorskip("rich")
+
+from llm_assistant.daemon import AssistantDaemon  # noqa: E402
+
+
+def _daemon():
+    return AssistantDaemon.__new__(AssistantDaemon)
+
+
+def test_context_capture_and_rag_retrieval_overlap():
+    context_started = asyncio.Event()
+    rag_started = asyncio.Event()
+    order = []
+
+    class Session:
+        async def capture_context(self, session_log):
+            context_started.set()
+            # Sequential stages would never see RAG start
+            await asyncio.wait_for(rag_started.wait(), timeout=2)
+            return "context"
+
+    async def retrieve_rag():
+        rag_started.set()
+        await asyncio.wait_for(context_started.wait(), timeout=2)
+        return "rag"
+
+    def build_tools():
+        order.append("tools")
+        assert context_started.is_set() and rag_started.is_set()
+        return [], None, {}
+
+    timings = {}
+    result = asyncio.run(
+        _daemon()._session_stages(Session(), "log", retrieve_rag, build_tools, timings)
+    )
+
+    assert result == ("context", "rag", ([], None, {}))
+    assert order == ["tools"]
+    assert set(timings) == {"context", "rag", "tools"}
+
+
+def test_tools_are_not_built_after_cancel():
+    cancel = threading.Event()
+
+    class Session:
+        async def capture_context(self, session_log):
+            cancel.set()  # Ctrl+C while the terminal is captured
+            return "context"
+
+    async def retrieve_rag():
+        return ""
+
+    def build_tools():
+        raise AssertionError("built after cancel")
+
+    result = asyncio.run(
+        _daemon()._session_stages(Session(), "log", retrieve_rag, build_tools, {}, cancel)
+    )
+    assert result == ("context", "", None)
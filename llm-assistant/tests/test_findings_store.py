@@ -0,0 +1,128 @@
+"""Tests for the SQLite findings store and the findings.md view."""
+
+import sqlite3
+import threading
+
+import pytest
+
+from llm_assistant.findings_store import FindingsStore, view_signature, write_view
+
+
+def _views(finding_id):
+    return {"row": f"| {finding_id} |", "block": f"block {finding_id}", "export": f"export {finding_id}"}
+
+
+def _add(store, title="t"):
+    finding_id = store.reserve_id()
+    store.add({"id": finding_id, "title": title}, "body", _views(finding_id))
+    return finding_id
+
+
+def test_reserved_ids_are_unique_and_ordered(tmp_path):
+    with FindingsStore(tmp_path / "findings.db") as store:
+        first = store.reserve_id()
+        second = store.reserve_id()
+        assert (first, second) == ("F001", "F002")
+        store.add({"id": second}, "body", _views(second))
+        store.release(first)
+        assert store.reserve_id() == "F003"
+        assert [meta["id"] for meta in store.metas()] == ["F002"]
+
+
+def test_add_never_overwrites(tmp_path):
+    with FindingsStore(tmp_path / "findings.db") as store:
+        finding_id = _add(store, "first")
+        with pytest.raises(sqlite3.IntegrityError):
+            store.add({"id": finding_id, "title": "second"}, "body", _views(finding_id))
+        assert store.get(finding_id)[0]["title"] == "first"
+
+
+def test_concurrent_adds_get_distinct_ids(tmp_path):
+    path = tmp_path / "findings.db"
+    FindingsStore(path).close()
+    ids = []
+    lock = threading.Lock()
+
+    def worker():
+        with FindingsStore(path) as store:
+            for _ in range(10):
+                finding_id = _add(store)
+                with lock:
+                    ids.append(finding_id)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(set(ids)) == 40
+    with FindingsStore(path) as store:
+        assert store.count() == 40
+
+
+def test_put_replaces_in_place_and_delete(tmp_path):
+    with FindingsStore(tmp_path / "findings.db") as store:
+        a, b = _add(store, "a"), _add(store, "b")
+        store.put({"id": a, "title": "a2"}, "body", _views(a))
+        assert [meta["title"] for meta in store.metas()] == ["a2", "b"]
+        assert store.views("row") == [f"| {a} |", f"| {b} |"]
+        assert store.delete(a)["title"] == "a2"
+        assert store.delete(a) is None
+        assert store.count() == 1
+
+
+def test_read_only_open_creates_nothing(tmp_path):
+    with pytest.raises(sqlite3.OperationalError):
+        FindingsStore(tmp_path / "missing.db", read_only=True)
+    assert not (tmp_path / "missing.db").exists()
+
+
+def test_write_view_is_atomic_and_signed(tmp_path):
+    path = tmp_path / "findings.md"
+    signature = write_view(path, "text")
+    assert path.read_text() == "text"
+    assert signature == view_signature(path)
+    assert [p.name for p in tmp_path.iterdir()] == ["findings.md"]
+
+
+@pytest.fixture
+def report(tmp_path):
+    pytest.importorskip("llm")
+    pytest.importorskip("rich")
+    pytest.importorskip("pydantic")
+    from llm_assistant.report import ReportMixin
+
+    class Report(ReportMixin):
+        def _debug(self, message):
+            pass
+
+    instance = Report()
+    instance.findings_base_dir = tmp_path
+    instance.findings_project = "acme"
+    (tmp_path / "acme").mkdir()
+    with FindingsStore(tmp_path / "acme" / "findings.db") as store:
+        store.set_project_meta({"project": "acme", "language_name": "English"})
+        instance._write_findings_view(store, tmp_path / "acme")
+    return instance
+
+
+def test_findings_md_round_trip(report, tmp_path):
+    project_dir = tmp_path / "acme"
+    for title, severity in (("SQL injection: login", 8), ("Weak TLS", 4)):
+        with report._open_findings_store(project_dir) as store:
+            finding_id = store.reserve_id()
+        meta = {"id": finding_id, "title": title, "severity": severity,
+                "severity_rationale": "r", "created": "2026-01-01T00:00:00", "evidence": []}
+        report._add_finding(project_dir, meta, "\n### Description\n\nd\n")
+    generated = (project_dir / "findings.md").read_text()
+
+    # A hand edit is imported, and regenerating the view reproduces it exactly
+    edited = generated.replace("Weak TLS", "Weak TLS ciphers")
+    (project_dir / "findings.md").write_text(edited)
+    with report._open_findings_store(project_dir) as store:
+        assert [meta["title"] for meta in store.metas()][1] == "Weak TLS ciphers"
+        report._write_findings_view(store, project_dir)
+    assert (project_dir / "findings.md").read_text() == edited
+
+    assert [meta["id"] for meta in report._finding_summaries()] == ["F001", "F002"]
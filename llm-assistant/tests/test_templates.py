@@ -0,0 +1,44 @@
+"""Tests for memoized template rendering."""
+
+import pytest
+
+pytest.importorskip("jinja2")
+
+from llm_assistant import templates  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    templates.clear_render_cache()
+    yield
+    templates.clear_render_cache()
+
+
+def test_repeat_render_is_a_hit():
+    first = templates.render('sections/watch.j2', watch_goal="spot failing builds")
+    assert templates.render('sections/watch.j2', watch_goal="spot failing builds") == first
+    assert templates.render_cache_stats() == {"entries": 1, "hits": 1, "misses": 1}
+
+
+def test_changed_input_is_a_miss():
+    a = templates.render('sections/watch.j2', watch_goal="spot failing builds")
+    b = templates.render('sections/watch.j2', watch_goal="watch the deploy")
+    assert a != b and "watch the deploy" in b
+    assert templates.render_cache_stats() == {"entries": 2, "hits": 0, "misses": 2}
+
+
+def test_bool_and_int_are_different_keys():
+    assert templates._memo_key('t', {"gui": True}) != templates._memo_key('t', {"gui": 1})
+    templates.render('sections/rag.j2', gui=True)
+    templates.render('sections/rag.j2', gui=1)
+    assert templates.render_cache_stats()["misses"] == 2
+
+
+def test_only_listed_templates_are_memoized(monkeypatch):
+    def no_key(*args):
+        raise AssertionError("memo key built for an unlisted template")
+
+    monkeypatch.setattr(templates, "_memo_key", no_key)
+    text = templates.render('prompts/squash_chunk.j2', excerpt="x" * 100_000)
+    assert "x" * 1000 in text
+    assert templates.render_cache_stats() == {"entries": 0, "hits": 0, "misses": 0}
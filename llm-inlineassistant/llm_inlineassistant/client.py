@@ -13,26 +13,24 @@ import os
 import signal
 import sys
 import unicodedata
-from typing import Iterator, Optional, Tuple
+from typing import TYPE_CHECKING, Iterator, Optional, Tuple
 
 import click
-from rich.console import Console, Group
-from rich.live import Live
-from rich.markdown import Markdown
-from rich.spinner import Spinner
-from rich.text import Text
 
-# Import shared utilities from llm_tools_core
+# Import shared utilities from llm_tools_core. The package resolves names
+# lazily, so only the daemon client modules are loaded here; rich and the
+# RAG/markdown helpers are imported inside the functions that render output,
+# keeping `--complete` (run on every Tab press) free of them.
 from llm_tools_core import (
     get_terminal_session_id,
     ensure_daemon,
+    cancel_request,
     stream_events,
-    get_action_verb,
-    get_tool_info,
-    RAGHandler,
-    strip_markdown,
 )
 
+if TYPE_CHECKING:
+    from rich.console import Console
+
 
 def _strip_trailing_artifacts(text: str) -> str:
     """Remove isolated non-Latin characters that models sometimes emit at end.
@@ -77,6 +75,8 @@ def stream_request(query: str, mode: str = "assistant", system_prompt: str = "")
         "q": query,
         "mode": mode,
         "sys": system_prompt,
+        # Relative @file/@pdf:/@dir: references resolve against this
+        "cwd": os.getcwd(),
     }
 
     for event in stream_events(request):
@@ -88,10 +88,22 @@ def stream_request(query: str, mode: str = "assistant", system_prompt: str = "")
                 "tool": event.get("tool", ""),
                 "args": event.get("args", {}),
             })
+        elif event_type == "tool_progress":
+            yield ("tool_progress", {
+                "tool": event.get("tool", ""),
+                "output": event.get("output", ""),
+            })
         elif event_type == "tool_done":
             yield ("tool_done", {
                 "tool": event.get("tool", ""),
                 "result": event.get("result", ""),
+                "cached": event.get("cached", False),
+            })
+        elif event_type == "progress":
+            yield ("progress", {
+                "ref": event.get("ref", ""),
+                "done": event.get("done", 0),
+                "total": event.get("total", 0),
             })
         elif event_type == "error":
             code = event.get("code", "UNKNOWN")
@@ -110,6 +122,8 @@ def handle_rag_command(command: str, terminal_id: str, console: Console) -> bool
         /rag search <coll> <query>  - Search collection
         /rag <collection>    - Activate collection for session
     """
+    from llm_tools_core import RAGHandler
+
     parts = command.split(maxsplit=2)
 
     # /rag or /rag list - list collections
@@ -241,6 +255,8 @@ def handle_slash_command(command: str, terminal_id: str) -> bool:
 
     Returns True if command was handled (don't send as query).
     """
+    from rich.console import Console
+
     console = Console()
 
     request_base = {
@@ -333,6 +349,7 @@ def handle_slash_command(command: str, terminal_id: str) -> bool:
 
         # Strip markdown unless raw mode
         if not raw_mode:
+            from llm_tools_core import strip_markdown
             try:
                 combined = strip_markdown(combined)
             except Exception as e:
@@ -368,6 +385,14 @@ def send_query(prompt: str, model: Optional[str] = None, stream: bool = True) ->
     Returns:
         The response text
     """
+    from rich.console import Console, Group
+    from rich.live import Live
+    from rich.markdown import Markdown
+    from rich.spinner import Spinner
+    from rich.text import Text
+
+    from llm_tools_core import MarkdownStream, get_action_verb, get_tool_info
+
     console = Console()
     terminal_id = get_terminal_session_id()
 
@@ -386,67 +411,95 @@ def send_query(prompt: str, model: Optional[str] = None, stream: bool = True) ->
         accumulated_text = ""
         active_tool = None
         active_tool_args = {}
+        # Last line a running tool printed (tool_progress), shown under the spinner
+        active_tool_line = ""
         error_message = None
         printed_separator = False
 
+        # Finished markdown blocks are printed once into scrollback; only the
+        # trailing open block is redrawn by Live, so per-chunk cost stays flat.
+        md_stream = MarkdownStream(console)
+
+        def feed(text: str) -> None:
+            nonlocal accumulated_text, printed_separator
+            accumulated_text += text
+            if text.strip() and not printed_separator:
+                # Visual separator between the query and the response
+                console.print()
+                printed_separator = True
+            md_stream.feed(text)
+
         try:
-            # Stream with Live display
-            # Start transient=True (clear on exit if no content), switch to False once content arrives
-            with Live(Markdown(""), console=console, refresh_per_second=10, transient=True) as live:
-                for event_type, data in stream_request(prompt):
-                    if event_type == "text":
-                        accumulated_text += data
-                        # Once we have content, make it persistent (don't clear on exit)
-                        if accumulated_text.strip() and not printed_separator:
-                            live.transient = False
-                            # Visual separator between the query and the response
-                            console.print()
-                            printed_separator = True
-                    elif event_type == "tool_start":
-                        active_tool = data["tool"]
-                        active_tool_args = data.get("args", {})
-                    elif event_type == "tool_done":
-                        tool_name = data["tool"]
-                        # Show suggest_command result as code block in response
-                        if tool_name == "suggest_command":
-                            cmd = active_tool_args.get("command", "")
-                            if cmd:
-                                accumulated_text += f"\n\n```\n{cmd}\n```\n\n"
-                        active_tool = None
-                        active_tool_args = {}
-                    elif event_type == "error":
-                        error_message = data
-
-                    # Update display
-                    if active_tool:
-                        action = get_action_verb(active_tool)
-                        # Show parameter value if available (like Terminator does)
-                        info = get_tool_info(active_tool)
-                        param_value = ""
-                        if info:
-                            param_name = info[0]
-                            param_value = active_tool_args.get(param_name, "")
-                        if param_value:
-                            spinner_text = Text(f"{action}: {param_value}", style="cyan")
+            with Live(Text(""), console=console, refresh_per_second=10, transient=True) as live:
+                try:
+                    for event_type, data in stream_request(prompt):
+                        if event_type == "text":
+                            feed(data)
+                        elif event_type == "progress":
+                            # @pdf: page extraction before the model starts
+                            if data["done"] < data["total"]:
+                                live.update(Spinner("dots", text=Text(
+                                    f"Extracting {data['ref']}: {data['done']}/{data['total']} pages",
+                                    style="cyan"
+                                ), style="cyan"))
+                            continue
+                        elif event_type == "tool_start":
+                            active_tool = data["tool"]
+                            active_tool_args = data.get("args", {})
+                            active_tool_line = ""
+                        elif event_type == "tool_progress":
+                            lines = [l for l in data["output"].splitlines() if l.strip()]
+                            if lines:
+                                active_tool_line = lines[-1][:120]
+                        elif event_type == "tool_done":
+                            tool_name = data["tool"]
+                            # Show suggest_command result as code block in response
+                            if tool_name == "suggest_command":
+                                cmd = active_tool_args.get("command", "")
+                                if cmd:
+                                    feed(f"\n\n```\n{cmd}\n```\n\n")
+                            active_tool = None
+                            active_tool_args = {}
+                            active_tool_line = ""
+                        elif event_type == "error":
+                            error_message = data
+
+                        # Update display
+                        if active_tool:
+                            action = get_action_verb(active_tool)
+                            # Show parameter value if available (like Terminator does)
+                            info = get_tool_info(active_tool)
+                            param_value = ""
+                            if info:
+                                param_name = info[0]
+                                param_value = active_tool_args.get(param_name, "")
+                            if param_value:
+                                spinner_text = Text(f"{action}: {param_value}", style="cyan")
+                            else:
+                                spinner_text = Text(f"{action}...", style="cyan")
+                            parts = [md_stream.tail, Spinner("dots", text=spinner_text, style="cyan")]
+                            if active_tool_line:
+                                parts.append(Text(f"  {active_tool_line}", style="dim",
+                                                  overflow="ellipsis", no_wrap=True))
+                            live.update(Group(*parts))
+                            live.refresh()  # Force immediate display for fast tools
                         else:
-                            spinner_text = Text(f"{action}...", style="cyan")
-                        live.update(Group(
-                            Markdown(accumulated_text) if accumulated_text else Text(""),
-                            Spinner("dots", text=spinner_text, style="cyan")
-                        ))
-                        live.refresh()  # Force immediate display for fast tools
-                    elif accumulated_text:
-                        live.update(Markdown(accumulated_text))
-
-                # Strip trailing model artifacts (stray CJK/Unicode tokens)
-                accumulated_text = _strip_trailing_artifacts(accumulated_text)
-
-                # Final update to ensure the last chunk is fully rendered before Live exits
-                if accumulated_text:
-                    live.update(Markdown(accumulated_text))
+                            live.update(md_stream.tail)
+
+                    # Strip trailing model artifacts (stray CJK/Unicode tokens)
+                    accumulated_text = _strip_trailing_artifacts(accumulated_text)
+                    live.update(Text(""))
+                    md_stream.finish(_strip_trailing_artifacts)
+                finally:
+                    # On Ctrl+C, keep the partial block on screen (no-op after finish)
+                    live.update(Text(""))
+                    md_stream.finish()
 
         except KeyboardInterrupt:
-            # Clean exit on Ctrl+C — Live context manager handles display cleanup
+            # Clean exit on Ctrl+C — Live context manager handles display cleanup.
+            # Tell the daemon to stop generating; it would otherwise only notice
+            # the closed socket on its next write.
+            cancel_request(terminal_id)
             if accumulated_text.strip():
                 console.print()  # Ensure we're on a new line
             # Show error even on interrupt so daemon errors aren't silently lost
@@ -567,6 +620,8 @@ def main(
 
     if not query_args:
         # Interactive mode hint
+        from rich.console import Console
+
         console = Console()
         console.print("[dim]Usage: @ <query>[/]")
         console.print("[dim]       llm-inlineassistant <query>[/]")
@@ -4,12 +4,14 @@ This package provides shared utilities:
 - PromptDetector: Shell prompt detection (regex and Unicode markers)
 - hash_blocks, filter_new_blocks: Block-level content hashing
 - ConsoleHelper: Rich console output formatting
-- get_config_dir, get_temp_dir, get_logs_db_path: XDG directory helpers
+- get_config_dir, get_cache_dir, get_temp_dir, get_logs_db_path: XDG directory helpers
 - strip_markdown, strip_markdown_for_tts, extract_code_blocks: Markdown processing
+- MarkdownStream: Incremental markdown rendering for streamed output
 - Model context limits and detection (models module)
 - System detection (system module)
 - TUI command detection (tui module)
 - Token estimation (tokens module)
+- Per-source token budgets for injected prompt context (context_budget module)
 - Daemon socket paths and constants (daemon module)
 - Daemon client utilities (daemon_client module)
 - Linux desktop context gathering (linux_context module)
@@ -17,177 +19,244 @@ This package provides shared utilities:
 - Error codes and exceptions (errors module)
 - ConversationHistory: Shared history access (history module)
 - AtHandler: @ reference parsing and resolution (at_handler module)
+- FragmentCache: On-disk cache of resolved @ references (fragment_cache module)
+- DirectoryIndex: Cached directory listings for @ completions (dir_index module)
+- Page-level PDF extraction for @pdf: (pdf_pages module)
+- Memory-mapped head/tail/lines/grep windows for @file: (file_window module)
+- BM25 relevance ranking (bm25 module)
 - RAGHandler: RAG integration wrapper (rag_handler module)
+- Resumable, manifest-based bulk RAG ingestion (rag_ingest module)
+- PluginCatalog: On-disk catalogue of llm plugin tools and models (plugin_catalog module)
+- MCPServerPool: Per-server MCP connections with cached tool schemas (mcp_pool module)
+- ToolResultCache: TTL cache of idempotent tool results (tool_cache module)
+- ToolExecutors: Bounded per-category tool pools with timeouts (tool_pools module)
+- report_progress, run_streaming: Stream incremental output from a running tool (tool_progress module)
+- KBSectionIndex: BM25 index over knowledge-base sections (kb_sections module)
+- FileWatcher: inotify change notification for cached files (file_watch module)
+- layout_prompt: Prompt-cache-friendly system prompt assembly (prompt_layout module)
 """
 
-from .prompt_detection import PromptDetector
-from .hashing import hash_blocks, filter_new_blocks, hash_window, hash_gui_context
-from .console import ConsoleHelper
-from .xdg import get_config_dir, get_temp_dir, get_logs_db_path
-from .markdown import strip_markdown, strip_markdown_for_tts, extract_code_blocks
+import importlib
+from importlib.util import find_spec
 
-# Model context limits and assistant model selection
-from .models import (
-    MODEL_CONTEXT_LIMITS,
-    PROVIDER_DEFAULT_LIMITS,
-    DEFAULT_CONTEXT_LIMIT,
-    get_model_context_limit,
-    ASSISTANT_MODEL_UPGRADES,
-    ASSISTANT_MODEL_FALLBACK,
-    get_assistant_default_model,
-)
-
-# System detection
-from .system import (
-    detect_shell,
-    detect_os,
-    detect_environment,
-    detect_package_managers,
-    get_system_context,
-)
-
-# TUI command detection
-from .tui import TUI_COMMANDS, is_tui_command
-
-# Token estimation
-from .tokens import (
-    CHARS_PER_TOKEN,
-    estimate_tokens,
-    estimate_tokens_json,
-    estimate_context_usage,
-    is_approaching_limit,
-)
-
-# Daemon socket paths and constants
-from .daemon import (
-    get_socket_path,
-    get_socket_dir,
-    get_suggest_path,
-    get_sessions_dir,
-    get_pid_path,
-    ensure_socket_dir,
-    sanitize_terminal_id_for_filename,
-    write_suggested_command,
-    read_suggested_command,
-    is_daemon_process_alive,
-    write_pid_file,
-    remove_pid_file,
-    cleanup_stale_daemon,
-    DAEMON_STARTUP_TIMEOUT,
-    REQUEST_TIMEOUT,
-    SOCKET_CONNECT_TIMEOUT,
-    RECV_BUFFER_SIZE,
-    IDLE_TIMEOUT_MINUTES,
-    WORKER_IDLE_MINUTES,
-    MAX_TOOL_ITERATIONS,
-)
-
-# Daemon client utilities
-from .daemon_client import (
-    is_daemon_running,
-    start_daemon,
-    ensure_daemon,
-    get_terminal_session_id,
-    connect_to_daemon,
-    stream_events,
-)
-
-# Linux desktop context (X11/Wayland)
-from .linux_context import (
-    is_x11,
-    is_wayland,
-    get_session_type,
-    get_focused_window_id,
-    get_visible_window_ids,
-    get_wm_class,
-    get_window_title,
-    get_focused_window_pid,
-    get_cwd,
-    get_cmdline,
-    get_selection,
-    gather_all_visible_windows,
-    gather_context,
-    format_context_for_llm,
-    format_gui_context,
-    MAX_SELECTION_BYTES,
-)
-
-# Shared system prompts
-from .prompts import (
-    CONTEXT_UNCHANGED_MARKER,
-    build_simple_system_prompt,
-    build_context_section,
-    wrap_terminal_context,
-    wrap_conversation_summary,
-    wrap_retrieved_documents,
-)
+# Public names are resolved lazily (PEP 562): importing the package is
+# nearly free, and each submodule is imported the first time one of its
+# names is accessed. Thin clients (@, espanso, ulauncher) only touch the
+# daemon/daemon_client modules and never pay for llm, sqlite_utils & co.
+_LAZY_SUBMODULES = {
+    "prompt_detection": ("PromptDetector",),
+    "hashing": ("hash_blocks", "filter_new_blocks", "hash_window", "hash_gui_context"),
+    "console": ("ConsoleHelper",),
+    "xdg": ("get_config_dir", "get_cache_dir", "get_temp_dir", "get_logs_db_path"),
+    "markdown": (
+        "strip_markdown",
+        "strip_markdown_for_tts",
+        "extract_code_blocks",
+        "MarkdownStream",
+    ),
+    # Model context limits and assistant model selection
+    "models": (
+        "MODEL_CONTEXT_LIMITS",
+        "PROVIDER_DEFAULT_LIMITS",
+        "DEFAULT_CONTEXT_LIMIT",
+        "get_model_context_limit",
+        "ASSISTANT_MODEL_UPGRADES",
+        "ASSISTANT_MODEL_FALLBACK",
+        "get_assistant_default_model",
+    ),
+    # System detection
+    "system": (
+        "detect_shell",
+        "detect_os",
+        "detect_environment",
+        "detect_package_managers",
+        "get_system_context",
+    ),
+    # TUI command detection
+    "tui": ("TUI_COMMANDS", "is_tui_command"),
+    # Token estimation
+    "tokens": (
+        "CHARS_PER_TOKEN",
+        "estimate_tokens",
+        "estimate_tokens_json",
+        "estimate_context_usage",
+        "is_approaching_limit",
+        "count_tokens",
+        "set_tokenizer",
+    ),
+    # Prompt context budget
+    "context_budget": (
+        "SourcePolicy",
+        "DEFAULT_POLICIES",
+        "SOURCE_BUDGET_FRACTION",
+        "SESSION_BUDGET_FRACTION",
+        "TURN_BUDGET_FRACTION",
+        "SESSION_SOURCES",
+        "allocate_budget",
+    ),
+    # Daemon socket paths and constants
+    "daemon": (
+        "get_socket_path",
+        "get_socket_dir",
+        "get_suggest_path",
+        "get_sessions_dir",
+        "get_pid_path",
+        "ensure_socket_dir",
+        "sanitize_terminal_id_for_filename",
+        "write_suggested_command",
+        "read_suggested_command",
+        "is_daemon_process_alive",
+        "write_pid_file",
+        "remove_pid_file",
+        "cleanup_stale_daemon",
+        "DAEMON_STARTUP_TIMEOUT",
+        "REQUEST_TIMEOUT",
+        "SOCKET_CONNECT_TIMEOUT",
+        "RECV_BUFFER_SIZE",
+        "IDLE_TIMEOUT_MINUTES",
+        "WORKER_IDLE_MINUTES",
+        "MAX_TOOL_ITERATIONS",
+    ),
+    # Daemon client utilities
+    "daemon_client": (
+        "is_daemon_running",
+        "start_daemon",
+        "ensure_daemon",
+        "get_terminal_session_id",
+        "connect_to_daemon",
+        "cancel_request",
+        "stream_events",
+    ),
+    # Linux desktop context (X11/Wayland)
+    "linux_context": (
+        "is_x11",
+        "is_wayland",
+        "get_session_type",
+        "get_focused_window_id",
+        "get_visible_window_ids",
+        "get_wm_class",
+        "get_window_title",
+        "get_focused_window_pid",
+        "get_cwd",
+        "get_cmdline",
+        "get_selection",
+        "gather_all_visible_windows",
+        "gather_context",
+        "format_context_for_llm",
+        "format_gui_context",
+        "MAX_SELECTION_BYTES",
+    ),
+    # Shared system prompts
+    "prompts": (
+        "CONTEXT_UNCHANGED_MARKER",
+        "build_simple_system_prompt",
+        "build_context_section",
+        "wrap_terminal_context",
+        "wrap_conversation_summary",
+        "wrap_retrieved_documents",
+    ),
+    # Error codes and exceptions
+    "errors": (
+        "ErrorCode",
+        "DaemonError",
+        "EmptyQueryError",
+        "ModelError",
+        "ToolError",
+        "DaemonTimeoutError",
+        "DaemonUnavailableError",
+        "format_error_response",
+    ),
+    # Conversation history (requires llm package)
+    "history": (
+        "ConversationHistory",
+        "ConversationSummary",
+        "FullConversation",
+        "Message",
+        "strip_context_tags",
+        "format_tool_call_markdown",
+        "TOOL_RESULT_TRUNCATE_LIMIT",
+    ),
+    # @ reference handling
+    "at_handler": ("AtHandler", "Completion", "ResolvedReference"),
+    "fragment_cache": ("FragmentCache", "get_fragment_cache"),
+    "dir_index": ("DirectoryIndex",),
+    # RAG integration
+    "rag_handler": (
+        "RAGHandler",
+        "SearchResult",
+        "AddResult",
+        "cached_search",
+        "get_engine",
+        "invalidate_collection",
+        "evict_idle_engines",
+        "rag_cache_stats",
+    ),
+    # llm plugin tool/model catalogue
+    "plugin_catalog": ("PluginCatalog", "get_plugin_catalog"),
+    # Per-server MCP lifecycle
+    "mcp_pool": ("MCPServerPool",),
+    # Idempotent tool result cache
+    "tool_cache": ("ToolResultCache", "CACHEABLE_TOOLS", "get_tool_result_cache"),
+    # Tool executor pools
+    "tool_pools": ("ToolExecutors", "ToolTimeoutError", "get_tool_executors"),
+    # Tool progress streaming
+    "tool_progress": ("ProgressChannel", "report_progress", "run_streaming"),
+    # Knowledge-base section retrieval
+    "kb_sections": ("KBSection", "KBSectionIndex", "split_sections"),
+    # inotify change notification
+    "file_watch": ("FileWatcher", "create_file_watcher"),
+    # Prompt-cache-friendly system prompt layout
+    "prompt_layout": (
+        "PromptSegment",
+        "PromptLayout",
+        "PromptCacheStats",
+        "layout_prompt",
+        "system_prompt_kwargs",
+        "cache_usage",
+    ),
+    # Tool display configuration
+    "tool_display": (
+        "TOOL_DISPLAY",
+        "get_action_verb",
+        "get_tool_info",
+        "get_action_verb_map",
+    ),
+    # Tool execution (requires llm package)
+    "tool_execution": ("execute_tool_call", "ToolEvent"),
+    # MCP citation post-processing
+    "mcp_citations": (
+        "MICROSOFT_DOC_TOOLS",
+        "MCP_CITATION_RULES",
+        "is_microsoft_doc_tool",
+        "format_microsoft_citations",
+    ),
+}
 
-# Error codes and exceptions
-from .errors import (
-    ErrorCode,
-    DaemonError,
-    EmptyQueryError,
-    ModelError,
-    ToolError,
-    DaemonTimeoutError,
-    DaemonUnavailableError,
-    format_error_response,
-)
+_LAZY_ATTRS = {
+    name: module
+    for module, names in _LAZY_SUBMODULES.items()
+    for name in names
+}
 
-# Conversation history (requires llm package)
-try:
-    from .history import (
-        ConversationHistory,
-        ConversationSummary,
-        FullConversation,
-        Message,
-        strip_context_tags,
-        format_tool_call_markdown,
-        TOOL_RESULT_TRUNCATE_LIMIT,
-    )
-    _HISTORY_AVAILABLE = True
-except ImportError:
-    _HISTORY_AVAILABLE = False
+# Modules that need the llm package. Availability is checked via find_spec
+# so deciding what to export does not import llm itself.
+_HISTORY_AVAILABLE = find_spec("llm") is not None and find_spec("sqlite_utils") is not None
+_TOOL_EXECUTION_AVAILABLE = find_spec("llm") is not None
 
-# @ reference handling
-from .at_handler import (
-    AtHandler,
-    Completion,
-    ResolvedReference,
-)
 
-# RAG integration
-from .rag_handler import (
-    RAGHandler,
-    SearchResult,
-    AddResult,
-)
+def __getattr__(name: str):
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(f".{module_name}", __name__)
+    value = getattr(module, name)
+    globals()[name] = value  # Cache so __getattr__ is only hit once per name
+    return value
 
-# Tool display configuration
-from .tool_display import (
-    TOOL_DISPLAY,
-    get_action_verb,
-    get_tool_info,
-    get_action_verb_map,
-)
 
-# Tool execution (requires llm package)
-try:
-    from .tool_execution import (
-        execute_tool_call,
-        ToolEvent,
-    )
-    _TOOL_EXECUTION_AVAILABLE = True
-except ImportError:
-    _TOOL_EXECUTION_AVAILABLE = False
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
 
-# MCP citation post-processing
-from .mcp_citations import (
-    MICROSOFT_DOC_TOOLS,
-    MCP_CITATION_RULES,
-    is_microsoft_doc_tool,
-    format_microsoft_citations,
-)
 
 __all__ = [
     # Prompt detection
@@ -201,12 +270,14 @@ __all__ = [
     "ConsoleHelper",
     # XDG directories
     "get_config_dir",
+    "get_cache_dir",
     "get_temp_dir",
     "get_logs_db_path",
     # Markdown processing
     "strip_markdown",
     "strip_markdown_for_tts",
     "extract_code_blocks",
+    "MarkdownStream",
     # Model context limits and assistant model selection
     "MODEL_CONTEXT_LIMITS",
     "PROVIDER_DEFAULT_LIMITS",
@@ -230,6 +301,16 @@ __all__ = [
     "estimate_tokens_json",
     "estimate_context_usage",
     "is_approaching_limit",
+    "count_tokens",
+    "set_tokenizer",
+    # Prompt context budget
+    "SourcePolicy",
+    "DEFAULT_POLICIES",
+    "SOURCE_BUDGET_FRACTION",
+    "SESSION_BUDGET_FRACTION",
+    "TURN_BUDGET_FRACTION",
+    "SESSION_SOURCES",
+    "allocate_budget",
     # Daemon paths and constants
     "get_socket_path",
     "get_socket_dir",
@@ -252,6 +333,7 @@ __all__ = [
     "ensure_daemon",
     "get_terminal_session_id",
     "connect_to_daemon",
+    "cancel_request",
     "stream_events",
     # Linux desktop context
     "is_x11",
@@ -290,10 +372,49 @@ __all__ = [
     "AtHandler",
     "Completion",
     "ResolvedReference",
+    "FragmentCache",
+    "get_fragment_cache",
+    "DirectoryIndex",
     # RAG integration
     "RAGHandler",
     "SearchResult",
     "AddResult",
+    "cached_search",
+    "get_engine",
+    "invalidate_collection",
+    "evict_idle_engines",
+    "rag_cache_stats",
+    # llm plugin tool/model catalogue
+    "PluginCatalog",
+    "get_plugin_catalog",
+    # Per-server MCP lifecycle
+    "MCPServerPool",
+    # Idempotent tool result cache
+    "ToolResultCache",
+    "CACHEABLE_TOOLS",
+    "get_tool_result_cache",
+    # Tool executor pools
+    "ToolExecutors",
+    "ToolTimeoutError",
+    "get_tool_executors",
+    # Tool progress streaming
+    "ProgressChannel",
+    "report_progress",
+    "run_streaming",
+    # Knowledge-base section retrieval
+    "KBSection",
+    "KBSectionIndex",
+    "split_sections",
+    # inotify change notification
+    "FileWatcher",
+    "create_file_watcher",
+    # Prompt-cache-friendly system prompt layout
+    "PromptSegment",
+    "PromptLayout",
+    "PromptCacheStats",
+    "layout_prompt",
+    "system_prompt_kwargs",
+    "cache_usage",
     # Tool display configuration
     "TOOL_DISPLAY",
     "get_action_verb",
@@ -2,12 +2,29 @@
 
 Provides unified @ reference parsing, autocomplete, and resolution.
 Supports file paths, URLs, PDFs, YouTube videos, and directories.
+Extracted PDFs, fetched pages and transcripts are cached (fragment_cache);
+completions can use a cached, fuzzy-matched directory index (dir_index).
 """
 
+import os
 import re
+import threading
+from concurrent.futures import CancelledError, Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
+
+from . import pdf_pages
+from .dir_index import DirEntry, DirectoryIndex, fuzzy_score, scan_directory
+from .file_window import read_window
+from .fragment_cache import FragmentCache, file_validator, get_fragment_cache, static_validator, url_validator
+from .tokens import CHARS_PER_TOKEN
+
+# Whole-file @file: references above this size are refused (use a window)
+MAX_FILE_BYTES = 10 * 1024 * 1024
+
+# Output cap for @file:...#head/#tail/#lines/#grep windows
+MAX_WINDOW_BYTES = 1024 * 1024
 
 
 @dataclass
@@ -29,6 +46,57 @@ class ResolvedReference:
     error: Optional[str]  # Error message if resolution failed
 
 
+# progress(original_reference, pages_done, pages_total)
+ProgressCallback = Callable[[str, int, int], None]
+
+
+# Loader functions live at module level so they can run in worker processes.
+# Each returns the joined fragment text ("" if nothing was extracted) and
+# raises ImportError when its plugin is not installed.
+
+def _join_fragments(fragments) -> str:
+    return "\n\n".join(f.content for f in fragments if f.content)
+
+
+def _load_pdf_text(path: str) -> str:
+    from llm.default_plugins.loaders.pdf import load_pdf
+    return _join_fragments(load_pdf(Path(path)))
+
+
+def _load_url_text(url: str) -> str:
+    from llm.default_plugins.loaders.site import load_site
+    return _join_fragments(load_site(url))
+
+
+def _load_youtube_text(url: str) -> str:
+    from llm_fragments_youtube_transcript import YouTubeFragmentLoader
+    return _join_fragments(YouTubeFragmentLoader().load(url))
+
+
+def _load_arxiv_text(paper_id: str) -> str:
+    from llm_arxiv import ArxivFragmentLoader
+    return _join_fragments(ArxivFragmentLoader().load(paper_id))
+
+
+# PDF extraction is CPU-bound, so concurrent extractions run in processes.
+# The pool is created on first use and kept for the life of the process.
+_pdf_executor: Optional[ProcessPoolExecutor] = None
+_pdf_executor_lock = threading.Lock()
+
+
+def _get_pdf_executor() -> ProcessPoolExecutor:
+    global _pdf_executor
+    with _pdf_executor_lock:
+        if _pdf_executor is None:
+            import multiprocessing
+            # spawn: forking a threaded daemon is unsafe
+            _pdf_executor = ProcessPoolExecutor(
+                max_workers=min(4, os.cpu_count() or 1),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pdf_executor
+
+
 class AtHandler:
     """Handle @ references in user input."""
 
@@ -66,13 +134,24 @@ class AtHandler:
         r'[^\s@]+)'  # @path or @file
     )
 
-    def __init__(self, cwd: Optional[str] = None):
+    def __init__(
+        self,
+        cwd: Optional[str] = None,
+        cache: Optional[FragmentCache] = None,
+        use_cache: bool = True,
+        index: Optional[DirectoryIndex] = None,
+    ):
         """Initialize handler.
 
         Args:
             cwd: Current working directory for relative paths (supports ~ expansion)
+            cache: FragmentCache for loaded content (default: shared per-process cache)
+            use_cache: Set False to always load from the source
+            index: DirectoryIndex for completions (default: list directories on every call)
         """
         self.cwd = Path(cwd).expanduser() if cwd else Path.cwd()
+        self.cache = (cache or get_fragment_cache()) if use_cache else None
+        self.index = index
 
     def parse_references(self, text: str) -> List[str]:
         """Extract @ references from text.
@@ -250,51 +329,43 @@ class AtHandler:
                     dir_to_list = working_dir / partial.parent if partial.parent != Path(".") else working_dir
                 name_prefix = partial.name
 
-        try:
-            if not dir_to_list.exists() or not dir_to_list.is_dir():
-                return []
+        for entry in self._match_entries(dir_to_list, name_prefix):
+            item = dir_to_list / entry.name
 
-            for item in sorted(dir_to_list.iterdir()):
-                if name_prefix and not item.name.lower().startswith(name_prefix.lower()):
-                    continue
+            # Build the relative path
+            rel_path = item.relative_to(working_dir) if item.is_relative_to(working_dir) else item
 
-                # Skip hidden files
-                if item.name.startswith("."):
+            if entry.is_dir:
+                completions.append(Completion(
+                    text=f"{prefix_format}{rel_path}/",
+                    description="Directory",
+                    type="directory"
+                ))
+            elif entry.is_file:
+                # Apply extension filter if specified
+                if filter_ext and item.suffix.lower() != filter_ext:
                     continue
 
-                # Build the relative path
-                rel_path = item.relative_to(working_dir) if item.is_relative_to(working_dir) else item
+                # Determine file type
+                if self.is_image(item.name):
+                    file_type = "Image"
+                elif filter_ext:
+                    file_type = filter_ext.upper().lstrip(".")
+                elif self.is_text_file(item.name):
+                    file_type = "Text"
+                else:
+                    file_type = "File"
 
-                if item.is_dir():
-                    completions.append(Completion(
-                        text=f"{prefix_format}{rel_path}/",
-                        description="Directory",
-                        type="directory"
-                    ))
-                elif item.is_file():
-                    # Apply extension filter if specified
-                    if filter_ext and item.suffix.lower() != filter_ext:
-                        continue
-
-                    # Determine file type
-                    if self.is_image(item.name):
-                        file_type = "Image"
-                    elif filter_ext:
-                        file_type = filter_ext.upper().lstrip(".")
-                    elif self.is_text_file(item.name):
-                        file_type = "Text"
-                    else:
-                        file_type = "File"
+                completions.append(Completion(
+                    text=f"{prefix_format}{rel_path}",
+                    description=file_type,
+                    type="file"
+                ))
 
-                    completions.append(Completion(
-                        text=f"{prefix_format}{rel_path}",
-                        description=file_type,
-                        type="file"
-                    ))
-        except PermissionError:
-            pass
+            if len(completions) >= 20:  # Limit results
+                break
 
-        return completions[:20]  # Limit results
+        return completions
 
     def _get_directory_completions(
         self,
@@ -330,43 +401,140 @@ class AtHandler:
                     dir_to_list = working_dir / partial.parent if partial.parent != Path(".") else working_dir
                 name_prefix = partial.name
 
-        try:
-            if not dir_to_list.exists() or not dir_to_list.is_dir():
-                return []
+        for entry in self._match_entries(dir_to_list, name_prefix):
+            if not entry.is_dir:
+                continue
 
-            for item in sorted(dir_to_list.iterdir()):
-                if not item.is_dir():
-                    continue
-                if name_prefix and not item.name.lower().startswith(name_prefix.lower()):
-                    continue
-                if item.name.startswith("."):
-                    continue
+            item = dir_to_list / entry.name
+            rel_path = item.relative_to(working_dir) if item.is_relative_to(working_dir) else item
+            completions.append(Completion(
+                text=f"@dir:{rel_path}/",
+                description="Directory",
+                type="directory"
+            ))
+            if len(completions) >= 20:
+                break
 
-                rel_path = item.relative_to(working_dir) if item.is_relative_to(working_dir) else item
-                completions.append(Completion(
-                    text=f"@dir:{rel_path}/",
-                    description="Directory",
-                    type="directory"
-                ))
-        except PermissionError:
-            pass
+        return completions
+
+    def _match_entries(self, directory: Path, name_prefix: str) -> List[DirEntry]:
+        """List non-hidden entries of directory matching name_prefix.
+
+        Matching is fuzzy (see fuzzy_score): prefix matches come first,
+        then substring and subsequence matches. Uses the DirectoryIndex
+        when one was given, so repeated completions skip the filesystem.
+        """
+        try:
+            if self.index is not None:
+                entries = self.index.list(str(directory))
+            else:
+                entries = scan_directory(str(directory))
+        except OSError:
+            return []
 
-        return completions[:20]
+        scored = []
+        for entry in entries:
+            if entry.name.startswith("."):
+                continue
+            score = fuzzy_score(name_prefix, entry.name)
+            if score is not None:
+                scored.append((score, entry.name, entry))
+        scored.sort(key=lambda item: (item[0], item[1]))
+        return [entry for _score, _name, entry in scored]
 
     def resolve(
         self,
         reference: str,
-        cwd: Optional[str] = None
+        cwd: Optional[str] = None,
+        query: str = "",
+        token_budget: Optional[int] = None,
+        progress: Optional[ProgressCallback] = None
     ) -> ResolvedReference:
         """Resolve a @ reference to its content.
 
         Args:
-            reference: The reference without @ (e.g., "pdf:report.pdf", "file.txt")
+            reference: The reference without @ (e.g., "pdf:report.pdf#10-40",
+                "file:big.log#tail=2000", "file.txt")
             cwd: Override current working directory
+            query: User query, used to rank PDF pages when over token_budget
+            token_budget: Maximum estimated tokens for a PDF or file window
+                (None = unlimited)
+            progress: Called as progress(original, pages_done, pages_total)
+                while PDF pages are extracted
 
         Returns:
             ResolvedReference with content or error
         """
+        return self._resolve(reference, cwd, None, query, token_budget, progress)
+
+    def resolve_many(
+        self,
+        references: List[str],
+        cwd: Optional[str] = None,
+        max_workers: int = 8,
+        query: str = "",
+        token_budget: Optional[int] = None,
+        progress: Optional[ProgressCallback] = None,
+        cancel: Optional[threading.Event] = None
+    ) -> List[ResolvedReference]:
+        """Resolve several @ references concurrently.
+
+        Network loaders (URLs, YouTube, arXiv) run in threads. When more than
+        one PDF needs extracting, extraction runs in worker processes because
+        it is CPU-bound. Duplicate references are resolved once.
+
+        Args:
+            references: References without @, in prompt order
+            cwd: Override current working directory
+            max_workers: Maximum concurrent resolutions
+            query, token_budget, progress: See resolve(); the budget applies
+                to each reference separately
+            cancel: Once set, references not started yet are skipped and PDF
+                extraction stops at its next progress report (pages done so
+                far stay cached); both resolve with the error "cancelled"
+
+        Returns:
+            ResolvedReference list in the same order as references
+        """
+        if cancel is not None:
+            report = progress
+
+            def progress(original: str, done: int, total: int) -> None:
+                if cancel.is_set():
+                    raise CancelledError("cancelled")
+                if report is not None:
+                    report(original, done, total)
+
+        def resolve_one(ref: str, pdf_executor: Optional[Executor] = None) -> ResolvedReference:
+            if cancel is not None and cancel.is_set():
+                return ResolvedReference(
+                    original=f"@{ref}", type="fragment", content=None, path=None, loader=None,
+                    error="cancelled"
+                )
+            return self._resolve(ref, cwd, pdf_executor, query, token_budget, progress)
+
+        unique = list(dict.fromkeys(references))
+        if len(unique) <= 1:
+            return [resolve_one(ref) for ref in references]
+
+        pdf_count = sum(1 for ref in unique if ref.startswith("pdf:"))
+        pdf_executor = _get_pdf_executor() if pdf_count > 1 else None
+
+        workers = min(max_workers, len(unique))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="at-resolve") as pool:
+            futures = {ref: pool.submit(resolve_one, ref, pdf_executor) for ref in unique}
+            resolved = {ref: future.result() for ref, future in futures.items()}
+        return [resolved[ref] for ref in references]
+
+    def _resolve(
+        self,
+        reference: str,
+        cwd: Optional[str] = None,
+        pdf_executor: Optional[Executor] = None,
+        query: str = "",
+        token_budget: Optional[int] = None,
+        progress: Optional[ProgressCallback] = None
+    ) -> ResolvedReference:
         working_dir = Path(cwd).expanduser() if cwd else self.cwd
 
         # Handle prefix:path patterns
@@ -374,7 +542,7 @@ class AtHandler:
             prefix_name, path = reference.split(":", 1)
 
             if prefix_name == "pdf":
-                return self._resolve_pdf(path, working_dir)
+                return self._resolve_pdf(path, working_dir, pdf_executor, query, token_budget, progress)
             elif prefix_name == "yt":
                 return self._resolve_youtube(path)
             elif prefix_name == "arxiv":
@@ -382,7 +550,7 @@ class AtHandler:
             elif prefix_name == "dir":
                 return self._resolve_directory(path, working_dir)
             elif prefix_name == "file":
-                return self._resolve_file(path, working_dir)
+                return self._resolve_file(path, working_dir, token_budget)
             else:
                 return ResolvedReference(
                     original=f"@{reference}",
@@ -398,20 +566,43 @@ class AtHandler:
             return self._resolve_url(reference)
 
         # Handle file paths
-        return self._resolve_file(reference, working_dir)
-
-    def _resolve_pdf(self, path: str, working_dir: Path) -> ResolvedReference:
-        """Resolve a PDF file reference."""
+        return self._resolve_file(reference, working_dir, token_budget)
+
+    def _cached_load(self, key: str, validator, load: Callable[[], str]) -> str:
+        """Return cached content for key, or call load() and cache the result."""
+        if self.cache is None:
+            return load()
+        content = self.cache.get(key, validator)
+        if content is None:
+            content = load()
+            if content:
+                self.cache.put(key, validator, content)
+        return content
+
+    def _resolve_pdf(
+        self,
+        path: str,
+        working_dir: Path,
+        pdf_executor: Optional[Executor] = None,
+        query: str = "",
+        token_budget: Optional[int] = None,
+        progress: Optional[ProgressCallback] = None
+    ) -> ResolvedReference:
+        """Resolve a PDF file reference, optionally with a #page-range suffix."""
+        original = f"@pdf:{path}"
         try:
-            # Try to use llm's PDF fragment loader
-            from llm.default_plugins.loaders.pdf import load_pdf
+            # "report.pdf#10-40" selects pages, unless the file name contains "#"
+            page_spec = ""
+            if "#" in path and not Path(path).expanduser().exists() and not (working_dir / path).exists():
+                path, _, page_spec = path.rpartition("#")
 
             # Expand ~ in path and resolve relative to working_dir
             expanded_path = Path(path).expanduser()
             file_path = expanded_path if expanded_path.is_absolute() else working_dir / path
-            if not file_path.exists():
+            validator = file_validator(file_path)
+            if validator is None:
                 return ResolvedReference(
-                    original=f"@pdf:{path}",
+                    original=original,
                     type="fragment",
                     content=None,
                     path=str(file_path),
@@ -419,11 +610,26 @@ class AtHandler:
                     error=f"File not found: {file_path}"
                 )
 
-            fragments = list(load_pdf(file_path))
-            if fragments:
-                content = "\n\n".join(f.content for f in fragments if f.content)
+            backend = pdf_pages.get_backend()
+            if backend is not None:
+                content = self._extract_pdf_pages(
+                    str(file_path.resolve()), validator, backend, page_spec,
+                    query, token_budget,
+                    (lambda done, total: progress(original, done, total)) if progress else None,
+                )
+            elif page_spec:
+                raise ValueError("Page ranges need PyMuPDF or pdftotext (poppler-utils)")
+            else:
+                def load() -> str:
+                    if pdf_executor is not None:
+                        return pdf_executor.submit(_load_pdf_text, str(file_path)).result()
+                    return _load_pdf_text(str(file_path))
+
+                content = self._cached_load(f"pdf:{file_path.resolve()}", validator, load)
+
+            if content:
                 return ResolvedReference(
-                    original=f"@pdf:{path}",
+                    original=original,
                     type="fragment",
                     content=content,
                     path=str(file_path),
@@ -432,7 +638,7 @@ class AtHandler:
                 )
             else:
                 return ResolvedReference(
-                    original=f"@pdf:{path}",
+                    original=original,
                     type="fragment",
                     content=None,
                     path=str(file_path),
@@ -441,7 +647,7 @@ class AtHandler:
                 )
         except ImportError:
             return ResolvedReference(
-                original=f"@pdf:{path}",
+                original=original,
                 type="fragment",
                 content=None,
                 path=None,
@@ -450,7 +656,7 @@ class AtHandler:
             )
         except Exception as e:
             return ResolvedReference(
-                original=f"@pdf:{path}",
+                original=original,
                 type="fragment",
                 content=None,
                 path=None,
@@ -458,16 +664,42 @@ class AtHandler:
                 error=str(e)
             )
 
+    def _extract_pdf_pages(
+        self,
+        path: str,
+        validator,
+        backend: str,
+        page_spec: str,
+        query: str,
+        token_budget: Optional[int],
+        progress: Optional[Callable[[int, int], None]]
+    ) -> str:
+        """Extract (and cache) the requested pages, then apply the token budget."""
+        count_text = self.cache.get(f"pdfpages:{path}", validator) if self.cache is not None else None
+        if count_text is None:
+            count = pdf_pages.page_count(path, backend)
+            if self.cache is not None:
+                self.cache.put(f"pdfpages:{path}", validator, str(count))
+        else:
+            count = int(count_text)
+
+        pages = pdf_pages.parse_page_range(page_spec, count) if page_spec else list(range(1, count + 1))
+        # A process pool only pays off when there is more than one chunk
+        executor = None
+        if backend == "pymupdf" and len(pages) > pdf_pages.CHUNK_PAGES:
+            executor = _get_pdf_executor()
+        texts = pdf_pages.extract_pages(
+            path, pages, backend,
+            cache=self.cache, validator=validator, executor=executor, progress=progress,
+        )
+        selected = pdf_pages.select_pages(texts, query, token_budget)
+        return pdf_pages.format_pages(texts, selected, count)
+
     def _resolve_youtube(self, url: str) -> ResolvedReference:
         """Resolve a YouTube video reference."""
         try:
-            # Try to use llm's YouTube fragment loader
-            from llm_fragments_youtube_transcript import YouTubeFragmentLoader
-
-            loader = YouTubeFragmentLoader()
-            fragments = list(loader.load(url))
-            if fragments:
-                content = "\n\n".join(f.content for f in fragments if f.content)
+            content = self._cached_load(f"yt:{url}", static_validator(), lambda: _load_youtube_text(url))
+            if content:
                 return ResolvedReference(
                     original=f"@yt:{url}",
                     type="fragment",
@@ -507,13 +739,10 @@ class AtHandler:
     def _resolve_arxiv(self, paper_id: str) -> ResolvedReference:
         """Resolve an arXiv paper reference."""
         try:
-            # Try to use llm-arxiv fragment loader
-            from llm_arxiv import ArxivFragmentLoader
-
-            loader = ArxivFragmentLoader()
-            fragments = list(loader.load(paper_id))
-            if fragments:
-                content = "\n\n".join(f.content for f in fragments if f.content)
+            content = self._cached_load(
+                f"arxiv:{paper_id}", static_validator(), lambda: _load_arxiv_text(paper_id)
+            )
+            if content:
                 return ResolvedReference(
                     original=f"@arxiv:{paper_id}",
                     type="fragment",
@@ -616,14 +845,15 @@ class AtHandler:
             )
 
     def _resolve_url(self, url: str) -> ResolvedReference:
-        """Resolve a URL reference."""
-        try:
-            # Try to use llm's site fragment loader
-            from llm.default_plugins.loaders.site import load_site
+        """Resolve a URL reference.
 
-            fragments = list(load_site(url))
-            if fragments:
-                content = "\n\n".join(f.content for f in fragments if f.content)
+        Cached pages are revalidated with a HEAD request (ETag/Last-Modified);
+        pages that send neither header are fetched every time.
+        """
+        try:
+            validator = url_validator(url) if self.cache is not None else None
+            content = self._cached_load(f"url:{url}", validator, lambda: _load_url_text(url))
+            if content:
                 return ResolvedReference(
                     original=f"@{url}",
                     type="fragment",
@@ -660,14 +890,25 @@ class AtHandler:
                 error=str(e)
             )
 
-    def _resolve_file(self, path: str, working_dir: Path) -> ResolvedReference:
-        """Resolve a file reference."""
+    def _resolve_file(
+        self,
+        path: str,
+        working_dir: Path,
+        token_budget: Optional[int] = None
+    ) -> ResolvedReference:
+        """Resolve a file reference, optionally with a #head/#tail/#lines/#grep window."""
+        original = f"@{path}"
+        # "big.log#tail=2000" selects a window, unless the file name contains "#"
+        window = ""
+        if "#" in path and not Path(path).expanduser().exists() and not (working_dir / path).exists():
+            path, _, window = path.rpartition("#")
+
         # Expand ~ in path
         expanded_path = Path(path).expanduser()
         file_path = expanded_path if expanded_path.is_absolute() else working_dir / path
         if not file_path.exists():
             return ResolvedReference(
-                original=f"@{path}",
+                original=original,
                 type="fragment",
                 content=None,
                 path=str(file_path),
@@ -676,9 +917,9 @@ class AtHandler:
             )
 
         # Handle images as attachments
-        if self.is_image(path):
+        if self.is_image(path) and not window:
             return ResolvedReference(
-                original=f"@{path}",
+                original=original,
                 type="attachment",
                 content=None,
                 path=str(file_path),
@@ -688,21 +929,38 @@ class AtHandler:
 
         # Handle text files as fragments
         try:
+            if window:
+                # Memory-mapped scan: works on multi-GB files in constant memory
+                max_bytes = MAX_WINDOW_BYTES
+                if token_budget is not None:
+                    max_bytes = min(max_bytes, token_budget * CHARS_PER_TOKEN)
+                content = read_window(str(file_path), window, max_bytes)
+                return ResolvedReference(
+                    original=original,
+                    type="fragment",
+                    content=content,
+                    path=str(file_path),
+                    loader="file",
+                    error=None
+                )
+
             # Guard against huge files (e.g. multi-GB logs) that would cause OOM
-            MAX_FILE_BYTES = 10 * 1024 * 1024  # 10 MB
             file_size = file_path.stat().st_size
             if file_size > MAX_FILE_BYTES:
                 return ResolvedReference(
-                    original=f"@{path}",
+                    original=original,
                     type="fragment",
                     content=None,
                     path=str(file_path),
                     loader="file",
-                    error=f"File too large ({file_size // (1024*1024)}MB, limit {MAX_FILE_BYTES // (1024*1024)}MB)"
+                    error=(
+                        f"File too large ({file_size // (1024*1024)}MB, limit {MAX_FILE_BYTES // (1024*1024)}MB); "
+                        f"use a window such as @file:{path}#tail=1000 or #grep=PATTERN"
+                    )
                 )
             content = file_path.read_text()
             return ResolvedReference(
-                original=f"@{path}",
+                original=original,
                 type="fragment",
                 content=content,
                 path=str(file_path),
@@ -711,7 +969,7 @@ class AtHandler:
             )
         except Exception as e:
             return ResolvedReference(
-                original=f"@{path}",
+                original=original,
                 type="fragment",
                 content=None,
                 path=str(file_path),
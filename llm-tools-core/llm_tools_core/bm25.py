@@ -0,0 +1,81 @@
+"""Lightweight BM25 ranking for selecting relevant text chunks.
+
+This module provides a dependency-free Okapi BM25 scorer used by:
+- AtHandler (picking the most relevant PDF pages under a token budget)
+- KBSectionIndex (picking the knowledge-base sections relevant to a query)
+
+It is meant for a few hundred to a few thousand short documents ranked
+against a user query, where building a real index would cost more than
+the scoring itself.
+"""
+
+import math
+import re
+from collections import Counter
+from typing import List, Sequence
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Standard Okapi BM25 parameters
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric terms (single characters dropped)."""
+    return [t for t in _TOKEN_RE.findall(text.lower()) if len(t) > 1]
+
+
+class BM25Index:
+    """Term statistics of a fixed document set, for repeated queries.
+
+    Tokenizing dominates the cost of scoring, so callers that rank the same
+    documents against many queries (KB sections) build this once.
+    """
+
+    def __init__(self, documents: Sequence[str]):
+        self._term_counts = [Counter(tokenize(doc)) for doc in documents]
+        self._lengths = [sum(counts.values()) for counts in self._term_counts]
+        self._avg_len = (sum(self._lengths) / len(documents) if documents else 0) or 1.0
+        self._df = Counter(term for counts in self._term_counts for term in counts)
+
+    def __len__(self) -> int:
+        return len(self._term_counts)
+
+    def scores(self, query: str) -> List[float]:
+        """One BM25 score per document (0.0 when no query term occurs)."""
+        query_terms = set(tokenize(query))
+        n_docs = len(self._term_counts)
+        if not n_docs or not query_terms:
+            return [0.0] * n_docs
+
+        idf = {
+            term: math.log(1 + (n_docs - self._df[term] + 0.5) / (self._df[term] + 0.5))
+            for term in query_terms
+        }
+
+        scores = []
+        for counts, length in zip(self._term_counts, self._lengths):
+            score = 0.0
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * length / self._avg_len)
+            for term in query_terms:
+                tf = counts.get(term, 0)
+                if tf:
+                    score += idf[term] * tf * (BM25_K1 + 1) / (tf + norm)
+            scores.append(score)
+        return scores
+
+
+def bm25_scores(documents: Sequence[str], query: str) -> List[float]:
+    """Score each document against query with Okapi BM25.
+
+    Args:
+        documents: Texts to rank
+        query: Free-text query
+
+    Returns:
+        One score per document (0.0 when no query term occurs)
+    """
+    if not documents or not tokenize(query):
+        return [0.0] * len(documents)
+    return BM25Index(documents).scores(query)
@@ -0,0 +1,185 @@
+"""Token budget allocation for injected prompt context.
+
+This module provides allocate_budget(), used by llm-assistant to fit the
+context it injects each turn (terminal capture, RAG results, knowledge
+bases, AGENTS.md memory, squash summaries, workflow state) into a
+share of the model's context window:
+
+- Every source has a priority and a minimum and maximum share of the budget
+- Sources are first capped at their maximum share, then, if the total is
+  still over budget, every source keeps its minimum share and the rest of
+  the budget goes to sources in priority order; the lowest priorities are
+  trimmed first
+- Trimming keeps the head of a text (ranked RAG results, documents) or
+  its tail (terminal output, where the latest lines matter most), and
+  uses the same token counter as the allocation, so a trimmed text fits
+  its grant
+- Sources in the cached part of the system prompt (SESSION_SOURCES:
+  memory, KB) get their own budget, separate from the per-turn sources.
+  A large terminal capture or RAG result never trims them, so their
+  bytes change only when they do and the provider's prompt cache keeps
+  matching
+
+Texts are trimmed rather than summarized: a model call per turn would cost
+more latency than the trimmed tokens are worth.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+from .tokens import CHARS_PER_TOKEN, estimate_tokens
+
+# Shares of the context window available to injected sources: the system
+# prompt's session sources, and everything injected per turn. The rest is
+# left for the conversation itself and the reply
+SESSION_BUDGET_FRACTION = 0.2
+TURN_BUDGET_FRACTION = 0.3
+SOURCE_BUDGET_FRACTION = SESSION_BUDGET_FRACTION + TURN_BUDGET_FRACTION
+
+# Sources allocated on the session budget
+SESSION_SOURCES = ("memory", "kb")
+
+TRIM_MARKER = "\n[... trimmed to fit the context budget ...]\n"
+
+# Text wrapped in one <tag>...</tag> (terminal_context, rag_context, ...)
+_WRAPPED_RE = re.compile(r"^(<(\w+)>)(.*)(</\2>)$", re.DOTALL)
+
+
+@dataclass(frozen=True)
+class SourcePolicy:
+    """How one context source shares the budget."""
+    priority: int  # Higher keeps its tokens longer
+    min_share: float = 0.0  # Fraction of the budget always granted (if needed)
+    max_share: float = 1.0  # Fraction of the budget never exceeded
+    keep: str = "head"  # "head" or "tail": which end survives trimming
+
+
+# Shares are of the budget a source is allocated in
+DEFAULT_POLICIES: Dict[str, SourcePolicy] = {
+    # Session budget
+    "memory": SourcePolicy(priority=90, min_share=0.15, max_share=0.40),
+    "kb": SourcePolicy(priority=30, max_share=0.85),
+    # Turn budget
+    "summary": SourcePolicy(priority=80, min_share=0.08, max_share=0.40),
+    "workflow": SourcePolicy(priority=70, max_share=0.15),
+    "terminal": SourcePolicy(priority=50, min_share=0.08, max_share=0.65, keep="tail"),
+    "rag": SourcePolicy(priority=40, min_share=0.08, max_share=0.50),
+    "kb_sections": SourcePolicy(priority=35, max_share=0.35),
+}
+
+# Used for sources without an entry in the policy table
+FALLBACK_POLICY = SourcePolicy(priority=10, max_share=0.20)
+
+
+@dataclass
+class Allocation:
+    """Result for one source."""
+    text: str
+    tokens: int  # Tokens after trimming
+    requested: int  # Tokens before trimming
+
+    @property
+    def trimmed(self) -> bool:
+        return self.tokens < self.requested
+
+
+def trim_to_tokens(
+    text: str,
+    tokens: int,
+    keep: str = "head",
+    count: Optional[Callable[[str], int]] = None,
+) -> str:
+    """Cut text to tokens tokens, marking the cut.
+
+    Text wrapped in a single <tag>...</tag> is trimmed inside the tags,
+    so the wrapper survives for later stripping. Without count the cut is
+    made at CHARS_PER_TOKEN characters per token; with it, the text is
+    cut further until count() of the result is within tokens.
+    """
+    max_chars = max(tokens, 0) * CHARS_PER_TOKEN
+    trimmed = _trim_text(text, max_chars, keep)
+    if count is None:
+        return trimmed
+    while trimmed:
+        used = count(trimmed)
+        if used <= tokens:
+            break
+        # Shrink in proportion to the overshoot, always by at least a char
+        max_chars = min(len(trimmed) - 1, len(trimmed) * max(tokens, 0) // used)
+        trimmed = _trim_text(text, max_chars, keep)
+    return trimmed
+
+
+def _trim_text(text: str, max_chars: int, keep: str) -> str:
+    if len(text) <= max_chars:
+        return text
+    wrapped = _WRAPPED_RE.match(text)
+    if wrapped:
+        opening, _, inner, closing = wrapped.groups()
+        inner = _trim_chars(inner, max_chars - len(opening) - len(closing), keep)
+        return f"{opening}{inner}{closing}" if inner else ""
+    return _trim_chars(text, max_chars, keep)
+
+
+def _trim_chars(text: str, max_chars: int, keep: str) -> str:
+    if len(text) <= max_chars:
+        return text
+    room = max(max_chars - len(TRIM_MARKER), 0)
+    if room == 0:
+        return ""
+    if keep == "tail":
+        return TRIM_MARKER.lstrip("\n") + text[-room:]
+    return text[:room] + TRIM_MARKER.rstrip("\n")
+
+
+def allocate_budget(
+    texts: Dict[str, str],
+    budget: int,
+    policies: Optional[Dict[str, SourcePolicy]] = None,
+    count: Callable[[str], int] = estimate_tokens,
+) -> Dict[str, Allocation]:
+    """Fit texts into budget tokens according to their policies.
+
+    Args:
+        texts: Source name -> text (empty texts are passed through)
+        budget: Tokens available to all sources together
+        policies: Source name -> policy (default: DEFAULT_POLICIES)
+        count: Token counter
+
+    Returns:
+        Source name -> Allocation, in the order of texts
+    """
+    policies = DEFAULT_POLICIES if policies is None else policies
+    budget = max(budget, 0)
+    requested = {name: count(text) if text else 0 for name, text in texts.items()}
+    policy = {name: policies.get(name, FALLBACK_POLICY) for name in texts}
+
+    # Each source is capped at its maximum share
+    grant = {
+        name: min(tokens, int(budget * policy[name].max_share))
+        for name, tokens in requested.items()
+    }
+
+    if sum(grant.values()) > budget:
+        # Minimum shares first, then the remainder by priority
+        wanted = grant
+        grant = {
+            name: min(tokens, int(budget * policy[name].min_share))
+            for name, tokens in wanted.items()
+        }
+        remaining = budget - sum(grant.values())
+        for name in sorted(wanted, key=lambda n: -policy[n].priority):
+            extra = min(wanted[name] - grant[name], max(remaining, 0))
+            grant[name] += extra
+            remaining -= extra
+
+    result = {}
+    for name, text in texts.items():
+        if grant[name] >= requested[name]:
+            result[name] = Allocation(text=text, tokens=requested[name], requested=requested[name])
+        else:
+            trimmed = trim_to_tokens(text, grant[name], policy[name].keep, count)
+            result[name] = Allocation(text=trimmed, tokens=count(trimmed) if trimmed else 0,
+                                      requested=requested[name])
+    return result
@@ -4,6 +4,7 @@ Provides shared client functions for connecting to the llm-assistant daemon:
 - Daemon availability checking
 - Daemon startup
 - Socket communication helpers
+- Query cancellation
 - NDJSON event streaming
 
 Used by:
@@ -39,6 +40,9 @@ from .daemon import (
 def is_daemon_running() -> bool:
     """Check if daemon is running by testing socket connection.
 
+    With systemd socket activation this succeeds as soon as systemd is
+    listening; the daemon itself is started on demand.
+
     Returns:
         True if daemon socket accepts connections, False otherwise.
 
@@ -61,36 +65,18 @@ def is_daemon_running() -> bool:
         sock.close()
 
 
-def _is_systemd_service_enabled() -> bool:
-    """Check if llm-assistant systemd user service is enabled.
+def _systemctl_user(*args: str, timeout: float = 5) -> bool:
+    """Run `systemctl --user <args>` and report success.
 
     Returns:
-        True if service is enabled, False otherwise.
+        True if systemctl exited with status 0, False otherwise.
     """
     try:
         result = subprocess.run(
-            ["systemctl", "--user", "is-enabled", "llm-assistant.service"],
+            ["systemctl", "--user", *args],
             capture_output=True,
             text=True,
-            timeout=5
-        )
-        return result.returncode == 0
-    except (subprocess.TimeoutExpired, FileNotFoundError, OSError):
-        return False
-
-
-def _start_via_systemctl() -> bool:
-    """Start daemon via systemctl --user start.
-
-    Returns:
-        True if started successfully, False otherwise.
-    """
-    try:
-        result = subprocess.run(
-            ["systemctl", "--user", "start", "llm-assistant.service"],
-            capture_output=True,
-            text=True,
-            timeout=10
+            timeout=timeout
         )
         return result.returncode == 0
     except (subprocess.TimeoutExpired, FileNotFoundError, OSError):
@@ -100,8 +86,11 @@ def _start_via_systemctl() -> bool:
 def start_daemon(model: Optional[str] = None) -> bool:
     """Start the llm-assistant daemon in background.
 
-    If systemd user service is enabled, uses systemctl --user start for
-    faster startup. Otherwise, falls back to subprocess.Popen method.
+    If the systemd socket unit is enabled, starts it: once systemd listens,
+    connections are queued by the kernel and activate the daemon, so there
+    is nothing to wait for. Otherwise, if the systemd user service is
+    enabled, uses systemctl --user start (which returns once the daemon has
+    signalled readiness). Falls back to subprocess.Popen.
 
     Tries absolute path first (for espanso and GUI apps where PATH
     may not include ~/.local/bin), then falls back to PATH lookup.
@@ -114,9 +103,14 @@ def start_daemon(model: Optional[str] = None) -> bool:
     """
     socket_path = get_socket_path()
 
-    # Try systemd first if service is enabled
-    if _is_systemd_service_enabled():
-        if _start_via_systemctl():
+    # Socket activation: a listening socket is all a client needs
+    if _systemctl_user("is-enabled", "llm-assistant.socket"):
+        if _systemctl_user("start", "llm-assistant.socket", timeout=10) and is_daemon_running():
+            return True
+
+    # Service without socket unit: start blocks until READY=1
+    if _systemctl_user("is-enabled", "llm-assistant.service"):
+        if _systemctl_user("start", "llm-assistant.service", timeout=10):
             # Wait for socket to appear
             start_time = time.time()
             while time.time() - start_time < DAEMON_STARTUP_TIMEOUT:
@@ -276,6 +270,46 @@ def connect_to_daemon(timeout: float = REQUEST_TIMEOUT) -> socket.socket:
         raise ConnectionError(f"Failed to connect to daemon: {e}")
 
 
+def cancel_request(terminal_id: str) -> bool:
+    """Ask the daemon to cancel the in-flight query for a terminal.
+
+    Best-effort and quick: used from Ctrl+C handlers, so it never starts the
+    daemon and gives up after SOCKET_CONNECT_TIMEOUT.
+
+    Args:
+        terminal_id: Terminal session ID whose query should be cancelled
+
+    Returns:
+        True if the daemon had an active query to cancel, False otherwise.
+    """
+    active = False
+    try:
+        sock = connect_to_daemon(timeout=SOCKET_CONNECT_TIMEOUT)
+    except ConnectionError:
+        return False
+    try:
+        sock.sendall(json.dumps({"cmd": "cancel", "tid": terminal_id}).encode('utf-8'))
+        sock.shutdown(socket.SHUT_WR)
+        data = b""
+        while True:
+            chunk = sock.recv(RECV_BUFFER_SIZE)
+            if not chunk:
+                break
+            data += chunk
+        for line in data.decode('utf-8', 'replace').splitlines():
+            try:
+                event = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if event.get('type') == 'cancelled':
+                active = bool(event.get('active'))
+    except (socket.error, OSError):
+        pass
+    finally:
+        sock.close()
+    return active
+
+
 def stream_events(request: dict) -> Iterator[dict]:
     """Send JSON request to daemon and yield NDJSON events.
 
@@ -0,0 +1,234 @@
+"""Cached directory listings and fuzzy matching for @ completions.
+
+This module provides DirectoryIndex, used by AtHandler when a long-lived
+process (the llm-assistant daemon) serves completion requests:
+
+- One os.scandir() per directory, reused until the directory's mtime
+  changes (adding, removing or renaming an entry updates it)
+- Listed directories are watched with a FileWatcher (inotify): a change
+  marks the listing for re-checking at once, and otherwise it is trusted
+  without a stat() call for WATCHED_REVALIDATE_SECONDS. Without inotify
+  (not Linux, watch limit reached) the window is REVALIDATE_SECONDS, so a
+  burst of keystrokes still costs no filesystem access at all
+- The periodic mtime check also catches changes inotify never reports,
+  such as files created by another host on an NFS mount
+- prefetch() walks a directory tree a few levels deep on one shared
+  background thread, so the first completion in a new cwd is already warm
+- fuzzy_score() ranks names by prefix, substring, then subsequence match
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, NamedTuple, Optional, Tuple
+
+from .file_watch import FileWatcher, create_file_watcher
+
+# Trust a listing this long before re-checking the directory mtime
+REVALIDATE_SECONDS = 1.0
+
+# Same for listings of watched directories (inotify reports local changes)
+WATCHED_REVALIDATE_SECONDS = 30.0
+
+# Maximum directories kept in the index
+MAX_DIRECTORIES = 2048
+
+# prefetch() limits
+PREFETCH_DEPTH = 2
+PREFETCH_MAX_DIRS = 256
+
+# Don't re-walk the same root more often than this
+PREFETCH_INTERVAL_SECONDS = 30.0
+
+# Roots remembered for PREFETCH_INTERVAL_SECONDS (least recent dropped first)
+PREFETCH_MAX_ROOTS = 64
+
+
+class DirEntry(NamedTuple):
+    """A directory entry as needed for completions."""
+    name: str
+    is_dir: bool
+    is_file: bool
+
+
+def scan_directory(path: str) -> List[DirEntry]:
+    """List a directory (sorted by name, hidden entries included)."""
+    entries = []
+    with os.scandir(path) as it:
+        for entry in it:
+            try:
+                is_dir = entry.is_dir()
+                is_file = not is_dir and entry.is_file()
+            except OSError:
+                continue
+            entries.append(DirEntry(entry.name, is_dir, is_file))
+    entries.sort(key=lambda e: e.name)
+    return entries
+
+
+def fuzzy_score(pattern: str, name: str) -> Optional[Tuple[int, ...]]:
+    """Score how well name matches pattern (lower is better), or None.
+
+    Case-insensitive. Prefix matches rank first, then substring matches
+    (earlier is better), then subsequence matches (tighter, then earlier
+    is better). Equal scores are left to the caller's name ordering.
+    """
+    if not pattern:
+        return (0, 0)
+    pattern = pattern.lower()
+    lowered = name.lower()
+    if lowered.startswith(pattern):
+        return (0, 0)
+    pos = lowered.find(pattern)
+    if pos >= 0:
+        return (1, pos)
+    # Subsequence: every pattern character in order
+    idx = -1
+    first = None
+    for ch in pattern:
+        idx = lowered.find(ch, idx + 1)
+        if idx < 0:
+            return None
+        if first is None:
+            first = idx
+    return (2, idx - first, first)
+
+
+class DirectoryIndex:
+    """Thread-safe LRU of directory listings, kept current by inotify or mtime.
+
+    With watch=False listings are only validated by mtime.
+    """
+
+    def __init__(self, max_directories: int = MAX_DIRECTORIES, watch: bool = True):
+        self.max_directories = max_directories
+        self._lock = threading.Lock()
+        # path -> (mtime_ns, checked_at, entries, watched)
+        self._listings: "OrderedDict[str, Tuple[int, float, List[DirEntry], bool]]" = OrderedDict()
+        self._changes = 0  # bumped by every watcher event
+        self._watch = watch
+        self._watcher: Optional[FileWatcher] = None
+        self._prefetched: "OrderedDict[str, float]" = OrderedDict()  # root -> time of last prefetch
+        self._prefetcher: Optional[ThreadPoolExecutor] = None
+
+    def _get_watcher(self) -> Optional[FileWatcher]:
+        with self._lock:
+            if self._watch and self._watcher is None:
+                self._watcher = create_file_watcher(self._on_change)
+                self._watch = self._watcher is not None
+            return self._watcher
+
+    def _on_change(self, path: Optional[str]) -> None:
+        """Watcher callback: re-check the changed directory on its next list()."""
+        with self._lock:
+            self._changes += 1
+            if path is None:
+                stale = list(self._listings)
+            else:
+                stale = [os.path.dirname(path), path]
+            for directory in stale:
+                cached = self._listings.get(directory)
+                if cached is not None:
+                    self._listings[directory] = (cached[0], float("-inf"), cached[2], cached[3])
+
+    def list(self, path: str) -> List[DirEntry]:
+        """Return the (cached) listing of path.
+
+        Raises:
+            OSError: If the directory cannot be read
+        """
+        path = os.path.abspath(path)
+        now = time.monotonic()
+        with self._lock:
+            cached = self._listings.get(path)
+            if cached is not None:
+                window = WATCHED_REVALIDATE_SECONDS if cached[3] else REVALIDATE_SECONDS
+                if now - cached[1] < window:
+                    self._listings.move_to_end(path)
+                    return cached[2]
+            changes = self._changes
+
+        # Watch before reading, so a change during the scan is not missed
+        watcher = self._get_watcher()
+        watched = watcher.watch(path) if watcher is not None else False
+        mtime = os.stat(path).st_mtime_ns
+        if cached is not None and cached[0] == mtime:
+            entries = cached[2]
+        else:
+            entries = scan_directory(path)
+        evicted = []
+        with self._lock:
+            if self._changes != changes:
+                now = float("-inf")  # Something changed meanwhile: re-check next time
+            self._listings[path] = (mtime, now, entries, watched)
+            self._listings.move_to_end(path)
+            while len(self._listings) > self.max_directories:
+                evicted.append(self._listings.popitem(last=False))
+        if watcher is not None:
+            for directory, (_, _, _, was_watched) in evicted:
+                if was_watched:
+                    watcher.unwatch(directory)
+        return entries
+
+    def invalidate(self, path: Optional[str] = None) -> None:
+        """Forget one directory, or everything."""
+        with self._lock:
+            if path is None:
+                self._listings.clear()
+            else:
+                self._listings.pop(os.path.abspath(path), None)
+
+    def __contains__(self, path: str) -> bool:
+        with self._lock:
+            return os.path.abspath(path) in self._listings
+
+    def prefetch(self, root: str, depth: int = PREFETCH_DEPTH) -> Optional[Future]:
+        """Warm listings under root on the background prefetch thread.
+
+        Visits at most PREFETCH_MAX_DIRS non-hidden directories, breadth
+        first. Returns the walk's future, or None if root was walked
+        recently.
+        """
+        root = os.path.abspath(root)
+        now = time.monotonic()
+        with self._lock:
+            last = self._prefetched.get(root)
+            if last is not None and now - last < PREFETCH_INTERVAL_SECONDS:
+                return None
+            self._prefetched[root] = now
+            self._prefetched.move_to_end(root)
+            while len(self._prefetched) > PREFETCH_MAX_ROOTS:
+                self._prefetched.popitem(last=False)
+            if self._prefetcher is None:
+                self._prefetcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="dir-prefetch")
+            prefetcher = self._prefetcher
+        return prefetcher.submit(self._walk, root, depth)
+
+    def close(self) -> None:
+        """Stop the prefetch thread and the watcher."""
+        with self._lock:
+            prefetcher, self._prefetcher = self._prefetcher, None
+            watcher, self._watcher = self._watcher, None
+            self._watch = False
+        if prefetcher is not None:
+            prefetcher.shutdown(wait=False)
+        if watcher is not None:
+            watcher.close()
+
+    def _walk(self, root: str, depth: int) -> None:
+        queue = [(root, 0)]
+        visited = 0
+        while queue and visited < PREFETCH_MAX_DIRS:
+            path, level = queue.pop(0)
+            try:
+                entries = self.list(path)
+            except OSError:
+                continue
+            visited += 1
+            if level >= depth:
+                continue
+            for entry in entries:
+                if entry.is_dir and not entry.name.startswith("."):
+                    queue.append((os.path.join(path, entry.name), level + 1))
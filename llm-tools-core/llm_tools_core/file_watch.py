@@ -0,0 +1,183 @@
+"""inotify change notification for cached files and directories.
+
+This module provides FileWatcher, used by llm-assistant's shared_state to
+serve parsed AGENTS.md, KB and skills data without stat() calls, and by
+DirectoryIndex to keep @ completion listings current:
+
+- Directories are watched, not files, so editors that save by writing a
+  temporary file and renaming it are seen too
+- Recursive watches follow subdirectories created later
+- The callback receives the full path of every changed entry, or None
+  when the kernel queue overflowed and everything must be treated as
+  changed
+- One background thread per watcher; stdlib only (inotify via ctypes)
+
+create_file_watcher() returns None where inotify is unavailable (not Linux,
+no libc, instance limit reached); callers then keep validating by mtime.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+from typing import Callable, Dict, Optional, Set
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+WATCH_MASK = (
+    IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+    | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+)
+
+_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+class FileWatcher:
+    """inotify watches on directories, reported to a callback.
+
+    callback(path) runs on the watcher thread; it must be quick and must not
+    call back into the watcher.
+    """
+
+    def __init__(self, callback: Callable[[Optional[str]], None]):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._rm_watch = libc.inotify_rm_watch
+        self._rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self._fd = fd
+        self._callback = callback
+        self._lock = threading.Lock()
+        self._paths: Dict[int, str] = {}  # wd -> directory
+        self._wds: Dict[str, int] = {}  # directory -> wd
+        self._recursive: Set[int] = set()
+        self._stop_r, self._stop_w = os.pipe()
+        self._thread = threading.Thread(target=self._run, name="file-watch", daemon=True)
+        self._thread.start()
+
+    def watch(self, directory: str, recursive: bool = False) -> bool:
+        """Watch a directory (and, if recursive, its subdirectories).
+
+        Returns False if it cannot be watched (missing, watch limit reached).
+        """
+        directory = os.path.abspath(directory)
+        with self._lock:
+            wd = self._wds.get(directory)
+            if wd is not None and (not recursive or wd in self._recursive):
+                return True
+            return self._add(directory, recursive)
+
+    def unwatch(self, directory: str) -> None:
+        """Stop watching a directory (its subdirectories keep their watches)."""
+        directory = os.path.abspath(directory)
+        with self._lock:
+            wd = self._wds.pop(directory, None)
+            if wd is None:
+                return
+            del self._paths[wd]
+            self._recursive.discard(wd)
+            self._rm_watch(self._fd, wd)
+
+    def _add(self, directory: str, recursive: bool) -> bool:
+        wd = self._add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            return False
+        self._paths[wd] = directory
+        self._wds[directory] = wd
+        if not recursive:
+            return True
+        self._recursive.add(wd)
+        ok = True
+        try:
+            with os.scandir(directory) as it:
+                subdirs = [e.path for e in it if e.is_dir(follow_symlinks=False)]
+        except OSError:
+            return False
+        for sub in subdirs:
+            if self._wds.get(sub) not in self._recursive:
+                ok = self._add(sub, True) and ok
+        return ok
+
+    def _run(self) -> None:
+        while True:
+            try:
+                ready, _, _ = select.select([self._fd, self._stop_r], [], [])
+            except (OSError, ValueError):
+                return
+            if self._stop_r in ready:
+                return
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+            except OSError:
+                return
+            for path in self._parse(data):
+                try:
+                    self._callback(path)
+                except Exception as e:
+                    print(f"[file-watch] callback failed: {e}", file=sys.stderr)
+
+    def _parse(self, data: bytes) -> list:
+        changed: list = []
+        offset = 0
+        with self._lock:
+            while offset + _EVENT.size <= len(data):
+                wd, mask, _cookie, length = _EVENT.unpack_from(data, offset)
+                raw_name = data[offset + _EVENT.size:offset + _EVENT.size + length]
+                offset += _EVENT.size + length
+                if mask & IN_Q_OVERFLOW:
+                    return [None]
+                directory = self._paths.get(wd)
+                if directory is None:
+                    continue
+                if mask & IN_IGNORED:
+                    # Watch removed by the kernel (directory deleted or moved)
+                    del self._paths[wd]
+                    self._wds.pop(directory, None)
+                    self._recursive.discard(wd)
+                    continue
+                name = os.fsdecode(raw_name.rstrip(b"\0"))
+                path = os.path.join(directory, name) if name else directory
+                if (mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO)
+                        and wd in self._recursive):
+                    self._add(path, True)
+                if path not in changed:
+                    changed.append(path)
+        return changed
+
+    def close(self) -> None:
+        """Stop the watcher thread and release the inotify instance."""
+        os.write(self._stop_w, b"x")
+        self._thread.join(timeout=1)
+        for fd in (self._fd, self._stop_r, self._stop_w):
+            os.close(fd)
+
+
+def create_file_watcher(callback: Callable[[Optional[str]], None]) -> Optional[FileWatcher]:
+    """Return a FileWatcher, or None where inotify is unavailable."""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        return FileWatcher(callback)
+    except (OSError, AttributeError):
+        return None
@@ -0,0 +1,198 @@
+"""Bounded windows into large text files for @file: references.
+
+This module provides read_window(), used by AtHandler for references like
+@file:big.log#tail=2000. The file is memory-mapped and scanned in
+SCAN_CHUNK-sized slices with bytes.count/find/rfind and compiled regexes,
+so memory stays constant no matter how large the file is:
+
+- head=N: first N lines
+- tail=N: last N lines
+- lines=A-B: lines A through B (1-based, inclusive)
+- grep=PATTERN: lines matching a regex, prefixed with their line numbers
+
+Output is capped at max_bytes; longer windows are cut (from the front for
+tail, from the end otherwise) and the header says so.
+"""
+
+import mmap
+import re
+from typing import List, Tuple
+
+# Slice size for newline counting; bounds the temporary copy per step
+SCAN_CHUNK = 1024 * 1024
+
+# Upper bound on matching lines collected by grep
+MAX_GREP_MATCHES = 10000
+
+WINDOW_KINDS = ("head", "tail", "lines", "grep")
+
+
+def parse_window(spec: str) -> Tuple[str, str]:
+    """Parse "tail=2000" into ("tail", "2000").
+
+    Raises:
+        ValueError: If the kind is unknown or the argument is missing
+    """
+    kind, sep, arg = spec.partition("=")
+    kind = kind.strip().lower()
+    if kind not in WINDOW_KINDS or not sep or not arg:
+        raise ValueError(
+            f"Invalid file window '#{spec}' (use #head=N, #tail=N, #lines=A-B or #grep=PATTERN)"
+        )
+    return kind, arg
+
+
+def _positive_int(value: str, what: str) -> int:
+    try:
+        number = int(value)
+    except ValueError:
+        raise ValueError(f"Invalid {what}: {value}") from None
+    if number < 1:
+        raise ValueError(f"Invalid {what}: {value}")
+    return number
+
+
+def _offset_of_line(mm: mmap.mmap, line: int, pos: int = 0) -> int:
+    """Byte offset where 1-based line starts, counting from pos.
+
+    Returns len(mm) if the file has fewer lines.
+    """
+    remaining = line - 1
+    size = len(mm)
+    while remaining and pos < size:
+        chunk = mm[pos:pos + SCAN_CHUNK]
+        count = chunk.count(b"\n")
+        if count < remaining:
+            remaining -= count
+            pos += len(chunk)
+            continue
+        # Target newline is inside this chunk
+        idx = -1
+        for _ in range(remaining):
+            idx = chunk.find(b"\n", idx + 1)
+        return pos + idx + 1
+    return pos if not remaining else size
+
+
+def _count_newlines(mm: mmap.mmap, start: int, end: int) -> int:
+    total = 0
+    while start < end:
+        stop = min(start + SCAN_CHUNK, end)
+        total += mm[start:stop].count(b"\n")
+        start = stop
+    return total
+
+
+def _head(mm: mmap.mmap, n: int) -> Tuple[int, int]:
+    return 0, _offset_of_line(mm, n + 1)
+
+
+def _tail(mm: mmap.mmap, n: int) -> Tuple[int, int]:
+    end = len(mm)
+    # Ignore the newline that terminates the last line
+    search_end = end - 1 if end and mm[end - 1:end] == b"\n" else end
+    pos = search_end
+    for _ in range(n):
+        pos = mm.rfind(b"\n", 0, pos)
+        if pos < 0:
+            return 0, end
+    return pos + 1, end
+
+
+def _grep(mm: mmap.mmap, pattern: str, max_bytes: int) -> Tuple[List[str], int]:
+    """Return (numbered matching lines, total matching lines).
+
+    Lines are collected until max_bytes; later matches are only counted.
+    """
+    try:
+        regex = re.compile(pattern.encode())
+    except re.error as e:
+        raise ValueError(f"Invalid grep pattern '{pattern}': {e}") from None
+
+    lines: List[str] = []
+    collected = 0
+    total = 0
+    line_no = 1
+    counted_to = 0
+    last_line_start = -1
+    size = len(mm)
+    for match in regex.finditer(mm):
+        start = mm.rfind(b"\n", 0, match.start()) + 1
+        if start == last_line_start:
+            continue  # Several matches on one line
+        last_line_start = start
+        line_no += _count_newlines(mm, counted_to, start)
+        counted_to = start
+        total += 1
+        if len(lines) < MAX_GREP_MATCHES and collected < max_bytes:
+            end = mm.find(b"\n", match.start())
+            end = size if end < 0 else end
+            line = f"{line_no}: {mm[start:min(end, start + max_bytes)].decode('utf-8', errors='replace')}"
+            lines.append(line)
+            collected += len(line) + 1
+    return lines, total
+
+
+def read_window(path: str, spec: str, max_bytes: int) -> str:
+    """Return the window of path described by spec ("tail=2000", ...).
+
+    Args:
+        path: Text file path
+        spec: Window spec after '#'
+        max_bytes: Output cap in bytes
+
+    Raises:
+        ValueError: For malformed specs or patterns
+        OSError: If the file cannot be read
+    """
+    kind, arg = parse_window(spec)
+
+    with open(path, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return f"[{kind}={arg}: empty file]"
+        with mm:
+            if kind == "grep":
+                lines, total = _grep(mm, arg, max_bytes)
+                header = f"[grep {arg}: {total} matching line(s)"
+                if total > len(lines):
+                    header += f", first {len(lines)} shown"
+                body = "\n".join(lines)
+                return _cap(header, body, max_bytes)
+
+            if kind == "head":
+                start, end = _head(mm, _positive_int(arg, "line count"))
+                header = f"[first {arg} line(s)"
+            elif kind == "tail":
+                start, end = _tail(mm, _positive_int(arg, "line count"))
+                header = f"[last {arg} line(s)"
+            else:
+                first, _, last = arg.partition("-")
+                first_line = _positive_int(first, "line range")
+                last_line = _positive_int(last, "line range") if last else first_line
+                if last_line < first_line:
+                    raise ValueError(f"Invalid line range: {arg}")
+                start = _offset_of_line(mm, first_line)
+                end = _offset_of_line(mm, last_line - first_line + 2, start)
+                header = f"[lines {first_line}-{last_line}"
+
+            # Never copy more than max_bytes out of the mapping
+            truncated = end - start > max_bytes
+            if truncated:
+                if kind == "tail":
+                    start = end - max_bytes
+                else:
+                    end = start + max_bytes
+            body = mm[start:end].decode("utf-8", errors="replace")
+            if truncated:
+                header += f", cut to {max_bytes} bytes"
+            return f"{header}]\n{body}"
+
+
+def _cap(header: str, body: str, max_bytes: int) -> str:
+    data = body.encode("utf-8")
+    if len(data) > max_bytes:
+        body = data[:max_bytes].decode("utf-8", errors="ignore")
+        header += f", cut to {max_bytes} bytes"
+    return f"{header}]\n{body}"
@@ -0,0 +1,293 @@
+"""Content-addressed cache for resolved @ reference fragments.
+
+This module provides FragmentCache, used by AtHandler to avoid re-extracting
+PDFs and re-fetching URLs that have not changed:
+
+- Entries are keyed by the reference (e.g. "pdf:/abs/report.pdf") and carry
+  a validator: (mtime_ns, size) for local files, (ETag, Last-Modified) for
+  URLs, or a creation time for sources without validators (YouTube, arXiv).
+- Content is stored once per SHA256 under blobs/, so two references with
+  the same text share one file.
+- Total blob size is bounded; least recently used entries are evicted first.
+- A small in-memory layer serves repeats within a process without touching
+  the disk beyond the validator's stat() call.
+- Reads only update recency in memory; the index is written on put, clear,
+  flush() or process exit, so a cache hit costs no index rewrite.
+
+Storage: XDG_CACHE_HOME/llm-assistant/fragments/ (index.json + blobs/).
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Hashable, Iterable, Mapping, Optional, Tuple
+
+from .xdg import get_cache_dir
+
+# Defaults for the on-disk store and the in-process layer
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_MEMORY_BYTES = 32 * 1024 * 1024
+
+# Sources without validators (YouTube transcripts, arXiv papers) are
+# trusted for this long
+STATIC_MAX_AGE_SECONDS = 7 * 24 * 3600
+
+# Timeout for the conditional HEAD request used to validate cached URLs
+URL_VALIDATE_TIMEOUT = 5
+
+
+def file_validator(path) -> Optional[Tuple[int, int]]:
+    """Return (mtime_ns, size) for a local file, or None if missing."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def url_validator(url: str) -> Optional[Tuple[str, str]]:
+    """Return (ETag, Last-Modified) from a HEAD request, or None.
+
+    None means the server sent neither header (or the request failed), so the
+    URL cannot be validated and must be fetched again.
+    """
+    import urllib.request
+
+    try:
+        request = urllib.request.Request(url, method="HEAD", headers={"User-Agent": "llm-assistant"})
+        with urllib.request.urlopen(request, timeout=URL_VALIDATE_TIMEOUT) as resp:
+            etag = resp.headers.get("ETag") or ""
+            modified = resp.headers.get("Last-Modified") or ""
+    except Exception:
+        return None
+    if not etag and not modified:
+        return None
+    return (etag, modified)
+
+
+def static_validator() -> Tuple[str]:
+    """Validator for sources that are not expected to change."""
+    return ("static",)
+
+
+class FragmentCache:
+    """On-disk LRU cache of fragment text, bounded by total bytes.
+
+    Thread-safe within a process. Multiple processes may share a cache
+    directory: writes are atomic renames, and a lost index update only
+    costs a re-extraction.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[Path] = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        memory_bytes: int = DEFAULT_MEMORY_BYTES,
+    ):
+        self.directory = Path(directory) if directory else get_cache_dir("llm-assistant") / "fragments"
+        self.max_bytes = max_bytes
+        self.memory_bytes = memory_bytes
+        self._lock = threading.Lock()
+        self._index: Optional[Dict[str, dict]] = None
+        # Recency updated by get() but not yet written to index.json
+        self._dirty = False
+        # key -> (validator, content), most recently used last
+        self._memory: "OrderedDict[str, Tuple[Hashable, str]]" = OrderedDict()
+        self._memory_size = 0
+        atexit.register(self.flush)
+
+    # -- public API -----------------------------------------------------------
+
+    def get(self, key: str, validator: Hashable) -> Optional[str]:
+        """Return cached content for key if its validator still matches."""
+        if validator is None:
+            return None
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None and cached[0] == validator:
+                self._memory.move_to_end(key)
+                return cached[1]
+
+            index = self._load_index()
+            entry = index.get(key)
+            if entry is None or _freeze(entry["validator"]) != validator:
+                return None
+            if validator == static_validator() and time.time() - entry["created"] > STATIC_MAX_AGE_SECONDS:
+                return None
+            try:
+                content = self._blob_path(entry["hash"]).read_text(encoding="utf-8")
+            except OSError:
+                index.pop(key, None)
+                return None
+            entry["used"] = time.time()
+            self._dirty = True
+            self._remember(key, validator, content)
+            return content
+
+    def get_many(self, keys: Iterable[str], validator: Hashable) -> Dict[str, str]:
+        """Cached content of each key whose validator still matches.
+
+        Keys without a valid entry are left out of the result.
+        """
+        found = {}
+        for key in keys:
+            content = self.get(key, validator)
+            if content is not None:
+                found[key] = content
+        return found
+
+    def put(self, key: str, validator: Hashable, content: str) -> None:
+        """Store content for key; no-op if validator is None."""
+        self.put_many({key: content}, validator)
+
+    def put_many(self, items: Mapping[str, str], validator: Hashable) -> None:
+        """Store several entries sharing one validator, with one index write.
+
+        Used for per-page PDF text, where put() per page would rewrite the
+        index once per page.
+        """
+        if validator is None:
+            return
+        with self._lock:
+            index = self._load_index()
+            stored = False
+            for key, content in items.items():
+                if content is None:
+                    continue
+                data = content.encode("utf-8")
+                if len(data) > self.max_bytes:
+                    continue
+                digest = hashlib.sha256(data).hexdigest()
+                blob = self._blob_path(digest)
+                if not blob.exists():
+                    blob.parent.mkdir(parents=True, exist_ok=True)
+                    _atomic_write(blob, data)
+                now = time.time()
+                index[key] = {
+                    "hash": digest,
+                    "size": len(data),
+                    "validator": list(validator),
+                    "created": now,
+                    "used": now,
+                }
+                self._remember(key, validator, content)
+                stored = True
+            if stored:
+                self._evict(index)
+                self._save_index()
+
+    def flush(self) -> None:
+        """Write recency updated by get() to the index."""
+        with self._lock:
+            if self._dirty:
+                self._save_index()
+
+    def total_bytes(self) -> int:
+        """Bytes of distinct blobs referenced by the index."""
+        with self._lock:
+            return sum(_unique_sizes(self._load_index()).values())
+
+    def clear(self) -> None:
+        """Remove every entry and blob."""
+        with self._lock:
+            index = self._load_index()
+            for digest in _unique_sizes(index):
+                try:
+                    self._blob_path(digest).unlink()
+                except OSError:
+                    pass
+            index.clear()
+            self._save_index()
+            self._memory.clear()
+            self._memory_size = 0
+
+    # -- internals (caller holds self._lock) ----------------------------------
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.directory / "blobs" / digest[:2] / digest
+
+    def _load_index(self) -> Dict[str, dict]:
+        if self._index is None:
+            try:
+                self._index = json.loads((self.directory / "index.json").read_text())
+            except (OSError, ValueError):
+                self._index = {}
+        return self._index
+
+    def _save_index(self) -> None:
+        self._dirty = False
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            _atomic_write(self.directory / "index.json", json.dumps(self._index).encode())
+        except OSError:
+            pass  # Cache is best-effort
+
+    def _evict(self, index: Dict[str, dict]) -> None:
+        sizes = _unique_sizes(index)
+        total = sum(sizes.values())
+        if total <= self.max_bytes:
+            return
+        for key, entry in sorted(index.items(), key=lambda kv: kv[1]["used"]):
+            if total <= self.max_bytes:
+                break
+            del index[key]
+            digest = entry["hash"]
+            if any(e["hash"] == digest for e in index.values()):
+                continue  # Blob still referenced by another key
+            total -= sizes.pop(digest, 0)
+            try:
+                self._blob_path(digest).unlink()
+            except OSError:
+                pass
+
+    def _remember(self, key: str, validator: Hashable, content: str) -> None:
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_size -= len(old[1])
+        if len(content) > self.memory_bytes:
+            return
+        self._memory[key] = (validator, content)
+        self._memory_size += len(content)
+        while self._memory_size > self.memory_bytes:
+            _, (_, dropped) = self._memory.popitem(last=False)
+            self._memory_size -= len(dropped)
+
+
+def _freeze(value) -> Hashable:
+    """JSON round-trips tuples as lists; compare validators as tuples."""
+    return tuple(value) if isinstance(value, list) else value
+
+
+def _unique_sizes(index: Dict[str, dict]) -> Dict[str, int]:
+    return {entry["hash"]: entry["size"] for entry in index.values()}
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+_default_cache: Optional[FragmentCache] = None
+
+
+def get_fragment_cache() -> FragmentCache:
+    """Return the process-wide FragmentCache."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = FragmentCache()
+    return _default_cache
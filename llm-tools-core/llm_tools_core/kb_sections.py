@@ -0,0 +1,101 @@
+"""Heading-based sections of a markdown knowledge base.
+
+This module provides KBSectionIndex, used by llm-assistant's KB mixin to
+inject only the parts of a large knowledge base that matter for the
+current query:
+
+- The file is split at headings (levels 1-3); headings inside code fences
+  do not split
+- Front matter (YAML header, title and intro before the first section) is
+  kept apart so it can always be included
+- Each section is indexed with its heading path ("Web > SQL injection") so
+  a match on a parent heading ranks its subsections
+- search() returns the top-k sections by BM25 score, in document order
+"""
+
+import re
+from dataclasses import dataclass
+from typing import List, Tuple
+
+from .bm25 import BM25Index
+
+# Deepest heading level that starts a new section
+MAX_SECTION_LEVEL = 3
+
+_HEADING_RE = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+_FENCE_RE = re.compile(r"^\s*(```|~~~)")
+
+
+@dataclass
+class KBSection:
+    """One heading and the text up to the next heading of level <= 3."""
+    heading: str  # Heading path, e.g. "Web > SQL injection"
+    text: str  # Including the heading line
+
+
+def split_sections(markdown: str, max_level: int = MAX_SECTION_LEVEL) -> Tuple[str, List[KBSection]]:
+    """Split markdown into front matter and sections.
+
+    Returns:
+        (front matter, sections in document order)
+    """
+    lines = markdown.splitlines(keepends=True)
+    front: List[str] = []
+    start = 0
+
+    # YAML front matter may contain "# comments" that are not headings
+    if lines and lines[0].strip() == "---":
+        for i in range(1, len(lines)):
+            if lines[i].strip() in ("---", "..."):
+                front.extend(lines[:i + 1])
+                start = i + 1
+                break
+
+    sections: List[KBSection] = []
+    current: List[str] = []
+    path: List[Tuple[int, str]] = []
+    in_fence = False
+    seen_heading = False
+
+    def finish():
+        if current and sections:
+            sections[-1].text = "".join(current)
+
+    for line in lines[start:]:
+        if _FENCE_RE.match(line):
+            in_fence = not in_fence
+        match = None if in_fence else _HEADING_RE.match(line)
+        level = len(match.group(1)) if match else 0
+        # A leading H1 is the document title and belongs to the front matter
+        if match and level <= max_level and not (level == 1 and not seen_heading):
+            finish()
+            path = [(lvl, title) for lvl, title in path if lvl < level]
+            path.append((level, match.group(2)))
+            sections.append(KBSection(" > ".join(title for _, title in path), ""))
+            current = [line]
+        elif sections:
+            current.append(line)
+        else:
+            front.append(line)
+        if match:
+            seen_heading = True
+    finish()
+    return "".join(front).strip(), sections
+
+
+class KBSectionIndex:
+    """BM25 index over the sections of one knowledge base."""
+
+    def __init__(self, markdown: str, max_level: int = MAX_SECTION_LEVEL):
+        self.front, self.sections = split_sections(markdown, max_level)
+        self._index = BM25Index([f"{s.heading}\n{s.text}" for s in self.sections])
+
+    def search(self, query: str, top_k: int) -> List[KBSection]:
+        """Best-matching sections (score > 0), at most top_k, in document order."""
+        scores = self._index.scores(query)
+        ranked = sorted(
+            (i for i, score in enumerate(scores) if score > 0),
+            key=lambda i: scores[i],
+            reverse=True,
+        )[:top_k]
+        return [self.sections[i] for i in sorted(ranked)]
@@ -4,12 +4,14 @@ This module provides markdown stripping and extraction functions used by:
 - llm-assistant (TTS speech synthesis, clipboard copy)
 - llm-inlineassistant (clipboard copy)
 - llm-guiassistant (smart actions on code blocks)
+- MarkdownStream: incremental rendering of streamed responses
+  (llm-assistant TUI, llm-inlineassistant)
 
 The strip_markdown library is optional - functions degrade gracefully
 to regex-based fallbacks when not installed.
 """
 import re
-from typing import List, Tuple
+from typing import Callable, List, Optional, Tuple
 
 # Regex to remove fenced code blocks entirely
 _CODE_BLOCK_RE = re.compile(r'```[\s\S]*?```', re.MULTILINE)
@@ -172,3 +174,164 @@ def extract_code_blocks(text: str) -> List[Tuple[str, str]]:
     """
     matches = _CODE_BLOCK_EXTRACT_RE.findall(text)
     return [(lang, code.rstrip('\n')) for lang, code in matches]
+
+
+# Line patterns for streaming block detection (CommonMark allows up to
+# three spaces of indentation before a block marker)
+_FENCE_OPEN_RE = re.compile(r'^ {0,3}(`{3,}|~{3,})')
+_ATX_HEADING_RE = re.compile(r'^ {0,3}#{1,6}(\s|$)')
+_LIST_ITEM_RE = re.compile(r'^ {0,3}([-*+]|\d{1,9}[.)])(\s|$)')
+
+
+class _MarkdownTail:
+    """Rich renderable that parses its markdown only when actually drawn.
+
+    Live redraws at its refresh rate, so parsing here (instead of building
+    a Markdown object per chunk) keeps per-chunk work independent of the
+    size of the open block.
+    """
+
+    def __init__(self, text: str, markdown_kwargs: dict):
+        self.text = text
+        self.markdown_kwargs = markdown_kwargs
+
+    def __rich_console__(self, console, options):
+        if self.text.strip():
+            from rich.markdown import Markdown
+            yield Markdown(self.text, **self.markdown_kwargs)
+
+
+class MarkdownStream:
+    """Incremental markdown renderer for streamed model output.
+
+    Calling live.update(Markdown(accumulated_text)) per chunk re-parses and
+    re-lays-out the whole answer every time, which is quadratic over a long
+    response. MarkdownStream splits the stream into top-level blocks instead:
+    finished blocks (paragraphs, headings, tables, lists, closed code fences)
+    are printed to the console once and become scrollback, and only the
+    trailing open block is exposed via `tail` for a Live display.
+
+    Like ConsoleHelper, this does not import rich at module level; the
+    caller provides the console.
+
+    Usage:
+        stream = MarkdownStream(console)
+        with Live(console=console, transient=True) as live:
+            for chunk in response:
+                stream.feed(chunk)
+                live.update(stream.tail)
+            stream.finish()
+    """
+
+    def __init__(self, console, **markdown_kwargs):
+        self.console = console
+        self.markdown_kwargs = markdown_kwargs
+        self._pending = ""        # Uncommitted text (the open block)
+        self._scan = 0            # Offset in _pending of the first unscanned line
+        self._kind: Optional[str] = None  # Open block: para, list, fence or None
+        self._fence: Optional[str] = None  # Opening fence marker while in a fence
+        self._list_blank = False  # Blank line seen inside the open list
+        self._blocks_printed = 0
+        self.has_content = False
+
+    @property
+    def tail(self) -> _MarkdownTail:
+        """Renderable for the trailing, still-open block."""
+        return _MarkdownTail(self._pending, self.markdown_kwargs)
+
+    def feed(self, chunk: str) -> None:
+        """Add a chunk of streamed text, committing any blocks it completes."""
+        if not chunk:
+            return
+        self._pending += chunk
+        if not self.has_content and chunk.strip():
+            self.has_content = True
+
+        while True:
+            end = self._pending.find('\n', self._scan)
+            if end == -1:
+                break
+            start = self._scan
+            self._scan = end + 1
+            self._scan_line(self._pending[start:end], start)
+
+    def finish(self, text_filter: Optional[Callable[[str], str]] = None) -> None:
+        """Commit whatever is left of the open block.
+
+        Args:
+            text_filter: Optional transform applied to the final block before
+                         printing (e.g. stripping trailing model artifacts)
+        """
+        tail = self._pending
+        if text_filter:
+            tail = text_filter(tail)
+        self._print_block(tail)
+        self._pending = ""
+        self._scan = 0
+        self._kind = None
+        self._fence = None
+        self._list_blank = False
+
+    def _scan_line(self, line: str, start: int) -> None:
+        """Advance the block state machine by one complete line."""
+        line_end = start + len(line) + 1
+
+        if self._fence:
+            stripped = line.strip()
+            if stripped.startswith(self._fence) and not stripped.strip(self._fence[0]):
+                self._commit(line_end)
+            return
+
+        if not line.strip():
+            if self._kind == "list":
+                self._list_blank = True
+            elif self._kind is not None:
+                self._commit(line_end)
+            return
+
+        indented = line[:1].isspace()
+        if self._kind == "list":
+            if self._list_blank and not indented and not _LIST_ITEM_RE.match(line):
+                # A blank line followed by non-list content closes the list
+                self._commit(start)
+            elif indented or not (_FENCE_OPEN_RE.match(line) or _ATX_HEADING_RE.match(line)):
+                self._list_blank = False
+                return
+            else:
+                self._commit(start)
+
+        fence = _FENCE_OPEN_RE.match(line)
+        if fence:
+            if self._kind is not None:
+                self._commit(start)  # A fence interrupts a paragraph
+            self._kind = "fence"
+            self._fence = fence.group(1)
+            return
+
+        if _ATX_HEADING_RE.match(line):
+            if self._kind is not None:
+                self._commit(start)
+            self._commit(line_end)  # Headings are always a single line
+            return
+
+        if self._kind is None:
+            self._kind = "list" if _LIST_ITEM_RE.match(line) else "para"
+
+    def _commit(self, pos: int) -> None:
+        """Print _pending[:pos] as a finished block and reset block state."""
+        block, self._pending = self._pending[:pos], self._pending[pos:]
+        self._scan -= pos
+        self._kind = None
+        self._fence = None
+        self._list_blank = False
+        self._print_block(block)
+
+    def _print_block(self, block: str) -> None:
+        block = block.strip('\n')
+        if not block.strip():
+            return
+        from rich.markdown import Markdown
+        if self._blocks_printed:
+            self.console.print()  # Markdown separates blocks by a blank line
+        self.console.print(Markdown(block, **self.markdown_kwargs))
+        self._blocks_printed += 1
@@ -0,0 +1,310 @@
+"""Per-server lifecycle management for MCP servers.
+
+This module provides MCPServerPool, used by llm-assistant's mcp module:
+
+- Servers are read from the llm-tools-mcp config (mcpServers in
+  ~/.llm-tools-mcp/mcp.json), re-read when the file changes
+- Each server is connected on its own, in parallel, with its own timeout,
+  and only when a session starts it or calls one of its tools
+- Tool schemas are cached on disk per server (keyed by the server's
+  config), so tools are advertised before the server is up
+- Servers without a tool call for idle_seconds are shut down; the next
+  call reconnects
+- state() reports each server's status (stopped, connecting, connected,
+  failed) for /api/tools
+
+Connecting is delegated to a connect(name, config) callable returning a
+toolbox whose tools() yields objects with name, description, input_schema
+and implementation (llm.Tool).
+
+Storage: XDG_CACHE_HOME/llm-assistant/mcp-schemas.json
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from .xdg import get_cache_dir
+
+DEFAULT_CONFIG_PATH = Path.home() / ".llm-tools-mcp" / "mcp.json"
+
+# Per-server connect timeout (servers connect in parallel)
+CONNECT_TIMEOUT = 20
+
+# Shut down servers without a tool call for this long
+IDLE_SECONDS = 15 * 60
+
+# Wait this long before retrying a server that failed to connect
+RETRY_SECONDS = 60
+
+CONNECT_WORKERS = 8
+
+
+def get_schema_cache_path() -> Path:
+    """Schema cache file location."""
+    return get_cache_dir("llm-assistant") / "mcp-schemas.json"
+
+
+def _config_hash(config: Dict[str, Any]) -> str:
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()
+
+
+def _default_close(toolbox) -> None:
+    close = getattr(toolbox, "close", None)
+    if close:
+        close()
+
+
+@dataclass
+class _Server:
+    name: str
+    config_hash: str
+    status: str = "stopped"
+    error: Optional[str] = None
+    toolbox: Any = None
+    implementations: Dict[str, Callable] = field(default_factory=dict)
+    future: Optional[Future] = None
+    started: float = 0.0  # monotonic time of the current connect attempt
+    last_used: float = 0.0
+
+
+class MCPServerPool:
+    """Lazily connected MCP servers with cached tool schemas.
+
+    Thread-safe; shared by all sessions in a process.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[str, Dict[str, Any]], Any],
+        close: Callable[[Any], None] = _default_close,
+        config_path: Optional[Path] = None,
+        cache_path: Optional[Path] = None,
+        timeout: float = CONNECT_TIMEOUT,
+        idle_seconds: float = IDLE_SECONDS,
+    ):
+        self._connect = connect
+        self._close = close
+        self.config_path = Path(config_path or DEFAULT_CONFIG_PATH)
+        self.cache_path = Path(cache_path or get_schema_cache_path())
+        self.timeout = timeout
+        self.idle_seconds = idle_seconds
+        self._lock = threading.RLock()
+        self._executor = ThreadPoolExecutor(max_workers=CONNECT_WORKERS, thread_name_prefix="mcp-connect")
+        self._config_key = None
+        self._configs: Dict[str, Dict[str, Any]] = {}
+        self.config_error: Optional[str] = None
+        self._servers: Dict[str, _Server] = {}
+        self._schemas = self._read_cache()
+        # Bumped whenever the set of servers or any server's tools change
+        self.generation = 0
+
+    # -- config and schema cache -------------------------------------------------
+
+    def _refresh_config(self) -> None:
+        try:
+            st = os.stat(self.config_path)
+        except OSError:
+            if self._configs or self.config_error is None:
+                self._configs, self._config_key = {}, None
+                self.generation += 1
+            self.config_error = f"Config file not found: {self.config_path}"
+            return
+        key = (st.st_mtime_ns, st.st_size)
+        if key == self._config_key:
+            return
+        try:
+            servers = json.loads(self.config_path.read_text()).get("mcpServers") or {}
+        except (OSError, ValueError, AttributeError) as e:
+            servers, self.config_error = {}, f"Invalid config {self.config_path}: {e}"
+        else:
+            self.config_error = None
+        self._config_key = key
+        self._configs = {name: cfg for name, cfg in servers.items() if isinstance(cfg, dict)}
+
+        # Servers whose config changed or disappeared are stopped
+        for name, server in list(self._servers.items()):
+            config = self._configs.get(name)
+            if config is None or _config_hash(config) != server.config_hash:
+                self._stop(server)
+                del self._servers[name]
+        self.generation += 1
+
+    def _read_cache(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            data = json.loads(self.cache_path.read_text())
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _write_cache(self) -> None:
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.cache_path.parent, prefix=".tmp-")
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump(self._schemas, f)
+                os.replace(tmp, self.cache_path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+        except (OSError, TypeError, ValueError):
+            pass  # Unserializable schema or read-only cache: reconnect next time
+
+    def _server(self, name: str) -> Optional[_Server]:
+        config = self._configs.get(name)
+        if config is None:
+            return None
+        server = self._servers.get(name)
+        if server is None:
+            server = self._servers[name] = _Server(name, _config_hash(config))
+        return server
+
+    # -- queries -------------------------------------------------------------------
+
+    def servers(self) -> Dict[str, bool]:
+        """Configured servers: {name: optional}."""
+        with self._lock:
+            self._refresh_config()
+            return {name: bool(cfg.get("optional", False)) for name, cfg in self._configs.items()}
+
+    def tools(self, name: str) -> List[Dict[str, Any]]:
+        """Tool schemas of a server (live, or cached for its current config)."""
+        with self._lock:
+            self._refresh_config()
+            config = self._configs.get(name)
+            cached = self._schemas.get(name)
+            if config is None or not cached or cached.get("config_hash") != _config_hash(config):
+                return []
+            return cached.get("tools", [])
+
+    def state(self) -> Dict[str, Dict[str, Any]]:
+        """Per-server status for display."""
+        now = time.monotonic()
+        with self._lock:
+            self._refresh_config()
+            result = {}
+            for name, config in self._configs.items():
+                server = self._servers.get(name)
+                result[name] = {
+                    "status": server.status if server else "stopped",
+                    "error": server.error if server else None,
+                    "optional": bool(config.get("optional", False)),
+                    "tool_count": len(self.tools(name)),
+                    "idle_seconds": int(now - server.last_used)
+                    if server and server.status == "connected" else None,
+                }
+            return result
+
+    # -- lifecycle -----------------------------------------------------------------
+
+    def start(self, names: Iterable[str]) -> None:
+        """Connect servers in the background (no-op for connected ones)."""
+        now = time.monotonic()
+        with self._lock:
+            self._refresh_config()
+            for name in names:
+                server = self._server(name)
+                if server is None or server.status in ("connected", "connecting"):
+                    continue
+                if server.status == "failed" and now - server.started < RETRY_SECONDS:
+                    continue
+                server.status, server.error, server.started = "connecting", None, now
+                server.future = self._executor.submit(self._run_connect, server)
+
+    def _run_connect(self, server: _Server) -> None:
+        try:
+            config = self._configs[server.name]
+            toolbox = self._connect(server.name, config)
+            tools = list(toolbox.tools())
+        except Exception as e:
+            with self._lock:
+                server.status, server.error = "failed", str(e) or type(e).__name__
+            return
+
+        with self._lock:
+            if self._servers.get(server.name) is not server:
+                # Config changed while connecting
+                self._close_quietly(toolbox)
+                return
+            server.toolbox = toolbox
+            server.implementations = {t.name: t.implementation for t in tools}
+            server.status, server.error = "connected", None
+            server.last_used = time.monotonic()
+            schemas = [
+                {"name": t.name, "description": t.description, "input_schema": t.input_schema}
+                for t in tools
+            ]
+            if self._schemas.get(server.name, {}).get("tools") != schemas:
+                self._schemas[server.name] = {"config_hash": server.config_hash, "tools": schemas}
+                self._write_cache()
+            elif self._schemas[server.name].get("config_hash") != server.config_hash:
+                self._schemas[server.name]["config_hash"] = server.config_hash
+                self._write_cache()
+            self.generation += 1
+
+    def wait(self, names: Iterable[str]) -> None:
+        """Wait for connecting servers, each up to its own timeout."""
+        with self._lock:
+            pending = [self._servers.get(name) for name in names]
+        for server in pending:
+            if server is None or server.future is None or server.status != "connecting":
+                continue
+            remaining = server.started + self.timeout - time.monotonic()
+            try:
+                server.future.result(timeout=max(remaining, 0))
+            except FutureTimeoutError:
+                with self._lock:
+                    if server.status == "connecting":
+                        server.status = "failed"
+                        server.error = f"Timed out after {self.timeout:g}s"
+
+    def call(self, name: str, tool: str, arguments: Dict[str, Any]):
+        """Run a tool, connecting its server first if needed."""
+        self.start([name])
+        self.wait([name])
+        with self._lock:
+            server = self._servers.get(name)
+            if server is None or server.status != "connected":
+                error = server.error if server else "not configured"
+                raise RuntimeError(f"MCP server '{name}' unavailable: {error}")
+            server.last_used = time.monotonic()
+            implementation = server.implementations.get(tool)
+        if implementation is None:
+            raise LookupError(f"MCP server '{name}' no longer provides tool '{tool}'")
+        return implementation(**arguments)
+
+    def _close_quietly(self, toolbox) -> None:
+        try:
+            self._close(toolbox)
+        except Exception:
+            pass  # Ignore cleanup errors
+
+    def _stop(self, server: _Server) -> None:
+        if server.toolbox is not None:
+            self._close_quietly(server.toolbox)
+        server.toolbox, server.implementations = None, {}
+        server.status, server.error = "stopped", None
+
+    def evict_idle(self) -> int:
+        """Shut down connected servers idle for idle_seconds. Returns the count."""
+        cutoff = time.monotonic() - self.idle_seconds
+        with self._lock:
+            idle = [s for s in self._servers.values() if s.status == "connected" and s.last_used < cutoff]
+            for server in idle:
+                self._stop(server)
+            return len(idle)
+
+    def shutdown(self) -> None:
+        """Close every server and stop connecting."""
+        with self._lock:
+            for server in self._servers.values():
+                self._stop(server)
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,229 @@
+"""Page-level PDF text extraction for @pdf: references.
+
+This module provides the PDF pipeline used by AtHandler:
+- Pages are extracted in chunks of CHUNK_PAGES, in parallel: across a
+  process pool with PyMuPDF, or as concurrent pdftotext processes with
+  poppler-utils (whichever is installed, in that order)
+- Page text is cached per page, so a changed page range or a second query
+  against the same document only extracts pages not seen before
+- Page ranges ("10-40", "1,3,7-9", "200-") and BM25 page selection under a
+  token budget
+"""
+
+import os
+import shutil
+import subprocess
+from concurrent.futures import Executor, ThreadPoolExecutor, as_completed
+from importlib.util import find_spec
+from typing import Callable, Dict, Hashable, List, Optional, Sequence
+
+from .bm25 import bm25_scores
+from .tokens import estimate_tokens
+
+# Pages per extraction task: large enough to amortize opening the document,
+# small enough to spread a long report across all workers
+CHUNK_PAGES = 16
+
+# Timeout for one pdftotext/pdfinfo call
+POPPLER_TIMEOUT = 120
+
+
+def get_backend() -> Optional[str]:
+    """Return "pymupdf", "poppler", or None if neither is available."""
+    if find_spec("pymupdf") is not None or find_spec("fitz") is not None:
+        return "pymupdf"
+    if shutil.which("pdftotext") and shutil.which("pdfinfo"):
+        return "poppler"
+    return None
+
+
+def _open_pymupdf(path: str):
+    try:
+        import pymupdf
+    except ImportError:
+        import fitz as pymupdf
+    return pymupdf.open(path)
+
+
+def page_count(path: str, backend: str) -> int:
+    """Number of pages in the document."""
+    if backend == "pymupdf":
+        with _open_pymupdf(path) as doc:
+            return doc.page_count
+    result = subprocess.run(
+        ["pdfinfo", path], capture_output=True, text=True, check=True, timeout=POPPLER_TIMEOUT
+    )
+    for line in result.stdout.splitlines():
+        if line.startswith("Pages:"):
+            return int(line.split(":", 1)[1])
+    raise ValueError("Could not determine page count")
+
+
+def extract_page_range(backend: str, path: str, first: int, last: int) -> List[str]:
+    """Extract text for pages first..last (1-based, inclusive).
+
+    Module-level so it can run in a worker process.
+    """
+    if backend == "pymupdf":
+        with _open_pymupdf(path) as doc:
+            return [doc.load_page(n - 1).get_text() for n in range(first, last + 1)]
+    result = subprocess.run(
+        ["pdftotext", "-layout", "-f", str(first), "-l", str(last), path, "-"],
+        capture_output=True, text=True, check=True, timeout=POPPLER_TIMEOUT,
+    )
+    # pdftotext terminates every page with a form feed
+    pages = result.stdout.split("\f")
+    count = last - first + 1
+    return (pages + [""] * count)[:count]
+
+
+def parse_page_range(spec: str, count: int) -> List[int]:
+    """Parse "10-40", "5", "1,3,7-9" or "200-" into sorted page numbers.
+
+    Pages beyond the end of the document are dropped.
+
+    Raises:
+        ValueError: If the spec is malformed or selects no pages
+    """
+    pages = set()
+    for part in spec.replace(" ", "").split(","):
+        if not part:
+            continue
+        start, sep, end = part.partition("-")
+        try:
+            first = int(start) if start else 1
+            last = (int(end) if end else count) if sep else first
+        except ValueError:
+            raise ValueError(f"Invalid page range: {spec}") from None
+        if first < 1 or last < first:
+            raise ValueError(f"Invalid page range: {spec}")
+        pages.update(range(first, min(last, count) + 1))
+    if not pages:
+        raise ValueError(f"Page range {spec} is outside the document ({count} pages)")
+    return sorted(pages)
+
+
+def _chunks(pages: Sequence[int]) -> List[tuple]:
+    """Group sorted page numbers into contiguous (first, last) runs of at most CHUNK_PAGES."""
+    runs = []
+    for n in pages:
+        if runs and n == runs[-1][1] + 1 and n - runs[-1][0] < CHUNK_PAGES:
+            runs[-1][1] = n
+        else:
+            runs.append([n, n])
+    return [tuple(run) for run in runs]
+
+
+def _page_key(path: str, n: int) -> str:
+    return f"pdfpage:{path}#{n}"
+
+
+def extract_pages(
+    path: str,
+    pages: Sequence[int],
+    backend: str,
+    cache=None,
+    validator: Optional[Hashable] = None,
+    executor: Optional[Executor] = None,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> Dict[int, str]:
+    """Extract the given pages, using cached text where still valid.
+
+    Args:
+        path: Absolute PDF path
+        pages: Sorted 1-based page numbers
+        backend: "pymupdf" or "poppler" (see get_backend())
+        cache: FragmentCache for per-page text (optional)
+        validator: File validator for cache entries (see file_validator())
+        executor: Process pool for PyMuPDF chunks; poppler runs pdftotext
+            processes from threads and ignores it
+        progress: Called with (pages_done, pages_total) as chunks complete
+
+    Returns:
+        Dict of page number -> text
+    """
+    texts: Dict[int, str] = {}
+    if cache is not None:
+        cached = cache.get_many((_page_key(path, n) for n in pages), validator)
+        texts = {n: cached[_page_key(path, n)] for n in pages if _page_key(path, n) in cached}
+    missing = [n for n in pages if n not in texts]
+
+    total = len(pages)
+    if progress and texts:
+        progress(len(texts), total)
+    if not missing:
+        return texts
+
+    chunks = _chunks(missing)
+
+    extracted: Dict[int, str] = {}
+
+    def store(first: int, page_texts: List[str]) -> None:
+        for offset, text in enumerate(page_texts):
+            texts[first + offset] = extracted[first + offset] = text
+        if progress:
+            progress(len(texts), total)
+
+    own_pool = None
+    try:
+        if len(chunks) == 1:
+            first, last = chunks[0]
+            store(first, extract_page_range(backend, path, first, last))
+            return texts
+
+        if backend != "pymupdf" or executor is None:
+            own_pool = executor = ThreadPoolExecutor(
+                max_workers=min(len(chunks), os.cpu_count() or 1), thread_name_prefix="pdf-pages"
+            )
+        futures = {
+            executor.submit(extract_page_range, backend, path, first, last): first
+            for first, last in chunks
+        }
+        for future in as_completed(futures):
+            store(futures[future], future.result())
+    finally:
+        if own_pool is not None:
+            own_pool.shutdown(wait=False, cancel_futures=True)
+        if cache is not None and extracted:
+            # One index write per document (pages done so far, even on
+            # error); empty pages are cached as a single space so they are
+            # not re-extracted
+            cache.put_many(
+                {_page_key(path, n): text or " " for n, text in extracted.items()}, validator
+            )
+    return texts
+
+
+def select_pages(texts: Dict[int, str], query: str, token_budget: Optional[int]) -> List[int]:
+    """Choose pages that fit token_budget, most relevant to query first.
+
+    Returns every page when they all fit. Otherwise pages are ranked by
+    BM25 against the query (document order when the query has no usable
+    terms) and added while they fit. At least one page is always kept.
+    The result is in document order.
+    """
+    numbers = sorted(texts)
+    tokens = {n: estimate_tokens(texts[n]) for n in numbers}
+    if token_budget is None or sum(tokens.values()) <= token_budget:
+        return numbers
+
+    scores = bm25_scores([texts[n] for n in numbers], query)
+    ranked = sorted(zip(numbers, scores), key=lambda item: (-item[1], item[0]))
+
+    selected = []
+    used = 0
+    for n, _score in ranked:
+        if used + tokens[n] <= token_budget:
+            selected.append(n)
+            used += tokens[n]
+    if not selected:
+        selected = [ranked[0][0]]
+    return sorted(selected)
+
+
+def format_pages(texts: Dict[int, str], selected: Sequence[int], page_total: int) -> str:
+    """Join selected page texts; mark page numbers when not the whole document."""
+    if len(selected) == page_total:
+        return "\n\n".join(texts[n].strip() for n in selected if texts[n].strip())
+    parts = [f"[Page {n}/{page_total}]\n{texts[n].strip()}" for n in selected if texts[n].strip()]
+    return "\n\n".join(parts)
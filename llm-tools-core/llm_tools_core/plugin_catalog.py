@@ -0,0 +1,264 @@
+"""On-disk catalogue of llm plugin tools and models.
+
+This module provides PluginCatalog, used by llm-assistant so that startup,
+model listings and model completions do not run llm plugin discovery:
+
+- The catalogue holds every plugin tool (name, description, input schema,
+  plugin, MCP server_name) and every model id with its aliases
+- It is keyed by a fingerprint of the installed llm and llm plugin
+  distributions (name, version, install time), LLM_LOAD_PLUGINS and the
+  mtimes of the llm config files (extra-openai-models.yaml, aliases.json,
+  plugin model caches), and rebuilt when the fingerprint changes or the
+  catalogue is older than CATALOG_MAX_AGE (plugins such as llm-ollama list
+  models that no file records)
+- tool_stubs() turns the catalogue into llm.Tool objects whose
+  implementation runs plugin discovery the first time any of them is called
+
+Storage: XDG_CACHE_HOME/llm-assistant/plugin-catalog.json
+"""
+
+import asyncio
+import hashlib
+import inspect
+import json
+import os
+import tempfile
+import threading
+import time
+from importlib import metadata
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from .xdg import get_cache_dir, get_config_dir
+
+# Bump when the stored format changes
+CATALOG_VERSION = 1
+
+# Rebuild at least this often, for plugins whose model lists live elsewhere
+CATALOG_MAX_AGE = 3600
+
+# Within a process, re-check the fingerprint at most this often
+FINGERPRINT_CHECK_SECONDS = 30
+
+# Files in the llm user directory that can change the tool or model lists
+CONFIG_SUFFIXES = (".json", ".yaml", ".yml")
+
+_real_tools: Optional[Dict[str, Any]] = None
+_real_tools_lock = threading.Lock()
+
+
+def get_catalog_path() -> Path:
+    """Catalogue file location."""
+    return get_cache_dir("llm-assistant") / "plugin-catalog.json"
+
+
+def _llm_user_dir() -> Path:
+    """llm's configuration directory (as click.get_app_dir on Linux)."""
+    path = os.environ.get("LLM_USER_PATH")
+    return Path(path) if path else get_config_dir("io.datasette.llm")
+
+
+def catalog_fingerprint() -> str:
+    """Hash of everything the tool and model lists depend on."""
+    parts = [f"v{CATALOG_VERSION}", os.environ.get("LLM_LOAD_PLUGINS", "*")]
+
+    try:
+        parts.append(f"llm=={metadata.version('llm')}")
+    except metadata.PackageNotFoundError:
+        parts.append("llm")
+
+    dists = set()
+    for dist in metadata.distributions():
+        # Entry points first: parsing a distribution's metadata is the slow part
+        if not any(ep.group == "llm" for ep in dist.entry_points):
+            continue
+        # Reinstalling the same version (editable installs) changes the mtime
+        location = getattr(dist, "_path", None)
+        try:
+            installed = os.stat(location).st_mtime_ns if location else 0
+        except OSError:
+            installed = 0
+        dists.add(f"{dist.metadata['Name']}=={dist.version}@{installed}")
+    parts.extend(sorted(dists))
+
+    try:
+        with os.scandir(_llm_user_dir()) as it:
+            configs = sorted(
+                f"{entry.name}:{entry.stat().st_mtime_ns}"
+                for entry in it
+                if entry.name.endswith(CONFIG_SUFFIXES) and entry.is_file()
+            )
+    except OSError:
+        configs = []
+    parts.extend(configs)
+
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+
+def build_catalog() -> Dict[str, Any]:
+    """Run llm plugin discovery and describe its tools and models."""
+    import llm
+
+    tools = [
+        {
+            "name": name,
+            "description": tool.description,
+            "input_schema": tool.input_schema,
+            "plugin": tool.plugin,
+            # Set on MCP-provided tools
+            "server_name": getattr(tool, "server_name", None),
+            "mcp_optional": getattr(tool, "mcp_optional", False),
+        }
+        for name, tool in llm.get_tools().items()
+        # Toolbox classes are instantiated per use and are not catalogued
+        if isinstance(tool, llm.Tool)
+    ]
+    models = [
+        {"model_id": entry.model.model_id, "aliases": list(entry.aliases)}
+        for entry in llm.get_models_with_aliases()
+        if entry.model is not None
+    ]
+    return {"tools": tools, "models": models}
+
+
+def resolve_tool(name: str):
+    """Return the real plugin tool, running plugin discovery on first use."""
+    global _real_tools
+    if _real_tools is None:
+        with _real_tools_lock:
+            if _real_tools is None:
+                import llm
+                _real_tools = llm.get_tools()
+    tool = _real_tools.get(name)
+    if tool is None:
+        raise LookupError(f"Tool '{name}' is no longer provided by any installed plugin")
+    return tool
+
+
+def _lazy_implementation(name: str) -> Callable:
+    def implementation(**kwargs):
+        result = resolve_tool(name).implementation(**kwargs)
+        # The stub is synchronous, so callers will not await for us
+        if inspect.iscoroutine(result):
+            result = asyncio.run(result)
+        return result
+
+    implementation.__name__ = name
+    return implementation
+
+
+class PluginCatalog:
+    """Fingerprint-validated catalogue of llm plugin tools and models.
+
+    Thread-safe; one instance per process via get_plugin_catalog().
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        builder: Callable[[], Dict[str, Any]] = build_catalog,
+        fingerprint: Callable[[], str] = catalog_fingerprint,
+        max_age: float = CATALOG_MAX_AGE,
+    ):
+        self.path = path or get_catalog_path()
+        self._builder = builder
+        self._fingerprint = fingerprint
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._data: Optional[Dict[str, Any]] = None
+        self._checked = 0.0
+
+    def _read(self) -> Optional[Dict[str, Any]]:
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return None
+        return data if isinstance(data, dict) else None
+
+    def _write(self, data: Dict[str, Any]) -> None:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=".tmp-")
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump(data, f)
+                os.replace(tmp, self.path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+        except (OSError, TypeError, ValueError):
+            pass  # Unserializable schema or read-only cache: rebuild next time
+
+    def _fresh(self, data: Optional[Dict[str, Any]], fingerprint: str) -> bool:
+        return (
+            data is not None
+            and data.get("fingerprint") == fingerprint
+            and time.time() - data.get("created", 0) < self.max_age
+        )
+
+    def load(self, refresh: bool = False) -> Dict[str, Any]:
+        """Return the catalogue, rebuilding it if stale or refresh is set."""
+        with self._lock:
+            now = time.monotonic()
+            if not refresh and self._data is not None and now - self._checked < FINGERPRINT_CHECK_SECONDS:
+                return self._data
+
+            fingerprint = self._fingerprint()
+            if not refresh and self._fresh(self._data, fingerprint):
+                self._checked = now
+                return self._data
+
+            data = None if refresh else self._read()
+            if not self._fresh(data, fingerprint):
+                data = {
+                    **self._builder(),
+                    "fingerprint": fingerprint,
+                    "created": time.time(),
+                }
+                self._write(data)
+            self._data = data
+            self._checked = now
+            return data
+
+    def invalidate(self) -> None:
+        """Drop the in-process copy; the next load re-validates from disk."""
+        with self._lock:
+            self._data = None
+
+    def tools(self) -> List[Dict[str, Any]]:
+        """Catalogued tool descriptions."""
+        return self.load().get("tools", [])
+
+    def model_ids(self) -> List[str]:
+        """Ids of all installed models, in plugin registration order."""
+        return [m["model_id"] for m in self.load().get("models", [])]
+
+    def tool_stubs(self) -> Dict[str, Any]:
+        """Return {name: llm.Tool} whose implementations load the plugin on first call."""
+        from llm import Tool
+
+        stubs = {}
+        for entry in self.tools():
+            stub = Tool(
+                name=entry["name"],
+                description=entry.get("description"),
+                input_schema=entry.get("input_schema") or {},
+                implementation=_lazy_implementation(entry["name"]),
+                plugin=entry.get("plugin"),
+            )
+            if entry.get("server_name"):
+                stub.server_name = entry["server_name"]
+                stub.mcp_optional = entry.get("mcp_optional", False)
+            stubs[entry["name"]] = stub
+        return stubs
+
+
+_default_catalog: Optional[PluginCatalog] = None
+
+
+def get_plugin_catalog() -> PluginCatalog:
+    """Return the process-wide PluginCatalog."""
+    global _default_catalog
+    if _default_catalog is None:
+        _default_catalog = PluginCatalog()
+    return _default_catalog
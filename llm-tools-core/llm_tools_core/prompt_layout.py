@@ -0,0 +1,188 @@
+"""Cache-friendly assembly of system prompts.
+
+This module provides layout_prompt(), used by llm-assistant to build the
+system prompt so that provider-side prompt caching (Anthropic, OpenAI,
+Gemini) can reuse as much of it as possible:
+
+- Segments are ordered from most to least stable (STATIC, SESSION, TURN);
+  within a tier the caller's order is kept
+- Empty segments are dropped, so switching one off does not leave stray
+  separators that shift the bytes of everything after it
+- Each tier becomes one block, and the end of each block is a cache
+  breakpoint; system_prompt_kwargs() passes the blocks to llm as system
+  fragments and turns on the model's "cache" option where it has one
+  (llm-anthropic). OpenAI and Gemini cache matching prefixes on their own
+- cache_usage() reads cache-read/cache-write token counts from a
+  response's token details (any of the three providers); PromptCacheStats
+  sums them into a hit rate
+"""
+
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+# Stability tiers, most stable first
+STATIC = 0  # Identical across sessions: base instructions, GUI/headless variant
+SESSION = 1  # Changes with user commands: skills, RAG, memory, KB
+TURN = 2  # May change every request: date, watch mode, workflow progress
+
+SEPARATOR = "\n\n"
+
+
+@dataclass(frozen=True)
+class PromptSegment:
+    """A named piece of the system prompt."""
+    name: str
+    text: str
+    stability: int = STATIC
+
+
+@dataclass
+class PromptLayout:
+    """Segments in cache order, grouped into one block per tier."""
+    segments: List[PromptSegment]
+    blocks: List[str]
+
+    @property
+    def text(self) -> str:
+        """The full system prompt."""
+        return SEPARATOR.join(self.blocks)
+
+    @property
+    def breakpoints(self) -> List[int]:
+        """Character offsets in text at which a cached prefix can end."""
+        offsets = []
+        end = -len(SEPARATOR)
+        for block in self.blocks:
+            end += len(SEPARATOR) + len(block)
+            offsets.append(end)
+        return offsets
+
+
+def layout_prompt(segments: Iterable[PromptSegment]) -> PromptLayout:
+    """Order segments by stability and join each tier into a block."""
+    kept = [s for s in segments if s.text and s.text.strip()]
+    kept.sort(key=lambda s: s.stability)  # Stable: keeps order within a tier
+    blocks: List[str] = []
+    tier = None
+    for segment in kept:
+        text = segment.text.strip()
+        if segment.stability == tier:
+            blocks[-1] = f"{blocks[-1]}{SEPARATOR}{text}"
+        else:
+            blocks.append(text)
+            tier = segment.stability
+    return PromptLayout(kept, blocks)
+
+
+def supports_cache_option(model: Any) -> bool:
+    """Whether the model's options include a prompt-cache switch."""
+    options = getattr(model, "Options", None)
+    fields = getattr(options, "model_fields", None) or getattr(options, "__fields__", None) or {}
+    return "cache" in fields
+
+
+def system_prompt_kwargs(layout: PromptLayout, model: Any = None) -> Dict[str, Any]:
+    """Keyword arguments for llm's prompt() that send layout as the system prompt.
+
+    All blocks but the last go in as system fragments, so plugins that place
+    cache breakpoints per fragment see the tier boundaries; llm joins them
+    back with the last block into the same text.
+    """
+    if not layout.blocks:
+        return {}
+    kwargs: Dict[str, Any] = {"system": layout.blocks[-1]}
+    if len(layout.blocks) > 1:
+        kwargs["system_fragments"] = layout.blocks[:-1]
+    if model is not None and supports_cache_option(model):
+        kwargs["cache"] = True
+    return kwargs
+
+
+@dataclass
+class CacheUsage:
+    """Prompt-cache tokens of one response."""
+    read: int = 0
+    write: int = 0
+    # Anthropic reports cached tokens in addition to input_tokens; OpenAI and
+    # Gemini count them as part of input_tokens
+    separate: bool = False
+
+    def prompt_tokens(self, input_tokens: int) -> int:
+        """Total prompt tokens, given the response's input_tokens."""
+        if self.separate:
+            return input_tokens + self.read + self.write
+        return input_tokens
+
+
+def _int(value: Any) -> int:
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def cache_usage(details: Any) -> CacheUsage:
+    """Cache-read/cache-write tokens from a response's token details.
+
+    Accepts the dict llm stores as token_details (or its JSON text).
+    Unknown formats yield zeros.
+    """
+    if isinstance(details, str):
+        try:
+            details = json.loads(details)
+        except ValueError:
+            return CacheUsage()
+    if not isinstance(details, dict):
+        return CacheUsage()
+    # Anthropic
+    if "cache_read_input_tokens" in details or "cache_creation_input_tokens" in details:
+        return CacheUsage(
+            read=_int(details.get("cache_read_input_tokens")),
+            write=_int(details.get("cache_creation_input_tokens")),
+            separate=True,
+        )
+    # OpenAI chat completions / responses API
+    for key in ("prompt_tokens_details", "input_tokens_details"):
+        nested = details.get(key)
+        if isinstance(nested, dict) and "cached_tokens" in nested:
+            return CacheUsage(read=_int(nested.get("cached_tokens")))
+    # Gemini (usageMetadata)
+    for key in ("cachedContentTokenCount", "cached_content_token_count"):
+        if key in details:
+            return CacheUsage(read=_int(details.get(key)))
+    return CacheUsage()
+
+
+@dataclass
+class PromptCacheStats:
+    """Running prompt-cache totals for a session."""
+    responses: int = 0
+    prompt_tokens: int = 0
+    cache_read: int = 0
+    cache_write: int = 0
+    last: Optional[CacheUsage] = field(default=None, repr=False)
+
+    def record(self, input_tokens: Optional[int], details: Any) -> CacheUsage:
+        """Add one response's usage; returns its cache tokens."""
+        usage = cache_usage(details)
+        self.responses += 1
+        self.prompt_tokens += usage.prompt_tokens(input_tokens or 0)
+        self.cache_read += usage.read
+        self.cache_write += usage.write
+        self.last = usage
+        return usage
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of prompt tokens served from the provider's cache."""
+        return self.cache_read / self.prompt_tokens if self.prompt_tokens else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "responses": self.responses,
+            "prompt_tokens": self.prompt_tokens,
+            "cache_read": self.cache_read,
+            "cache_write": self.cache_write,
+            "hit_rate": round(self.hit_rate, 3),
+        }
@@ -1,10 +1,30 @@
 """RAG handler wrapper for llm-assistant and llm-guiassistant.
 
 Provides a thin wrapper around llm-tools-rag for use in GUI and CLI.
+
+Loaded engines (vector index, BM25 structures) stay resident in a
+per-process registry until idle for ENGINE_IDLE_SECONDS, and search
+results are kept in an LRU keyed by (collection, normalized query,
+top_k, mode, filters). Anything that changes a collection must call
+invalidate_collection(); entries also expire after QUERY_CACHE_TTL_SECONDS
+to pick up changes made by other processes.
 """
 
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .rag_ingest import IngestProgress, delete_manifest, ingest_documents
+
+# Unload an engine after this long without a search
+ENGINE_IDLE_SECONDS = 30 * 60
+
+# Cached search results (per process)
+QUERY_CACHE_SIZE = 256
+QUERY_CACHE_TTL_SECONDS = 10 * 60
 
 
 # Citation rules appended to RAG context when sources is enabled
@@ -53,6 +73,200 @@ class AddResult:
     error: Optional[str]
 
 
+def _create_engine(collection: str, model: Optional[str] = None):
+    from llm_tools_rag.engine import get_or_create_engine
+
+    if model:
+        return get_or_create_engine(collection, model)
+    return get_or_create_engine(collection)
+
+
+class EngineRegistry:
+    """Thread-safe registry of loaded engines with idle eviction.
+
+    Engines load outside the registry lock: a slow load (embedding model
+    start-up) only makes callers wait for that same engine.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[..., Any] = _create_engine,
+        idle_seconds: float = ENGINE_IDLE_SECONDS,
+    ):
+        self.factory = factory
+        self.idle_seconds = idle_seconds
+        self._lock = threading.Lock()
+        # (collection, model) -> [engine, last_used]
+        self._engines: Dict[Tuple[str, Optional[str]], list] = {}
+        # Loads in progress; concurrent callers for the same key share one
+        self._loading: Dict[Tuple[str, Optional[str]], Future] = {}
+
+    def get(self, collection: str, model: Optional[str] = None):
+        """Return the engine for collection, loading it on first use."""
+        key = (collection, model)
+        with self._lock:
+            entry = self._engines.get(key)
+            if entry is not None:
+                entry[1] = time.monotonic()
+                return entry[0]
+            future = self._loading.get(key)
+            if future is not None:
+                loading = False
+            else:
+                loading = True
+                future = self._loading[key] = Future()
+        if not loading:
+            return future.result()
+
+        try:
+            engine = self.factory(collection, model)
+        except BaseException as e:
+            with self._lock:
+                if self._loading.get(key) is future:
+                    del self._loading[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            # Not kept if the collection was discarded while loading
+            if self._loading.get(key) is future:
+                del self._loading[key]
+                self._engines[key] = [engine, time.monotonic()]
+        future.set_result(engine)
+        return engine
+
+    def discard(self, collection: str) -> None:
+        """Unload every engine for collection (loads in progress are not kept)."""
+        with self._lock:
+            for key in [k for k in self._engines if k[0] == collection]:
+                del self._engines[key]
+            for key in [k for k in self._loading if k[0] == collection]:
+                del self._loading[key]
+
+    def evict_idle(self) -> int:
+        """Unload engines idle longer than idle_seconds. Returns the count."""
+        cutoff = time.monotonic() - self.idle_seconds
+        with self._lock:
+            stale = [k for k, (_, used) in self._engines.items() if used < cutoff]
+            for key in stale:
+                del self._engines[key]
+        return len(stale)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._engines)
+
+
+def normalize_query(query: str) -> str:
+    """Collapse whitespace and case so trivially different queries share a cache entry."""
+    return " ".join(query.split()).casefold()
+
+
+class QueryCache:
+    """Thread-safe LRU of search results with a time-to-live."""
+
+    def __init__(self, max_entries: int = QUERY_CACHE_SIZE, ttl: float = QUERY_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[tuple, Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+
+    @staticmethod
+    def key(
+        collection: str,
+        query: str,
+        top_k: int,
+        mode: str,
+        filters: Optional[Dict[str, str]] = None,
+    ) -> tuple:
+        return (
+            collection,
+            normalize_query(query),
+            top_k,
+            mode,
+            tuple(sorted(filters.items())) if filters else None,
+        )
+
+    def get(self, key: tuple) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return list(entry[1])
+
+    def put(self, key: tuple, results: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), list(results))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, collection: Optional[str] = None) -> None:
+        """Drop results for collection, or all results."""
+        with self._lock:
+            if collection is None:
+                self._entries.clear()
+            else:
+                for key in [k for k in self._entries if k[0] == collection]:
+                    del self._entries[key]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+_engines = EngineRegistry()
+_results = QueryCache()
+
+
+def get_engine(collection: str, model: Optional[str] = None):
+    """Return a resident engine for collection (see EngineRegistry)."""
+    return _engines.get(collection, model)
+
+
+def cached_search(
+    collection: str,
+    query: str,
+    top_k: int = 5,
+    mode: str = "hybrid",
+    filters: Optional[Dict[str, str]] = None,
+) -> List[Dict[str, Any]]:
+    """Search a collection through the engine registry and result cache.
+
+    Returns the raw llm-tools-rag result dicts (content, score, metadata).
+
+    Raises:
+        ImportError: If llm-tools-rag is not installed
+        Exception: Whatever the engine raises; errors are not cached
+    """
+    key = QueryCache.key(collection, query, top_k, mode, filters)
+    results = _results.get(key)
+    if results is None:
+        engine = _engines.get(collection)
+        results = engine.search(query, top_k=top_k, mode=mode, filters=filters)
+        _results.put(key, results)
+    return results
+
+
+def invalidate_collection(collection: str) -> None:
+    """Forget engines and cached results after collection changed."""
+    _engines.discard(collection)
+    _results.invalidate(collection)
+
+
+def evict_idle_engines() -> int:
+    """Unload idle engines (call periodically from long-lived processes)."""
+    return _engines.evict_idle()
+
+
+def rag_cache_stats() -> Dict[str, int]:
+    """Resident engines and cached queries, for status output."""
+    return {"engines": len(_engines), "cached_queries": len(_results)}
+
+
 class RAGHandler:
     """Wrapper for llm-tools-rag functionality."""
 
@@ -112,10 +326,8 @@ class RAGHandler:
             return []
 
         try:
-            from llm_tools_rag.engine import get_or_create_engine
-
-            engine = get_or_create_engine(collection)
-            results = engine.search(
+            results = cached_search(
+                collection,
                 query,
                 top_k=top_k,
                 mode=mode,
@@ -139,7 +351,8 @@ class RAGHandler:
         collection: str,
         path: str,
         refresh: bool = False,
-        model: Optional[str] = None
+        model: Optional[str] = None,
+        progress: Optional[IngestProgress] = None
     ) -> AddResult:
         """Add documents to a RAG collection.
 
@@ -149,11 +362,17 @@ class RAGHandler:
         - Web URLs: https://example.com/doc.pdf
         - Glob patterns: *.py
 
+        Directories and globs are ingested file by file against the
+        collection's manifest (see rag_ingest), so unchanged files are
+        skipped and an interrupted add resumes.
+
         Args:
             collection: Collection name
             path: Document path, URL, or pattern
             refresh: Force reindex if document exists
             model: Optional embedding model override
+            progress: Called with (files_done, files_total, path,
+                chunks_added) per file
 
         Returns:
             AddResult with status and details
@@ -168,10 +387,13 @@ class RAGHandler:
             )
 
         try:
-            from llm_tools_rag.engine import get_or_create_engine
-
-            engine = get_or_create_engine(collection, model)
-            result = engine.add_document(path, refresh=refresh)
+            try:
+                result = ingest_documents(
+                    get_engine(collection, model), collection, path,
+                    refresh=refresh, progress=progress
+                )
+            finally:
+                invalidate_collection(collection)
 
             return AddResult(
                 status=result.get("status", "error"),
@@ -273,10 +495,7 @@ class RAGHandler:
             return None
 
         try:
-            from llm_tools_rag.engine import get_or_create_engine
-
-            engine = get_or_create_engine(collection)
-            return engine.get_stats()
+            return get_engine(collection).get_stats()
         except Exception:
             return None
 
@@ -293,10 +512,11 @@ class RAGHandler:
             return False
 
         try:
-            from llm_tools_rag.engine import get_or_create_engine
-
-            engine = get_or_create_engine(collection)
-            engine.delete_collection()
+            try:
+                get_engine(collection).delete_collection()
+                delete_manifest(collection)
+            finally:
+                invalidate_collection(collection)
             return True
         except Exception:
             return False
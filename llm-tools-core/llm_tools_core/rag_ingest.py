@@ -0,0 +1,292 @@
+"""Resumable bulk ingestion into llm-tools-rag collections.
+
+This module provides ingest_documents(), used by RAGHandler.add_documents
+(/rag add and POST /api/rag/add):
+- Local directories and glob patterns are enumerated up front. Binary
+  files (by extension or a NUL/UTF-8 sniff of their first block),
+  virtualenvs and git object stores are skipped, so only what the engine
+  can chunk reaches it
+- Every file is read, sniffed and hashed in parallel before indexing
+  starts (a process pool for large inputs, threads otherwise)
+- A per-collection manifest records each file's content hash and chunk
+  count. It is saved as files complete, so an interrupted ingest resumes
+  where it stopped, and re-adding a directory skips unchanged files
+- Changed files are re-indexed (refresh), new files are added
+- Progress (files done, chunks added) is reported per file through a
+  callback
+
+git: sources and URLs are handed to the engine as a single unit. Chunking
+and batched embedding of each file happen inside the llm-tools-rag engine,
+whose add_document() takes a path.
+"""
+
+import glob
+import hashlib
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .xdg import get_config_dir
+
+# Parallel file scanning (hash + text sniff)
+HASH_WORKERS = min(8, os.cpu_count() or 1)
+HASH_BLOCK = 1024 * 1024
+# Inputs with at least this many files are scanned in a process pool
+PROCESS_SCAN_MIN_FILES = 256
+
+# Save the manifest at most this often while ingesting (and always at the end)
+MANIFEST_SAVE_INTERVAL = 1.0
+
+# Directories never descended into when enumerating
+SKIP_DIRS = {"node_modules", "__pycache__", "venv", "site-packages"}
+
+# Extensions skipped without reading
+BINARY_EXTENSIONS = {
+    ".png", ".jpg", ".jpeg", ".gif", ".bmp", ".ico", ".webp", ".tif", ".tiff",
+    ".zip", ".gz", ".tgz", ".bz2", ".xz", ".7z", ".rar", ".tar", ".zst",
+    ".so", ".dll", ".dylib", ".exe", ".bin", ".o", ".a", ".lib", ".class",
+    ".jar", ".pyc", ".pyo", ".whl", ".egg", ".iso", ".img", ".dmg",
+    ".mp3", ".mp4", ".wav", ".flac", ".ogg", ".avi", ".mov", ".mkv", ".webm",
+    ".ttf", ".otf", ".woff", ".woff2", ".eot", ".db", ".sqlite", ".sqlite3",
+}
+
+# Binary formats the engine converts to text; kept without the text sniff
+DOCUMENT_EXTENSIONS = {".pdf", ".docx", ".pptx", ".xlsx", ".odt", ".epub"}
+
+# Bytes read to decide whether a file is text
+SNIFF_BYTES = 8192
+
+# progress(files_done, files_total, path, chunks_added)
+IngestProgress = Callable[[int, int, str, int], None]
+
+
+def get_manifest_path(collection: str) -> Path:
+    """Manifest file for a collection."""
+    return get_config_dir("llm-assistant") / "rag-manifests" / f"{collection}.json"
+
+
+def load_manifest(collection: str) -> Dict[str, Dict[str, Any]]:
+    """Return {path: {"hash": ..., "chunks": ...}} ({} if none or unreadable)."""
+    try:
+        data = json.loads(get_manifest_path(collection).read_text())
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def save_manifest(collection: str, manifest: Dict[str, Dict[str, Any]]) -> None:
+    """Atomically replace a collection's manifest."""
+    path = get_manifest_path(collection)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(manifest, f, indent=1, sort_keys=True)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def delete_manifest(collection: str) -> None:
+    """Forget a collection's manifest (after deleting the collection)."""
+    try:
+        get_manifest_path(collection).unlink()
+    except OSError:
+        pass
+
+
+def _is_skipped_dir(path: str, name: str) -> bool:
+    """Hidden, dependency or tool directories, virtualenvs and git stores."""
+    if name.startswith(".") or name in SKIP_DIRS:
+        return True
+    if os.path.isfile(os.path.join(path, "pyvenv.cfg")):
+        return True  # Virtualenv under any name
+    # Bare repositories and git dirs that are not called .git
+    return all(os.path.exists(os.path.join(path, entry)) for entry in ("HEAD", "objects", "refs"))
+
+
+def enumerate_files(source: str) -> Optional[List[str]]:
+    """Expand a local file, directory or glob into sorted absolute file paths.
+
+    Hidden files and directories, SKIP_DIRS, virtualenvs, git object stores
+    and files with BINARY_EXTENSIONS are skipped when walking a directory
+    (binary extensions are skipped for globs too; content sniffing happens
+    later, in scan_file()). Returns None for sources that are not local
+    paths (git:, URLs).
+    """
+    if source.startswith(("git:", "http://", "https://")):
+        return None
+
+    expanded = os.path.expanduser(source)
+    if glob.has_magic(expanded):
+        return sorted(
+            os.path.abspath(p) for p in glob.glob(expanded, recursive=True)
+            if os.path.isfile(p) and not _has_binary_extension(p)
+        )
+    if os.path.isfile(expanded):
+        return [os.path.abspath(expanded)]
+
+    files = []
+    for root, dirs, names in os.walk(expanded):
+        dirs[:] = [d for d in dirs if not _is_skipped_dir(os.path.join(root, d), d)]
+        for name in names:
+            if not name.startswith(".") and not _has_binary_extension(name):
+                files.append(os.path.abspath(os.path.join(root, name)))
+    return sorted(files)
+
+
+def _has_binary_extension(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() in BINARY_EXTENSIONS
+
+
+def _looks_like_text(block: bytes, truncated: bool) -> bool:
+    """No NUL bytes and valid UTF-8.
+
+    A character cut at the end is allowed if block is only the start of
+    the file.
+    """
+    if b"\0" in block:
+        return False
+    try:
+        block.decode("utf-8")
+    except UnicodeDecodeError as e:
+        return truncated and e.reason == "unexpected end of data"
+    return True
+
+
+def file_hash(path: str) -> Optional[str]:
+    """SHA-256 of a file's content, or None if it cannot be read."""
+    return scan_file(path)[0]
+
+
+def scan_file(path: str) -> Tuple[Optional[str], bool]:
+    """Read a file once: (SHA-256 or None if unreadable, whether to index it).
+
+    Files in DOCUMENT_EXTENSIONS are always indexed; other files only if
+    their first SNIFF_BYTES look like text.
+    """
+    digest = hashlib.sha256()
+    indexable = os.path.splitext(path)[1].lower() in DOCUMENT_EXTENSIONS
+    try:
+        with open(path, "rb") as f:
+            first = f.read(HASH_BLOCK)
+            digest.update(first)
+            if not indexable:
+                indexable = _looks_like_text(first[:SNIFF_BYTES], len(first) > SNIFF_BYTES)
+            for block in iter(lambda: f.read(HASH_BLOCK), b""):
+                digest.update(block)
+    except OSError:
+        return None, False
+    return digest.hexdigest(), indexable
+
+
+def _scan_executor(count: int) -> Executor:
+    if count >= PROCESS_SCAN_MIN_FILES:
+        import multiprocessing
+        # spawn: forking a threaded daemon is unsafe
+        return ProcessPoolExecutor(max_workers=HASH_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="rag-hash")
+
+
+def ingest_documents(
+    engine,
+    collection: str,
+    source: str,
+    refresh: bool = False,
+    progress: Optional[IngestProgress] = None,
+) -> Dict[str, Any]:
+    """Add a file, directory, glob, git repo or URL to a collection.
+
+    Args:
+        engine: llm-tools-rag engine for the collection
+        collection: Collection name (selects the manifest)
+        source: Path, glob, git: source or URL
+        refresh: Re-index every file, even if unchanged
+        progress: Called with (files_done, files_total, path, chunks_added)
+            per file
+
+    Returns:
+        Dict with status ('success', 'skipped' or 'error'), chunks added,
+        reason, error, and per-outcome file counts (files, added,
+        unchanged, failed, binary)
+    """
+    files = enumerate_files(source)
+    if files is None:
+        return engine.add_document(source, refresh=refresh)
+    if not files:
+        return {"status": "error", "chunks": 0, "error": f"No files found: {source}"}
+
+    with _scan_executor(len(files)) as pool:
+        scans = dict(zip(files, pool.map(scan_file, files, chunksize=16)))
+    binary = {path for path, (digest, indexable) in scans.items() if digest and not indexable}
+    files = [path for path in files if path not in binary]
+    if not files:
+        return {"status": "skipped", "chunks": 0, "reason": f"No text files found: {source}",
+                "error": None, "files": 0, "added": 0, "unchanged": 0, "failed": 0,
+                "binary": len(binary)}
+
+    manifest = load_manifest(collection)
+    added = unchanged = chunks = 0
+    errors: List[str] = []
+    last_save = time.monotonic()
+    try:
+        for done, path in enumerate(files, 1):
+            digest = scans[path][0]
+            entry = manifest.get(path)
+            if digest is None:
+                errors.append(f"{path}: unreadable")
+            elif not refresh and entry and entry.get("hash") == digest:
+                unchanged += 1
+            else:
+                try:
+                    result = engine.add_document(path, refresh=refresh or entry is not None)
+                except Exception as e:
+                    result = {"status": "error", "error": str(e)}
+                status = result.get("status")
+                if status == "success":
+                    added += 1
+                    chunks += result.get("chunks", 0)
+                    manifest[path] = {"hash": digest, "chunks": result.get("chunks", 0)}
+                elif status == "skipped":
+                    # Already indexed before the manifest knew about it
+                    unchanged += 1
+                    manifest[path] = {"hash": digest, "chunks": result.get("chunks", 0)}
+                else:
+                    errors.append(f"{path}: {result.get('error') or result.get('reason') or 'unknown error'}")
+
+            if progress:
+                progress(done, len(files), path, chunks)
+            if time.monotonic() - last_save >= MANIFEST_SAVE_INTERVAL:
+                save_manifest(collection, manifest)
+                last_save = time.monotonic()
+    finally:
+        save_manifest(collection, manifest)
+
+    reason = f"{added} file(s) added, {unchanged} unchanged, {len(errors)} failed"
+    if binary:
+        reason += f", {len(binary)} binary skipped"
+    if added:
+        status = "success"
+    elif errors and not unchanged:
+        status = "error"
+    else:
+        status = "skipped"
+    return {
+        "status": status,
+        "chunks": chunks,
+        "reason": reason,
+        "error": "; ".join(errors[:5]) if errors else None,
+        "files": len(files),
+        "added": added,
+        "unchanged": unchanged,
+        "failed": len(errors),
+        "binary": len(binary),
+    }
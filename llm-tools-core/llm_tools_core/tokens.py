@@ -13,9 +13,14 @@ Used by:
 - Any tool that needs rough token estimates
 
 Note: Actual token counts vary by model tokenizer. For accurate counts,
-use the model's tokenizer or API-provided usage metrics.
+use the model's tokenizer or API-provided usage metrics. count_tokens()
+uses a registered tokenizer (set_tokenizer(), or tiktoken when installed)
+and falls back to the character estimate.
 """
 
+from importlib.util import find_spec
+from typing import Callable, Optional
+
 # Standard approximation: 4 characters per token
 # This is a rough heuristic that works reasonably well for English text.
 # Source: OpenAI estimates "one token is around 4 characters of English text"
@@ -116,3 +121,54 @@ def is_approaching_limit(
         False
     """
     return current_tokens >= max_tokens * threshold
+
+
+# Exact counter registered with set_tokenizer(), or loaded from tiktoken.
+# False means "looked, none available".
+_tokenizer = None
+
+
+def set_tokenizer(counter: Optional[Callable[[str], int]]) -> None:
+    """Register a function returning the exact token count of a text.
+
+    Pass None to go back to auto-detection (tiktoken if installed).
+    """
+    global _tokenizer
+    _tokenizer = counter
+
+
+def get_tokenizer() -> Optional[Callable[[str], int]]:
+    """Return the registered or auto-detected tokenizer, or None."""
+    global _tokenizer
+    if _tokenizer is None:
+        _tokenizer = False
+        if find_spec("tiktoken") is not None:
+            try:
+                import tiktoken
+                encoding = tiktoken.get_encoding("o200k_base")
+
+                def _tiktoken_count(text: str) -> int:
+                    return len(encoding.encode(text, disallowed_special=()))
+
+                _tokenizer = _tiktoken_count
+            except Exception:
+                pass
+    return _tokenizer or None
+
+
+def count_tokens(text: str) -> int:
+    """Count tokens with the tokenizer if one is available, else estimate.
+
+    Slower than estimate_tokens() when a tokenizer is in use; meant for
+    text that is counted once and remembered (see llm-assistant's token
+    ledger).
+    """
+    if not text:
+        return 0
+    counter = get_tokenizer()
+    if counter is not None:
+        try:
+            return counter(text)
+        except Exception:
+            pass
+    return estimate_tokens(text)
@@ -0,0 +1,161 @@
+"""TTL result cache for idempotent tools.
+
+This module provides ToolResultCache, used by execute_tool_call() so that
+repeated web searches, page fetches and documentation lookups within a few
+minutes are answered without going out again:
+
+- Caching is opt-in per tool (CACHEABLE_TOOLS): only read-only lookups are
+  listed; anything with side effects (shell, Python, file writes, browser
+  control) is never cached
+- Only successful calls are cached (see is_cacheable_result): a tool that
+  raised, returned an empty result or flagged its result as an error is
+  asked again next time
+- Entries are keyed by tool name plus the canonical JSON of the arguments
+  and argument overrides (e.g. sources on/off changes the output)
+- Each tool has its own TTL and per-result size limit; total size is
+  bounded and least recently used entries are evicted first
+- One cache per process, so all daemon sessions (terminals, popup, web UI)
+  share it
+
+The terminal `context` tool is deliberately not cached: its output is per
+terminal and changes with every command.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class ToolCachePolicy:
+    """How long and how large a tool's results may be cached."""
+    ttl: float  # Seconds
+    max_result_chars: int = 256 * 1024
+
+
+_WEB = ToolCachePolicy(ttl=10 * 60)
+_DOCS = ToolCachePolicy(ttl=60 * 60)
+
+CACHEABLE_TOOLS: Dict[str, ToolCachePolicy] = {
+    # Web tools
+    "search_google": _WEB,
+    "fetch_url": _WEB,
+    # Microsoft Learn MCP tools
+    "microsoft_docs_search": _DOCS,
+    "microsoft_docs_fetch": _DOCS,
+    "microsoft_code_sample_search": _DOCS,
+    # AWS Knowledge MCP tools
+    "aws___search_documentation": _DOCS,
+    "aws___read_documentation": _DOCS,
+    "aws___recommend": _DOCS,
+    # ArXiv MCP tools (read-only ones; download_paper writes files)
+    "search_papers": _DOCS,
+    "read_paper": _DOCS,
+}
+
+DEFAULT_MAX_CHARS = 16 * 1024 * 1024
+
+# Outputs worded as failures by tools that report errors as text
+_ERROR_PREFIXES = ("error", "failed", "http error")
+
+
+def is_cacheable_result(result: Any, output: str) -> bool:
+    """Whether a tool call that returned result (as text: output) succeeded.
+
+    Calls that raised never get here. A result is not cached when it is
+    empty (e.g. an upstream timeout), carries an error flag (exception on
+    an llm ToolResult, isError / is_error on MCP results) or reads as an
+    error message. Failures reported as ordinary text in any other wording
+    cannot be told apart from content.
+    """
+    if not output or not output.strip():
+        return False
+    for flag in ("exception", "isError", "is_error", "error"):
+        if getattr(result, flag, None):
+            return False
+    return not output.lstrip().lower().startswith(_ERROR_PREFIXES)
+
+
+class ToolResultCache:
+    """Bounded, thread-safe LRU of tool outputs with per-tool TTLs."""
+
+    def __init__(
+        self,
+        policies: Optional[Dict[str, ToolCachePolicy]] = None,
+        max_chars: int = DEFAULT_MAX_CHARS,
+    ):
+        self.policies = CACHEABLE_TOOLS if policies is None else policies
+        self.max_chars = max_chars
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._chars = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(tool: str, args: Dict[str, Any], overrides: Optional[Dict[str, Any]] = None) -> str:
+        """Canonical key: equal for equal arguments in any order."""
+        payload = json.dumps([tool, args, overrides or {}], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def cacheable(self, tool: str) -> bool:
+        return tool in self.policies
+
+    def get(self, tool: str, args: Dict[str, Any], overrides: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """Return a cached output, or None if absent, expired or not cacheable."""
+        policy = self.policies.get(tool)
+        if policy is None:
+            return None
+        key = self.key(tool, args, overrides)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > policy.ttl:
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, tool: str, args: Dict[str, Any], output: str, overrides: Optional[Dict[str, Any]] = None) -> None:
+        """Store a successful output (ignored for tools that are not cacheable)."""
+        policy = self.policies.get(tool)
+        if policy is None or not output or len(output) > policy.max_result_chars:
+            return
+        key = self.key(tool, args, overrides)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic(), output)
+            self._chars += len(output)
+            while self._chars > self.max_chars and self._entries:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: str) -> None:
+        _, output = self._entries.pop(key)
+        self._chars -= len(output)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._chars = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "chars": self._chars, "hits": self.hits, "misses": self.misses}
+
+
+_default_cache: Optional[ToolResultCache] = None
+
+
+def get_tool_result_cache() -> ToolResultCache:
+    """Return the process-wide ToolResultCache."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ToolResultCache()
+    return _default_cache
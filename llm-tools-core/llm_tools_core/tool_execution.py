@@ -1,17 +1,24 @@
 """Shared tool execution logic for daemon and web UI server.
 
 Provides a common implementation for executing tool calls with consistent
-event emission and error handling.
+event emission and error handling. Results of idempotent tools are served
+from the process-wide ToolResultCache (see tool_cache); everything else runs
+on the bounded, per-category ToolExecutors with per-tool timeouts (see
+tool_pools). Output tools report while running is streamed as tool_progress
+events (see tool_progress).
 """
 
-import asyncio
 import uuid
 from dataclasses import dataclass
 from typing import Any, Callable, Dict, Optional, Protocol
 
 from llm import ToolResult
 
+from .errors import ErrorCode
 from .mcp_citations import is_microsoft_doc_tool, format_microsoft_citations
+from .tool_cache import ToolResultCache, get_tool_result_cache, is_cacheable_result
+from .tool_pools import ToolExecutors, ToolTimeoutError, get_tool_executors
+from .tool_progress import ProgressChannel, call_with_progress
 
 
 @dataclass
@@ -36,17 +43,25 @@ async def execute_tool_call(
     emit: EventEmitter,
     arg_overrides: Optional[Dict[str, Dict[str, Any]]] = None,
     message_id: Optional[str] = None,
+    cache: Optional[ToolResultCache] = None,
+    executors: Optional[ToolExecutors] = None,
 ) -> ToolResult:
     """Execute a single tool call and return the result.
 
     Args:
         tool_call: The tool call object with name, arguments, tool_call_id
         implementations: Dict mapping tool names to implementation functions
-        emit: Async callback to emit events (tool_start, tool_done)
+        emit: Async callback to emit events (tool_start, tool_progress,
+              tool_done)
         arg_overrides: Optional dict mapping tool names to argument overrides.
                        Example: {"search_google": {"sources": False}}
         message_id: Optional ID of the parent message for this tool call.
                     Used by clients to associate tool calls with messages.
+        cache: Result cache for idempotent tools (default: the process-wide
+               cache). Hits are marked with "cached": true in tool_done.
+        executors: Pools the tool runs on (default: the process-wide pools).
+                   A timeout yields an error result and a tool_done event
+                   with "error": "TIMEOUT".
 
     Returns:
         ToolResult with the execution output
@@ -85,40 +100,97 @@ async def execute_tool_call(
             tool_call_id=tool_call_id,
         )
 
+    if cache is None:
+        cache = get_tool_result_cache()
+    if executors is None:
+        executors = get_tool_executors()
+    # Everything that shapes the output: the tool's own overrides and the
+    # citation switch applied below
+    cache_overrides = {
+        name: value for name, value in (arg_overrides or {}).items()
+        if name in (tool_name, 'microsoft_sources')
+    }
+
+    async def send_progress(text: str, dropped: int) -> None:
+        event = {
+            "type": "tool_progress",
+            "tool": tool_name,
+            "output": text,
+            "tool_call_id": tool_call_id,
+            "messageId": message_id,
+        }
+        if dropped:
+            event["dropped"] = dropped
+        await emit(event)
+
     try:
-        impl = implementations[tool_name]
-        # Run tool in executor to avoid blocking event loop
-        loop = asyncio.get_running_loop()
-        result = await loop.run_in_executor(
-            None, lambda: impl(**tool_args)
-        )
+        output = cache.get(tool_name, tool_args, cache_overrides)
+        cached = output is not None
+        if not cached:
+            impl = implementations[tool_name]
+            # Run tool on its category's pool to avoid blocking event loop
+            channel = ProgressChannel(send_progress)
+            channel.start()
+            try:
+                result = await executors.run(
+                    tool_name, lambda: call_with_progress(channel, lambda: impl(**tool_args))
+                )
+            finally:
+                await channel.close()
+
+            # Handle different result types
+            if hasattr(result, "output"):
+                output = result.output
+            elif isinstance(result, str):
+                output = result
+            else:
+                output = str(result)
+
+            # Post-process Microsoft MCP tools for citations
+            if is_microsoft_doc_tool(tool_name):
+                sources_enabled = True
+                if arg_overrides and 'microsoft_sources' in arg_overrides:
+                    sources_enabled = arg_overrides['microsoft_sources'].get('sources', True)
+                output = format_microsoft_citations(tool_name, output, sources_enabled)
+
+            if is_cacheable_result(result, output):
+                cache.put(tool_name, tool_args, output, cache_overrides)
+
+        done_event = {
+            "type": "tool_done",
+            "tool": tool_name,
+            "result": output[:500] if len(output) > 500 else output,
+            "tool_call_id": tool_call_id,
+            "messageId": message_id,
+        }
+        if cached:
+            done_event["cached"] = True
+        await emit(done_event)
 
-        # Handle different result types
-        if hasattr(result, "output"):
-            output = result.output
-        elif isinstance(result, str):
-            output = result
-        else:
-            output = str(result)
-
-        # Post-process Microsoft MCP tools for citations
-        if is_microsoft_doc_tool(tool_name):
-            sources_enabled = True
-            if arg_overrides and 'microsoft_sources' in arg_overrides:
-                sources_enabled = arg_overrides['microsoft_sources'].get('sources', True)
-            output = format_microsoft_citations(tool_name, output, sources_enabled)
+        return ToolResult(
+            name=tool_call.name,
+            output=output,
+            tool_call_id=tool_call_id,
+        )
 
+    except ToolTimeoutError as e:
+        error_msg = (
+            f"Error executing {tool_name}: timed out after {e.timeout:g}s. "
+            "The tool may still be running; do not retry it unchanged."
+        )
         await emit({
             "type": "tool_done",
             "tool": tool_name,
-            "result": output[:500] if len(output) > 500 else output,
+            "result": error_msg,
+            "error": ErrorCode.TIMEOUT,
+            "timeout": e.timeout,
             "tool_call_id": tool_call_id,
             "messageId": message_id,
         })
 
         return ToolResult(
             name=tool_call.name,
-            output=output,
+            output=error_msg,
             tool_call_id=tool_call_id,
         )
 
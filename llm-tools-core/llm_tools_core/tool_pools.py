@@ -0,0 +1,206 @@
+"""Bounded executors and timeouts for tool calls.
+
+This module provides ToolExecutors, used by execute_tool_call() instead of
+the event loop's default executor:
+
+- Tools run on a pool for their category: network (web, MCP and plugin
+  tools), cpu (local parsing) or subprocess (sandboxed shell/Python,
+  screenshots); unknown tools count as network
+- Pool sizes and per-tool timeouts are configurable (configure(), fed from
+  tool_pools / tool_timeouts in assistant-config.yaml by the daemon)
+- A call that exceeds its timeout raises ToolTimeoutError; execute_tool_call
+  turns it into an error result. Python threads cannot be killed, so a hung
+  tool keeps its slot until it returns - but only in its own pool, never in
+  the default executor used for context capture
+- stats() reports per-pool size, busy, queued and timeout counts for the
+  daemon status command
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+NETWORK = "network"
+CPU = "cpu"
+SUBPROCESS = "subprocess"
+
+DEFAULT_POOL_SIZES: Dict[str, int] = {
+    NETWORK: 16,
+    CPU: 4,
+    SUBPROCESS: 4,
+}
+
+# Per-category timeout in seconds, used for tools without their own entry
+DEFAULT_TIMEOUTS: Dict[str, float] = {
+    NETWORK: 120,
+    CPU: 120,
+    SUBPROCESS: 300,
+}
+
+TOOL_CATEGORIES: Dict[str, str] = {
+    'execute_python': SUBPROCESS,
+    'sandboxed_shell': SUBPROCESS,
+    'capture_screen': SUBPROCESS,
+    'load_pdf': CPU,
+    'suggest_command': CPU,
+}
+
+TOOL_TIMEOUTS: Dict[str, float] = {
+    'suggest_command': 10,
+    'capture_screen': 30,
+    'search_google': 60,
+    'fetch_url': 60,
+    'load_github': 300,
+    'prompt_fabric': 300,
+    'generate_image': 300,
+}
+
+
+class ToolTimeoutError(Exception):
+    """Raised when a tool call exceeds its timeout."""
+
+    def __init__(self, tool: str, timeout: float):
+        self.tool = tool
+        self.timeout = timeout
+        super().__init__(f"{tool} timed out after {timeout:g}s")
+
+
+class _PoolStats:
+    __slots__ = ("busy", "queued", "completed", "timed_out")
+
+    def __init__(self):
+        self.busy = 0
+        self.queued = 0
+        self.completed = 0
+        self.timed_out = 0
+
+
+class ToolExecutors:
+    """One bounded thread pool per tool category, with per-tool timeouts.
+
+    Thread-safe; shared by all sessions in a process.
+    """
+
+    def __init__(
+        self,
+        sizes: Optional[Dict[str, int]] = None,
+        timeouts: Optional[Dict[str, float]] = None,
+        categories: Optional[Dict[str, str]] = None,
+    ):
+        self._lock = threading.Lock()
+        self._executors: Dict[str, ThreadPoolExecutor] = {}
+        self._stats: Dict[str, _PoolStats] = {name: _PoolStats() for name in DEFAULT_POOL_SIZES}
+        self.sizes = dict(DEFAULT_POOL_SIZES)
+        self.timeouts = dict(TOOL_TIMEOUTS)
+        self.categories = dict(TOOL_CATEGORIES)
+        self.configure(sizes, timeouts, categories)
+
+    def configure(
+        self,
+        sizes: Optional[Dict[str, int]] = None,
+        timeouts: Optional[Dict[str, float]] = None,
+        categories: Optional[Dict[str, str]] = None,
+    ) -> None:
+        """Override pool sizes, tool timeouts and tool categories.
+
+        Invalid entries are ignored. Resized pools are replaced; calls already
+        running on the old pool finish there.
+        """
+        with self._lock:
+            for name, size in (sizes or {}).items():
+                if name in self.sizes and isinstance(size, int) and size > 0 and size != self.sizes[name]:
+                    self.sizes[name] = size
+                    old = self._executors.pop(name, None)
+                    if old is not None:
+                        old.shutdown(wait=False)
+            for tool, timeout in (timeouts or {}).items():
+                if isinstance(timeout, (int, float)) and timeout > 0:
+                    self.timeouts[tool] = timeout
+            for tool, category in (categories or {}).items():
+                if category in self.sizes:
+                    self.categories[tool] = category
+
+    def category(self, tool: str) -> str:
+        return self.categories.get(tool, NETWORK)
+
+    def timeout(self, tool: str) -> float:
+        return self.timeouts.get(tool) or DEFAULT_TIMEOUTS[self.category(tool)]
+
+    def _executor(self, category: str) -> ThreadPoolExecutor:
+        executor = self._executors.get(category)
+        if executor is None:
+            executor = self._executors[category] = ThreadPoolExecutor(
+                max_workers=self.sizes[category], thread_name_prefix=f"tool-{category}"
+            )
+        return executor
+
+    async def run(self, tool: str, fn: Callable[[], Any]) -> Any:
+        """Run fn on the tool's pool; raise ToolTimeoutError past its timeout.
+
+        The timeout includes time spent queued behind a saturated pool.
+        """
+        category = self.category(tool)
+        timeout = self.timeout(tool)
+        stats = self._stats[category]
+
+        def tracked():
+            with self._lock:
+                stats.queued -= 1
+                stats.busy += 1
+            try:
+                return fn()
+            finally:
+                with self._lock:
+                    stats.busy -= 1
+                    stats.completed += 1
+
+        def on_done(f: Future):
+            if f.cancelled():  # Timed out before it left the queue
+                with self._lock:
+                    stats.queued -= 1
+
+        with self._lock:
+            future = self._executor(category).submit(tracked)
+            stats.queued += 1
+        future.add_done_callback(on_done)
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            future.cancel()
+            with self._lock:
+                stats.timed_out += 1
+            raise ToolTimeoutError(tool, timeout) from None
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Per-pool saturation: {category: {size, busy, queued, completed, timed_out}}."""
+        with self._lock:
+            return {
+                name: {
+                    "size": self.sizes[name],
+                    "busy": s.busy,
+                    "queued": s.queued,
+                    "completed": s.completed,
+                    "timed_out": s.timed_out,
+                }
+                for name, s in self._stats.items()
+            }
+
+    def shutdown(self) -> None:
+        """Stop accepting calls; running tools are not waited for."""
+        with self._lock:
+            for executor in self._executors.values():
+                executor.shutdown(wait=False)
+            self._executors.clear()
+
+
+_default_executors: Optional[ToolExecutors] = None
+
+
+def get_tool_executors() -> ToolExecutors:
+    """Return the process-wide ToolExecutors."""
+    global _default_executors
+    if _default_executors is None:
+        _default_executors = ToolExecutors()
+    return _default_executors
@@ -0,0 +1,194 @@
+"""Incremental output from long-running tools.
+
+This module provides ProgressChannel, used by execute_tool_call() to stream
+tool_progress events while a tool runs:
+
+- Tools report output either by calling report_progress(text) from their
+  implementation, or by returning an iterator of chunks (the joined chunks
+  become the result); run_streaming() runs a subprocess and reports its
+  output line by line
+- Output is sent at most every PROGRESS_INTERVAL seconds, batched; tools
+  that never report cost nothing
+- Unsent output is held in a ring buffer of MAX_PENDING_CHARS: a tool that
+  prints faster than clients read loses the oldest text (reported as
+  "dropped"), never memory
+- The model always receives the tool's full result, not the stream
+"""
+
+import asyncio
+import subprocess
+import threading
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Optional, Tuple
+
+# Minimum seconds between two tool_progress events for one tool call
+PROGRESS_INTERVAL = 0.25
+
+# Unsent output kept per tool call; older text is dropped
+MAX_PENDING_CHARS = 64 * 1024
+
+_local = threading.local()
+
+
+def report_progress(text: str) -> bool:
+    """Stream text from inside a tool implementation.
+
+    Returns False when the tool was not started with a progress channel
+    (e.g. in the TUI or in tests), so callers can ignore it.
+    """
+    channel = getattr(_local, "channel", None)
+    if channel is None or not text:
+        return False
+    channel.write(text)
+    return True
+
+
+def run_streaming(args, timeout: Optional[float] = None, **kwargs) -> subprocess.CompletedProcess:
+    """Run a command, reporting its output line by line while it runs.
+
+    stdout and stderr are merged into result.stdout (text). Without a
+    progress channel this is subprocess.run() with captured output.
+
+    Raises:
+        subprocess.TimeoutExpired: The command ran longer than timeout
+            (it is killed; the output so far is on the exception)
+    """
+    proc = subprocess.Popen(
+        args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+        text=True, errors="replace", **kwargs,
+    )
+    timer = threading.Timer(timeout, proc.kill) if timeout is not None else None
+    if timer is not None:
+        timer.daemon = True
+        timer.start()
+    lines = []
+    try:
+        for line in proc.stdout:
+            lines.append(line)
+            report_progress(line)
+        returncode = proc.wait()
+    finally:
+        if timer is not None:
+            timer.cancel()
+        proc.stdout.close()
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+    output = "".join(lines)
+    if timer is not None and timer.finished.is_set() and returncode < 0:
+        raise subprocess.TimeoutExpired(args, timeout, output=output)
+    return subprocess.CompletedProcess(args, returncode, stdout=output)
+
+
+def call_with_progress(channel: "ProgressChannel", fn: Callable[[], Any]) -> Any:
+    """Run fn with report_progress() bound to channel (on the calling thread).
+
+    An iterator result (other than str/bytes) is consumed here: each chunk is
+    streamed and the joined chunks are returned.
+    """
+    _local.channel = channel
+    try:
+        result = fn()
+        if hasattr(result, "__next__") and not isinstance(result, (str, bytes)):
+            parts = []
+            for chunk in result:
+                chunk = str(chunk)
+                parts.append(chunk)
+                channel.write(chunk)
+            result = "".join(parts)
+        return result
+    finally:
+        _local.channel = None
+
+
+class ProgressChannel:
+    """Rate-limited, bounded bridge from a tool thread to an async sender.
+
+    write() may be called from any thread; send(text, dropped) is awaited on
+    the event loop that called start().
+    """
+
+    def __init__(
+        self,
+        send: Callable[[str, int], Awaitable[None]],
+        interval: float = PROGRESS_INTERVAL,
+        max_chars: int = MAX_PENDING_CHARS,
+    ):
+        self._send = send
+        self.interval = interval
+        self.max_chars = max_chars
+        self._lock = threading.Lock()
+        self._pending: Deque[str] = deque()
+        self._pending_chars = 0
+        self._dropped = 0
+        self._notified = False
+        self._closed = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._task = asyncio.ensure_future(self._pump())
+
+    def write(self, text: str) -> None:
+        with self._lock:
+            if self._closed or not text:
+                return
+            self._pending.append(text)
+            self._pending_chars += len(text)
+            while self._pending_chars > self.max_chars:
+                overflow = self._pending_chars - self.max_chars
+                head = self._pending[0]
+                if len(head) <= overflow:
+                    self._pending.popleft()
+                    cut = len(head)
+                else:
+                    self._pending[0] = head[overflow:]
+                    cut = overflow
+                self._pending_chars -= cut
+                self._dropped += cut
+            # Wake the pump once per batch, not once per write
+            notify = not self._notified and self._loop is not None
+            self._notified = True
+        if notify:
+            try:
+                self._loop.call_soon_threadsafe(self._wake.set)
+            except RuntimeError:
+                pass  # Loop closed while a timed-out tool kept writing
+
+    def drain(self) -> Tuple[str, int]:
+        """Take the unsent text and the number of chars dropped before it."""
+        with self._lock:
+            text = "".join(self._pending)
+            dropped = self._dropped
+            self._pending.clear()
+            self._pending_chars = 0
+            self._dropped = 0
+            self._notified = False
+        return text, dropped
+
+    async def _flush(self) -> None:
+        text, dropped = self.drain()
+        if text:
+            await self._send(text, dropped)
+
+    async def _pump(self) -> None:
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            await self._flush()
+            await asyncio.sleep(self.interval)
+
+    async def close(self) -> None:
+        """Stop streaming and send what is left. Later writes are ignored."""
+        with self._lock:
+            self._closed = True
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        await self._flush()
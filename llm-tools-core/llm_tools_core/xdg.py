@@ -1,7 +1,7 @@
 """XDG Base Directory Specification helpers.
 
 This module provides XDG-compliant directory management used by:
-- llm-assistant (config, logs, temp files)
+- llm-assistant (config, logs, temp files, caches)
 - llm-inlineassistant (config, logs, temp files)
 
 All functions take an app_name parameter to support multiple applications
@@ -28,6 +28,23 @@ def get_config_dir(app_name: str) -> Path:
     return base / app_name
 
 
+def get_cache_dir(app_name: str) -> Path:
+    """Get application cache directory using XDG spec.
+
+    Args:
+        app_name: Application name (e.g., "llm-assistant")
+
+    Returns:
+        Path to XDG_CACHE_HOME/app_name or ~/.cache/app_name
+    """
+    xdg_cache = os.environ.get('XDG_CACHE_HOME')
+    if xdg_cache:
+        base = Path(xdg_cache)
+    else:
+        base = Path.home() / '.cache'
+    return base / app_name
+
+
 def get_temp_dir(app_name: str) -> Path:
     """Get application temp directory with user isolation.
 
@@ -0,0 +1,91 @@
+"""Tests for the prompt context budget allocator."""
+
+from llm_tools_core.context_budget import (
+    SourcePolicy,
+    TRIM_MARKER,
+    allocate_budget,
+    trim_to_tokens,
+)
+
+
+def words(n):
+    """A text of n 'tokens' under the word counter below."""
+    return " ".join(f"w{i}" for i in range(n))
+
+
+def count(text):
+    return len(text.split())
+
+
+POLICIES = {
+    "memory": SourcePolicy(priority=90, min_share=0.1, max_share=0.5),
+    "terminal": SourcePolicy(priority=50, min_share=0.1, max_share=0.5, keep="tail"),
+    "kb": SourcePolicy(priority=10, max_share=0.5),
+}
+
+
+def test_everything_fits_untouched():
+    texts = {"memory": words(10), "terminal": words(10), "kb": ""}
+    result = allocate_budget(texts, 100, POLICIES, count=count)
+    assert {name: a.text for name, a in result.items()} == texts
+    assert [a.tokens for a in result.values()] == [10, 10, 0]
+    assert not any(a.trimmed for a in result.values())
+
+
+def test_lowest_priority_is_trimmed_first():
+    texts = {"memory": words(40), "terminal": words(40), "kb": words(40)}
+    result = allocate_budget(texts, 100, POLICIES, count=count)
+    assert result["memory"].tokens == 40
+    assert result["terminal"].tokens == 40
+    assert result["kb"].trimmed
+    assert result["kb"].requested == 40
+    assert sum(a.tokens for a in result.values()) <= 100 + 10  # plus trim markers
+
+
+def test_minimum_share_survives_higher_priorities():
+    policies = dict(POLICIES, kb=SourcePolicy(priority=10, min_share=0.2, max_share=0.5))
+    texts = {"memory": words(50), "terminal": words(50), "kb": words(50)}
+    result = allocate_budget(texts, 100, policies, count=count)
+    assert result["kb"].text  # kept its minimum even though others could use it
+    assert result["memory"].tokens == 50
+
+
+def test_max_share_caps_even_when_budget_is_free():
+    result = allocate_budget({"kb": words(80)}, 100, POLICIES, count=count)
+    assert result["kb"].trimmed
+
+
+def test_unknown_sources_use_fallback_policy():
+    result = allocate_budget({"custom": "x" * 40}, 1000)
+    assert result["custom"].tokens == 10
+    assert not result["custom"].trimmed
+
+
+def test_trim_keeps_head_or_tail():
+    text = "".join(str(i % 10) for i in range(1000))
+    head = trim_to_tokens(text, 50, "head")
+    tail = trim_to_tokens(text, 50, "tail")
+    assert head.startswith(text[:50]) and head.endswith(TRIM_MARKER.strip("\n"))
+    assert tail.endswith(text[-50:]) and tail.startswith(TRIM_MARKER.strip("\n"))
+    assert len(head) <= 200 and len(tail) <= 200
+    assert trim_to_tokens(text, 0) == ""
+    assert trim_to_tokens("short", 50) == "short"
+
+
+def test_trim_keeps_wrapping_tags():
+    text = "<terminal_context>\n" + "line\n" * 500 + "last prompt $\n</terminal_context>"
+    trimmed = trim_to_tokens(text, 40, "tail")
+    assert trimmed.startswith("<terminal_context>")
+    assert trimmed.endswith("last prompt $\n</terminal_context>")
+    assert TRIM_MARKER.strip("\n") in trimmed
+
+
+def test_trim_with_counter_fits_the_grant():
+    # One token per character: the CHARS_PER_TOKEN estimate would overshoot 4x
+    text = "<rag>" + "x" * 1000 + "</rag>"
+    trimmed = trim_to_tokens(text, 100, count=len)
+    assert len(trimmed) <= 100
+    assert trimmed.startswith("<rag>x") and trimmed.endswith(TRIM_MARKER.rstrip("\n") + "</rag>")
+
+    result = allocate_budget({"kb": "y" * 1000}, 100, POLICIES, count=len)
+    assert result["kb"].tokens <= 50
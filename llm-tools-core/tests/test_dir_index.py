@@ -0,0 +1,119 @@
+"""Tests for DirectoryIndex and fuzzy @ completions."""
+
+import os
+import time
+
+import pytest
+
+from llm_tools_core import dir_index
+from llm_tools_core.at_handler import AtHandler
+from llm_tools_core.dir_index import DirectoryIndex, fuzzy_score
+
+
+def _bump_mtime(path):
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def test_fuzzy_score_ranks_prefix_substring_subsequence():
+    assert fuzzy_score("rep", "report.pdf")[0] == 0
+    assert fuzzy_score("port", "report.pdf")[0] == 1
+    assert fuzzy_score("rpt", "report.pdf")[0] == 2
+    assert fuzzy_score("RPT", "report.pdf")[0] == 2
+    assert fuzzy_score("xyz", "report.pdf") is None
+    assert fuzzy_score("", "anything") == (0, 0)
+
+
+def test_listing_is_reused_until_directory_changes(tmp_path, monkeypatch):
+    (tmp_path / "a.txt").write_text("a")
+    scans = []
+    real_scan = dir_index.scan_directory
+
+    def counting_scan(path):
+        scans.append(path)
+        return real_scan(path)
+
+    monkeypatch.setattr(dir_index, "scan_directory", counting_scan)
+    monkeypatch.setattr(dir_index, "REVALIDATE_SECONDS", 0)
+    index = DirectoryIndex(watch=False)
+
+    assert [e.name for e in index.list(str(tmp_path))] == ["a.txt"]
+    index.list(str(tmp_path))
+    assert len(scans) == 1
+
+    (tmp_path / "b.txt").write_text("b")
+    _bump_mtime(tmp_path)
+    assert [e.name for e in index.list(str(tmp_path))] == ["a.txt", "b.txt"]
+    assert len(scans) == 2
+
+
+def test_index_is_bounded():
+    index = DirectoryIndex(max_directories=1)
+    index.list("/")
+    index.list(os.path.expanduser("~"))
+    assert "/" not in index
+
+
+def test_prefetch_warms_subdirectories(tmp_path):
+    (tmp_path / "src" / "pkg").mkdir(parents=True)
+    (tmp_path / ".git").mkdir()
+    index = DirectoryIndex()
+
+    index.prefetch(str(tmp_path)).result()
+
+    assert str(tmp_path / "src") in index
+    assert str(tmp_path / "src" / "pkg") in index
+    assert str(tmp_path / ".git") not in index
+    # A second prefetch of the same root is skipped
+    assert index.prefetch(str(tmp_path)) is None
+
+
+def test_watched_listing_follows_changes(tmp_path):
+    index = DirectoryIndex()
+    assert index.list(str(tmp_path)) == []
+    if not index._listings[str(tmp_path)][3]:
+        index.close()
+        pytest.skip("inotify unavailable")
+
+    (tmp_path / "new.txt").write_text("x")
+    deadline = time.monotonic() + 5
+    while [e.name for e in index.list(str(tmp_path))] != ["new.txt"]:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    index.close()
+
+
+def test_evicted_listings_are_unwatched(tmp_path):
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    index = DirectoryIndex(max_directories=1)
+    index.list(str(tmp_path / "a"))
+    index.list(str(tmp_path / "b"))
+    if index._watcher is not None:
+        assert list(index._watcher._wds) == [str(tmp_path / "b")]
+    index.close()
+
+
+def test_prefetched_roots_are_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(dir_index, "PREFETCH_MAX_ROOTS", 2)
+    index = DirectoryIndex(watch=False)
+    for name in ("a", "b", "c"):
+        (tmp_path / name).mkdir()
+        index.prefetch(str(tmp_path / name)).result()
+    assert list(index._prefetched) == [str(tmp_path / "b"), str(tmp_path / "c")]
+    index.close()
+
+
+def test_completions_are_fuzzy_and_prefix_first(tmp_path):
+    for name in ("report.pdf", "my_report.pdf", "notes.txt", ".hidden.pdf"):
+        (tmp_path / name).write_text("x")
+    (tmp_path / "reports").mkdir()
+    handler = AtHandler(cwd=str(tmp_path), index=DirectoryIndex())
+
+    texts = [c.text for c in handler.get_completions("rep")]
+    assert texts == ["@report.pdf", "@reports/", "@my_report.pdf"]
+
+    texts = [c.text for c in handler.get_completions("pdf:rpt")]
+    assert texts == ["@pdf:report.pdf", "@pdf:reports/", "@pdf:my_report.pdf"]
+
+    assert [c.text for c in handler.get_completions("dir:rp")] == ["@dir:reports/"]
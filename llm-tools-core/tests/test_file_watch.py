@@ -0,0 +1,64 @@
+"""Tests for inotify-based change notification."""
+
+import os
+import queue
+
+import pytest
+
+from llm_tools_core.file_watch import create_file_watcher
+
+
+@pytest.fixture
+def events():
+    changes = queue.Queue()
+    watcher = create_file_watcher(changes.put)
+    if watcher is None:
+        pytest.skip("inotify not available")
+    yield watcher, changes
+    watcher.close()
+
+
+def wait_for(changes, path, timeout=2.0):
+    seen = []
+    while True:
+        try:
+            item = changes.get(timeout=timeout)
+        except queue.Empty:
+            raise AssertionError(f"no event for {path}; saw {seen}")
+        if item == str(path):
+            return
+        seen.append(item)
+
+
+def test_file_edits_and_renames_are_reported(tmp_path, events):
+    watcher, changes = events
+    target = tmp_path / "AGENTS.md"
+    target.write_text("one")
+    assert watcher.watch(str(tmp_path))
+    target.write_text("two")
+    wait_for(changes, target)
+
+    # Editors save by writing a temporary file and renaming it over the original
+    tmp = tmp_path / ".AGENTS.md.swp"
+    tmp.write_text("three")
+    os.replace(tmp, target)
+    wait_for(changes, target)
+
+
+def test_recursive_watch_follows_new_subdirectories(tmp_path, events):
+    watcher, changes = events
+    (tmp_path / "existing").mkdir()
+    assert watcher.watch(str(tmp_path), recursive=True)
+
+    (tmp_path / "existing" / "SKILL.md").write_text("x")
+    wait_for(changes, tmp_path / "existing" / "SKILL.md")
+
+    (tmp_path / "new").mkdir()
+    wait_for(changes, tmp_path / "new")
+    (tmp_path / "new" / "SKILL.md").write_text("y")
+    wait_for(changes, tmp_path / "new" / "SKILL.md")
+
+
+def test_missing_directory_cannot_be_watched(tmp_path, events):
+    watcher, _ = events
+    assert not watcher.watch(str(tmp_path / "missing"))
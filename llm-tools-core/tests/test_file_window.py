@@ -0,0 +1,71 @@
+"""Tests for mmap-based @file: windows."""
+
+import pytest
+
+from llm_tools_core import file_window
+from llm_tools_core.at_handler import AtHandler
+from llm_tools_core.file_window import read_window
+
+
+@pytest.fixture
+def log_file(tmp_path, monkeypatch):
+    # Small scan chunks so chunk boundaries are exercised
+    monkeypatch.setattr(file_window, "SCAN_CHUNK", 64)
+    path = tmp_path / "big.log"
+    lines = [f"{'ERROR' if n % 25 == 0 else 'INFO'} line {n}" for n in range(1, 1001)]
+    path.write_text("\n".join(lines) + "\n")
+    return path
+
+
+def body(text):
+    return text.split("\n", 1)[1]
+
+
+def test_head(log_file):
+    assert body(read_window(str(log_file), "head=3", 10_000)) == "INFO line 1\nINFO line 2\nINFO line 3\n"
+
+
+def test_tail(log_file):
+    assert body(read_window(str(log_file), "tail=2", 10_000)) == "INFO line 999\nERROR line 1000\n"
+
+
+def test_lines(log_file):
+    out = read_window(str(log_file), "lines=500-502", 10_000)
+    assert out.startswith("[lines 500-502]")
+    assert body(out) == "ERROR line 500\nINFO line 501\nINFO line 502\n"
+
+
+def test_grep_numbers_lines(log_file):
+    out = read_window(str(log_file), "grep=ERROR", 10_000)
+    assert out.startswith("[grep ERROR: 40 matching line(s)]")
+    assert body(out).splitlines()[:2] == ["25: ERROR line 25", "50: ERROR line 50"]
+
+
+def test_byte_cap(log_file):
+    out = read_window(str(log_file), "tail=1000", 30)
+    assert "cut to 30 bytes" in out
+    assert body(out).endswith("ERROR line 1000\n")
+    assert len(body(out).encode()) == 30
+
+
+def test_window_longer_than_file(log_file):
+    assert body(read_window(str(log_file), "head=5000", 1_000_000)).count("\n") == 1000
+
+
+@pytest.mark.parametrize("spec", ["tail", "tail=x", "lines=5-2", "sideways=3", "grep=("])
+def test_invalid_specs(log_file, spec):
+    with pytest.raises(ValueError):
+        read_window(str(log_file), spec, 1000)
+
+
+def test_resolve_file_window(log_file):
+    handler = AtHandler(cwd=str(log_file.parent), use_cache=False)
+    ref = handler.resolve("file:big.log#tail=1")
+    assert ref.error is None
+    assert body(ref.content) == "ERROR line 1000\n"
+
+    # Token budget caps the window (4 chars per token)
+    ref = handler.resolve("file:big.log#head=1000", token_budget=5)
+    assert len(body(ref.content)) == 20
+
+    assert "Invalid file window" in handler.resolve("file:big.log#nope=1").error
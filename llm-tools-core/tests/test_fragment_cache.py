@@ -0,0 +1,122 @@
+"""Tests for FragmentCache and AtHandler.resolve_many."""
+
+import json
+import os
+
+from llm_tools_core import at_handler
+from llm_tools_core.at_handler import AtHandler
+from llm_tools_core.fragment_cache import FragmentCache, file_validator
+
+
+def test_get_requires_matching_validator(tmp_path):
+    cache = FragmentCache(tmp_path / "cache")
+    cache.put("pdf:/a.pdf", (1, 10), "page text")
+
+    assert cache.get("pdf:/a.pdf", (1, 10)) == "page text"
+    assert cache.get("pdf:/a.pdf", (2, 10)) is None
+    assert cache.get("pdf:/b.pdf", (1, 10)) is None
+
+
+def test_entries_persist_across_instances(tmp_path):
+    FragmentCache(tmp_path / "cache").put("url:https://x", ("etag", ""), "body")
+    assert FragmentCache(tmp_path / "cache").get("url:https://x", ("etag", "")) == "body"
+
+
+def test_identical_content_is_stored_once(tmp_path):
+    cache = FragmentCache(tmp_path / "cache")
+    cache.put("a", (1,), "same")
+    cache.put("b", (1,), "same")
+
+    blobs = [p for p in (tmp_path / "cache" / "blobs").rglob("*") if p.is_file()]
+    assert len(blobs) == 1
+    assert cache.total_bytes() == len("same")
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = FragmentCache(tmp_path / "cache", max_bytes=25, memory_bytes=0)
+    cache.put("old", (1,), "a" * 10)
+    cache.put("mid", (1,), "b" * 10)
+    cache.get("old", (1,))  # Refresh "old"
+    cache.put("new", (1,), "c" * 10)
+
+    assert cache.get("mid", (1,)) is None
+    assert cache.get("old", (1,)) == "a" * 10
+    assert cache.get("new", (1,)) == "c" * 10
+    assert cache.total_bytes() <= 25
+
+
+def test_reads_do_not_rewrite_index(tmp_path):
+    cache = FragmentCache(tmp_path / "cache", memory_bytes=0)
+    cache.put("a", (1,), "text")
+    index = tmp_path / "cache" / "index.json"
+    before = index.stat().st_mtime_ns
+    used = json.loads(index.read_text())["a"]["used"]
+
+    assert cache.get("a", (1,)) == "text"
+    assert index.stat().st_mtime_ns == before
+    cache.flush()
+    assert json.loads(index.read_text())["a"]["used"] > used
+
+
+def test_put_many_and_get_many(tmp_path):
+    cache = FragmentCache(tmp_path / "cache")
+    cache.put_many({"p#1": "one", "p#2": "two"}, (1, 1))
+
+    reopened = FragmentCache(tmp_path / "cache")
+    assert reopened.get_many(["p#1", "p#2", "p#3"], (1, 1)) == {"p#1": "one", "p#2": "two"}
+    assert reopened.get_many(["p#1"], (2, 1)) == {}
+
+
+def test_none_validator_is_never_cached(tmp_path):
+    cache = FragmentCache(tmp_path / "cache")
+    cache.put("url:https://x", None, "body")
+    assert cache.get("url:https://x", None) is None
+
+
+def test_resolve_many_keeps_order_and_dedupes(tmp_path, monkeypatch):
+    (tmp_path / "a.txt").write_text("alpha")
+    (tmp_path / "b.txt").write_text("beta")
+    calls = []
+
+    def fake_url(url):
+        calls.append(url)
+        return f"page {url}"
+
+    monkeypatch.setattr(at_handler, "_load_url_text", fake_url)
+    handler = AtHandler(cwd=str(tmp_path), use_cache=False)
+
+    refs = ["b.txt", "https://example.com", "a.txt", "b.txt", "missing.txt"]
+    results = handler.resolve_many(refs)
+
+    assert [r.original for r in results] == ["@b.txt", "@https://example.com", "@a.txt", "@b.txt", "@missing.txt"]
+    assert results[0].content == "beta"
+    assert results[1].content == "page https://example.com"
+    assert results[2].content == "alpha"
+    assert results[4].error
+    assert calls == ["https://example.com"]
+
+
+def test_cached_pdf_is_not_re_extracted(tmp_path, monkeypatch):
+    pdf = tmp_path / "report.pdf"
+    pdf.write_bytes(b"%PDF-1.4")
+    extractions = []
+
+    def fake_pdf(path):
+        extractions.append(path)
+        return "extracted"
+
+    monkeypatch.setattr(at_handler, "_load_pdf_text", fake_pdf)
+    # Whole-document loader path (no page-level backend)
+    monkeypatch.setattr(at_handler.pdf_pages, "get_backend", lambda: None)
+    handler = AtHandler(cwd=str(tmp_path), cache=FragmentCache(tmp_path / "cache"))
+
+    assert handler.resolve("pdf:report.pdf").content == "extracted"
+    assert handler.resolve("pdf:report.pdf").content == "extracted"
+    assert len(extractions) == 1
+
+    # Touching the file invalidates the entry
+    st = pdf.stat()
+    os.utime(pdf, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert file_validator(pdf) != (st.st_mtime_ns, st.st_size)
+    handler.resolve("pdf:report.pdf")
+    assert len(extractions) == 2
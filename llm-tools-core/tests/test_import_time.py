@@ -0,0 +1,123 @@
+"""Import-time regression tests for the thin client entry points.
+
+Every `@`, `context`, espanso and ulauncher invocation starts a fresh
+Python process, so anything imported at module load is paid per keystroke.
+Each entry point is imported in a clean interpreter, and the test checks
+which modules that loaded. Module sets are deterministic; wall-clock
+budgets are not on shared CI machines.
+"""
+
+import os
+import subprocess
+import sys
+from importlib.util import find_spec
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+# Modules a thin client must never import at startup: third-party stacks,
+# and stdlib modules that are slow to load and unneeded before a request
+HEAVY_MODULES = (
+    "llm", "sqlite_utils", "pydantic", "pluggy", "rich", "jinja2", "yaml",
+    "numpy", "sqlite3", "asyncio", "multiprocessing", "concurrent", "ctypes",
+)
+
+
+def _import_modules(code: str, extra_path: Path = None) -> set:
+    """Run code in a fresh interpreter and return the names in sys.modules."""
+    env = dict(os.environ)
+    paths = [str(REPO_ROOT / "llm-tools-core")]
+    if extra_path is not None:
+        paths.append(str(extra_path))
+    if env.get("PYTHONPATH"):
+        paths.append(env["PYTHONPATH"])
+    env["PYTHONPATH"] = os.pathsep.join(paths)
+
+    wrapped = f"import sys\n{code}\nprint('\\n'.join(sys.modules))\n"
+    proc = subprocess.run(
+        [sys.executable, "-c", wrapped],
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    return set(proc.stdout.splitlines())
+
+
+def _assert_light(modules: set):
+    heavy = sorted(m for m in modules if m.split(".")[0] in HEAVY_MODULES)
+    assert not heavy, f"heavy modules imported at startup: {heavy}"
+
+
+def _require(*modules):
+    missing = [m for m in modules if find_spec(m) is None]
+    if missing:
+        pytest.skip(f"not installed: {', '.join(missing)}")
+
+
+def test_package_import_is_lazy():
+    modules = _import_modules("import llm_tools_core")
+    assert "llm_tools_core.history" not in modules
+    assert "llm_tools_core.at_handler" not in modules
+    _assert_light(modules)
+
+
+def test_daemon_client_names_only_load_daemon_modules():
+    modules = _import_modules(
+        "from llm_tools_core import ensure_daemon, stream_events, build_simple_system_prompt"
+    )
+    loaded = {m for m in modules if m.startswith("llm_tools_core.")}
+    assert loaded == {
+        "llm_tools_core.daemon",
+        "llm_tools_core.daemon_client",
+        "llm_tools_core.prompts",
+    }
+    _assert_light(modules)
+
+
+def test_lazy_attributes_resolve():
+    import llm_tools_core
+
+    assert llm_tools_core.get_socket_path is llm_tools_core.daemon.get_socket_path
+    assert "AtHandler" in dir(llm_tools_core)
+    with pytest.raises(AttributeError):
+        llm_tools_core.does_not_exist
+
+
+def test_at_client_import():
+    _require("click", "rich")
+    modules = _import_modules(
+        "import llm_inlineassistant.client",
+        extra_path=REPO_ROOT / "llm-inlineassistant",
+    )
+    assert "rich" not in modules
+    _assert_light(modules)
+
+
+def test_context_cli_import():
+    _require("click")
+    modules = _import_modules(
+        "import llm_tools_context.cli",
+        extra_path=REPO_ROOT / "llm-tools-context",
+    )
+    _assert_light(modules)
+
+
+def test_espanso_query_import():
+    script = REPO_ROOT / "espanso-llm" / "llm-query.py"
+    modules = _import_modules(
+        "import importlib.util as u; "
+        f"s = u.spec_from_file_location('llm_query', {str(script)!r}); "
+        "s.loader.exec_module(u.module_from_spec(s))"
+    )
+    _assert_light(modules)
+
+
+def test_ulauncher_query_import():
+    modules = _import_modules(
+        "import query",
+        extra_path=REPO_ROOT / "ulauncher-llm",
+    )
+    _assert_light(modules)
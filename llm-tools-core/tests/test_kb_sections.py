@@ -0,0 +1,67 @@
+"""Tests for knowledge-base section retrieval."""
+
+from llm_tools_core.bm25 import BM25Index, bm25_scores
+from llm_tools_core.kb_sections import KBSectionIndex, split_sections
+
+KB = """---
+# not a heading
+scope: internal
+---
+# Pentest Checklist
+
+Always confirm scope before testing.
+
+## Web
+
+General web notes.
+
+### SQL injection
+
+Try sqlmap against every parameter.
+
+```bash
+# this comment is not a heading
+sqlmap -u URL
+```
+
+### XSS
+
+Check reflected parameters.
+
+## Active Directory
+
+Enumerate with bloodhound and kerberoast service accounts.
+"""
+
+
+def test_split_keeps_front_matter_and_heading_paths():
+    front, sections = split_sections(KB)
+    assert front.startswith("---")
+    assert "Always confirm scope" in front
+    assert "# Pentest Checklist" in front
+    assert [s.heading for s in sections] == [
+        "Web", "Web > SQL injection", "Web > XSS", "Active Directory",
+    ]
+    assert "sqlmap -u URL" in sections[1].text
+    assert sections[1].text.startswith("### SQL injection")
+
+
+def test_search_returns_top_sections_in_document_order():
+    index = KBSectionIndex(KB)
+    hits = index.search("kerberoast the sql server", top_k=2)
+    assert [s.heading for s in hits] == ["Web > SQL injection", "Active Directory"]
+    assert index.search("bloodhound", top_k=5)[0].heading == "Active Directory"
+    assert index.search("nothing relevant here", top_k=5) == []
+    assert index.search("", top_k=5) == []
+
+
+def test_document_without_sections():
+    front, sections = split_sections("Just some notes.\n")
+    assert front == "Just some notes."
+    assert sections == []
+    assert KBSectionIndex("Just some notes.").search("notes", 3) == []
+
+
+def test_index_matches_one_shot_scores():
+    docs = ["alpha beta", "beta gamma gamma", "delta"]
+    assert BM25Index(docs).scores("gamma beta") == bm25_scores(docs, "gamma beta")
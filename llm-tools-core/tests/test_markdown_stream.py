@@ -0,0 +1,75 @@
+"""Tests for MarkdownStream incremental block commits."""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("rich")
+
+from llm_tools_core.markdown import MarkdownStream
+
+
+class _RecordingConsole:
+    """Console stand-in that records the markdown source of printed blocks."""
+
+    def __init__(self):
+        self.blocks = []
+
+    def print(self, renderable=None):
+        if renderable is not None:
+            self.blocks.append(renderable.markup)
+
+
+def _stream(text, chunk_size=3):
+    console = _RecordingConsole()
+    stream = MarkdownStream(console)
+    for i in range(0, len(text), chunk_size):
+        stream.feed(text[i:i + chunk_size])
+    return console, stream
+
+
+def test_paragraph_committed_at_blank_line():
+    console, stream = _stream("First paragraph.\n\nSecond")
+    assert console.blocks == ["First paragraph."]
+    assert stream.tail.text == "Second"
+
+
+def test_code_fence_waits_for_closing_fence():
+    console, _ = _stream("```python\nx = 1\n\ny = 2\n")
+    assert console.blocks == []
+
+    console, _ = _stream("```python\nx = 1\n\ny = 2\n```\n")
+    assert console.blocks == ["```python\nx = 1\n\ny = 2\n```"]
+
+
+def test_loose_list_stays_open_until_non_list_line():
+    console, _ = _stream("1. one\n\n2. two\n\nAfter\n")
+    assert console.blocks == ["1. one\n\n2. two"]
+
+
+def test_heading_and_table_blocks():
+    console, _ = _stream("# Title\n| a | b |\n|---|---|\n| 1 | 2 |\n\n")
+    assert console.blocks == ["# Title", "| a | b |\n|---|---|\n| 1 | 2 |"]
+
+
+def test_finish_commits_tail_with_filter():
+    console, stream = _stream("Done.\n\nstray")
+    stream.finish(lambda text: text.upper())
+    assert console.blocks == ["Done.", "STRAY"]
+
+
+def test_import_does_not_load_rich():
+    # Rendering must not pull rich into thin-client imports; the caller brings the console
+    code = (
+        "import sys\n"
+        "from llm_tools_core.markdown import MarkdownStream\n"
+        "print('rich' in sys.modules)"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True, text=True, check=True,
+        cwd=Path(__file__).resolve().parents[1],
+    )
+    assert proc.stdout.strip() == "False"
@@ -0,0 +1,130 @@
+"""Tests for per-server MCP lifecycle management."""
+
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from llm_tools_core.mcp_pool import MCPServerPool
+
+
+class FakeToolbox:
+    def __init__(self, name):
+        self.name = name
+        self.closed = False
+
+    def tools(self):
+        return [SimpleNamespace(
+            name=f"{self.name}_search",
+            description="Search",
+            input_schema={"type": "object"},
+            implementation=lambda query: f"{self.name}: {query}",
+        )]
+
+
+class Connector:
+    def __init__(self, slow=(), fail=()):
+        self.calls = []
+        self.slow = set(slow)
+        self.fail = set(fail)
+        self.release = threading.Event()
+
+    def __call__(self, name, config):
+        self.calls.append(name)
+        if name in self.fail:
+            raise RuntimeError("spawn failed")
+        if name in self.slow:
+            self.release.wait(5)
+        return FakeToolbox(name)
+
+
+@pytest.fixture
+def config(tmp_path):
+    path = tmp_path / "mcp.json"
+    path.write_text(json.dumps({"mcpServers": {
+        "docs": {"type": "http", "url": "https://example.com/mcp"},
+        "browser": {"command": "browser-mcp", "optional": True},
+    }}))
+    return path
+
+
+def make(tmp_path, config, connector, **kwargs):
+    return MCPServerPool(connect=connector, close=lambda t: setattr(t, "closed", True),
+                         config_path=config, cache_path=tmp_path / "schemas.json", **kwargs)
+
+
+def test_servers_connect_only_when_used(tmp_path, config):
+    connector = Connector()
+    pool = make(tmp_path, config, connector)
+    assert pool.servers() == {"docs": False, "browser": True}
+    assert connector.calls == []
+
+    assert pool.call("docs", "docs_search", {"query": "q"}) == "docs: q"
+    assert connector.calls == ["docs"]
+    assert pool.state()["docs"]["status"] == "connected"
+    assert pool.state()["browser"]["status"] == "stopped"
+    pool.shutdown()
+
+
+def test_schemas_are_cached_for_the_next_process(tmp_path, config):
+    pool = make(tmp_path, config, Connector())
+    assert pool.tools("docs") == []
+    pool.call("docs", "docs_search", {"query": "q"})
+    pool.shutdown()
+
+    connector = Connector()
+    fresh = make(tmp_path, config, connector)
+    assert [t["name"] for t in fresh.tools("docs")] == ["docs_search"]
+    assert connector.calls == []
+
+    # A changed server config invalidates its cached schemas
+    data = json.loads(config.read_text())
+    data["mcpServers"]["docs"]["url"] = "https://example.org/mcp/v2"
+    config.write_text(json.dumps(data))
+    assert fresh.tools("docs") == []
+    fresh.shutdown()
+
+
+def test_slow_server_times_out_without_blocking_others(tmp_path, config):
+    connector = Connector(slow={"browser"})
+    pool = make(tmp_path, config, connector, timeout=0.2)
+    pool.start(["docs", "browser"])
+    start = time.monotonic()
+    pool.wait(["docs", "browser"])
+    assert time.monotonic() - start < 1
+    state = pool.state()
+    assert state["docs"]["status"] == "connected"
+    assert state["browser"]["status"] == "failed"
+    assert "Timed out" in state["browser"]["error"]
+    connector.release.set()
+    pool.shutdown()
+
+
+def test_failed_server_reports_error(tmp_path, config):
+    pool = make(tmp_path, config, Connector(fail={"docs"}))
+    with pytest.raises(RuntimeError, match="spawn failed"):
+        pool.call("docs", "docs_search", {"query": "q"})
+    assert pool.state()["docs"]["status"] == "failed"
+    pool.shutdown()
+
+
+def test_idle_servers_are_shut_down_and_reconnected(tmp_path, config):
+    connector = Connector()
+    pool = make(tmp_path, config, connector, idle_seconds=0)
+    pool.call("docs", "docs_search", {"query": "q"})
+    toolbox = pool._servers["docs"].toolbox
+    assert pool.evict_idle() == 1
+    assert toolbox.closed
+    assert pool.state()["docs"]["status"] == "stopped"
+
+    pool.call("docs", "docs_search", {"query": "again"})
+    assert connector.calls == ["docs", "docs"]
+    pool.shutdown()
+
+
+def test_missing_config(tmp_path):
+    pool = make(tmp_path, tmp_path / "missing.json", Connector())
+    assert pool.servers() == {}
+    assert "not found" in pool.config_error
@@ -0,0 +1,129 @@
+"""Tests for page-level PDF extraction, page ranges and page selection."""
+
+import pytest
+
+from llm_tools_core import pdf_pages
+from llm_tools_core.at_handler import AtHandler
+from llm_tools_core.fragment_cache import FragmentCache
+
+
+@pytest.mark.parametrize("spec,expected", [
+    ("10-12", [10, 11, 12]),
+    ("5", [5]),
+    ("1,3,7-8", [1, 3, 7, 8]),
+    ("18-", [18, 19, 20]),
+    ("15-99", [15, 16, 17, 18, 19, 20]),
+])
+def test_parse_page_range(spec, expected):
+    assert pdf_pages.parse_page_range(spec, 20) == expected
+
+
+@pytest.mark.parametrize("spec", ["abc", "5-2", "0", "30-40"])
+def test_parse_page_range_rejects(spec):
+    with pytest.raises(ValueError):
+        pdf_pages.parse_page_range(spec, 20)
+
+
+def test_chunks_split_contiguous_runs():
+    pages = list(range(1, 21)) + [30, 31]
+    assert pdf_pages._chunks(pages) == [(1, 16), (17, 20), (30, 31)]
+
+
+def test_select_pages_keeps_relevant_pages_in_order():
+    texts = {
+        1: "introduction " * 40,
+        2: "kerberos ticket roasting findings " * 10,
+        3: "appendix " * 40,
+        4: "kerberos delegation " * 10,
+    }
+    selected = pdf_pages.select_pages(texts, "kerberos findings", token_budget=200)
+    assert selected == [2, 4]
+    # Everything fits: all pages
+    assert pdf_pages.select_pages(texts, "kerberos", token_budget=None) == [1, 2, 3, 4]
+
+
+def _fake_document(monkeypatch, n_pages):
+    calls = []
+
+    def fake_extract(backend, path, first, last):
+        calls.append((first, last))
+        return [f"text of page {n}" for n in range(first, last + 1)]
+
+    monkeypatch.setattr(pdf_pages, "extract_page_range", fake_extract)
+    monkeypatch.setattr(pdf_pages, "page_count", lambda path, backend: n_pages)
+    monkeypatch.setattr(pdf_pages, "get_backend", lambda: "poppler")
+    return calls
+
+
+def test_extract_pages_uses_page_cache(tmp_path, monkeypatch):
+    calls = _fake_document(monkeypatch, 40)
+    cache = FragmentCache(tmp_path / "cache")
+    progress = []
+
+    texts = pdf_pages.extract_pages(
+        "/doc.pdf", list(range(1, 41)), "poppler",
+        cache=cache, validator=(1, 1), progress=lambda d, t: progress.append((d, t)),
+    )
+    assert len(texts) == 40 and texts[40] == "text of page 40"
+    assert sorted(calls) == [(1, 16), (17, 32), (33, 40)]
+    assert progress[-1] == (40, 40)
+
+    calls.clear()
+    pdf_pages.extract_pages("/doc.pdf", [10, 11, 12], "poppler", cache=cache, validator=(1, 1))
+    assert calls == []
+
+
+def test_extract_pages_writes_cache_index_once(tmp_path, monkeypatch):
+    _fake_document(monkeypatch, 100)
+    cache = FragmentCache(tmp_path / "cache")
+    saves = []
+    save_index = cache._save_index
+    monkeypatch.setattr(cache, "_save_index", lambda: saves.append(1) or save_index())
+
+    pdf_pages.extract_pages("/doc.pdf", list(range(1, 101)), "poppler", cache=cache, validator=(1, 1))
+    assert len(saves) == 1
+    pdf_pages.extract_pages("/doc.pdf", list(range(1, 101)), "poppler", cache=cache, validator=(1, 1))
+    assert len(saves) == 1
+
+
+def test_resolve_pdf_page_range(tmp_path, monkeypatch):
+    _fake_document(monkeypatch, 50)
+    (tmp_path / "report.pdf").write_bytes(b"%PDF-1.4")
+    handler = AtHandler(cwd=str(tmp_path), cache=FragmentCache(tmp_path / "cache"))
+
+    ref = handler.resolve("pdf:report.pdf#10-11")
+    assert ref.error is None
+    assert ref.original == "@pdf:report.pdf#10-11"
+    assert ref.content == "[Page 10/50]\ntext of page 10\n\n[Page 11/50]\ntext of page 11"
+
+    bad = handler.resolve("pdf:report.pdf#60-70")
+    assert "outside the document" in bad.error
+
+
+def test_resolve_many_reports_progress(tmp_path, monkeypatch):
+    _fake_document(monkeypatch, 3)
+    (tmp_path / "a.pdf").write_bytes(b"%PDF-1.4")
+    events = []
+    handler = AtHandler(cwd=str(tmp_path), use_cache=False)
+
+    [ref] = handler.resolve_many(["pdf:a.pdf"], progress=lambda *e: events.append(e))
+    assert ref.content == "text of page 1\n\ntext of page 2\n\ntext of page 3"
+    assert events == [("@pdf:a.pdf", 3, 3)]
+
+
+def test_resolve_many_stops_when_cancelled(tmp_path, monkeypatch):
+    import threading
+
+    calls = _fake_document(monkeypatch, 40)
+    (tmp_path / "a.pdf").write_bytes(b"%PDF-1.4")
+    handler = AtHandler(cwd=str(tmp_path), use_cache=False)
+    cancel = threading.Event()
+
+    # Cancelled after the first of three chunks
+    [ref] = handler.resolve_many(["pdf:a.pdf"], progress=lambda *e: cancel.set(), cancel=cancel)
+    assert ref.error == "cancelled"
+
+    calls.clear()
+    refs = handler.resolve_many(["pdf:a.pdf", "https://example.com"], cancel=cancel)
+    assert [r.error for r in refs] == ["cancelled", "cancelled"]
+    assert calls == []
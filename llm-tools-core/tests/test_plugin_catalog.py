@@ -0,0 +1,82 @@
+"""Tests for the on-disk plugin tool/model catalogue."""
+
+import os
+
+import pytest
+
+from llm_tools_core import plugin_catalog
+from llm_tools_core.plugin_catalog import PluginCatalog, catalog_fingerprint
+
+CATALOG = {
+    "tools": [{"name": "fetch_url", "description": "Fetch", "input_schema": {}, "plugin": "web"}],
+    "models": [{"model_id": "gpt-4.1", "aliases": ["4.1"]}, {"model_id": "gemini-2.5-flash", "aliases": []}],
+}
+
+
+class Builder:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return CATALOG
+
+
+@pytest.fixture
+def fingerprint():
+    return {"value": "a"}
+
+
+def make(tmp_path, builder, fingerprint, **kwargs):
+    return PluginCatalog(
+        path=tmp_path / "catalog.json", builder=builder, fingerprint=lambda: fingerprint["value"], **kwargs
+    )
+
+
+def test_catalog_is_built_once_and_reused_across_processes(tmp_path, fingerprint):
+    builder = Builder()
+    assert make(tmp_path, builder, fingerprint).model_ids() == ["gpt-4.1", "gemini-2.5-flash"]
+    # A new process (new instance) reads the file instead of rebuilding
+    assert make(tmp_path, builder, fingerprint).tools()[0]["name"] == "fetch_url"
+    assert builder.calls == 1
+
+
+def test_changed_fingerprint_rebuilds(tmp_path, fingerprint, monkeypatch):
+    builder = Builder()
+    make(tmp_path, builder, fingerprint).load()
+    fingerprint["value"] = "b"
+    make(tmp_path, builder, fingerprint).load()
+    assert builder.calls == 2
+
+    # Within a process the fingerprint is only re-checked periodically
+    catalog = make(tmp_path, builder, fingerprint)
+    catalog.load()
+    fingerprint["value"] = "c"
+    catalog.load()
+    assert builder.calls == 2
+    monkeypatch.setattr(plugin_catalog, "FINGERPRINT_CHECK_SECONDS", 0)
+    catalog.load()
+    assert builder.calls == 3
+
+
+def test_expired_catalog_and_refresh_rebuild(tmp_path, fingerprint):
+    builder = Builder()
+    make(tmp_path, builder, fingerprint, max_age=-1).load()
+    make(tmp_path, builder, fingerprint, max_age=-1).load()
+    assert builder.calls == 2
+    make(tmp_path, builder, fingerprint).load(refresh=True)
+    assert builder.calls == 3
+
+
+def test_fingerprint_tracks_llm_config_mtimes(tmp_path, monkeypatch):
+    monkeypatch.setenv("LLM_USER_PATH", str(tmp_path))
+    (tmp_path / "logs.db").write_text("")
+    (tmp_path / "extra-openai-models.yaml").write_text("[]")
+    before = catalog_fingerprint()
+
+    # The logs database changes on every query and must not matter
+    os.utime(tmp_path / "logs.db", ns=(1, 1))
+    assert catalog_fingerprint() == before
+
+    os.utime(tmp_path / "extra-openai-models.yaml", ns=(1, 1))
+    assert catalog_fingerprint() != before
@@ -0,0 +1,71 @@
+"""Tests for prompt-cache-friendly system prompt layout."""
+
+from llm_tools_core.prompt_layout import (
+    SESSION,
+    STATIC,
+    TURN,
+    PromptCacheStats,
+    PromptSegment,
+    cache_usage,
+    layout_prompt,
+    system_prompt_kwargs,
+)
+
+
+def test_orders_by_stability_and_keeps_order_within_tier():
+    layout = layout_prompt([
+        PromptSegment("watch", "W", TURN),
+        PromptSegment("base", "B"),
+        PromptSegment("skills", "S", SESSION),
+        PromptSegment("kb", "K", SESSION),
+    ])
+    assert [s.name for s in layout.segments] == ["base", "skills", "kb", "watch"]
+    assert [s.stability for s in layout.segments] == [STATIC, SESSION, SESSION, TURN]
+    assert layout.blocks == ["B", "S\n\nK", "W"]
+    assert layout.text == "B\n\nS\n\nK\n\nW"
+    assert layout.breakpoints == [1, 7, 10]
+    assert layout.breakpoints[-1] == len(layout.text)
+
+
+def test_static_prefix_unaffected_by_dynamic_segments():
+    base = PromptSegment("base", "Base instructions\n")
+    quiet = layout_prompt([base, PromptSegment("watch", "", TURN)])
+    active = layout_prompt([PromptSegment("watch", "goal", TURN), base])
+    assert quiet.text == "Base instructions"
+    assert active.text.startswith(quiet.text + "\n\n")
+    assert active.blocks[0] == quiet.blocks[0]
+
+
+def test_system_prompt_kwargs():
+    layout = layout_prompt([PromptSegment("a", "A"), PromptSegment("b", "B", SESSION)])
+    assert system_prompt_kwargs(layout) == {"system": "B", "system_fragments": ["A"]}
+    assert system_prompt_kwargs(layout_prompt([])) == {}
+
+    class Model:
+        class Options:
+            model_fields = {"cache": None, "max_tokens": None}
+
+    assert system_prompt_kwargs(layout_prompt([PromptSegment("a", "A")]), Model()) == {
+        "system": "A", "cache": True,
+    }
+
+
+def test_cache_usage_by_provider():
+    anthropic = cache_usage({"cache_read_input_tokens": 900, "cache_creation_input_tokens": 50})
+    assert (anthropic.read, anthropic.write) == (900, 50)
+    assert anthropic.prompt_tokens(100) == 1050
+    openai = cache_usage('{"prompt_tokens_details": {"cached_tokens": 512}}')
+    assert (openai.read, openai.prompt_tokens(1000)) == (512, 1000)
+    assert cache_usage({"input_tokens_details": {"cached_tokens": 7}}).read == 7
+    assert cache_usage({"cachedContentTokenCount": 300}).read == 300
+    assert cache_usage(None).read == 0
+    assert cache_usage("not json").read == 0
+
+
+def test_stats_hit_rate():
+    stats = PromptCacheStats()
+    stats.record(100, {"cache_read_input_tokens": 900, "cache_creation_input_tokens": 0})
+    stats.record(1000, None)
+    assert stats.responses == 2
+    assert stats.prompt_tokens == 2000
+    assert stats.stats()["hit_rate"] == 0.45
@@ -0,0 +1,108 @@
+"""Tests for the RAG engine registry and query-result cache."""
+
+import threading
+
+import pytest
+
+from llm_tools_core import rag_handler
+from llm_tools_core.rag_handler import EngineRegistry, QueryCache
+
+
+class FakeEngine:
+    def __init__(self, collection):
+        self.collection = collection
+        self.searches = 0
+
+    def search(self, query, top_k=5, mode="hybrid", filters=None):
+        self.searches += 1
+        return [{"content": f"{self.collection}: {query}", "score": 1.0, "metadata": {}}]
+
+
+@pytest.fixture
+def loads(monkeypatch):
+    """Route cached_search through fresh caches and record engine loads."""
+    created = []
+
+    def factory(collection, model=None):
+        created.append(collection)
+        return FakeEngine(collection)
+
+    monkeypatch.setattr(rag_handler, "_engines", EngineRegistry(factory=factory))
+    monkeypatch.setattr(rag_handler, "_results", QueryCache())
+    return created
+
+
+def test_engine_is_loaded_once(loads):
+    rag_handler.cached_search("docs", "first question")
+    rag_handler.cached_search("docs", "follow-up question")
+    assert loads == ["docs"]
+    assert rag_handler.get_engine("docs").searches == 2
+
+
+def test_equivalent_queries_hit_the_cache(loads):
+    first = rag_handler.cached_search("docs", "How  does X work?")
+    second = rag_handler.cached_search("docs", "how does x work?  ")
+    assert first == second
+    assert rag_handler.get_engine("docs").searches == 1
+
+    # Different top_k or mode is a different search
+    rag_handler.cached_search("docs", "how does x work?", top_k=3)
+    rag_handler.cached_search("docs", "how does x work?", mode="vector")
+    assert rag_handler.get_engine("docs").searches == 3
+
+
+def test_invalidate_collection_drops_engine_and_results(loads):
+    rag_handler.cached_search("docs", "q")
+    rag_handler.cached_search("other", "q")
+    rag_handler.invalidate_collection("docs")
+
+    rag_handler.cached_search("docs", "q")
+    rag_handler.cached_search("other", "q")
+    assert loads == ["docs", "other", "docs"]
+    assert rag_handler.get_engine("other").searches == 1
+
+
+def test_idle_engines_are_evicted():
+    registry = EngineRegistry(factory=lambda c, m=None: FakeEngine(c), idle_seconds=0)
+    registry.get("docs")
+    assert registry.evict_idle() == 1
+    assert len(registry) == 0
+
+
+def test_slow_load_blocks_only_its_own_collection():
+    started, release = threading.Event(), threading.Event()
+    created = []
+
+    def factory(collection, model=None):
+        created.append(collection)
+        if collection == "slow":
+            started.set()
+            release.wait(5)
+        return FakeEngine(collection)
+
+    registry = EngineRegistry(factory=factory)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get("slow"))) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    assert started.wait(5)
+    # Another collection loads while "slow" is still loading
+    assert registry.get("fast").collection == "fast"
+    assert not release.is_set() and "slow" not in [k[0] for k in registry._engines]
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert created.count("slow") == 1
+    assert len({id(engine) for engine in results}) == 1
+
+
+def test_query_cache_is_bounded_and_expires():
+    cache = QueryCache(max_entries=2, ttl=60)
+    for name in ("a", "b", "c"):
+        cache.put(QueryCache.key(name, "q", 5, "hybrid"), [{"content": name}])
+    assert cache.get(QueryCache.key("a", "q", 5, "hybrid")) is None
+    assert cache.get(QueryCache.key("c", "q", 5, "hybrid")) == [{"content": "c"}]
+
+    expired = QueryCache(ttl=-1)
+    expired.put(QueryCache.key("a", "q", 5, "hybrid"), [])
+    assert expired.get(QueryCache.key("a", "q", 5, "hybrid")) is None
@@ -0,0 +1,98 @@
+"""Tests for manifest-based RAG ingestion."""
+
+import pytest
+
+from llm_tools_core.rag_ingest import enumerate_files, ingest_documents, load_manifest
+
+
+class FakeEngine:
+    def __init__(self, fail=()):
+        self.calls = []
+        self.fail = set(fail)
+
+    def add_document(self, path, refresh=False):
+        self.calls.append((path, refresh))
+        if path in self.fail:
+            raise RuntimeError("embedding failed")
+        return {"status": "success", "chunks": 2}
+
+
+@pytest.fixture(autouse=True)
+def config_home(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path / "config"))
+
+
+@pytest.fixture
+def docs(tmp_path):
+    root = tmp_path / "docs"
+    (root / "sub").mkdir(parents=True)
+    (root / ".git").mkdir()
+    (root / "a.md").write_text("alpha")
+    (root / "sub" / "b.md").write_text("beta")
+    (root / ".git" / "config").write_text("x")
+    (root / ".hidden").write_text("x")
+    return root
+
+
+def test_enumerate_skips_hidden_and_passes_through_remote(docs):
+    assert enumerate_files(str(docs)) == [str(docs / "a.md"), str(docs / "sub" / "b.md")]
+    assert enumerate_files(str(docs / "**" / "*.md")) == [str(docs / "a.md"), str(docs / "sub" / "b.md")]
+    assert enumerate_files("git:https://github.com/user/repo") is None
+    assert enumerate_files("https://example.com/doc.pdf") is None
+
+
+def test_readd_skips_unchanged_and_refreshes_changed(docs):
+    engine = FakeEngine()
+    result = ingest_documents(engine, "notes", str(docs))
+    assert result["status"] == "success"
+    assert result["chunks"] == 4
+    assert engine.calls == [(str(docs / "a.md"), False), (str(docs / "sub" / "b.md"), False)]
+    assert load_manifest("notes")[str(docs / "a.md")]["chunks"] == 2
+
+    (docs / "a.md").write_text("alpha, edited")
+    (docs / "c.md").write_text("gamma")
+    engine.calls.clear()
+    result = ingest_documents(engine, "notes", str(docs))
+    assert engine.calls == [(str(docs / "a.md"), True), (str(docs / "c.md"), False)]
+    assert (result["added"], result["unchanged"], result["failed"]) == (2, 1, 0)
+
+    engine.calls.clear()
+    assert ingest_documents(engine, "notes", str(docs))["status"] == "skipped"
+    assert engine.calls == []
+
+
+def test_interrupted_ingest_resumes(docs):
+    failing = FakeEngine(fail={str(docs / "sub" / "b.md")})
+    result = ingest_documents(failing, "notes", str(docs))
+    assert result["failed"] == 1
+    assert "embedding failed" in result["error"]
+
+    engine = FakeEngine()
+    ingest_documents(engine, "notes", str(docs))
+    assert engine.calls == [(str(docs / "sub" / "b.md"), False)]
+
+
+def test_progress_reports_every_file(docs):
+    seen = []
+    ingest_documents(FakeEngine(), "notes", str(docs), progress=lambda d, t, p, c: seen.append((d, t, c)))
+    assert seen == [(1, 2, 2), (2, 2, 4)]
+
+
+def test_binary_files_and_tool_dirs_are_skipped(docs):
+    (docs / "logo.png").write_bytes(b"\x89PNG\r\n")
+    (docs / "blob").write_bytes(b"\x00\x01\x02 not text")
+    (docs / "latin1.txt").write_bytes("caf\xe9".encode("latin-1"))
+    (docs / "env" / "lib").mkdir(parents=True)
+    (docs / "env" / "pyvenv.cfg").write_text("home = /usr")
+    (docs / "env" / "lib" / "x.py").write_text("x = 1")
+    for name in ("HEAD", "objects", "refs"):
+        (docs / "mirror" / name).mkdir(parents=True)
+
+    files = enumerate_files(str(docs))
+    assert str(docs / "logo.png") not in files
+    assert not any("/env/" in f or "/mirror/" in f for f in files)
+
+    engine = FakeEngine()
+    result = ingest_documents(engine, "notes", str(docs))
+    assert sorted(path for path, _ in engine.calls) == [str(docs / "a.md"), str(docs / "sub" / "b.md")]
+    assert result["binary"] == 2
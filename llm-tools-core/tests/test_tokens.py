@@ -0,0 +1,35 @@
+"""Tests for the pluggable tokenizer in tokens."""
+
+import pytest
+
+from llm_tools_core import tokens
+
+
+@pytest.fixture(autouse=True)
+def reset_tokenizer():
+    yield
+    tokens.set_tokenizer(None)
+
+
+def test_count_tokens_uses_registered_tokenizer():
+    tokens.set_tokenizer(lambda text: len(text.split()))
+    assert tokens.count_tokens("three short words") == 3
+    assert tokens.count_tokens("") == 0
+
+
+def test_count_tokens_falls_back_to_estimate():
+    def broken(text):
+        raise RuntimeError("tokenizer failed")
+
+    tokens.set_tokenizer(broken)
+    assert tokens.count_tokens("x" * 40) == 10
+
+
+def test_auto_detection_is_cached(monkeypatch):
+    lookups = []
+    monkeypatch.setattr(tokens, "find_spec", lambda name: lookups.append(name))
+    tokens.set_tokenizer(None)
+    assert tokens.get_tokenizer() is None
+    assert tokens.get_tokenizer() is None
+    assert lookups == ["tiktoken"]
+    assert tokens.count_tokens("x" * 40) == 10
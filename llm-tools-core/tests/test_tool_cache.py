@@ -0,0 +1,102 @@
+"""Tests for the idempotent tool result cache."""
+
+import asyncio
+from types import SimpleNamespace
+
+from llm_tools_core import tool_cache
+from llm_tools_core.tool_cache import ToolCachePolicy, ToolResultCache, is_cacheable_result
+
+
+def make(**kwargs):
+    return ToolResultCache(policies={
+        "fetch_url": ToolCachePolicy(ttl=60, max_result_chars=100),
+        "search_google": ToolCachePolicy(ttl=60),
+    }, **kwargs)
+
+
+def test_hit_ignores_argument_order():
+    cache = make()
+    assert cache.get("fetch_url", {"url": "https://a", "raw": False}) is None
+    cache.put("fetch_url", {"url": "https://a", "raw": False}, "page")
+    assert cache.get("fetch_url", {"raw": False, "url": "https://a"}) == "page"
+    assert cache.get("fetch_url", {"url": "https://b", "raw": False}) is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_overrides_are_part_of_the_key():
+    cache = make()
+    args = {"query": "q"}
+    cache.put("search_google", args, "with sources", {"search_google": {"sources": True}})
+    assert cache.get("search_google", args, {"search_google": {"sources": False}}) is None
+    assert cache.get("search_google", args, {"search_google": {"sources": True}}) == "with sources"
+
+
+def test_tools_with_side_effects_are_never_cached():
+    cache = ToolResultCache()
+    cache.put("execute_terminal", {"command": "ls"}, "files")
+    assert cache.get("execute_terminal", {"command": "ls"}) is None
+    assert "context" not in tool_cache.CACHEABLE_TOOLS
+    assert cache.stats()["entries"] == 0
+
+
+def test_entries_expire(monkeypatch):
+    cache = make()
+    now = [1000.0]
+    monkeypatch.setattr(tool_cache.time, "monotonic", lambda: now[0])
+    cache.put("fetch_url", {"url": "https://a"}, "page")
+    now[0] += 59
+    assert cache.get("fetch_url", {"url": "https://a"}) == "page"
+    now[0] += 2
+    assert cache.get("fetch_url", {"url": "https://a"}) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_size_limits():
+    cache = make(max_chars=10)
+    cache.put("fetch_url", {"url": "too-big"}, "x" * 101)
+    assert cache.get("fetch_url", {"url": "too-big"}) is None
+
+    cache.put("fetch_url", {"url": "a"}, "aaaaa")
+    cache.put("fetch_url", {"url": "b"}, "bbbbb")
+    cache.get("fetch_url", {"url": "a"})  # a is now most recently used
+    cache.put("fetch_url", {"url": "c"}, "ccccc")
+    assert cache.get("fetch_url", {"url": "b"}) is None
+    assert cache.get("fetch_url", {"url": "a"}) == "aaaaa"
+    assert cache.stats()["chars"] == 10
+
+
+def test_failures_are_not_cacheable():
+    assert is_cacheable_result("page", "page")
+    assert not is_cacheable_result("", "")
+    assert not is_cacheable_result("  \n", "  \n")
+    assert not is_cacheable_result(SimpleNamespace(exception=OSError()), "partial")
+    assert not is_cacheable_result(SimpleNamespace(isError=True), "upstream said no")
+    assert not is_cacheable_result("Failed to fetch https://a", "Failed to fetch https://a")
+    assert not is_cacheable_result("x", "Error: timeout")
+
+
+def test_failed_calls_are_not_cached():
+    from llm_tools_core.tool_execution import execute_tool_call
+
+    cache = make()
+    outcomes = [RuntimeError("connection reset"), "", "page"]
+
+    def fetch_url(url):
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    async def emit(event):
+        pass
+
+    def call():
+        tool_call = SimpleNamespace(name="fetch_url", arguments={"url": "https://a"}, tool_call_id="t1")
+        return asyncio.run(execute_tool_call(tool_call, {"fetch_url": fetch_url}, emit, cache=cache))
+
+    assert call().output.startswith("Error executing fetch_url")
+    assert call().output == ""
+    assert cache.stats()["entries"] == 0
+    assert call().output == "page"
+    assert cache.get("fetch_url", {"url": "https://a"}) == "page"
@@ -0,0 +1,67 @@
+"""Tests for per-category tool executors and timeouts."""
+
+import asyncio
+import threading
+
+import pytest
+
+from llm_tools_core.tool_pools import ToolExecutors, ToolTimeoutError
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_tools_run_on_their_category_pool():
+    executors = ToolExecutors()
+    name = run(executors.run("sandboxed_shell", lambda: threading.current_thread().name))
+    assert name.startswith("tool-subprocess")
+    name = run(executors.run("some_mcp_tool", lambda: threading.current_thread().name))
+    assert name.startswith("tool-network")
+    assert executors.stats()["subprocess"]["completed"] == 1
+    executors.shutdown()
+
+
+def test_timeout_raises_and_frees_the_caller():
+    executors = ToolExecutors(timeouts={"sandboxed_shell": 0.05})
+    release = threading.Event()
+    with pytest.raises(ToolTimeoutError) as excinfo:
+        run(executors.run("sandboxed_shell", lambda: release.wait(5)))
+    assert excinfo.value.timeout == 0.05
+    stats = executors.stats()["subprocess"]
+    assert stats["timed_out"] == 1
+    assert stats["busy"] == 1  # The hung call still holds its slot
+    release.set()
+    executors.shutdown()
+
+
+def test_saturated_pool_does_not_block_other_categories():
+    executors = ToolExecutors(sizes={"subprocess": 1}, timeouts={"sandboxed_shell": 0.05})
+    release = threading.Event()
+
+    async def scenario():
+        hung = asyncio.ensure_future(executors.run("sandboxed_shell", lambda: release.wait(5)))
+        queued = asyncio.ensure_future(executors.run("sandboxed_shell", lambda: "never"))
+        await asyncio.sleep(0.01)
+        assert executors.stats()["subprocess"]["queued"] == 1
+        assert await executors.run("fetch_url", lambda: "page") == "page"
+        for task in (hung, queued):
+            with pytest.raises(ToolTimeoutError):
+                await task
+
+    run(scenario())
+    stats = executors.stats()["subprocess"]
+    assert stats["timed_out"] == 2
+    assert stats["queued"] == 0  # The queued call was cancelled, not run
+    release.set()
+    executors.shutdown()
+
+
+def test_configure_ignores_invalid_entries():
+    executors = ToolExecutors()
+    executors.configure(sizes={"network": 0, "cpu": 2, "gpu": 4}, timeouts={"fetch_url": "slow"})
+    assert executors.sizes["network"] == 16
+    assert executors.sizes["cpu"] == 2
+    assert "gpu" not in executors.sizes
+    assert executors.timeout("fetch_url") == 60
+    assert executors.timeout("unknown_tool") == 120
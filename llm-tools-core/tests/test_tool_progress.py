@@ -0,0 +1,88 @@
+"""Tests for streaming progress from running tools."""
+
+import asyncio
+import subprocess
+import sys
+import time
+
+import pytest
+
+from llm_tools_core.tool_progress import ProgressChannel, call_with_progress, report_progress, run_streaming
+
+
+class Sink:
+    def __init__(self):
+        self.events = []
+
+    async def __call__(self, text, dropped):
+        self.events.append((text, dropped))
+
+
+def run_tool(fn, sink, **kwargs):
+    async def scenario():
+        channel = ProgressChannel(sink, **kwargs)
+        channel.start()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                None, lambda: call_with_progress(channel, fn)
+            )
+        finally:
+            await channel.close()
+
+    return asyncio.run(scenario())
+
+
+def test_report_progress_is_batched_and_rate_limited():
+    def tool():
+        for i in range(50):
+            report_progress(f"line {i}\n")
+            time.sleep(0.002)
+        return "done"
+
+    sink = Sink()
+    assert run_tool(tool, sink, interval=0.05) == "done"
+    # ~100ms of output at one event per 50ms, plus the final flush
+    assert 1 <= len(sink.events) <= 5
+    assert "".join(text for text, _ in sink.events) == "".join(f"line {i}\n" for i in range(50))
+
+
+def test_iterator_results_are_streamed_and_joined():
+    sink = Sink()
+    result = run_tool(lambda: (f"{i}," for i in range(3)), sink)
+    assert result == "0,1,2,"
+    assert "".join(text for text, _ in sink.events) == "0,1,2,"
+
+
+def test_pending_output_is_bounded():
+    sink = Sink()
+
+    def flood():
+        report_progress("a" * 100)
+        report_progress("b" * 30)
+        return "full result"
+
+    # A long interval keeps later output pending until close()
+    assert run_tool(flood, sink, interval=10, max_chars=50) == "full result"
+    assert sink.events[-1][0].endswith("b" * 30)
+    assert all(len(text) <= 50 for text, _ in sink.events)
+    assert sum(len(text) + dropped for text, dropped in sink.events) == 130
+
+
+def test_report_progress_without_channel():
+    assert report_progress("ignored") is False
+
+
+def test_run_streaming_reports_lines_and_returns_output():
+    script = "import sys\nprint('out')\nprint('err', file=sys.stderr)\nsys.exit(3)"
+    sink = Sink()
+    result = run_tool(lambda: run_streaming([sys.executable, "-c", script]), sink)
+    assert result.returncode == 3
+    assert sorted(result.stdout.splitlines()) == ["err", "out"]
+    assert "".join(text for text, _ in sink.events) == result.stdout
+
+
+def test_run_streaming_timeout_kills_command():
+    script = "import time\nprint('started', flush=True)\ntime.sleep(30)"
+    with pytest.raises(subprocess.TimeoutExpired) as excinfo:
+        run_streaming([sys.executable, "-c", script], timeout=0.5)
+    assert excinfo.value.output == "started\n"